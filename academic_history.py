@@ -6,29 +6,24 @@ Proporciona funciones para analizar patrones, mejoras y reincidencias en tutorí
 from collections import defaultdict
 from datetime import datetime
 
+from motivo_classifier import MOTIVO_CATEGORIES, obtener_clasificador
+
 class AcademicHistoryAnalyzer:
     """Analizador de historial académico de estudiantes"""
     
-    MOTIVO_CATEGORIES = {
-        'baja calificación': 'Baja Calificación',
-        'bajo desempeño': 'Baja Calificación',
-        'inasistencia': 'Inasistencias',
-        'falta de motivación': 'Problemas de Actitud',
-        'problemas de conducta': 'Problemas de Actitud',
-        'reforzamiento': 'Reforzamiento Académico',
-        'asesoría general': 'Asesoría General',
-    }
+    MOTIVO_CATEGORIES = MOTIVO_CATEGORIES
     
     def __init__(self):
         pass
         
+    @property
+    def clasificador(self):
+        """Clasificador de motivos compartido para la tabla MOTIVO_CATEGORIES vigente"""
+        return obtener_clasificador(categorias=self.MOTIVO_CATEGORIES)
+        
     def _normalize_motivo(self, motivo):
-        """Normaliza el motivo a una categoría general."""
-        motivo_lower = motivo.lower()
-        for keyword, category in self.MOTIVO_CATEGORIES.items():
-            if keyword in motivo_lower:
-                return category
-        return motivo # Retorna el motivo original si no se encuentra categoría
+        """Normaliza el motivo a una categoría general (o el original si no hay categoría)."""
+        return self.clasificador.clasificar(motivo).categoria
     
     def agrupar_por_cuatrimestre(self, tutorias):
         """
@@ -60,11 +55,11 @@ class AcademicHistoryAnalyzer:
             Dict con {motivo: cantidad}
         """
         motivos = defaultdict(int)
+        clasificar = self.clasificador.clasificar
         
         for tutoría in tutorias:
             motivo = tutoría.get('motivo', 'N/A')
-            normalized_motivo = self._normalize_motivo(motivo)
-            motivos[normalized_motivo] += 1
+            motivos[clasificar(motivo).categoria] += 1
         
         return dict(sorted(motivos.items(), key=lambda x: x[1], reverse=True))
     
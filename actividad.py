@@ -0,0 +1,235 @@
+"""
+Módulo de Actividad Mensual
+Mantiene la tabla de resumen actividad_mensual (registros por tipo, año, mes, carrera y
+cuatrimestre) actualizada por triggers, y la lectura que usa el dashboard
+"""
+
+from collections import namedtuple
+
+# Número de meses (los más recientes con registros) que muestra la gráfica del dashboard
+MESES_GRAFICA = 12
+
+MESES_ABREVIADOS = ('Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic')
+
+_ANIO = "coalesce(CAST(strftime('%Y', {p}fecha) AS INTEGER), 0)"
+_MES = "coalesce(CAST(strftime('%m', {p}fecha) AS INTEGER), 0)"
+
+# Tipos de registro: tabla origen -> (expresión de carrera, expresión de cuatrimestre,
+# columnas que cambian la clave, (columna origen, columna de estudiantes) o None).
+# La carrera de asesorías y tutorías individuales es la del estudiante; las asesorías
+# no registran cuatrimestre y quedan con '' (solo cuentan sin filtro de cuatrimestre).
+TIPOS_ACTIVIDAD = {
+    'asesoria': (
+        "(SELECT e.carrera FROM estudiantes e WHERE e.id = {p}estudiante_id)", "''",
+        ('fecha', 'estudiante_id'), ('estudiante_id', 'id'),
+    ),
+    'tutoria': (
+        "(SELECT e.carrera FROM estudiantes e WHERE e.id = {p}estudiante_id)", "{p}cuatrimestre",
+        ('fecha', 'estudiante_id', 'cuatrimestre'), ('estudiante_id', 'id'),
+    ),
+    'tutoria_grupal': (
+        "{p}carrera", "{p}cuatrimestre",
+        ('fecha', 'carrera', 'cuatrimestre'), None,
+    ),
+}
+
+ResumenActividad = namedtuple('ResumenActividad', [
+    'totales',          # {tipo: registros} (incluye los que no tienen fecha)
+    'meses',            # etiquetas 'Ene 2025' en orden cronológico
+    'series',           # {tipo: [cantidad por mes]} alineadas con meses
+    'carreras',         # opciones del filtro de carrera
+    'cuatrimestres',    # opciones del filtro de cuatrimestre
+])
+
+_CONFLICTO = "ON CONFLICT (tipo, anio, mes, carrera, cuatrimestre) DO UPDATE SET cantidad = cantidad + excluded.cantidad"
+
+
+def _sumar_fila(tipo, prefijo, cantidad):
+    """Sentencia que suma `cantidad` al grupo de una fila (new. u old.)"""
+    carrera, cuatrimestre, _, _ = TIPOS_ACTIVIDAD[tipo]
+    return f"""
+        INSERT INTO actividad_mensual (tipo, anio, mes, carrera, cuatrimestre, cantidad)
+        VALUES ('{tipo}', {_ANIO.format(p=prefijo)}, {_MES.format(p=prefijo)},
+                coalesce({carrera.format(p=prefijo)}, ''), coalesce({cuatrimestre.format(p=prefijo)}, ''), {cantidad})
+        {_CONFLICTO};
+    """
+
+
+def _sumar_grupos(tipo, signo, carrera=None, condicion=''):
+    """Sentencia que suma (signo '+') o resta (signo '-') los grupos de las filas de la tabla"""
+    expresion_carrera, expresion_cuatrimestre, _, _ = TIPOS_ACTIVIDAD[tipo]
+    carrera = carrera or expresion_carrera.format(p='t.')
+    return f"""
+        INSERT INTO actividad_mensual (tipo, anio, mes, carrera, cuatrimestre, cantidad)
+        SELECT '{tipo}', anio, mes, carrera, cuatrimestre, {signo}COUNT(*) FROM (
+            SELECT {_ANIO.format(p='t.')} AS anio, {_MES.format(p='t.')} AS mes,
+                   coalesce({carrera}, '') AS carrera,
+                   coalesce({expresion_cuatrimestre.format(p='t.')}, '') AS cuatrimestre
+            FROM {tipo} t {condicion}
+        )
+        GROUP BY anio, mes, carrera, cuatrimestre
+        {_CONFLICTO};
+    """
+
+
+def _triggers_estudiantes():
+    """
+    Un cambio en estudiantes (alta, baja, carrera o llave) mueve las filas que dependen
+    del estudiante al grupo de la carrera nueva: se restan con la carrera anterior y se
+    suman con la actual. Antes del alta y después de la baja la carrera es ''.
+    """
+    dependientes = [(tipo, llave) for tipo, (_, _, _, llave) in TIPOS_ACTIVIDAD.items() if llave]
+    llaves = sorted({columna_estudiante for _, (_, columna_estudiante) in dependientes})
+
+    def mover(antes, despues, filas):
+        sentencias = []
+        for tipo, (columna, columna_estudiante) in dependientes:
+            condicion = f"WHERE t.{columna} IN ({filas(columna_estudiante)})"
+            sentencias.append(_sumar_grupos(tipo, '-', antes(columna, columna_estudiante), condicion))
+            sentencias.append(_sumar_grupos(tipo, '+', despues(columna, columna_estudiante), condicion))
+        return ''.join(sentencias)
+
+    alta = mover(lambda c, e: "''", lambda c, e: "new.carrera", lambda e: f"new.{e}")
+    baja = mover(lambda c, e: "old.carrera", lambda c, e: "''", lambda e: f"old.{e}")
+    cambio = mover(
+        lambda c, e: f"CASE WHEN t.{c} = old.{e} THEN old.carrera END",
+        lambda c, e: f"CASE WHEN t.{c} = new.{e} THEN new.carrera END",
+        lambda e: f"old.{e}, new.{e}",
+    )
+    cambio_clave = ' OR '.join(f"old.{columna} IS NOT new.{columna}" for columna in ['carrera', *llaves])
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS actividad_estudiantes_ai AFTER INSERT ON estudiantes BEGIN {alta} END",
+        f"CREATE TRIGGER IF NOT EXISTS actividad_estudiantes_ad AFTER DELETE ON estudiantes BEGIN {baja} END",
+        f"CREATE TRIGGER IF NOT EXISTS actividad_estudiantes_au AFTER UPDATE OF carrera, {', '.join(llaves)} "
+        f"ON estudiantes WHEN {cambio_clave} BEGIN {cambio} END",
+    )
+
+
+def crear_tabla_actividad(conn):
+    """
+    Crea actividad_mensual y los triggers que la mantienen (no hace commit).
+    Si la tabla es nueva se llena con los registros existentes.
+    """
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'actividad_mensual'"
+    ).fetchone()
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS actividad_mensual (
+            tipo TEXT NOT NULL,
+            anio INTEGER NOT NULL,
+            mes INTEGER NOT NULL,
+            carrera TEXT NOT NULL,
+            cuatrimestre TEXT NOT NULL,
+            cantidad INTEGER NOT NULL,
+            PRIMARY KEY (tipo, anio, mes, carrera, cuatrimestre)
+        ) WITHOUT ROWID
+    """)
+
+    for tipo, (_, _, columnas, _) in TIPOS_ACTIVIDAD.items():
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS actividad_{tipo}_ai AFTER INSERT ON {tipo} BEGIN
+                {_sumar_fila(tipo, 'new.', 1)}
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS actividad_{tipo}_ad AFTER DELETE ON {tipo} BEGIN
+                {_sumar_fila(tipo, 'old.', -1)}
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS actividad_{tipo}_au AFTER UPDATE OF {', '.join(columnas)} ON {tipo} BEGIN
+                {_sumar_fila(tipo, 'old.', -1)}
+                {_sumar_fila(tipo, 'new.', 1)}
+            END
+        """)
+    for trigger in _triggers_estudiantes():
+        conn.execute(trigger)
+
+    if not existe:
+        _llenar_actividad(conn)
+
+
+def eliminar_triggers_actividad(conn):
+    """
+    Elimina los triggers de actividad_mensual (no hace commit). Las migraciones que
+    reescriben tablas completas los quitan y al terminar llaman a reconstruir_actividad
+    """
+    for tipo in TIPOS_ACTIVIDAD:
+        for sufijo in ('ai', 'ad', 'au'):
+            conn.execute(f"DROP TRIGGER IF EXISTS actividad_{tipo}_{sufijo}")
+    for sufijo in ('ai', 'ad', 'au'):
+        conn.execute(f"DROP TRIGGER IF EXISTS actividad_estudiantes_{sufijo}")
+
+
+def _llenar_actividad(conn):
+    for tipo in TIPOS_ACTIVIDAD:
+        conn.execute(_sumar_grupos(tipo, '+'))
+
+
+def reconstruir_actividad(conn):
+    """Vacía y vuelve a calcular actividad_mensual desde las tablas de registros (hace commit)"""
+    crear_tabla_actividad(conn)
+    conn.execute("DELETE FROM actividad_mensual")
+    _llenar_actividad(conn)
+    conn.commit()
+
+
+def _orden_cuatrimestre(valor):
+    return (0, int(valor), '') if valor.isdigit() else (1, 0, valor)
+
+
+def obtener_resumen_actividad(db, carrera=None, cuatrimestre=None, meses_grafica=MESES_GRAFICA):
+    """
+    Totales y series mensuales del dashboard con una sola consulta a actividad_mensual.
+    Los filtros por carrera y cuatrimestre se aplican sobre el resumen ya leído, que
+    también da las opciones de ambos filtros.
+
+    Returns:
+        ResumenActividad
+    """
+    filas = db.execute(
+        "SELECT tipo, anio, mes, carrera, cuatrimestre, cantidad FROM actividad_mensual WHERE cantidad <> 0"
+    ).fetchall()
+
+    totales = dict.fromkeys(TIPOS_ACTIVIDAD, 0)
+    por_mes = {}
+    carreras, cuatrimestres = set(), set()
+    for tipo, anio, mes, carrera_fila, cuatrimestre_fila, cantidad in filas:
+        if carrera_fila:
+            carreras.add(carrera_fila)
+        if cuatrimestre_fila:
+            cuatrimestres.add(cuatrimestre_fila)
+        if (carrera and carrera_fila != carrera) or (cuatrimestre and cuatrimestre_fila != cuatrimestre):
+            continue
+        totales[tipo] += cantidad
+        if mes:
+            conteos = por_mes.setdefault((anio, mes), dict.fromkeys(TIPOS_ACTIVIDAD, 0))
+            conteos[tipo] += cantidad
+
+    # Meses de las tres series juntas: todas quedan alineadas con las mismas etiquetas
+    claves = sorted(por_mes)[-meses_grafica:]
+    return ResumenActividad(
+        totales=totales,
+        meses=[f"{MESES_ABREVIADOS[mes - 1]} {anio}" for anio, mes in claves],
+        series={tipo: [por_mes[clave][tipo] for clave in claves] for tipo in TIPOS_ACTIVIDAD},
+        carreras=sorted(carreras),
+        cuatrimestres=sorted(cuatrimestres, key=_orden_cuatrimestre),
+    )
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from database import DATABASE, conectar
+
+    parser = argparse.ArgumentParser(description="Reconstruye la tabla de resumen actividad_mensual")
+    parser.add_argument('--db', default=DATABASE, help=f"Ruta de la base de datos (por defecto: {DATABASE})")
+    args = parser.parse_args()
+
+    conn = conectar(args.db)
+    try:
+        reconstruir_actividad(conn)
+        print("✅ Resumen de actividad mensual reconstruido.")
+    finally:
+        conn.close()
@@ -1,125 +1,145 @@
-from flask import Flask, render_template, request, redirect, url_for, session, g, flash, send_file, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, g, flash, send_file, jsonify, abort
+import json
+import multiprocessing
+import os
 import re
 import sqlite3
+import time
 from datetime import datetime
 from functools import wraps
-from pdf_generator import PDFReportGenerator
+from werkzeug.serving import is_running_from_reloader
+from actividad import obtener_resumen_actividad
+from busqueda import buscar_asesorias, buscar_tutorias, buscar_tutorias_grupales, buscar_estudiantes
+from database import ConnectionManager, DATABASE, VISTA_DE
+from esquema import preparar_esquema
+import metricas
+from instrumentacion import ACTIVADA as INSTRUMENTACION_SQL, MonitorPeticiones, RegistroPeticion, encabezado_server_timing
+from motivo_classifier import obtener_clasificador
+from paginacion import paginar, paginar_resultados, tamano_pagina, ORDEN_RECIENTES, ORDEN_APELLIDOS
+from report_jobs import ReportJobQueue, TERMINADO, FORMATOS, FORMATO_PDF
 from academic_history import AcademicHistoryAnalyzer
 from risk_assessment import RiskAssessmentEngine
-from utils import obtener_cuatrimestres_disponibles, obtener_nombre_periodo, validar_cuatrimestre, obtener_grupos_disponibles, obtener_carreras_por_programa, obtener_todas_las_carreras, decodificar_grupo, obtener_fecha_inicio_filtro, PROGRAMA_EDUCATIVO_1, PROGRAMA_EDUCATIVO_2
-from init_test_data import inicializar_datos_prueba
+from risk_data import recalcular_riesgo_estudiante, eliminar_riesgo_estudiante, obtener_evaluaciones_riesgo, obtener_evaluacion_estudiante, renovar_ventanas
+from utils import calendario, validar_cuatrimestre, obtener_grupos_disponibles, obtener_carreras_por_programa, obtener_todas_las_carreras, decodificar_grupo, PROGRAMA_EDUCATIVO_1, PROGRAMA_EDUCATIVO_2
 
-DATABASE = 'asesorias.db'
 app = Flask(__name__)
 app.secret_key = 'supersecretkey'  # Necesario para sesiones
 
-# Agregar datetime y cuatrimestres al contexto de Jinja2
+# Servidor de desarrollo con depurador y recargador (ver main())
+DEPURAR = True
+
+# Agregar datetime y cuatrimestres al contexto de Jinja2 (el calendario los calcula una vez por día)
 @app.context_processor
 def inject_now():
-    return {
-        'now': datetime.now,
-        'cuatrimestres_disponibles': obtener_cuatrimestres_disponibles(),
-        'periodo_actual': obtener_nombre_periodo()
-    }
+    return {'now': datetime.now, **calendario.contexto_plantillas()}
 
 # ---------------------------
 # Helpers de DB
 # ---------------------------
+# Grupo acotado de conexiones persistentes (WAL, synchronous=NORMAL, foreign_keys=ON)
+gestor_db = ConnectionManager(DATABASE)
+
+# Registro opcional de las consultas de cada petición (TUTORIAS_INSTRUMENTACION_SQL=1, ver instrumentacion.py)
+monitor_peticiones = MonitorPeticiones() if INSTRUMENTACION_SQL else None
+ENDPOINTS_SIN_REGISTRO = ('static', 'debug_requests')
+
 def get_db():
     db = getattr(g, '_database', None)
     if db is None:
-        db = g._database = sqlite3.connect(DATABASE)
-        db.row_factory = sqlite3.Row
+        db = g._database = gestor_db.obtener()
+        g.sentencias_inicio = db.sentencias
+        registro = g.get('registro_sql')
+        if registro is not None:
+            db.instrumentar(registro)
     return db
 
+# Estadísticas de las cachés que llevan las suyas propias (publicadas en /metrics)
+def _aciertos_conexiones():
+    estadisticas = gestor_db.obtener_estadisticas()
+    return estadisticas['conexiones_reutilizadas'], estadisticas['conexiones_abiertas']
+
+def _aciertos_clasificador():
+    info = obtener_clasificador().info_cache()
+    return info.hits, info.misses
+
+metricas.caches.registrar('conexiones', _aciertos_conexiones)
+metricas.caches.registrar('clasificador_motivos', _aciertos_clasificador)
+
+@app.before_request
+def iniciar_metricas():
+    if metricas.ACTIVADAS:
+        g.inicio_peticion = time.perf_counter()
+
+def registrar_metricas(estado):
+    """Latencia, conteo y sentencias SQL de la petición en curso (ruta = regla de URL, no la URL)"""
+    inicio = g.pop('inicio_peticion', None)
+    if inicio is None:
+        return
+    ruta = request.url_rule.rule if request.url_rule is not None else 'sin_ruta'
+    metricas.duracion_peticiones.observar(time.perf_counter() - inicio, ruta, request.method)
+    metricas.peticiones.incrementar(ruta, request.method, str(estado))
+    if estado >= 500:
+        metricas.errores.incrementar(ruta, request.method)
+    db = g.get('_database')
+    metricas.sentencias_peticion.observar(db.sentencias - g.sentencias_inicio if db is not None else 0, ruta)
+
+@app.after_request
+def terminar_metricas(response):
+    registrar_metricas(response.status_code)
+    return response
+
+@app.teardown_request
+def terminar_metricas_error(exception):
+    # Petición que terminó con una excepción sin pasar por after_request
+    registrar_metricas(500)
+
+@app.before_request
+def iniciar_registro_sql():
+    if monitor_peticiones is not None and request.endpoint not in ENDPOINTS_SIN_REGISTRO:
+        g.registro_sql = RegistroPeticion(request.method, request.full_path.rstrip('?'), request.endpoint)
+
+@app.after_request
+def terminar_registro_sql(response):
+    registro = g.pop('registro_sql', None)
+    if registro is not None:
+        monitor_peticiones.terminar(registro, response.status_code)
+        response.headers['Server-Timing'] = encabezado_server_timing(registro)
+    return response
+
 @app.teardown_appcontext
 def close_connection(exception):
-    db = getattr(g, '_database', None)
+    # Petición que terminó con una excepción sin pasar por after_request
+    registro = g.pop('registro_sql', None)
+    if registro is not None:
+        monitor_peticiones.terminar(registro, 500)
+    # La conexión vuelve al grupo para la siguiente petición (de cualquier hilo); solo se
+    # descarta lo que haya quedado sin commit
+    db = g.pop('_database', None)
     if db is not None:
-        db.close()
+        if db.registro is not None:
+            db.instrumentar(None)
+        gestor_db.liberar(db)
 
 def init_db():
-    db = get_db()
-    cursor = db.cursor()
-    # Tabla usuarios
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nombre TEXT NOT NULL,
-            usuario TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL
-        )
-    ''')
-    # Tabla asesorías
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS asesoria (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nombre TEXT,
-            apellido_p TEXT,
-            apellido_m TEXT,
-            unidad TEXT,
-            parcial TEXT,
-            periodo TEXT,
-            tema TEXT,
-            fecha TEXT,
-            created_at TEXT
-        )
-    ''')
-    # Tabla tutorías
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tutoria (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            estudiante_id INTEGER,
-            nombre TEXT,
-            apellido_p TEXT,
-            apellido_m TEXT,
-            matricula TEXT,
-            cuatrimestre TEXT,
-            motivo TEXT,
-            fecha TEXT,
-            descripcion TEXT,
-            observaciones TEXT,
-            seguimiento TEXT,
-            created_at TEXT,
-            FOREIGN KEY (estudiante_id) REFERENCES estudiantes(id)
-        )
-    ''')
-    # Tabla tutorías grupales
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tutoria_grupal (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            grupo_nombre TEXT,
-            carrera TEXT,
-            cuatrimestre TEXT,
-            motivo TEXT,
-            fecha TEXT,
-            descripcion TEXT,
-            asistentes TEXT,
-            observaciones TEXT,
-            created_at TEXT
-        )
-    ''')
-    # Tabla estudiantes
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS estudiantes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            matricula TEXT UNIQUE NOT NULL,
-            nombre TEXT NOT NULL,
-            apellido_p TEXT NOT NULL,
-            apellido_m TEXT,
-            cuatrimestre_actual TEXT,
-            carrera TEXT,
-            created_at TEXT,
-            updated_at TEXT
-        )
-    ''')
-    db.commit()
-
-# Inicializar BD al iniciar la app
-with app.app_context():
-    init_db()
-    # Inicializar datos de prueba si la base de datos está vacía
-    inicializar_datos_prueba()
+    """
+    Prepara el esquema solo si la versión guardada en PRAGMA user_version es anterior a la
+    de la aplicación (ver esquema.py); con la base al día es una sola lectura
+
+    Returns:
+        bool: True si se creó o migró algo
+    """
+    return preparar_esquema(get_db())
+
+# Cola de reportes PDF (grupo acotado de hilos, ver report_jobs.py). Los hilos se crean con
+# el primer trabajo; los pendientes de un arranque anterior los reanuda main()
+cola_reportes = ReportJobQueue(DATABASE)
+
+# Inicializar BD al iniciar la app. Los procesos de la exportación masiva
+# (report_export.py) importan este módulo y no deben repetir la inicialización.
+# Los datos de demostración se cargan aparte con: python init_test_data.py
+if multiprocessing.parent_process() is None:
+    with app.app_context():
+        init_db()
 
 # ---------------------------
 # Decorador login_required
@@ -191,64 +211,24 @@ def register_user():
 @login_required
 def index():
     db = get_db()
-    cursor = db.cursor()
-    
-    # Totales
-    cursor.execute("SELECT COUNT(*) FROM asesoria")
-    total_asesorias = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM tutoria")
-    total_tutorias = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM tutoria_grupal")
-    total_grupales = cursor.fetchone()[0]
-
-    # Asesorías por mes
-    cursor.execute("""
-        SELECT strftime('%m', fecha) as mes, COUNT(*) as cantidad
-        FROM asesoria
-        WHERE fecha IS NOT NULL AND fecha != ''
-        GROUP BY mes
-        ORDER BY mes
-    """)
-    asesorias_result = cursor.fetchall()
-
-    # Tutorías individuales por mes
-    cursor.execute("""
-        SELECT strftime('%m', fecha) as mes, COUNT(*) as cantidad
-        FROM tutoria
-        WHERE fecha IS NOT NULL AND fecha != ''
-        GROUP BY mes
-        ORDER BY mes
-    """)
-    tutorias_result = cursor.fetchall()
-
-    # Tutorías grupales por mes
-    cursor.execute("""
-        SELECT strftime('%m', fecha) as mes, COUNT(*) as cantidad
-        FROM tutoria_grupal
-        WHERE fecha IS NOT NULL AND fecha != ''
-        GROUP BY mes
-        ORDER BY mes
-    """)
-    grupales_result = cursor.fetchall()
-
-    # Crear etiquetas de mes únicas
-    meses = [datetime.strptime(r['mes'], '%m').strftime('%b') for r in asesorias_result]
-
-    # Crear listas de cantidades por tipo (coincidiendo con meses)
-    cantidades_asesorias = [r['cantidad'] for r in asesorias_result]
-    cantidades_tutorias = [r['cantidad'] for r in tutorias_result]
-    cantidades_grupales = [r['cantidad'] for r in grupales_result]
+    carrera = request.args.get('carrera', '').strip()
+    cuatrimestre = request.args.get('cuatrimestre', '').strip()
+
+    # Totales y registros por mes desde la tabla de resumen (ver actividad.py)
+    resumen = obtener_resumen_actividad(db, carrera or None, cuatrimestre or None)
 
     return render_template("index.html",
-                           total_asesorias=total_asesorias,
-                           total_tutorias=total_tutorias,
-                           total_grupales=total_grupales,
-                           meses=meses,
-                           cantidades_asesorias=cantidades_asesorias,
-                           cantidades_tutorias=cantidades_tutorias,
-                           cantidades_grupales=cantidades_grupales,
+                           total_asesorias=resumen.totales['asesoria'],
+                           total_tutorias=resumen.totales['tutoria'],
+                           total_grupales=resumen.totales['tutoria_grupal'],
+                           meses=resumen.meses,
+                           cantidades_asesorias=resumen.series['asesoria'],
+                           cantidades_tutorias=resumen.series['tutoria'],
+                           cantidades_grupales=resumen.series['tutoria_grupal'],
+                           opciones_carrera=resumen.carreras,
+                           opciones_cuatrimestre=resumen.cuatrimestres,
+                           carrera=carrera,
+                           cuatrimestre=cuatrimestre,
                            nombre=session.get('nombre'))
 
 # ---------------------------
@@ -268,11 +248,10 @@ def register_asesoria():
             estudiante = db.execute("SELECT * FROM estudiantes WHERE id = ?", (estudiante_id,)).fetchone()
             if estudiante:
                 db.execute('''
-                    INSERT INTO asesoria (nombre, apellido_p, apellido_m, matricula, unidad, parcial, periodo, tema, fecha, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO asesoria (estudiante_id, unidad, parcial, periodo, tema, fecha, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                 ''', (
-                    estudiante['nombre'], estudiante['apellido_p'], estudiante['apellido_m'],
-                    estudiante['matricula'], data.get('unidad'), data.get('parcial'), data.get('periodo'),
+                    estudiante['id'], data.get('unidad'), data.get('parcial'), data.get('periodo'),
                     data.get('tema'), data.get('fecha'), datetime.utcnow().isoformat()
                 ))
                 db.commit()
@@ -308,11 +287,10 @@ def register_asesoria():
             
             # Registrar asesoría
             db.execute('''
-                INSERT INTO asesoria (nombre, apellido_p, apellido_m, matricula, unidad, parcial, periodo, tema, fecha, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO asesoria (estudiante_id, unidad, parcial, periodo, tema, fecha, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (
-                data.get('nombre'), data.get('apellido_p'), data.get('apellido_m'),
-                matricula, data.get('unidad'), data.get('parcial'), data.get('periodo'),
+                estudiante['id'], data.get('unidad'), data.get('parcial'), data.get('periodo'),
                 data.get('tema'), data.get('fecha'), datetime.utcnow().isoformat()
             ))
             db.commit()
@@ -321,7 +299,7 @@ def register_asesoria():
     
     # Obtener lista de estudiantes para el select
     estudiantes = db.execute("SELECT * FROM estudiantes ORDER BY apellido_p, apellido_m, nombre").fetchall()
-    return render_template('register_asesoria.html', nombre=session.get('nombre'), estudiantes=estudiantes, periodo_actual=obtener_nombre_periodo(), active_page='register_asesoria')
+    return render_template('register_asesoria.html', nombre=session.get('nombre'), estudiantes=estudiantes, periodo_actual=calendario.nombre_periodo(), active_page='register_asesoria')
 
 # ---------------------------
 # Registro de Tutorías
@@ -339,16 +317,16 @@ def register_tutoria():
         if estudiante_id:
             estudiante = db.execute("SELECT * FROM estudiantes WHERE id = ?", (estudiante_id,)).fetchone()
             if estudiante:
+                # El cuatrimestre se guarda en la tutoría: es el que cursaba en esa fecha
                 db.execute('''
-                    INSERT INTO tutoria (estudiante_id, nombre, apellido_p, apellido_m, matricula, cuatrimestre, motivo, fecha, descripcion, observaciones, seguimiento, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO tutoria (estudiante_id, cuatrimestre, motivo, fecha, descripcion, observaciones, seguimiento, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
-                    estudiante_id,
-                    estudiante['nombre'], estudiante['apellido_p'], estudiante['apellido_m'],
-                    estudiante['matricula'], estudiante['cuatrimestre_actual'], data.get('motivo'),
+                    estudiante['id'], estudiante['cuatrimestre_actual'], data.get('motivo'),
                     data.get('fecha'), data.get('descripcion'), data.get('observaciones'),
                     data.get('seguimiento'), datetime.utcnow().isoformat()
                 ))
+                recalcular_riesgo_estudiante(db, estudiante['id'])
                 db.commit()
                 flash('Tutoría registrada correctamente.', 'success')
                 return redirect(url_for('consultas'))
@@ -385,15 +363,14 @@ def register_tutoria():
             
             # Registrar tutoría
             db.execute('''
-                INSERT INTO tutoria (estudiante_id, nombre, apellido_p, apellido_m, matricula, cuatrimestre, motivo, fecha, descripcion, observaciones, seguimiento, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO tutoria (estudiante_id, cuatrimestre, motivo, fecha, descripcion, observaciones, seguimiento, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
-                estudiante['id'],
-                data.get('nombre'), data.get('apellido_p'), data.get('apellido_m'),
-                data.get('matricula'), data.get('cuatrimestre'), data.get('motivo'),
+                estudiante['id'], data.get('cuatrimestre'), data.get('motivo'),
                 data.get('fecha'), data.get('descripcion'), data.get('observaciones'),
                 data.get('seguimiento'), datetime.utcnow().isoformat()
             ))
+            recalcular_riesgo_estudiante(db, estudiante['id'])
             db.commit()
             flash('Tutoría registrada correctamente.', 'success')
             return redirect(url_for('consultas'))
@@ -422,7 +399,7 @@ def register_tutoria_grupal():
         db.commit()
         flash('Tutoría grupal registrada correctamente.', 'success')
         return redirect(url_for('consultas'))
-    cuatrimestres_disponibles = obtener_cuatrimestres_disponibles()
+    cuatrimestres_disponibles = calendario.cuatrimestres_disponibles()
     
     return render_template('register_tutoria_grupal.html', nombre=session.get('nombre'), cuatrimestres_disponibles=cuatrimestres_disponibles, active_page='register_tutoria_grupal')
 
@@ -432,57 +409,90 @@ def register_tutoria_grupal():
 # ---------------------------
 # Consultas (con búsqueda)
 # ---------------------------
+# Secciones de /consultas: tipo -> (tabla o vista, función de búsqueda, parámetro del cursor)
+SECCIONES_CONSULTAS = {
+    'asesoria': (VISTA_DE['asesoria'], buscar_asesorias, 'cursor_asesoria'),
+    'tutoria': (VISTA_DE['tutoria'], buscar_tutorias, 'cursor_tutoria'),
+    'tutoria_grupal': ('tutoria_grupal', buscar_tutorias_grupales, 'cursor_tutoria_grupal'),
+}
+
+def pagina_consultas(db, tipo, busqueda, cursor, tamano):
+    """Una página de una sección de consultas: más recientes primero o por relevancia si hay búsqueda"""
+    tabla, buscar, _ = SECCIONES_CONSULTAS[tipo]
+    if busqueda:
+        return paginar_resultados(lambda limite, desplazamiento: buscar(db, busqueda, limite, desplazamiento),
+                                  cursor, tamano)
+    return paginar(db, tabla, ORDEN_RECIENTES, descendente=True, cursor=cursor, tamano=tamano)
+
+def pagina_estudiantes(db, busqueda, cuatrimestre, cursor, tamano):
+    """Una página de estudiantes: por apellidos o por relevancia si hay búsqueda"""
+    if busqueda:
+        return paginar_resultados(
+            lambda limite, desplazamiento: buscar_estudiantes(db, busqueda, cuatrimestre, limite, desplazamiento),
+            cursor, tamano)
+    filtros, parametros = '', ()
+    if cuatrimestre:
+        filtros, parametros = 'AND cuatrimestre_actual = ?', (cuatrimestre,)
+    return paginar(db, 'estudiantes', ORDEN_APELLIDOS, cursor=cursor, tamano=tamano,
+                   filtros=filtros, parametros=parametros)
+
+def enlaces_pagina(pagina, parametro_cursor):
+    """URLs de la página anterior y siguiente conservando los demás parámetros de la petición"""
+    enlaces = {}
+    for nombre, cursor in (('anterior', pagina.anterior), ('siguiente', pagina.siguiente)):
+        if cursor:
+            argumentos = request.args.to_dict()
+            argumentos[parametro_cursor] = cursor
+            enlaces[nombre] = url_for(request.endpoint, **request.view_args, **argumentos)
+    return enlaces
+
 @app.route('/consultas')
 @login_required
 def consultas():
     db = get_db()
     tipo = request.args.get('tipo', 'todos')
     busqueda = request.args.get('busqueda', '').strip().lower()
-    asesorias = []
-    tutorias = []
-    tutorias_grupales = []
-
-    # Filtrar y buscar según el tipo
-    if tipo in ('todos', 'asesoria'):
-        if busqueda:
-            asesorias = db.execute("""
-                SELECT * FROM asesoria 
-                WHERE LOWER(nombre) LIKE ? OR LOWER(apellido_p) LIKE ? OR LOWER(apellido_m) LIKE ?
-                ORDER BY created_at DESC
-            """, (f"%{busqueda}%", f"%{busqueda}%", f"%{busqueda}%")).fetchall()
-        else:
-            asesorias = db.execute("SELECT * FROM asesoria ORDER BY created_at DESC").fetchall()
-
-    if tipo in ('todos', 'tutoria'):
-        if busqueda:
-            tutorias = db.execute("""
-                SELECT * FROM tutoria 
-                WHERE LOWER(nombre) LIKE ? OR LOWER(apellido_p) LIKE ? OR LOWER(apellido_m) LIKE ?
-                ORDER BY created_at DESC
-            """, (f"%{busqueda}%", f"%{busqueda}%", f"%{busqueda}%")).fetchall()
-        else:
-            tutorias = db.execute("SELECT * FROM tutoria ORDER BY created_at DESC").fetchall()
-
-    if tipo in ('todos', 'tutoria_grupal'):
-        if busqueda:
-            tutorias_grupales = db.execute("""
-                SELECT * FROM tutoria_grupal 
-                WHERE LOWER(grupo_nombre) LIKE ?
-                ORDER BY created_at DESC
-            """, (f"%{busqueda}%",)).fetchall()
-        else:
-            tutorias_grupales = db.execute("SELECT * FROM tutoria_grupal ORDER BY created_at DESC").fetchall()
+    tamano = tamano_pagina(request.args.get('tamano'))
+    resultados = {'asesoria': [], 'tutoria': [], 'tutoria_grupal': []}
+    paginacion = {}
+
+    # Cada sección se pagina con su propio cursor; con búsqueda, los resultados vienen
+    # del índice de texto completo ordenados por relevancia
+    for seccion, (_, _, parametro_cursor) in SECCIONES_CONSULTAS.items():
+        if tipo in ('todos', seccion):
+            pagina = pagina_consultas(db, seccion, busqueda, request.args.get(parametro_cursor), tamano)
+            resultados[seccion] = pagina.filas
+            paginacion[seccion] = enlaces_pagina(pagina, parametro_cursor)
 
     return render_template(
         'consultas.html',
-        asesorias=asesorias,
-        tutorias=tutorias,
-        tutorias_grupales=tutorias_grupales,
+        asesorias=resultados['asesoria'],
+        tutorias=resultados['tutoria'],
+        tutorias_grupales=resultados['tutoria_grupal'],
+        paginacion=paginacion,
         tipo=tipo,
         busqueda=busqueda,
         nombre=session.get('nombre')
     )
 
+@app.route('/api/consultas/<tipo>')
+@login_required
+def api_consultas(tipo):
+    """API paginada de asesorías, tutorías o tutorías grupales (mismos parámetros que /consultas)."""
+    if tipo not in SECCIONES_CONSULTAS:
+        return jsonify({"error": f"Tipo no válido: {tipo}"}), 404
+    pagina = pagina_consultas(
+        get_db(), tipo,
+        request.args.get('busqueda', '').strip().lower(),
+        request.args.get('cursor'),
+        tamano_pagina(request.args.get('tamano'))
+    )
+    return jsonify({
+        'registros': [dict(fila) for fila in pagina.filas],
+        'siguiente': pagina.siguiente,
+        'anterior': pagina.anterior,
+    })
+
 # ---------------------------
 # Funciones auxiliares de BD
 # ---------------------------
@@ -493,7 +503,10 @@ def eliminar_asesoria_db(id):
 
 def eliminar_tutoria_db(id):
     db = get_db()
+    tutoria = db.execute("SELECT estudiante_id FROM tutoria WHERE id = ?", (id,)).fetchone()
     db.execute("DELETE FROM tutoria WHERE id = ?", (id,))
+    if tutoria and tutoria['estudiante_id'] is not None:
+        recalcular_riesgo_estudiante(db, tutoria['estudiante_id'])
     db.commit()
 
 def eliminar_tutoria_grupal_db(id):
@@ -532,7 +545,7 @@ def eliminar_tutoria_grupal(id):
 @login_required
 def editar_asesoria(id):
     db = get_db()
-    asesoria = db.execute("SELECT * FROM asesoria WHERE id = ?", (id,)).fetchone()
+    asesoria = db.execute("SELECT * FROM vista_asesoria WHERE id = ?", (id,)).fetchone()
 
     if not asesoria:
         flash("Asesoría no encontrada.", "error")
@@ -540,9 +553,13 @@ def editar_asesoria(id):
 
     if request.method == "POST":
         data = request.form
+        # La identidad de una asesoría con estudiante se edita en el estudiante
         db.execute("""
             UPDATE asesoria
-            SET nombre=?, apellido_p=?, apellido_m=?, unidad=?, parcial=?, periodo=?, tema=?, fecha=?
+            SET nombre = CASE WHEN estudiante_id IS NULL THEN ? END,
+                apellido_p = CASE WHEN estudiante_id IS NULL THEN ? END,
+                apellido_m = CASE WHEN estudiante_id IS NULL THEN ? END,
+                unidad=?, parcial=?, periodo=?, tema=?, fecha=?
             WHERE id=?
         """, (
             data.get('nombre'), data.get('apellido_p'), data.get('apellido_m'),
@@ -563,7 +580,7 @@ def editar_asesoria(id):
 @login_required
 def editar_tutoria(id):
     db = get_db()
-    tutoria = db.execute("SELECT * FROM tutoria WHERE id = ?", (id,)).fetchone()
+    tutoria = db.execute("SELECT * FROM vista_tutoria WHERE id = ?", (id,)).fetchone()
 
     if not tutoria:
         flash("Tutoría no encontrada.", "error")
@@ -571,9 +588,14 @@ def editar_tutoria(id):
 
     if request.method == "POST":
         data = request.form
+        # La identidad de una tutoría con estudiante se edita en el estudiante
         db.execute("""
             UPDATE tutoria
-            SET nombre=?, apellido_p=?, apellido_m=?, matricula=?, cuatrimestre=?, motivo=?, fecha=?, descripcion=?, observaciones=?, seguimiento=?
+            SET nombre = CASE WHEN estudiante_id IS NULL THEN ? END,
+                apellido_p = CASE WHEN estudiante_id IS NULL THEN ? END,
+                apellido_m = CASE WHEN estudiante_id IS NULL THEN ? END,
+                matricula = CASE WHEN estudiante_id IS NULL THEN ? END,
+                cuatrimestre=?, motivo=?, fecha=?, descripcion=?, observaciones=?, seguimiento=?
             WHERE id=?
         """, (
             data.get('nombre'), data.get('apellido_p'), data.get('apellido_m'),
@@ -581,6 +603,8 @@ def editar_tutoria(id):
             data.get('fecha'), data.get('descripcion'),
             data.get('observaciones'), data.get('seguimiento'), id
         ))
+        if tutoria['estudiante_id'] is not None:
+            recalcular_riesgo_estudiante(db, tutoria['estudiante_id'])
         db.commit()
         flash("Tutoría actualizada correctamente.", "success")
         return redirect(url_for("consultas"))
@@ -641,51 +665,9 @@ def dashboard_risk():
     busqueda = request.args.get('busqueda', '').strip().lower()
     time_filter = request.args.get('time_filter', 'todo') # Nuevo filtro de tiempo
     
-    # Calcular fecha de inicio del filtro de tiempo
-    fecha_inicio = obtener_fecha_inicio_filtro(time_filter)
-    fecha_inicio_str = fecha_inicio.strftime('%Y-%m-%d')
-    
-    # Obtener todos los estudiantes registrados
-    estudiantes_todos = db.execute("SELECT * FROM estudiantes").fetchall()
-    
-    # Preparar datos para evaluación
-    estudiantes_data = []
-    
-    for estudiante in estudiantes_todos:
-        # Obtener todas las tutorías del estudiante, filtradas por fecha
-        tutorias_est = db.execute(
-            "SELECT * FROM tutoria WHERE estudiante_id = ? AND fecha >= ? ORDER BY fecha DESC",
-            (estudiante['id'], fecha_inicio_str)
-        ).fetchall()
-        
-        # Solo incluir estudiantes que tienen tutorías en el período
-        if not tutorias_est:
-            continue
-        
-        # Contar inasistencias y bajas calificaciones
-        inasistencias = sum(1 for t in tutorias_est if 'inasistencia' in t['motivo'].lower())
-        bajas_calificaciones = sum(1 for t in tutorias_est if 'baja calificación' in t['motivo'].lower() or 'bajo desempeño' in t['motivo'].lower())
-        
-        student_info = {
-            'info': {
-                'nombre': estudiante['nombre'],
-                'apellido_p': estudiante['apellido_p'],
-                'apellido_m': estudiante['apellido_m'],
-                'matricula': estudiante['matricula'],
-                'carrera': estudiante['carrera'] or 'No especificada',
-                'cuatrimestre': estudiante['cuatrimestre_actual'],
-                'student_id': estudiante['id']
-            },
-            'tutorias': [dict(t) for t in tutorias_est],
-            'inasistencias': inasistencias,
-            'bajas_calificaciones': bajas_calificaciones
-        }
-        
-        estudiantes_data.append(student_info)
-    
-    # Evaluar riesgo
+    # Leer las evaluaciones materializadas de la ventana (ordenadas por puntuación)
     engine = RiskAssessmentEngine()
-    evaluaciones = engine.evaluar_multiples_estudiantes(estudiantes_data)
+    evaluaciones = obtener_evaluaciones_riesgo(db, time_filter, engine)
     
     # Aplicar filtros
     filtros = {
@@ -788,124 +770,191 @@ def student_history(student_id):
 # Rutas para Generación de Reportes PDF
 # ---------------------------
 
+@app.route('/report/estudiante/<int:estudiante_id>')
+@login_required
+def report_estudiante(estudiante_id):
+    """Encola el reporte PDF de un estudiante (estudiantes.id)"""
+    db = get_db()
+    estudiante = db.execute("SELECT id FROM estudiantes WHERE id = ?", (estudiante_id,)).fetchone()
+    
+    if not estudiante:
+        flash("Estudiante no encontrado.", "error")
+        return redirect(url_for('lista_estudiantes'))
+    
+    trabajo_id = cola_reportes.encolar(db, 'estudiante', {'estudiante_id': estudiante_id, 'tutor': session.get('nombre')},
+                                       session.get('usuario'))
+    return redirigir_a_trabajo(trabajo_id)
+
 @app.route('/report/student/<int:student_id>')
 @login_required
 def report_student(student_id):
-    """Genera un reporte PDF para un estudiante específico"""
+    """Reporte PDF del estudiante de una tutoría (student_id es el id de la tutoría)"""
     db = get_db()
     
-    # Obtener información del estudiante (última tutoría)
-    tutoria = db.execute("SELECT * FROM tutoria WHERE id = ?", (student_id,)).fetchone()
+    tutoria = db.execute("SELECT id, estudiante_id FROM tutoria WHERE id = ?", (student_id,)).fetchone()
     
     if not tutoria:
         flash("Estudiante no encontrado.", "error")
         return redirect(url_for('consultas'))
     
-    # Obtener todas las tutorías del estudiante
-    tutorias = db.execute(
-        "SELECT * FROM tutoria WHERE nombre = ? AND apellido_p = ? AND apellido_m = ? ORDER BY fecha DESC",
-        (tutoria['nombre'], tutoria['apellido_p'], tutoria['apellido_m'])
-    ).fetchall()
+    if tutoria['estudiante_id'] is not None:
+        return redirect(url_for('report_estudiante', estudiante_id=tutoria['estudiante_id']))
     
-    # Preparar datos
-    student_data = {
-        'nombre': tutoria['nombre'],
-        'apellido_p': tutoria['apellido_p'],
-        'apellido_m': tutoria['apellido_m'],
-        'matricula': tutoria['matricula'],
-        'cuatrimestre': tutoria['cuatrimestre'],
-        'carrera': 'Ingeniería en Software',
-        'tutor': session.get('nombre')
-    }
-    
-    tutorias_data = [dict(t) for t in tutorias]
-    
-    # Generar PDF
-    generator = PDFReportGenerator()
-    pdf_buffer = generator.generate_student_report(student_data, tutorias_data)
-    
-    filename = f"Reporte_Tutorias_{tutoria['nombre']}_{tutoria['apellido_p']}.pdf"
-    return send_file(pdf_buffer, as_attachment=True, download_name=filename, mimetype='application/pdf')
+    # Tutoría sin estudiante registrado: sus tutorías se reúnen por nombre
+    trabajo_id = cola_reportes.encolar(db, 'estudiante', {'student_id': student_id, 'tutor': session.get('nombre')},
+                                       session.get('usuario'))
+    return redirigir_a_trabajo(trabajo_id)
 
 @app.route('/report/group/<int:group_id>')
 @login_required
 def report_group(group_id):
-    """Genera un reporte PDF para un grupo específico"""
+    """Encola el reporte PDF de un grupo específico"""
     db = get_db()
     
     # Obtener información del grupo
-    grupo = db.execute("SELECT * FROM tutoria_grupal WHERE id = ?", (group_id,)).fetchone()
+    grupo = db.execute("SELECT id FROM tutoria_grupal WHERE id = ?", (group_id,)).fetchone()
     
     if not grupo:
         flash("Grupo no encontrado.", "error")
         return redirect(url_for('consultas'))
     
-    # Obtener todas las tutorías del grupo
-    tutorias_grupales = db.execute(
-        "SELECT * FROM tutoria_grupal WHERE grupo_nombre = ? ORDER BY fecha DESC",
-        (grupo['grupo_nombre'],)
-    ).fetchall()
-    
-    # Preparar datos
-    group_data = {
-        'grupo_nombre': grupo['grupo_nombre'],
-        'carrera': grupo['carrera'],
-        'cuatrimestre': grupo['cuatrimestre'],
-    }
-    
-    tutorias_data = [dict(t) for t in tutorias_grupales]
-    
-    # Generar PDF
-    generator = PDFReportGenerator()
-    pdf_buffer = generator.generate_group_report(group_data, tutorias_data)
-    
-    filename = f"Reporte_Tutorias_Grupo_{grupo['grupo_nombre']}.pdf"
-    return send_file(pdf_buffer, as_attachment=True, download_name=filename, mimetype='application/pdf')
+    trabajo_id = cola_reportes.encolar(db, 'grupo', {'group_id': group_id}, session.get('usuario'))
+    return redirigir_a_trabajo(trabajo_id)
 
 @app.route('/report/period', methods=['GET', 'POST'])
 @login_required
 def report_period():
-    """Genera un reporte PDF para un período específico"""
+    """Encola un reporte PDF para un período específico"""
     if request.method == 'POST':
-        start_date = request.form.get('start_date')
-        end_date = request.form.get('end_date')
-        carrera = request.form.get('carrera', '')
-        cuatrimestre = request.form.get('cuatrimestre', '')
-        
-        db = get_db()
-        
-        # Construir consulta dinámicamente
-        query = "SELECT * FROM tutoria WHERE fecha >= ? AND fecha <= ?"
-        params = [start_date, end_date]
-        
-        # Nota: La tabla tutoria no tiene columna 'carrera', solo 'cuatrimestre'
-        if cuatrimestre:
-            query += " AND cuatrimestre = ?"
-            params.append(cuatrimestre)
-        
-        query += " ORDER BY fecha DESC"
-        
-        tutorias = db.execute(query, params).fetchall()
-        
-        # Preparar datos
-        period_data = {
-            'start_date': start_date,
-            'end_date': end_date,
-            'carrera': carrera or 'Todas',
-            'cuatrimestre': cuatrimestre or 'Todos',
+        parametros = {
+            'start_date': request.form.get('start_date'),
+            'end_date': request.form.get('end_date'),
+            'carrera': request.form.get('carrera', ''),
+            'cuatrimestre': request.form.get('cuatrimestre', ''),
         }
-        
-        tutorias_data = [dict(t) for t in tutorias]
-        tutorias_data = [{**t, 'tipo': 'Individual'} for t in tutorias_data]
-        
-        # Generar PDF
-        generator = PDFReportGenerator()
-        pdf_buffer = generator.generate_period_report(period_data, tutorias_data)
-        
-        filename = f"Reporte_Periodo_{start_date}_a_{end_date}.pdf"
-        return send_file(pdf_buffer, as_attachment=True, download_name=filename, mimetype='application/pdf')
-    
-    return render_template('report_period.html', nombre=session.get('nombre'))
+        trabajo_id = cola_reportes.encolar(get_db(), 'periodo', parametros, session.get('usuario'))
+        return redirigir_a_trabajo(trabajo_id)
+    
+    # Opciones de la exportación masiva (valores tal como están en estudiantes)
+    carreras = [fila['carrera'] for fila in get_db().execute(
+        "SELECT DISTINCT carrera FROM estudiantes WHERE carrera IS NOT NULL ORDER BY carrera"
+    )]
+    return render_template('report_period.html', carreras=carreras, periodo=calendario.periodo_actual(),
+                           nombre=session.get('nombre'))
+
+@app.route('/report/bulk', methods=['POST'])
+@login_required
+def report_bulk():
+    """Encola un ZIP con el reporte PDF de cada estudiante de un grupo o carrera"""
+    parametros = {
+        'grupo': request.form.get('grupo', '').strip(),
+        'carrera': request.form.get('carrera', '').strip(),
+        'tutor': session.get('nombre'),
+    }
+    if not parametros['grupo'] and not parametros['carrera']:
+        flash("Indica un grupo o una carrera para la exportación.", "error")
+        return redirect(url_for('report_period'))
+    trabajo_id = cola_reportes.encolar(get_db(), 'lote', parametros, session.get('usuario'))
+    return redirigir_a_trabajo(trabajo_id)
+
+def redirigir_a_trabajo(trabajo_id):
+    """Descarga directa si el reporte salió de la caché; si no, la página de espera"""
+    trabajo = cola_reportes.obtener(get_db(), trabajo_id)
+    if trabajo['estado'] == TERMINADO:
+        return redirect(url_descarga(trabajo))
+    return redirect(url_for('estado_reporte', trabajo_id=trabajo_id))
+
+def url_descarga(trabajo):
+    """URL estable de la caché si el archivo del trabajo es el de la caché; si no, la del trabajo"""
+    if trabajo['clave'] and not os.path.exists(cola_reportes.ruta_archivo(trabajo['id'], trabajo['tipo'])):
+        return url_for('descargar_cache', clave=trabajo['clave'])
+    return url_for('descargar_reporte', trabajo_id=trabajo['id'])
+
+def obtener_trabajo_usuario(trabajo_id):
+    """Trabajo de reporte del usuario en sesión o None"""
+    trabajo = cola_reportes.obtener(get_db(), trabajo_id)
+    if trabajo is None or trabajo['usuario'] != session.get('usuario'):
+        return None
+    return trabajo
+
+def estado_trabajo(trabajo):
+    """Datos públicos de un trabajo de reporte"""
+    return {
+        'id': trabajo['id'],
+        'tipo': trabajo['tipo'],
+        'estado': trabajo['estado'],
+        'progreso': trabajo['progreso'],
+        'mensaje': trabajo['mensaje'],
+        'creado': trabajo['creado'],
+        'expira': trabajo['expira'],
+        'descarga': url_descarga(trabajo) if trabajo['estado'] == TERMINADO else None,
+    }
+
+@app.route('/reportes/<trabajo_id>')
+@login_required
+def estado_reporte(trabajo_id):
+    """Página de espera: consulta el avance del trabajo y descarga el PDF al terminar"""
+    trabajo = obtener_trabajo_usuario(trabajo_id)
+    if trabajo is None:
+        flash("El reporte no existe o ya expiró.", "error")
+        return redirect(url_for('report_period'))
+    return render_template('reporte_trabajo.html', trabajo=estado_trabajo(trabajo), nombre=session.get('nombre'))
+
+@app.route('/api/reportes/<trabajo_id>')
+@login_required
+def api_estado_reporte(trabajo_id):
+    """API con el estado y el progreso de un trabajo de reporte."""
+    trabajo = obtener_trabajo_usuario(trabajo_id)
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    return jsonify(estado_trabajo(trabajo))
+
+@app.route('/reportes/<trabajo_id>/descargar')
+@login_required
+def descargar_reporte(trabajo_id):
+    """Descarga el PDF de un trabajo terminado"""
+    trabajo = obtener_trabajo_usuario(trabajo_id)
+    if trabajo is None:
+        flash("El reporte no existe o ya expiró.", "error")
+        return redirect(url_for('report_period'))
+    if trabajo['estado'] != TERMINADO:
+        return redirect(url_for('estado_reporte', trabajo_id=trabajo_id))
+    if trabajo['clave'] and not os.path.exists(cola_reportes.ruta_archivo(trabajo_id, trabajo['tipo'])):
+        return redirect(url_for('descargar_cache', clave=trabajo['clave']))
+    _, mimetype = FORMATOS.get(trabajo['tipo'], FORMATO_PDF)
+    return send_file(os.path.abspath(cola_reportes.ruta_archivo(trabajo_id, trabajo['tipo'])), as_attachment=True,
+                     download_name=trabajo['nombre_descarga'], mimetype=mimetype, etag=True)
+
+@app.route('/reportes/cache/<clave>')
+@login_required
+def descargar_cache(clave):
+    """
+    Descarga un reporte de la caché. La URL solo depende de la clave (tipo, parámetros y huella
+    de los datos), así que es la misma en cada solicitud: la clave es el ETag y una petición con
+    If-None-Match igual responde 304 sin enviar el PDF
+    """
+    db = get_db()
+    # Un trabajo del usuario con esa clave da el nombre de descarga y permite volver a generarlo
+    trabajo = db.execute(
+        "SELECT tipo, parametros, nombre_descarga FROM trabajos_reporte WHERE clave = ? AND usuario = ? AND estado = ? "
+        "ORDER BY creado DESC LIMIT 1", (clave, session.get('usuario'), TERMINADO)
+    ).fetchone()
+    if trabajo is None:
+        flash("El reporte no existe o ya expiró.", "error")
+        return redirect(url_for('report_period'))
+    ruta = cola_reportes.cache.obtener(clave)
+    try:
+        archivo = open(ruta, 'rb') if ruta else None
+    except FileNotFoundError:
+        # Se descartó entre obtener() y la apertura
+        archivo = None
+    if archivo is None:
+        # La caché ya lo descartó (LRU): se vuelve a generar
+        return redirigir_a_trabajo(cola_reportes.encolar(db, trabajo['tipo'], json.loads(trabajo['parametros']),
+                                                         session.get('usuario')))
+    _, mimetype = FORMATOS.get(trabajo['tipo'], FORMATO_PDF)
+    return send_file(archivo, as_attachment=True, download_name=trabajo['nombre_descarga'], mimetype=mimetype,
+                     etag=clave)
 
 # ---------------------------
 # Gestión de Estudiantes
@@ -920,21 +969,10 @@ def lista_estudiantes():
     busqueda = request.args.get('busqueda', '')
     cuatrimestre = request.args.get('cuatrimestre', '')
     
-    query = "SELECT * FROM estudiantes WHERE 1=1"
-    params = []
-    
-    if busqueda:
-        query += " AND (nombre LIKE ? OR apellido_p LIKE ? OR matricula LIKE ?)"
-        busqueda_param = f"%{busqueda}%"
-        params.extend([busqueda_param, busqueda_param, busqueda_param])
-    
-    if cuatrimestre:
-        query += " AND cuatrimestre_actual = ?"
-        params.append(cuatrimestre)
-    
-    query += " ORDER BY apellido_p, apellido_m, nombre"
-    
-    estudiantes = db.execute(query, params).fetchall()
+    # Página por apellidos (keyset) o, con búsqueda, por relevancia en el índice de texto completo
+    pagina = pagina_estudiantes(db, busqueda, cuatrimestre, request.args.get('cursor'),
+                                tamano_pagina(request.args.get('tamano')))
+    estudiantes = pagina.filas
     
     # Obtener cuatrimestres únicos para filtros
     cuatrimestres = db.execute("SELECT DISTINCT cuatrimestre_actual FROM estudiantes WHERE cuatrimestre_actual IS NOT NULL ORDER BY cuatrimestre_actual").fetchall()
@@ -942,6 +980,7 @@ def lista_estudiantes():
     return render_template(
         'lista_estudiantes.html',
         estudiantes=estudiantes,
+        paginacion=enlaces_pagina(pagina, 'cursor'),
         cuatrimestres=[c['cuatrimestre_actual'] for c in cuatrimestres],
         busqueda=busqueda,
         cuatrimestre_filtro=cuatrimestre,
@@ -1002,8 +1041,17 @@ def eliminar_estudiante(id):
     """Elimina un estudiante y sus tutorías asociadas"""
     db = get_db()
     try:
-        # 1. Eliminar las tutorías asociadas al estudiante
+        # 1. Eliminar las tutorías y la evaluación de riesgo materializada del estudiante
+        #    (antes que el estudiante, por las llaves foráneas)
         db.execute("DELETE FROM tutoria WHERE estudiante_id = ?", (id,))
+        eliminar_riesgo_estudiante(db, id)
+        #    Las asesorías se conservan sin estudiante, con una copia de su identidad
+        estudiante = db.execute("SELECT * FROM estudiantes WHERE id = ?", (id,)).fetchone()
+        if estudiante:
+            db.execute("""
+                UPDATE asesoria SET estudiante_id = NULL, nombre = ?, apellido_p = ?, apellido_m = ?, matricula = ?
+                WHERE estudiante_id = ?
+            """, (estudiante['nombre'], estudiante['apellido_p'], estudiante['apellido_m'], estudiante['matricula'], id))
         # 2. Eliminar al estudiante
         db.execute("DELETE FROM estudiantes WHERE id = ?", (id,))
         db.commit()
@@ -1089,25 +1137,8 @@ def perfil_estudiante(id):
         datos_frecuencia = analyzer.obtener_datos_grafico_frecuencia(analisis['por_cuatrimestre'])
         datos_motivos = analyzer.obtener_datos_grafico_motivos(analisis['motivos_generales'])
         
-        # Evaluación de riesgo
-        risk_engine = RiskAssessmentEngine()
-        inasistencias = sum(1 for t in tutorias_data if 'inasistencia' in t.get('motivo', '').lower())
-        bajas_calificaciones = sum(1 for t in tutorias_data if 'baja calificación' in t.get('motivo', '').lower() or 'bajo desempeño' in t.get('motivo', '').lower())
-        
-        evaluacion_riesgo = risk_engine.evaluar_estudiante(
-            {
-                'student_id': estudiante['id'],
-                'matricula': estudiante['matricula'],
-                'nombre': estudiante['nombre'],
-                'apellido_p': estudiante['apellido_p'],
-                'apellido_m': estudiante['apellido_m'],
-                'carrera': estudiante['carrera'],
-                'cuatrimestre': estudiante['cuatrimestre_actual']
-            },
-            tutorias_data,
-            inasistencias,
-            bajas_calificaciones
-        )
+        # Evaluación de riesgo (tabla materializada riesgo_estudiante)
+        evaluacion_riesgo = obtener_evaluacion_estudiante(db, estudiante['id'])
     else:
         analisis = None
         datos_frecuencia = None
@@ -1162,6 +1193,50 @@ def api_grupos():
     
     return jsonify(grupos_filtrados)
 
+@app.route('/api/db/estadisticas')
+@login_required
+def api_db_estadisticas():
+    """API con la reutilización de conexiones y las esperas por bloqueo de la base de datos."""
+    return jsonify(gestor_db.obtener_estadisticas())
+
+@app.route('/debug/requests')
+@login_required
+def debug_requests():
+    """Últimas peticiones con el detalle de sus consultas SQL (solo con la instrumentación activa y en el equipo local)"""
+    if monitor_peticiones is None or request.remote_addr not in ('127.0.0.1', '::1'):
+        abort(404)
+    return render_template(
+        'debug_requests.html',
+        peticiones=monitor_peticiones.peticiones(),
+        lentas=monitor_peticiones.lentas(),
+        umbral_ms=monitor_peticiones.umbral_ms,
+        nombre=session.get('nombre')
+    )
+
+@app.route('/metrics')
+def metrics():
+    """Métricas del proceso en el formato de texto de Prometheus (sin sesión: la consulta un recolector)"""
+    if not metricas.ACTIVADAS:
+        abort(404)
+    return app.response_class(metricas.registro.exponer(), content_type=metricas.TIPO_CONTENIDO)
+
+@app.route('/api/estudiantes/pagina')
+@login_required
+def api_estudiantes_pagina():
+    """API paginada del listado de estudiantes (mismos parámetros que /estudiantes)."""
+    pagina = pagina_estudiantes(
+        get_db(),
+        request.args.get('busqueda', ''),
+        request.args.get('cuatrimestre', ''),
+        request.args.get('cursor'),
+        tamano_pagina(request.args.get('tamano'))
+    )
+    return jsonify({
+        'estudiantes': [dict(fila) for fila in pagina.filas],
+        'siguiente': pagina.siguiente,
+        'anterior': pagina.anterior,
+    })
+
 @app.route('/api/estudiantes')
 @login_required
 def api_estudiantes():
@@ -1196,5 +1271,19 @@ def api_estudiantes():
     
     return jsonify(estudiantes_list)
 
+def main():
+    """Punto de entrada del servidor: lo que no debe pagar ninguna petición se hace antes de atenderlas"""
+    multiprocessing.freeze_support()
+    with app.app_context():
+        # Ventanas de riesgo que vencieron con el servidor detenido (cambio de día o de pesos).
+        # Con el servidor en marcha las lecturas las renuevan en segundo plano
+        renovar_ventanas(get_db())
+        # Con el recargador de debug main() corre también en el proceso que solo vigila los
+        # archivos: los reportes pendientes y el barrido de los vencidos van en el que atiende las peticiones
+        if not DEPURAR or is_running_from_reloader():
+            cola_reportes.reanudar(get_db())
+            cola_reportes.iniciar_limpieza()
+    app.run(debug=DEPURAR)
+
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    main()
\ No newline at end of file
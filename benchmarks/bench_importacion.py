@@ -0,0 +1,128 @@
+"""
+Benchmark de Importación
+Mide el arranque de la aplicación con el perfil de `python -X importtime`: tiempo total
+de `import app`, los módulos que más tardan y la memoria residente del proceso ya
+iniciado (sin peticiones). Falla (código 1) si se excede el presupuesto de tiempo o de
+memoria, o si al iniciar se importa alguno de los módulos que deben cargarse en el primer
+uso (carga_diferida.MODULOS_DIFERIDOS: ReportLab, pandas, ...):
+
+    python benchmarks/bench_importacion.py --presupuesto-ms 400 --presupuesto-memoria-mb 45
+
+Cada repetición es un proceso nuevo sobre una base ya migrada, como al abrir el
+ejecutable; se informa la repetición más rápida.
+
+Uso: python benchmarks/bench_importacion.py [--repeticiones N] [--top N]
+                                            [--presupuesto-ms MS] [--presupuesto-memoria-mb MB]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from carga_diferida import MODULOS_DIFERIDOS
+
+# El proceso hijo importa la app e informa su memoria máxima (KB en Linux, bytes en macOS)
+CODIGO_HIJO = """
+import json, sys
+import app
+try:
+    import resource
+    memoria = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    memoria = memoria / 1024 / 1024 if sys.platform == 'darwin' else memoria / 1024
+except ImportError:  # Windows
+    memoria = None
+print(json.dumps({'memoria_mb': memoria}))
+"""
+
+
+def leer_importtime(texto):
+    """[(modulo, propio_us, acumulado_us, profundidad)] de la salida de -X importtime"""
+    modulos = []
+    for linea in texto.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        profundidad = (len(nombre) - len(nombre.lstrip())) // 2
+        modulos.append((nombre.strip(), int(propio), int(acumulado), profundidad))
+    return modulos
+
+
+def medir_arranque(directorio):
+    """Importa la app en un proceso nuevo con -X importtime"""
+    entorno = dict(os.environ, TUTORIAS_DB=os.path.join(directorio, 'asesorias.db'),
+                   TUTORIAS_REPORTES_DIR=os.path.join(directorio, 'reportes'), PYTHONPATH=RAIZ)
+    proceso = subprocess.run([sys.executable, '-X', 'importtime', '-c', CODIGO_HIJO], env=entorno, cwd=directorio,
+                             capture_output=True, text=True, check=True)
+    modulos = leer_importtime(proceso.stderr)
+    total_us = next(acumulado for nombre, _, acumulado, _ in modulos if nombre == 'app')
+    return {
+        'total_ms': total_us / 1000,
+        'memoria_mb': json.loads(proceso.stdout.strip().splitlines()[-1])['memoria_mb'],
+        'modulos': modulos,
+    }
+
+
+def diferidos_importados(modulos):
+    """Módulos de MODULOS_DIFERIDOS (o sus submódulos) que aparecen en el perfil"""
+    nombres = {nombre for nombre, _, _, _ in modulos}
+    return sorted(diferido for diferido in MODULOS_DIFERIDOS
+                  if any(nombre == diferido or nombre.startswith(diferido + '.') for nombre in nombres))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Perfil de importación y presupuesto de arranque de la aplicación')
+    parser.add_argument('--repeticiones', type=int, default=5, help='Arranques medidos (se toma el más rápido)')
+    parser.add_argument('--top', type=int, default=15, help='Módulos más lentos que se muestran')
+    parser.add_argument('--presupuesto-ms', type=float, default=400, help='Tiempo máximo de import app')
+    parser.add_argument('--presupuesto-memoria-mb', type=float, default=45,
+                        help='Memoria residente máxima del proceso iniciado')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # El primer arranque crea y migra la base; no se mide
+        medir_arranque(directorio)
+        mediciones = [medir_arranque(directorio) for _ in range(args.repeticiones)]
+    mejor = min(mediciones, key=lambda m: m['total_ms'])
+
+    print(f"import app: {mejor['total_ms']:.0f} ms (presupuesto {args.presupuesto_ms:.0f} ms)")
+    if mejor['memoria_mb'] is not None:
+        print(f"Memoria residente al iniciar: {mejor['memoria_mb']:.1f} MB "
+              f"(presupuesto {args.presupuesto_memoria_mb:.0f} MB)")
+
+    # Paquetes de primer nivel (los que importa directamente cada módulo del proyecto)
+    print(f"\n{'módulo':<40} {'acumulado ms':>13} {'propio ms':>10}")
+    primer_nivel = {}
+    for nombre, propio, acumulado, _ in mejor['modulos']:
+        raiz = nombre.split('.')[0]
+        actual = primer_nivel.get(raiz)
+        if actual is None or acumulado > actual[1]:
+            primer_nivel[raiz] = (propio, acumulado)
+    for nombre, (propio, acumulado) in sorted(primer_nivel.items(), key=lambda m: -m[1][1])[:args.top]:
+        print(f"{nombre:<40} {acumulado / 1000:>13.1f} {propio / 1000:>10.1f}")
+
+    fallas = []
+    if mejor['total_ms'] > args.presupuesto_ms:
+        fallas.append(f"import app tardó {mejor['total_ms']:.0f} ms")
+    if mejor['memoria_mb'] is not None and mejor['memoria_mb'] > args.presupuesto_memoria_mb:
+        fallas.append(f"memoria al iniciar {mejor['memoria_mb']:.1f} MB")
+    diferidos = diferidos_importados(mejor['modulos'])
+    if diferidos:
+        fallas.append(f"se importan al iniciar: {', '.join(diferidos)}")
+
+    if fallas:
+        print("\n❌ Fuera de presupuesto:")
+        for falla in fallas:
+            print(f"  - {falla}")
+        return 1
+    print("\n✅ Arranque dentro del presupuesto")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
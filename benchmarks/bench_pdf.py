@@ -0,0 +1,90 @@
+"""
+Benchmark de Generación de Reportes PDF
+Mide reportes por segundo de PDFReportGenerator (estudiante, grupo y período). Con
+--referencia se mide también otra versión del módulo para comparar antes y después:
+
+    git show <commit>:pdf_generator.py > /tmp/pdf_generator_anterior.py
+    python benchmarks/bench_pdf.py --referencia /tmp/pdf_generator_anterior.py
+
+Uso: python benchmarks/bench_pdf.py [--reportes N] [--tutorias T] [--referencia RUTA]
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from init_test_data import MOTIVOS_TUTORIAS
+
+
+def cargar_generador(ruta):
+    """Clase PDFReportGenerator de un archivo pdf_generator.py cualquiera"""
+    spec = importlib.util.spec_from_file_location(f"pdf_generator_{abs(hash(ruta))}", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo.PDFReportGenerator
+
+
+def datos_prueba(tutorias):
+    random.seed(42)
+    individuales = [{
+        'fecha': f"2025-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+        'nombre': 'Juan', 'apellido_p': 'Pérez', 'apellido_m': 'García',
+        'motivo': random.choice(MOTIVOS_TUTORIAS),
+        'descripcion': 'Seguimiento del desempeño en las materias del cuatrimestre',
+        'tutor': 'Tutor de prueba', 'tipo': 'Individual',
+    } for _ in range(tutorias)]
+    grupales = [{
+        'fecha': t['fecha'], 'motivo': t['motivo'], 'asistentes': '25',
+        'descripcion': 'Dinámica grupal de integración y revisión de avances',
+    } for t in individuales]
+    estudiante = {'nombre': 'Juan', 'apellido_p': 'Pérez', 'apellido_m': 'García', 'matricula': '1234567890',
+                  'carrera': 'Ingeniería en Software', 'cuatrimestre': '7', 'tutor': 'Tutor de prueba'}
+    grupo = {'grupo_nombre': 'IS-701', 'carrera': 'Ingeniería en Software', 'cuatrimestre': '7'}
+    periodo = {'start_date': '2025-01-01', 'end_date': '2025-12-31', 'carrera': 'Todas', 'cuatrimestre': 'Todos'}
+    return {
+        'estudiante': lambda g: g.generate_student_report(estudiante, individuales, BytesIO()),
+        'grupo': lambda g: g.generate_group_report(grupo, grupales, BytesIO()),
+        'periodo': lambda g: g.generate_period_report(periodo, individuales, BytesIO()),
+    }
+
+
+def medir(clase, reporte, reportes):
+    """Reportes por segundo generando `reportes` PDF con un generador nuevo cada vez (como las rutas)"""
+    reporte(clase())  # calentamiento (imports perezosos de ReportLab)
+    inicio = time.perf_counter()
+    for _ in range(reportes):
+        reporte(clase())
+    return reportes / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de generación de reportes PDF')
+    parser.add_argument('--reportes', type=int, default=30, help='Reportes generados por tipo')
+    parser.add_argument('--tutorias', type=int, default=20, help='Tutorías por reporte')
+    parser.add_argument('--referencia', help='Otro pdf_generator.py para comparar (p. ej. la versión anterior)')
+    args = parser.parse_args()
+
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    versiones = [('actual', cargar_generador(os.path.join(raiz, 'pdf_generator.py')))]
+    if args.referencia:
+        versiones.insert(0, ('referencia', cargar_generador(args.referencia)))
+
+    reportes = datos_prueba(args.tutorias)
+    print(f"{args.reportes} reportes por tipo, {args.tutorias} tutorías por reporte\n")
+    print(f"{'reporte':<12}" + ''.join(f"{nombre + ' (rep/s)':>20}" for nombre, _ in versiones))
+    for tipo, reporte in reportes.items():
+        tasas = [medir(clase, reporte, args.reportes) for _, clase in versiones]
+        linea = f"{tipo:<12}" + ''.join(f"{tasa:>20.1f}" for tasa in tasas)
+        if len(tasas) == 2:
+            linea += f"   x{tasas[1] / tasas[0]:.2f}"
+        print(linea)
+
+
+if __name__ == '__main__':
+    main()
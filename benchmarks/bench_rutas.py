@@ -0,0 +1,384 @@
+"""
+Benchmark de Rutas
+Mide las rutas principales con el cliente de pruebas de Flask sobre bases sintéticas
+(datos_sinteticos.py) de 1 mil a 1 millón de tutorías. Por ruta registra la latencia p50
+y p95, el pico de memoria de Python (tracemalloc) y las consultas SQL de la petición, y
+compara con una línea base guardada:
+
+    python benchmarks/bench_rutas.py --tamanos 1000,10000 --guardar-linea-base
+    python benchmarks/bench_rutas.py --tamanos 1000,10000 --umbral-p95 1.3
+
+Cada tamaño se mide en un proceso aparte (la app lee TUTORIAS_DB al importarse) sobre
+una copia de la base generada, así las tablas de riesgo y los reportes siempre empiezan
+en frío. Las bases se generan una vez y se reutilizan desde --datos.
+
+Uso: python benchmarks/bench_rutas.py [--tamanos 1000,10000,100000,1000000] [--repeticiones N]
+                                      [--salida RUTA] [--linea-base RUTA] [--guardar-linea-base]
+                                      [--umbral-p95 X] [--umbral-memoria X] [--umbral-consultas N]
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from datos_sinteticos import crear_base_sintetica
+from report_jobs import EN_PROCESO, ERROR, PENDIENTE
+
+TAMANOS = (1000, 10000, 100000, 1000000)
+
+LINEA_BASE = os.path.join(RAIZ, 'benchmarks', 'linea_base_rutas.json')
+
+# Diferencias de p95 menores a esto se consideran ruido aunque superen el umbral relativo
+MARGEN_RUIDO_MS = 2.0
+
+# Espera entre consultas del estado de un reporte en segundo plano
+INTERVALO_SONDEO_S = 0.005
+
+USUARIO = {'usuario': 'demo@uptecamac.edu.mx', 'nombre': 'Usuario Demo'}
+
+
+def tamanos_base(tutorias):
+    """Tamaños de las demás tablas en proporción a las tutorías (como 50k/1M/200k/50k)"""
+    return {
+        'estudiantes': max(100, tutorias // 20),
+        'tutorias': tutorias,
+        'asesorias': tutorias // 5,
+        'grupales': max(20, tutorias // 20),
+    }
+
+
+def base_generada(directorio, tutorias, semilla, hasta):
+    """Ruta de la base sintética del tamaño; la genera si aún no existe"""
+    ruta = os.path.join(directorio, f"rutas_{tutorias}_s{semilla}_{hasta.isoformat()}.db")
+    if not os.path.exists(ruta):
+        os.makedirs(directorio, exist_ok=True)
+        print(f"→ Generando base de {tutorias:,} tutorías en {ruta}...")
+        # Con los índices FTS5: las rutas de búsqueda los usan y la app no migra la base al abrirla
+        resumen = crear_base_sintetica(ruta, semilla=semilla, hasta=hasta, busqueda=True, **tamanos_base(tutorias))
+        print(f"  ✓ {sum(resumen.filas.values()):,} filas en {sum(resumen.segundos.values()):.1f} s")
+    return ruta
+
+
+def percentil(valores, fraccion):
+    """Percentil por rango más cercano de una lista no vacía"""
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(fraccion * len(ordenados)) - 1)]
+
+
+# ---------------------------
+# Medición (proceso hijo, con TUTORIAS_DB apuntando a la copia de la base)
+# ---------------------------
+
+class ContadorConsultas:
+    """Callback de set_trace_callback que cuenta las sentencias de la conexión de la petición"""
+
+    def __init__(self):
+        self.total = 0
+        self.activo = True
+
+    def __call__(self, sql):
+        # Las sentencias de los triggers llegan como comentarios '-- TRIGGER ...'
+        if self.activo and not sql.startswith('--'):
+            self.total += 1
+
+
+def objetivos(db, repeticiones):
+    """
+    Identificadores de los registros que se consultan. El perfil y el historial usan al
+    estudiante con más tutorías (el peor caso); cada repetición de un reporte usa otro
+    estudiante, grupo o día para medir la generación y no la caché.
+    """
+    cantidad = repeticiones + 2
+    estudiantes = db.execute("""
+        SELECT estudiante_id, MAX(id) AS tutoria_id FROM tutoria
+        GROUP BY estudiante_id ORDER BY COUNT(*) DESC, estudiante_id LIMIT ?
+    """, (cantidad,)).fetchall()
+    grupos = db.execute("""
+        SELECT MAX(id) FROM tutoria_grupal GROUP BY grupo_nombre ORDER BY COUNT(*) DESC, grupo_nombre LIMIT ?
+    """, (cantidad,)).fetchall()
+    fechas = db.execute("SELECT DISTINCT fecha FROM tutoria ORDER BY fecha DESC LIMIT ?", (cantidad,)).fetchall()
+    carrera = db.execute("SELECT carrera FROM estudiantes GROUP BY carrera ORDER BY COUNT(*) DESC LIMIT 1").fetchone()
+    return {
+        'estudiante': estudiantes[0]['estudiante_id'],
+        'tutorias': [fila['tutoria_id'] for fila in estudiantes],
+        'grupos': [fila[0] for fila in grupos],
+        'fechas': [fila[0] for fila in fechas],
+        'carrera': carrera[0],
+    }
+
+
+def rutas_a_medir(ids):
+    """[(nombre, método, ruta o función(i) -> ruta, datos del formulario o función(i) -> datos)]"""
+    rutas = [
+        ('index', 'GET', '/index', None),
+        ('consultas', 'GET', '/consultas', None),
+        ('consultas_busqueda', 'GET', '/consultas?busqueda=calificacion', None),
+    ]
+    rutas += [(f"dashboard_risk_{ventana}", 'GET', f"/dashboard/risk?time_filter={ventana}", None)
+              for ventana in ('todo', 'cuatrimestre', 'mes', 'semana')]
+    rutas += [
+        ('perfil_estudiante', 'GET', f"/estudiantes/perfil/{ids['estudiante']}", None),
+        ('student_history', 'GET', f"/student/{ids['estudiante']}/history", None),
+        ('report_student', 'GET', lambda i: f"/report/student/{ids['tutorias'][i % len(ids['tutorias'])]}", None),
+        ('report_group', 'GET', lambda i: f"/report/group/{ids['grupos'][i % len(ids['grupos'])]}", None),
+        ('report_period', 'POST', '/report/period', lambda i: {
+            'start_date': ids['fechas'][i % len(ids['fechas'])], 'end_date': ids['fechas'][i % len(ids['fechas'])],
+            'carrera': '', 'cuatrimestre': '',
+        }),
+        ('api_carreras', 'GET', '/api/carreras', None),
+        ('api_grupos', 'GET', '/api/grupos?carrera_sigla=IS&cuatrimestre=7', None),
+        ('api_estudiantes', 'GET', f"/api/estudiantes?carrera={ids['carrera']}&cuatrimestre=1", None),
+        ('api_estudiantes_pagina', 'GET', '/api/estudiantes/pagina', None),
+        ('api_consultas_tutoria', 'GET', '/api/consultas/tutoria', None),
+        ('api_consultas_asesoria', 'GET', '/api/consultas/asesoria?busqueda=datos', None),
+        ('api_db_estadisticas', 'GET', '/api/db/estadisticas', None),
+    ]
+    return rutas
+
+
+def _peticion(cliente, contador, metodo, ruta, datos):
+    """
+    Hace la petición y, si es un reporte en segundo plano, espera a que termine y lo
+    descarga. Las consultas del sondeo del estado no se cuentan (dependen del tiempo).
+
+    Returns:
+        int: Estado HTTP de la última respuesta
+    """
+    respuesta = cliente.open(ruta, method=metodo, data=datos)
+    while respuesta.status_code in (301, 302, 303):
+        destino = respuesta.headers['Location']
+        # Página de espera de un trabajo (no sus descargas ni las de la caché)
+        if (destino.startswith('/reportes/') and not destino.endswith('/descargar')
+                and not destino.startswith('/reportes/cache/')):
+            trabajo_id = destino.rsplit('/', 1)[1]
+            contador.activo = False
+            while True:
+                estado = cliente.get(f"/api/reportes/{trabajo_id}").get_json()
+                if estado['estado'] not in (PENDIENTE, EN_PROCESO):
+                    break
+                time.sleep(INTERVALO_SONDEO_S)
+            contador.activo = True
+            if estado['estado'] == ERROR:
+                return 500
+            destino = estado['descarga']
+        respuesta = cliente.get(destino)
+    return respuesta.status_code
+
+
+def medir_rutas(repeticiones):
+    """Mide todas las rutas con la base de TUTORIAS_DB y devuelve {ruta: métricas}"""
+    import app as aplicacion
+
+    cliente = aplicacion.app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion.update(USUARIO)
+    contador = ContadorConsultas()
+    # El cliente de pruebas atiende las peticiones en este hilo: siempre con esta conexión
+    with aplicacion.app.app_context():
+        db = aplicacion.get_db()
+        ids = objetivos(db, repeticiones)
+        db.set_trace_callback(contador)
+
+    resultados = {}
+    for nombre, metodo, ruta, datos in rutas_a_medir(ids):
+        def pedir(i):
+            return _peticion(cliente, contador, metodo, ruta(i) if callable(ruta) else ruta,
+                             datos(i) if callable(datos) else datos)
+
+        # Primera petición: tablas materializadas, cachés y páginas de SQLite en frío
+        inicio = time.perf_counter()
+        estado = pedir(0)
+        primera = (time.perf_counter() - inicio) * 1000
+
+        tiempos = []
+        for i in range(1, repeticiones + 1):
+            contador.total = 0
+            inicio = time.perf_counter()
+            estado = max(estado, pedir(i))
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        consultas = contador.total
+
+        tracemalloc.start()
+        pedir(repeticiones + 1)
+        memoria = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        resultados[nombre] = {
+            'estado': estado,
+            'primera_ms': round(primera, 3),
+            'p50_ms': round(percentil(tiempos, 0.5), 3),
+            'p95_ms': round(percentil(tiempos, 0.95), 3),
+            'memoria_pico_kb': round(memoria / 1024, 1),
+            'consultas': consultas,
+        }
+        print(f"    {nombre:<28}{resultados[nombre]['p95_ms']:>10.1f} ms p95", flush=True)
+    return resultados
+
+
+def _memoria_maxima_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def maquina():
+    """Procesador, núcleos y memoria del equipo: las latencias solo se comparan en el mismo"""
+    procesador = platform.processor()
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as archivo:
+            procesador = next((linea.split(':', 1)[1].strip() for linea in archivo
+                               if linea.startswith('model name')), procesador)
+    except OSError:
+        pass
+    try:
+        memoria_gb = round(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 1024 ** 3, 1)
+    except (AttributeError, ValueError, OSError):  # Windows
+        memoria_gb = None
+    return {'sistema': platform.platform(), 'procesador': procesador or platform.machine(),
+            'nucleos': os.cpu_count(), 'memoria_gb': memoria_gb}
+
+
+def medir_tamano(ruta_base, repeticiones):
+    """Ejecuta la medición de una base en un proceso nuevo sobre una copia de la base"""
+    with tempfile.TemporaryDirectory() as directorio:
+        copia = os.path.join(directorio, 'asesorias.db')
+        shutil.copyfile(ruta_base, copia)
+        salida = os.path.join(directorio, 'resultado.json')
+        entorno = dict(os.environ, TUTORIAS_DB=copia)
+        # cwd temporal: los reportes y su caché se escriben junto a la copia
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--medir', salida,
+                        '--repeticiones', str(repeticiones)], cwd=directorio, env=entorno, check=True)
+        with open(salida, encoding='utf-8') as archivo:
+            return json.load(archivo)
+
+
+# ---------------------------
+# Comparación con la línea base
+# ---------------------------
+
+def comparar(actual, base, umbral_p95, umbral_memoria, umbral_consultas):
+    """
+    Regresiones de `actual` respecto a `base` (mismos tamaños y rutas).
+
+    Args:
+        umbral_p95: Razón máxima permitida entre el p95 actual y el de la línea base
+        umbral_memoria: Razón máxima permitida del pico de memoria
+        umbral_consultas: Consultas adicionales permitidas por petición
+
+    Returns:
+        list: [(tamaño, ruta, descripción)]
+    """
+    regresiones = []
+    for tamano, medicion in actual['bases'].items():
+        referencia = base.get('bases', {}).get(tamano)
+        if referencia is None:
+            continue
+        for ruta, metricas in medicion['rutas'].items():
+            anterior = referencia['rutas'].get(ruta)
+            if anterior is None:
+                continue
+            if metricas['p95_ms'] > anterior['p95_ms'] * umbral_p95 \
+                    and metricas['p95_ms'] - anterior['p95_ms'] > MARGEN_RUIDO_MS:
+                regresiones.append((tamano, ruta, f"p95 {anterior['p95_ms']:.1f} → {metricas['p95_ms']:.1f} ms"))
+            if metricas['memoria_pico_kb'] > anterior['memoria_pico_kb'] * umbral_memoria:
+                regresiones.append((tamano, ruta, f"memoria {anterior['memoria_pico_kb']:.0f} → {metricas['memoria_pico_kb']:.0f} KB"))
+            if metricas['consultas'] > anterior['consultas'] + umbral_consultas:
+                regresiones.append((tamano, ruta, f"consultas {anterior['consultas']} → {metricas['consultas']}"))
+            if metricas['estado'] >= 400 > anterior['estado']:
+                regresiones.append((tamano, ruta, f"estado HTTP {anterior['estado']} → {metricas['estado']}"))
+    return regresiones
+
+
+def imprimir_tabla(tamano, medicion, referencia=None):
+    print(f"\n{tamano:,} tutorías (memoria máxima del proceso: {medicion['memoria_proceso_mb']} MB)")
+    print(f"{'ruta':<28}{'p50 ms':>10}{'p95 ms':>10}{'1ª ms':>10}{'KB pico':>10}{'consultas':>11}{'vs base':>9}")
+    for ruta, m in medicion['rutas'].items():
+        anterior = (referencia or {}).get('rutas', {}).get(ruta)
+        razon = f"x{m['p95_ms'] / anterior['p95_ms']:.2f}" if anterior and anterior['p95_ms'] else ''
+        aviso = '' if m['estado'] < 400 else f"  ⚠️ HTTP {m['estado']}"
+        print(f"{ruta:<28}{m['p50_ms']:>10.1f}{m['p95_ms']:>10.1f}{m['primera_ms']:>10.1f}"
+              f"{m['memoria_pico_kb']:>10.0f}{m['consultas']:>11}{razon:>9}{aviso}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de rutas sobre bases sintéticas de distintos tamaños')
+    parser.add_argument('--tamanos', default=','.join(str(t) for t in TAMANOS), help='Tutorías de cada base, separadas por comas')
+    parser.add_argument('--repeticiones', type=int, default=20, help='Peticiones medidas por ruta')
+    parser.add_argument('--semilla', type=int, default=42, help='Semilla de las bases sintéticas')
+    parser.add_argument('--datos', default=os.path.join(tempfile.gettempdir(), 'tutorias_bench'),
+                        help='Directorio donde se guardan y reutilizan las bases generadas')
+    parser.add_argument('--salida', default='resultados_rutas.json', help='Archivo JSON con los resultados')
+    parser.add_argument('--linea-base', default=LINEA_BASE, help='JSON de resultados anterior contra el que se compara')
+    parser.add_argument('--guardar-linea-base', action='store_true', help='Guarda los resultados como la nueva línea base')
+    parser.add_argument('--umbral-p95', type=float, default=1.25, help='Razón máxima de p95 respecto a la línea base')
+    parser.add_argument('--umbral-memoria', type=float, default=1.25, help='Razón máxima del pico de memoria')
+    parser.add_argument('--umbral-consultas', type=int, default=0, help='Consultas adicionales permitidas por petición')
+    parser.add_argument('--medir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        resultado = {'rutas': medir_rutas(args.repeticiones), 'memoria_proceso_mb': _memoria_maxima_mb()}
+        with open(args.medir, 'w', encoding='utf-8') as archivo:
+            json.dump(resultado, archivo)
+        return 0
+
+    hoy = date.today()
+    actual = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'maquina': maquina(),
+        'repeticiones': args.repeticiones,
+        'bases': {},
+    }
+    base = {}
+    if os.path.exists(args.linea_base) and not args.guardar_linea_base:
+        with open(args.linea_base, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+
+    for tamano in (int(t) for t in args.tamanos.split(',')):
+        ruta = base_generada(args.datos, tamano, args.semilla, hoy)
+        print(f"→ Midiendo {tamano:,} tutorías...")
+        medicion = medir_tamano(ruta, args.repeticiones)
+        medicion['filas'] = tamanos_base(tamano)
+        actual['bases'][str(tamano)] = medicion
+        imprimir_tabla(tamano, medicion, base.get('bases', {}).get(str(tamano)))
+
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(actual, archivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {args.salida}")
+    if args.guardar_linea_base:
+        shutil.copyfile(args.salida, args.linea_base)
+        print(f"Línea base actualizada: {args.linea_base}")
+        return 0
+    if not base:
+        print(f"Sin línea base en {args.linea_base} (créala con --guardar-linea-base)")
+        return 0
+
+    if base.get('maquina') != actual['maquina']:
+        print(f"⚠️  La línea base se midió en otro equipo ({base.get('maquina', 'sin registrar')}); las latencias no son comparables")
+    regresiones = comparar(actual, base, args.umbral_p95, args.umbral_memoria, args.umbral_consultas)
+    for tamano, ruta, descripcion in regresiones:
+        print(f"  ❌ {int(tamano):,} tutorías, {ruta}: {descripcion}")
+    print(f"{'❌' if regresiones else '✅'} {len(regresiones)} regresiones respecto a la línea base "
+          f"({base.get('fecha', 'sin fecha')})")
+    return 1 if regresiones else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
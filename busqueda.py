@@ -0,0 +1,321 @@
+"""
+Módulo de Búsqueda de Texto Completo
+Proporciona índices FTS5 con tokenizador trigram (sincronizados por triggers) y las
+funciones de búsqueda clasificada que usan /consultas y /estudiantes
+"""
+
+import sqlite3
+
+from database import VISTA_DE
+
+# Vocales acentuadas, diéresis y eñe se pliegan a su letra base (como remove_diacritics).
+# LOWER de SQLite solo convierte ASCII, por eso se incluyen también las mayúsculas.
+PLIEGUE_DIACRITICOS = (
+    ('á', 'a'), ('é', 'e'), ('í', 'i'), ('ó', 'o'), ('ú', 'u'), ('ü', 'u'), ('ñ', 'n'),
+    ('Á', 'a'), ('É', 'e'), ('Í', 'i'), ('Ó', 'o'), ('Ú', 'u'), ('Ü', 'u'), ('Ñ', 'n'),
+)
+
+_TABLA_PLIEGUE = str.maketrans({origen: destino for origen, destino in PLIEGUE_DIACRITICOS})
+
+# El tokenizador trigram solo puede usar el índice con términos de 3 o más caracteres
+LONGITUD_MINIMA_TERMINO = 3
+
+_NOMBRE_COMPLETO = "coalesce({p}nombre, '') || ' ' || coalesce({p}apellido_p, '') || ' ' || coalesce({p}apellido_m, '')"
+
+# Asesorías y tutorías de un estudiante registrado no guardan su identidad: se toma de
+# estudiantes, y la copia del registro solo cuenta en los que no tienen estudiante
+_DEL_ESTUDIANTE = "(SELECT {expresion} FROM estudiantes e WHERE e.id = {{p}}estudiante_id)"
+_NOMBRE_REGISTRO = f"coalesce({_DEL_ESTUDIANTE.format(expresion=_NOMBRE_COMPLETO.format(p='e.'))}, {_NOMBRE_COMPLETO})"
+_MATRICULA_REGISTRO = f"coalesce({_DEL_ESTUDIANTE.format(expresion='e.matricula')}, {{p}}matricula, '')"
+
+# Índices de búsqueda: tabla origen -> (tabla FTS5, {columna FTS: expresión SQL sobre la fila})
+INDICES_BUSQUEDA = {
+    'asesoria': ('busqueda_asesoria', {
+        'nombre': _NOMBRE_REGISTRO,
+        'matricula': _MATRICULA_REGISTRO,
+        'tema': "coalesce({p}tema, '')",
+    }),
+    'tutoria': ('busqueda_tutoria', {
+        'nombre': _NOMBRE_REGISTRO,
+        'matricula': _MATRICULA_REGISTRO,
+        'motivo': "coalesce({p}motivo, '')",
+        'descripcion': "coalesce({p}descripcion, '')",
+    }),
+    'tutoria_grupal': ('busqueda_tutoria_grupal', {
+        'grupo': "coalesce({p}grupo_nombre, '')",
+        'motivo': "coalesce({p}motivo, '')",
+        'descripcion': "coalesce({p}descripcion, '')",
+    }),
+    'estudiantes': ('busqueda_estudiantes', {
+        'nombre': _NOMBRE_COMPLETO,
+        'matricula': "coalesce({p}matricula, '')",
+    }),
+}
+
+# Cambios de estudiantes que alteran el texto indexado de sus asesorías y tutorías
+_IDENTIDAD_ESTUDIANTE = ('nombre', 'apellido_p', 'apellido_m', 'matricula')
+
+_fts_disponible = None
+
+
+def fts_disponible():
+    """True si el SQLite enlazado incluye FTS5 con el tokenizador trigram"""
+    global _fts_disponible
+    if _fts_disponible is None:
+        conn = sqlite3.connect(':memory:')
+        try:
+            conn.execute("CREATE VIRTUAL TABLE prueba USING fts5(texto, tokenize='trigram')")
+            _fts_disponible = True
+        except sqlite3.OperationalError:
+            _fts_disponible = False
+        finally:
+            conn.close()
+    return _fts_disponible
+
+
+def plegar_texto(texto):
+    """Minúsculas y sin diacríticos, igual que las expresiones que alimentan los índices"""
+    return (texto or '').lower().translate(_TABLA_PLIEGUE)
+
+
+def _expresion_plegada(expresion):
+    """Envuelve una expresión SQL en lower() y un replace() por cada diacrítico"""
+    sql = f"lower({expresion})"
+    for origen, destino in PLIEGUE_DIACRITICOS:
+        sql = f"replace({sql}, '{origen}', '{destino}')"
+    return sql
+
+
+def _valores(columnas, prefijo):
+    return ', '.join(_expresion_plegada(expresion.format(p=prefijo)) for expresion in columnas.values())
+
+
+def crear_indices_busqueda(conn, llenar=True):
+    """
+    Crea las tablas FTS5 y los triggers que las mantienen sincronizadas (no hace commit).
+    Las tablas nuevas se llenan con las filas existentes, salvo con llenar=False (las
+    migraciones las llenan por lotes con completar_indices_busqueda).
+
+    Returns:
+        bool: False si SQLite no tiene FTS5 (la búsqueda usa LIKE)
+    """
+    if not fts_disponible():
+        return False
+
+    for tabla, (tabla_fts, columnas) in INDICES_BUSQUEDA.items():
+        existe = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla_fts,)
+        ).fetchone()
+        nombres = ', '.join(columnas)
+
+        conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {tabla_fts} USING fts5({nombres}, tokenize='trigram')")
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabla_fts}_ai AFTER INSERT ON {tabla} BEGIN
+                INSERT INTO {tabla_fts}(rowid, {nombres}) VALUES (new.id, {_valores(columnas, 'new.')});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabla_fts}_ad AFTER DELETE ON {tabla} BEGIN
+                DELETE FROM {tabla_fts} WHERE rowid = old.id;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabla_fts}_au AFTER UPDATE ON {tabla} BEGIN
+                DELETE FROM {tabla_fts} WHERE rowid = old.id;
+                INSERT INTO {tabla_fts}(rowid, {nombres}) VALUES (new.id, {_valores(columnas, 'new.')});
+            END
+        """)
+        if tabla in VISTA_DE:
+            # Renombrar a un estudiante reindexa solo sus registros (índice de estudiante_id)
+            cambio = ' OR '.join(f"old.{columna} IS NOT new.{columna}" for columna in _IDENTIDAD_ESTUDIANTE)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {tabla_fts}_estudiante
+                AFTER UPDATE OF {', '.join(_IDENTIDAD_ESTUDIANTE)} ON estudiantes WHEN {cambio} BEGIN
+                    DELETE FROM {tabla_fts} WHERE rowid IN (SELECT id FROM {tabla} WHERE estudiante_id = new.id);
+                    INSERT INTO {tabla_fts}(rowid, {nombres})
+                    SELECT id, {_valores(columnas, '')} FROM {tabla} WHERE estudiante_id = new.id;
+                END
+            """)
+        if llenar and not existe:
+            _llenar_indice(conn, tabla, tabla_fts, columnas)
+    return True
+
+
+def eliminar_triggers_busqueda(conn):
+    """
+    Elimina los triggers de los índices de búsqueda (no hace commit); crear_indices_busqueda
+    los vuelve a crear. Las migraciones que reescriben tablas completas los quitan mientras
+    tanto para no reindexar fila por fila
+    """
+    for tabla, (tabla_fts, _) in INDICES_BUSQUEDA.items():
+        for sufijo in ('ai', 'ad', 'au', 'estudiante'):
+            conn.execute(f"DROP TRIGGER IF EXISTS {tabla_fts}_{sufijo}")
+
+
+def reindexar_filas(conn, tabla, condicion, parametros=()):
+    """
+    Vuelve a calcular el texto indexado de las filas de `tabla` que cumplen `condicion`
+    (SQL sobre la tabla, sin alias); no hace commit
+    """
+    if not fts_disponible():
+        return
+    tabla_fts, columnas = INDICES_BUSQUEDA[tabla]
+    conn.execute(f"DELETE FROM {tabla_fts} WHERE rowid IN (SELECT id FROM {tabla} WHERE {condicion})", parametros)
+    conn.execute(f"""
+        INSERT INTO {tabla_fts}(rowid, {', '.join(columnas)})
+        SELECT id, {_valores(columnas, '')} FROM {tabla} WHERE {condicion}
+    """, parametros)
+
+
+def completar_indices_busqueda(conn, tamano_lote):
+    """
+    Agrega a los índices de búsqueda las filas que les falten, por rangos de id y con un
+    commit por lote, para no retener el candado de escritura mientras se tokenizan
+    tablas grandes. Se puede interrumpir y repetir.
+
+    Returns:
+        int: Filas agregadas
+    """
+    agregadas = 0
+    for tabla, (tabla_fts, columnas) in INDICES_BUSQUEDA.items():
+        maximo = conn.execute(f"SELECT max(id) FROM {tabla}").fetchone()[0] or 0
+        for desde in range(0, maximo, tamano_lote):
+            rango = (desde, desde + tamano_lote)
+            agregadas += conn.execute(f"""
+                INSERT INTO {tabla_fts}(rowid, {', '.join(columnas)})
+                SELECT id, {_valores(columnas, '')} FROM {tabla}
+                WHERE id > ? AND id <= ?
+                  AND id NOT IN (SELECT rowid FROM {tabla_fts} WHERE rowid > ? AND rowid <= ?)
+            """, rango + rango).rowcount
+            conn.commit()
+    return agregadas
+
+
+def _llenar_indice(conn, tabla, tabla_fts, columnas):
+    conn.execute(f"""
+        INSERT INTO {tabla_fts}(rowid, {', '.join(columnas)})
+        SELECT id, {_valores(columnas, '')} FROM {tabla}
+    """)
+
+
+def reconstruir_indices_busqueda(conn):
+    """Vacía y vuelve a llenar todos los índices de búsqueda (hace commit)"""
+    if not crear_indices_busqueda(conn):
+        return False
+    for tabla, (tabla_fts, columnas) in INDICES_BUSQUEDA.items():
+        conn.execute(f"DELETE FROM {tabla_fts}")
+        _llenar_indice(conn, tabla, tabla_fts, columnas)
+    conn.commit()
+    return True
+
+
+def _terminos(texto):
+    """Términos plegados de la búsqueda; los cortos se omiten si hay alguno indexable"""
+    terminos = plegar_texto(texto).split()
+    largos = [t for t in terminos if len(t) >= LONGITUD_MINIMA_TERMINO]
+    return largos, terminos
+
+
+def _consulta_fts(terminos):
+    """Cada término como frase entre comillas: todos deben aparecer (AND implícito)"""
+    return ' '.join('"' + t.replace('"', '""') + '"' for t in terminos)
+
+
+def _buscar(db, tabla, texto, filtros='', parametros=(), orden_secundario='t.id DESC', columnas_like=(),
+            limite=None, desplazamiento=0):
+    """
+    Busca en la tabla origen a través de su índice FTS5 y devuelve las filas completas
+    ordenadas por relevancia (bm25). Sin FTS5 recurre a LIKE sobre columnas_like plegadas.
+    Con limite se devuelve solo esa porción de los resultados (paginación).
+    Las filas de asesorías y tutorías se leen de su vista, con la identidad del estudiante.
+    """
+    tabla_fts, columnas = INDICES_BUSQUEDA[tabla]
+    origen = VISTA_DE.get(tabla, tabla)
+    largos, terminos = _terminos(texto)
+    if not terminos:
+        return []
+    pagina, argumentos_pagina = '', ()
+    if limite is not None:
+        pagina, argumentos_pagina = 'LIMIT ? OFFSET ?', (limite, desplazamiento)
+
+    if not fts_disponible():
+        condicion = ' AND '.join(
+            '(' + ' OR '.join(f"{_expresion_plegada(f't.{c}')} LIKE ?" for c in columnas_like) + ')' for _ in terminos
+        )
+        valores = [f"%{termino}%" for termino in terminos for _ in columnas_like]
+        return db.execute(
+            f"SELECT t.* FROM {origen} t WHERE {condicion} {filtros} ORDER BY {orden_secundario} {pagina}",
+            (*valores, *parametros, *argumentos_pagina)
+        ).fetchall()
+
+    if largos:
+        # Búsqueda indexada por trigramas
+        return db.execute(f"""
+            SELECT t.* FROM {tabla_fts} f
+            JOIN {origen} t ON t.id = f.rowid
+            WHERE {tabla_fts} MATCH ? {filtros}
+            ORDER BY f.rank, {orden_secundario} {pagina}
+        """, (_consulta_fts(largos), *parametros, *argumentos_pagina)).fetchall()
+
+    # Términos de menos de 3 caracteres: LIKE sobre el texto ya plegado del índice
+    condicion = ' AND '.join(
+        '(' + ' OR '.join(f"f.{c} LIKE ?" for c in columnas) + ')' for _ in terminos
+    )
+    valores = [f"%{termino}%" for termino in terminos for _ in columnas]
+    return db.execute(f"""
+        SELECT t.* FROM {tabla_fts} f
+        JOIN {origen} t ON t.id = f.rowid
+        WHERE {condicion} {filtros}
+        ORDER BY {orden_secundario} {pagina}
+    """, (*valores, *parametros, *argumentos_pagina)).fetchall()
+
+
+def buscar_asesorias(db, texto, limite=None, desplazamiento=0):
+    """Asesorías por nombre, matrícula o tema"""
+    return _buscar(db, 'asesoria', texto, orden_secundario='t.created_at DESC, t.id DESC',
+                   columnas_like=('nombre', 'apellido_p', 'apellido_m', 'matricula', 'tema'),
+                   limite=limite, desplazamiento=desplazamiento)
+
+
+def buscar_tutorias(db, texto, limite=None, desplazamiento=0):
+    """Tutorías individuales por nombre, matrícula, motivo o descripción"""
+    return _buscar(db, 'tutoria', texto, orden_secundario='t.created_at DESC, t.id DESC',
+                   columnas_like=('nombre', 'apellido_p', 'apellido_m', 'matricula', 'motivo', 'descripcion'),
+                   limite=limite, desplazamiento=desplazamiento)
+
+
+def buscar_tutorias_grupales(db, texto, limite=None, desplazamiento=0):
+    """Tutorías grupales por grupo, motivo o descripción"""
+    return _buscar(db, 'tutoria_grupal', texto, orden_secundario='t.created_at DESC, t.id DESC',
+                   columnas_like=('grupo_nombre', 'motivo', 'descripcion'),
+                   limite=limite, desplazamiento=desplazamiento)
+
+
+def buscar_estudiantes(db, texto, cuatrimestre=None, limite=None, desplazamiento=0):
+    """Estudiantes por nombre o matrícula, opcionalmente de un cuatrimestre"""
+    filtros, parametros = '', ()
+    if cuatrimestre:
+        filtros, parametros = 'AND t.cuatrimestre_actual = ?', (cuatrimestre,)
+    return _buscar(db, 'estudiantes', texto, filtros, parametros,
+                   orden_secundario='t.apellido_p, t.apellido_m, t.nombre, t.id',
+                   columnas_like=('nombre', 'apellido_p', 'apellido_m', 'matricula'),
+                   limite=limite, desplazamiento=desplazamiento)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from database import DATABASE, conectar
+
+    parser = argparse.ArgumentParser(description="Reconstruye los índices de búsqueda FTS5")
+    parser.add_argument('--db', default=DATABASE, help=f"Ruta de la base de datos (por defecto: {DATABASE})")
+    args = parser.parse_args()
+
+    conn = conectar(args.db)
+    try:
+        if reconstruir_indices_busqueda(conn):
+            print("✅ Índices de búsqueda reconstruidos.")
+        else:
+            print("❌ Este SQLite no incluye FTS5; la búsqueda usará LIKE.")
+    finally:
+        conn.close()
@@ -0,0 +1,50 @@
+"""
+Módulo de Carga Diferida
+Fachada para los subsistemas pesados (ReportLab en pdf_generator, pandas): el módulo se
+importa en el primer acceso a uno de sus atributos y no al iniciar la aplicación. La
+mayoría de las peticiones nunca genera un PDF ni evalúa un lote, así que ningún proceso
+paga ese tiempo de importación ni esa memoria hasta que lo necesita.
+
+benchmarks/bench_importacion.py verifica que MODULOS_DIFERIDOS no se importen al iniciar
+"""
+
+import importlib
+import sys
+
+# Módulos (y paquetes) que no deben cargarse al importar app
+MODULOS_DIFERIDOS = ('pdf_generator', 'reportlab', 'pandas', 'numpy', 'openpyxl')
+
+
+class ModuloDiferido:
+    """Módulo que se importa en el primer acceso a uno de sus atributos"""
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def cargar(self):
+        """Importa el módulo si aún no se importó (el candado de importación lo hace seguro entre hilos)"""
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nombre)
+        return self._modulo
+
+    @property
+    def cargado(self):
+        return self._modulo is not None or self._nombre in sys.modules
+
+    def __getattr__(self, atributo):
+        return getattr(self.cargar(), atributo)
+
+    def __repr__(self):
+        estado = 'cargado' if self.cargado else 'sin cargar'
+        return f"<ModuloDiferido {self._nombre} ({estado})>"
+
+
+# Generación de reportes PDF (ReportLab)
+pdf = ModuloDiferido('pdf_generator')
+
+
+def modulos_cargados(nombres=MODULOS_DIFERIDOS):
+    """Cuáles de los módulos indicados (o sus submódulos) ya están importados en el proceso"""
+    return sorted(nombre for nombre in nombres
+                  if nombre in sys.modules or any(m.startswith(nombre + '.') for m in sys.modules))
@@ -0,0 +1,541 @@
+"""
+Módulo de Conexiones a la Base de Datos
+Proporciona un grupo acotado de conexiones SQLite persistentes, configuradas con WAL
+y PRAGMAs ajustados, y estadísticas de reutilización y esperas por bloqueo
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Ruta de la base de datos (se puede cambiar con la variable de entorno TUTORIAS_DB)
+DATABASE = os.environ.get('TUTORIAS_DB', 'asesorias.db')
+
+# Ajustes de PRAGMA (configurables por variables de entorno)
+CACHE_SIZE_KIB = int(os.environ.get('TUTORIAS_DB_CACHE_KIB', 16384))      # 16 MiB de caché de páginas
+MMAP_SIZE = int(os.environ.get('TUTORIAS_DB_MMAP_MB', 64)) * 1024 * 1024   # 64 MiB mapeados en memoria
+BUSY_TIMEOUT_MS = int(os.environ.get('TUTORIAS_DB_BUSY_TIMEOUT_MS', 5000))
+
+# Conexiones que conserva abiertas cada gestor (peticiones simultáneas que no esperan)
+TAMANO_POOL = int(os.environ.get('TUTORIAS_DB_POOL', 8))
+
+# Una escritura que tarda más que esto casi seguro esperó el candado de escritura
+UMBRAL_ESPERA_MS = 100
+
+SENTENCIAS_ESCRITURA = ('INSERT', 'UPDATE', 'DELETE', 'REPLAC')
+
+# Filas que se traen por cada fetchmany() al recorrer resultados grandes
+TAMANO_LOTE = 500
+
+
+class EstadisticasConexion:
+    """Contadores compartidos por todas las conexiones de un gestor"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.conexiones_abiertas = 0
+        self.conexiones_reutilizadas = 0
+        self.esperas_pool = 0
+        self.escrituras = 0
+        self.tiempo_escritura_ms = 0.0
+        self.max_escritura_ms = 0.0
+        self.esperas_bloqueo = 0
+        self.errores_bloqueo = 0
+
+    def registrar_escritura(self, duracion_ms):
+        with self._lock:
+            self.escrituras += 1
+            self.tiempo_escritura_ms += duracion_ms
+            if duracion_ms > self.max_escritura_ms:
+                self.max_escritura_ms = duracion_ms
+            if duracion_ms >= UMBRAL_ESPERA_MS:
+                self.esperas_bloqueo += 1
+
+    def registrar_error_bloqueo(self):
+        with self._lock:
+            self.errores_bloqueo += 1
+
+    def incrementar(self, campo):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+
+def _es_error_bloqueo(error):
+    mensaje = str(error).lower()
+    return 'locked' in mensaje or 'busy' in mensaje
+
+
+class CursorMonitoreado(sqlite3.Cursor):
+    """
+    Cursor que cuenta las sentencias, mide las escrituras y cuenta los errores por base de
+    datos bloqueada. Si la conexión tiene un registro de instrumentación (ver instrumentacion.py) mide además
+    todas las sentencias
+    """
+
+    _consulta = None
+
+    def _medir(self, metodo, sql, *args):
+        conexion = self.connection
+        conexion.sentencias += 1
+        estadisticas = conexion.estadisticas
+        registro = conexion.registro
+        escritura = estadisticas is not None and sql.lstrip()[:6].upper().startswith(SENTENCIAS_ESCRITURA)
+        if not escritura and registro is None:
+            return metodo(sql, *args)
+        consulta = registro.iniciar(sql) if registro is not None else None
+        inicio = time.perf_counter()
+        try:
+            resultado = metodo(sql, *args)
+        except sqlite3.OperationalError as e:
+            if escritura and _es_error_bloqueo(e):
+                estadisticas.registrar_error_bloqueo()
+            raise
+        finally:
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            if escritura:
+                estadisticas.registrar_escritura(duracion_ms)
+            if consulta is not None:
+                consulta.duracion_ms += duracion_ms
+                registro.finalizar()
+        if consulta is not None and self.description is None:
+            # Escrituras: filas afectadas (en executemany, de todas las ejecuciones)
+            consulta.filas = max(self.rowcount, 0)
+        self._consulta = consulta
+        return resultado
+
+    def execute(self, sql, parameters=()):
+        return self._medir(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._medir(super().executemany, sql, seq_of_parameters)
+
+
+class CursorInstrumentado(CursorMonitoreado):
+    """CursorMonitoreado que además suma a la sentencia el tiempo y las filas de cada lectura"""
+
+    def _leer(self, metodo, *args):
+        consulta = self._consulta
+        if consulta is None:
+            return metodo(*args)
+        inicio = time.perf_counter()
+        try:
+            resultado = metodo(*args)
+        finally:
+            consulta.duracion_ms += (time.perf_counter() - inicio) * 1000
+        consulta.filas += len(resultado) if isinstance(resultado, list) else resultado is not None
+        return resultado
+
+    def fetchone(self):
+        return self._leer(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._leer(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._leer(super().fetchall)
+
+    def __next__(self):
+        fila = self._leer(super().fetchone)
+        if fila is None:
+            raise StopIteration
+        return fila
+
+
+class ConexionMonitoreada(sqlite3.Connection):
+    """
+    Conexión cuyos cursores (incluidos los de execute directo) son CursorMonitoreado, o
+    CursorInstrumentado mientras tiene asignado un registro de instrumentación
+    """
+
+    estadisticas = None
+    registro = None
+    # Sentencias ejecutadas desde que se abrió (metricas.py las cuenta por petición)
+    sentencias = 0
+
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = CursorMonitoreado if self.registro is None else CursorInstrumentado
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def instrumentar(self, registro):
+        """Asigna (o quita, con None) el registro de instrumentación de la petición en curso"""
+        self.registro = registro
+        self.set_trace_callback(registro.trazar if registro is not None else None)
+
+    def commit(self):
+        if (self.estadisticas is None and self.registro is None) or not self.in_transaction:
+            return super().commit()
+        registro = self.registro
+        consulta = registro.iniciar('COMMIT') if registro is not None else None
+        inicio = time.perf_counter()
+        try:
+            super().commit()
+        except sqlite3.OperationalError as e:
+            if self.estadisticas is not None and _es_error_bloqueo(e):
+                self.estadisticas.registrar_error_bloqueo()
+            raise
+        finally:
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            if self.estadisticas is not None:
+                self.estadisticas.registrar_escritura(duracion_ms)
+            if consulta is not None:
+                consulta.duracion_ms = duracion_ms
+                registro.finalizar()
+
+
+def configurar_conexion(conn, cache_size_kib=CACHE_SIZE_KIB, mmap_size=MMAP_SIZE, busy_timeout_ms=BUSY_TIMEOUT_MS):
+    """
+    Aplica los PRAGMAs de rendimiento y consistencia a una conexión
+
+    Args:
+        conn: Conexión sqlite3
+        cache_size_kib: Tamaño de la caché de páginas en KiB
+        mmap_size: Bytes de la base de datos a mapear en memoria (0 lo desactiva)
+        busy_timeout_ms: Milisegundos a esperar un candado antes de fallar
+    """
+    # Primero busy_timeout: los demás PRAGMAs ya esperan un candado en lugar de fallar
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+    if conn.execute("PRAGMA journal_mode").fetchone()[0] not in ('wal', 'memory'):
+        # Normalmente ya lo activó esquema.migrar; si otra conexión lo está cambiando a la
+        # vez (requiere candado exclusivo) basta con que una lo logre
+        try:
+            activar_wal(conn)
+        except sqlite3.OperationalError:
+            pass
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{int(cache_size_kib)}")
+    conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+def activar_wal(conn):
+    """
+    Cambia la base a WAL. Es persistente en el archivo (en bases en memoria se ignora) y
+    requiere un candado exclusivo, por eso se hace una vez al migrar y no en cada conexión
+
+    Returns:
+        str: Modo de journal resultante
+    """
+    return conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+
+
+def conectar(database=DATABASE, **pragmas):
+    """Abre una conexión independiente (scripts y CLI) con los mismos PRAGMAs que la app"""
+    conn = sqlite3.connect(database)
+    conn.row_factory = sqlite3.Row
+    return configurar_conexion(conn, **pragmas)
+
+
+def recorrer_en_lotes(cursor, tamano=TAMANO_LOTE):
+    """Itera las filas de un cursor con fetchmany(): en memoria solo queda un lote a la vez"""
+    while True:
+        filas = cursor.fetchmany(tamano)
+        if not filas:
+            return
+        yield from filas
+
+
+class ConnectionManager:
+    """
+    Grupo acotado de conexiones persistentes. Cada petición toma una conexión libre con
+    obtener() y la devuelve con liberar(), que solo deshace la transacción pendiente; así se
+    reutilizan aunque cada petición llegue en un hilo nuevo (servidor threaded de Werkzeug).
+    Con las `tamano` conexiones ocupadas, obtener() espera hasta busy_timeout a que se libere una.
+    """
+
+    def __init__(self, database=DATABASE, tamano=TAMANO_POOL, cache_size_kib=CACHE_SIZE_KIB, mmap_size=MMAP_SIZE,
+                 busy_timeout_ms=BUSY_TIMEOUT_MS):
+        self.database = database
+        self.tamano = max(1, int(tamano))
+        self.pragmas = {
+            'cache_size_kib': cache_size_kib,
+            'mmap_size': mmap_size,
+            'busy_timeout_ms': busy_timeout_ms,
+        }
+        self.estadisticas = EstadisticasConexion()
+        # Pila de conexiones libres: la última devuelta (con la caché más caliente) sale primero
+        self._libres = queue.LifoQueue()
+        # Conexiones vivas del grupo, libres o en uso; las que no están aquí se cierran al liberarlas
+        self._conexiones = set()
+        self._abriendo = 0
+        self._lock = threading.Lock()
+
+    def _abrir(self):
+        # check_same_thread=False: la conexión pasa de un hilo a otro, pero solo la usa uno a la vez
+        # timeout en segundos para la espera interna de sqlite3.connect (igual que busy_timeout)
+        conn = sqlite3.connect(self.database, timeout=self.pragmas['busy_timeout_ms'] / 1000,
+                               factory=ConexionMonitoreada, check_same_thread=False)
+        try:
+            conn.estadisticas = self.estadisticas
+            conn.row_factory = sqlite3.Row
+            configurar_conexion(conn, **self.pragmas)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def obtener(self):
+        """Toma una conexión libre del grupo, abre una nueva si hay cupo o espera a que se libere una"""
+        try:
+            conn = self._libres.get_nowait()
+        except queue.Empty:
+            conn = None
+        if conn is None:
+            with self._lock:
+                abrir = len(self._conexiones) + self._abriendo < self.tamano
+                if abrir:
+                    self._abriendo += 1
+            if abrir:
+                try:
+                    conn = self._abrir()
+                finally:
+                    with self._lock:
+                        self._abriendo -= 1
+                        if conn is not None:
+                            self._conexiones.add(conn)
+                self.estadisticas.incrementar('conexiones_abiertas')
+                return conn
+            self.estadisticas.incrementar('esperas_pool')
+            try:
+                conn = self._libres.get(timeout=self.pragmas['busy_timeout_ms'] / 1000)
+            except queue.Empty:
+                raise sqlite3.OperationalError(
+                    f"No se liberó ninguna de las {self.tamano} conexiones del grupo a tiempo") from None
+        self.estadisticas.incrementar('conexiones_reutilizadas')
+        return conn
+
+    def liberar(self, conn):
+        """Devuelve la conexión al grupo sin cerrarla, descartando lo que quedó sin commit"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Conexión inservible (cerrada o dañada): se descarta y deja su cupo libre
+            with self._lock:
+                self._conexiones.discard(conn)
+            conn.close()
+            return
+        with self._lock:
+            vigente = conn in self._conexiones
+        if vigente:
+            self._libres.put(conn)
+        else:
+            # Se cerró el grupo mientras estaba en uso
+            conn.close()
+
+    def cerrar_todas(self):
+        """Cierra las conexiones libres; las que están en uso se cierran al liberarlas"""
+        with self._lock:
+            self._conexiones = set()
+        while True:
+            try:
+                self._libres.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def obtener_estadisticas(self):
+        """Resumen de reutilización y esperas por bloqueo"""
+        e = self.estadisticas
+        with self._lock:
+            activas = len(self._conexiones)
+        libres = self._libres.qsize()
+        with e._lock:
+            total = e.conexiones_abiertas + e.conexiones_reutilizadas
+            return {
+                'database': self.database,
+                'pragmas': dict(self.pragmas),
+                'tamano_pool': self.tamano,
+                'conexiones_activas': activas,
+                'conexiones_en_uso': max(activas - libres, 0),
+                'conexiones_abiertas': e.conexiones_abiertas,
+                'conexiones_reutilizadas': e.conexiones_reutilizadas,
+                'tasa_reutilizacion': round(e.conexiones_reutilizadas / total, 4) if total else 0.0,
+                'esperas_pool': e.esperas_pool,
+                'escrituras': e.escrituras,
+                'tiempo_escritura_ms': round(e.tiempo_escritura_ms, 3),
+                'max_escritura_ms': round(e.max_escritura_ms, 3),
+                'esperas_bloqueo': e.esperas_bloqueo,
+                'errores_bloqueo': e.errores_bloqueo,
+            }
+
+
+# ---------------------------
+# Esquema
+# ---------------------------
+TABLAS = (
+    ('usuarios', '''
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL,
+            usuario TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL
+        )
+    '''),
+    ('asesoria', '''
+        CREATE TABLE IF NOT EXISTS asesoria (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            estudiante_id INTEGER REFERENCES estudiantes(id),
+            nombre TEXT,
+            apellido_p TEXT,
+            apellido_m TEXT,
+            matricula TEXT,
+            unidad TEXT,
+            parcial TEXT,
+            periodo TEXT,
+            tema TEXT,
+            fecha TEXT,
+            created_at TEXT
+        )
+    '''),
+    ('tutoria', '''
+        CREATE TABLE IF NOT EXISTS tutoria (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            estudiante_id INTEGER,
+            nombre TEXT,
+            apellido_p TEXT,
+            apellido_m TEXT,
+            matricula TEXT,
+            cuatrimestre TEXT,
+            motivo TEXT,
+            fecha TEXT,
+            descripcion TEXT,
+            observaciones TEXT,
+            seguimiento TEXT,
+            created_at TEXT,
+            FOREIGN KEY (estudiante_id) REFERENCES estudiantes(id)
+        )
+    '''),
+    ('tutoria_grupal', '''
+        CREATE TABLE IF NOT EXISTS tutoria_grupal (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            grupo_nombre TEXT,
+            carrera TEXT,
+            cuatrimestre TEXT,
+            motivo TEXT,
+            fecha TEXT,
+            descripcion TEXT,
+            asistentes TEXT,
+            observaciones TEXT,
+            created_at TEXT
+        )
+    '''),
+    ('estudiantes', '''
+        CREATE TABLE IF NOT EXISTS estudiantes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            matricula TEXT UNIQUE NOT NULL,
+            nombre TEXT NOT NULL,
+            apellido_p TEXT NOT NULL,
+            apellido_m TEXT,
+            cuatrimestre_actual TEXT,
+            carrera TEXT,
+            grupo TEXT,
+            programa_educativo INTEGER DEFAULT 2,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    '''),
+)
+
+# Índices secundarios: (nombre, tabla, columnas, consulta que lo usa)
+INDICES = (
+    ('idx_tutoria_estudiante_fecha', 'tutoria', 'estudiante_id, fecha', 'historial, perfil y panel de riesgo'),
+    ('idx_tutoria_fecha_cuatrimestre', 'tutoria', 'fecha, cuatrimestre', 'report_period'),
+    ('idx_tutoria_nombre_fecha', 'tutoria', 'nombre, apellido_p, apellido_m, fecha', 'report_student por nombre'),
+    ('idx_tutoria_created_at', 'tutoria', 'created_at', 'consultas (ORDER BY created_at DESC)'),
+    ('idx_tutoria_grupal_grupo_fecha', 'tutoria_grupal', 'grupo_nombre, fecha', 'report_group'),
+    ('idx_tutoria_grupal_created_at', 'tutoria_grupal', 'created_at', 'consultas (ORDER BY created_at DESC)'),
+    ('idx_asesoria_estudiante_fecha', 'asesoria', 'estudiante_id, fecha', 'triggers de actividad_mensual y de búsqueda al cambiar un estudiante'),
+    ('idx_asesoria_created_at', 'asesoria', 'created_at', 'consultas (ORDER BY created_at DESC)'),
+    ('idx_estudiantes_apellidos', 'estudiantes', 'apellido_p, apellido_m, nombre', 'listados ordenados de estudiantes'),
+    ('idx_estudiantes_orden', 'estudiantes', "apellido_p, coalesce(apellido_m, ''), nombre", 'paginación keyset de /estudiantes'),
+    ('idx_estudiantes_cuatrimestre', 'estudiantes', 'cuatrimestre_actual', 'filtro y lista de cuatrimestres'),
+    ('idx_estudiantes_carrera_cuatrimestre', 'estudiantes', 'carrera, cuatrimestre_actual', '/api/estudiantes'),
+    ('idx_estudiantes_grupo', 'estudiantes', 'grupo', 'exportación masiva de reportes por grupo'),
+)
+
+# Índices que ya no usa ninguna consulta (la gráfica mensual lee actividad_mensual);
+# se eliminan para no pagar su mantenimiento en cada escritura
+INDICES_OBSOLETOS = ('idx_tutoria_grupal_fecha', 'idx_asesoria_fecha', 'idx_asesoria_matricula')
+
+# Identidad del estudiante. Las asesorías y tutorías de un estudiante registrado solo guardan
+# estudiante_id; estas columnas quedan en NULL y se conservan solo en los registros sin estudiante
+COLUMNAS_IDENTIDAD = ('nombre', 'apellido_p', 'apellido_m', 'matricula')
+
+# Vistas de compatibilidad con las columnas de siempre: la identidad sale de estudiantes (por su
+# llave primaria) o, en los registros sin estudiante, de la copia del propio registro
+VISTAS = (
+    ('vista_asesoria', 'asesoria', '''
+        CREATE VIEW IF NOT EXISTS vista_asesoria AS
+        SELECT a.id, a.estudiante_id,
+               coalesce(e.nombre, a.nombre) AS nombre,
+               coalesce(e.apellido_p, a.apellido_p) AS apellido_p,
+               coalesce(e.apellido_m, a.apellido_m) AS apellido_m,
+               coalesce(e.matricula, a.matricula) AS matricula,
+               a.unidad, a.parcial, a.periodo, a.tema, a.fecha, a.created_at
+        FROM asesoria a
+        LEFT JOIN estudiantes e ON e.id = a.estudiante_id
+    '''),
+    ('vista_tutoria', 'tutoria', '''
+        CREATE VIEW IF NOT EXISTS vista_tutoria AS
+        SELECT t.id, t.estudiante_id,
+               coalesce(e.nombre, t.nombre) AS nombre,
+               coalesce(e.apellido_p, t.apellido_p) AS apellido_p,
+               coalesce(e.apellido_m, t.apellido_m) AS apellido_m,
+               coalesce(e.matricula, t.matricula) AS matricula,
+               t.cuatrimestre, t.motivo, t.fecha, t.descripcion, t.observaciones, t.seguimiento, t.created_at
+        FROM tutoria t
+        LEFT JOIN estudiantes e ON e.id = t.estudiante_id
+    '''),
+)
+
+# Vista de lectura de cada tabla de registros
+VISTA_DE = {tabla: vista for vista, tabla, _ in VISTAS}
+
+
+def crear_tablas(conn):
+    """Crea las tablas base si no existen (no hace commit)"""
+    for _, ddl in TABLAS:
+        conn.execute(ddl)
+
+
+def crear_indices(conn):
+    """
+    Crea los índices secundarios si no existen y elimina los obsoletos (no hace commit).
+    En bases antiguas a las que aún les falta una columna el índice se omite;
+    las migraciones lo vuelven a intentar después de agregarla.
+
+    Returns:
+        list: Nombres de los índices que no se pudieron crear
+    """
+    omitidos = []
+    for nombre, tabla, columnas, _ in INDICES:
+        try:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla}({columnas})")
+        except sqlite3.OperationalError:
+            omitidos.append(nombre)
+    for nombre in INDICES_OBSOLETOS:
+        conn.execute(f"DROP INDEX IF EXISTS {nombre}")
+    return omitidos
+
+
+def crear_vistas(conn):
+    """Crea las vistas de compatibilidad (no hace commit)"""
+    for _, _, ddl in VISTAS:
+        conn.execute(ddl)
+
+
+def crear_esquema(conn):
+    """Crea tablas, índices y vistas base (no hace commit)"""
+    crear_tablas(conn)
+    crear_indices(conn)
+    crear_vistas(conn)
@@ -0,0 +1,416 @@
+"""
+Módulo de Datos Sintéticos
+Genera bases de datos de prueba del tamaño de producción (p. ej. 50 mil estudiantes y un
+millón de tutorías) para pruebas de carga y benchmarks. La generación es determinista:
+la misma semilla y la misma fecha final producen exactamente la misma base.
+
+Las tablas base se llenan con executemany por lotes en una sola transacción y sin
+triggers ni índices; los índices, la búsqueda FTS5 y actividad_mensual se construyen al
+final con una sola pasada sobre los datos (el mismo llenado inicial que usa la app)
+"""
+
+import os
+import random
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+from itertools import accumulate
+
+from actividad import crear_tabla_actividad
+from busqueda import crear_indices_busqueda
+from database import crear_indices, crear_tablas, crear_vistas
+from esquema import fijar_version_esquema
+from init_test_data import MOTIVOS_TUTORIAS, TEMAS_ASESORIAS, generar_usuario_demo
+from report_jobs import crear_tabla_trabajos
+from risk_data import crear_tabla_riesgo
+from utils import calendario, obtener_carreras_por_programa
+
+# Filas que se generan y se escriben en cada executemany
+TAMANO_LOTE_GENERACION = 50000
+
+# Días hacia atrás desde la fecha final que cubren los registros
+DIAS_HISTORIAL = 730
+
+# Los primeros cuatrimestres tienen más estudiantes (deserción)
+PESOS_CUATRIMESTRE = {'1': 14, '2': 13, '3': 12, '4': 11, '5': 10, '6': 10, '7': 9, '8': 8, '9': 7, '10': 6}
+
+# Grupos por carrera y cuatrimestre (1 a 5, como utils.obtener_grupos_disponibles); los
+# últimos grupos de cada generación son los más pequeños
+PESOS_NUMERO_GRUPO = (5, 4, 3, 2, 1)
+
+# Forma de la cola de la distribución de Pareto de registros por estudiante: pocos
+# estudiantes concentran la mayoría de las tutorías, como en el panel de riesgo real.
+# El peso se acota para que ningún estudiante acumule una fracción absurda del total
+ALFA_PARETO = 2.0
+PESO_MAXIMO_ESTUDIANTE = 25
+
+# El código de grupo solo admite los grupos 1 a 5, así que con muchos estudiantes cada
+# grupo es grande; los asistentes de una sesión grupal no rebasan el cupo de un salón
+CUPO_SALON = 40
+
+# Frecuencia relativa de cada motivo de init_test_data.MOTIVOS_TUTORIAS (en el mismo orden)
+PESOS_MOTIVO_TUTORIA = dict(zip(MOTIVOS_TUTORIAS, (18, 16, 14, 5, 15, 20, 7, 5)))
+
+MOTIVOS_GRUPALES = {
+    "Integración grupal": 20,
+    "Seguimiento de calificaciones del parcial": 25,
+    "Inasistencias frecuentes en el grupo": 12,
+    "Falta de motivación del grupo": 10,
+    "Reforzamiento de materia": 18,
+    "Orientación sobre reinscripción y trámites": 15,
+}
+
+PESOS_SEGUIMIENTO = {'Resuelto': 50, 'En proceso': 30, 'Pendiente': 20}
+
+NOMBRES = (
+    'José', 'María', 'Juan', 'Guadalupe', 'Luis', 'Fernanda', 'Carlos', 'Daniela', 'Miguel', 'Sofía',
+    'Jorge', 'Valeria', 'Diego', 'Ximena', 'Alejandro', 'Andrea', 'Fernando', 'Camila', 'Ricardo', 'Ana',
+    'Eduardo', 'Paola', 'Javier', 'Karla', 'Óscar', 'Mariana', 'Ángel', 'Alejandra', 'Emiliano', 'Itzel',
+    'Santiago', 'Renata', 'Iván', 'Brenda', 'Uriel', 'Montserrat', 'Kevin', 'Jimena', 'Brandon', 'Abril',
+)
+
+APELLIDOS = (
+    'Hernández', 'García', 'Martínez', 'López', 'González', 'Pérez', 'Rodríguez', 'Sánchez', 'Ramírez', 'Cruz',
+    'Flores', 'Gómez', 'Morales', 'Vázquez', 'Reyes', 'Jiménez', 'Torres', 'Díaz', 'Gutiérrez', 'Ruiz',
+    'Mendoza', 'Aguilar', 'Ortiz', 'Moreno', 'Castillo', 'Romero', 'Álvarez', 'Méndez', 'Chávez', 'Rivera',
+    'Juárez', 'Ramos', 'Domínguez', 'Herrera', 'Medina', 'Castro', 'Vargas', 'Guzmán', 'Velázquez', 'Muñoz',
+)
+
+# Los registros se capturan en horario escolar
+HORAS = tuple(f"T{minuto // 60:02d}:{minuto % 60:02d}:00" for minuto in range(7 * 60, 20 * 60, 5))
+
+ResumenGeneracion = namedtuple('ResumenGeneracion', [
+    'filas',       # {tabla: filas generadas}
+    'segundos',    # {'datos': escritura de las tablas base, 'derivados': índices y tablas derivadas}
+])
+
+_INSERTAR_ESTUDIANTE = """
+    INSERT INTO estudiantes (id, matricula, nombre, apellido_p, apellido_m, cuatrimestre_actual, carrera, grupo,
+                             programa_educativo, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERTAR_TUTORIA = """
+    INSERT INTO tutoria (estudiante_id, cuatrimestre, motivo, fecha, descripcion, observaciones, seguimiento, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERTAR_ASESORIA = """
+    INSERT INTO asesoria (estudiante_id, unidad, parcial, periodo, tema, fecha, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERTAR_GRUPAL = """
+    INSERT INTO tutoria_grupal (grupo_nombre, carrera, cuatrimestre, motivo, fecha, descripcion, asistentes,
+                                observaciones, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _acumulados(pesos):
+    return list(accumulate(pesos))
+
+
+def _elegir(rng, opciones, pesos, k):
+    """k elementos de `opciones` según `pesos` (dict o secuencia alineada)"""
+    if isinstance(opciones, dict):
+        opciones, pesos = list(opciones), list(opciones.values())
+    return rng.choices(opciones, cum_weights=_acumulados(pesos), k=k)
+
+
+def _lotes(total, tamano):
+    """Tamaños de los lotes en que se generan `total` filas"""
+    for inicio in range(0, total, tamano):
+        yield min(tamano, total - inicio)
+
+
+# ---------------------------
+# Calendario
+# ---------------------------
+
+def periodos_de(fechas):
+    """Período cuatrimestral de cada fecha ISO, p. ej. 'Mayo-Agosto 2025'"""
+    return [f"{periodo.nombre.replace(' - ', '-')} {periodo.año}" for periodo in calendario.periodos(fechas)]
+
+
+def dias_habiles(hasta, dias=DIAS_HISTORIAL):
+    """
+    (fechas ISO, pesos) de los días hábiles de la ventana. Las semanas de vacaciones
+    (Semana Santa aproximada, agosto y fin de año) tienen una fracción de la actividad.
+    """
+    fechas, pesos = [], []
+    for desplazamiento in range(dias, -1, -1):
+        dia = hasta - timedelta(days=desplazamiento)
+        if dia.weekday() >= 5:
+            continue
+        vacaciones = (dia.month == 4 and 1 <= dia.day <= 14) or (dia.month == 8 and dia.day <= 20) \
+            or (dia.month == 12 and dia.day >= 18) or (dia.month == 1 and dia.day <= 6)
+        fechas.append(dia.isoformat())
+        pesos.append(1 if vacaciones else 10)
+    return fechas, pesos
+
+
+# ---------------------------
+# Generadores de filas
+# ---------------------------
+
+def generar_estudiantes(rng, total, hasta):
+    """
+    Filas de _INSERTAR_ESTUDIANTE. El cuatrimestre, la carrera y el grupo siguen el formato
+    de utils: programa 1 en 7° y 10° cuatrimestre, programa 2 en el resto, y grupos
+    [Grupo][Cuatrimestre][Año][Carrera]
+    """
+    anio = hasta.year
+    creado = f"{hasta.isoformat()}T00:00:00"
+    carreras = {programa: list(obtener_carreras_por_programa(programa).items()) for programa in (1, 2)}
+    # Las primeras carreras de cada programa son las de mayor matrícula
+    acumulados_carrera = {programa: _acumulados(1 / (posicion + 1) for posicion in range(len(lista)))
+                          for programa, lista in carreras.items()}
+
+    cuatrimestres = _elegir(rng, PESOS_CUATRIMESTRE, None, total)
+    numeros_grupo = _elegir(rng, range(1, 6), PESOS_NUMERO_GRUPO, total)
+    nombres = rng.choices(NOMBRES, k=total)
+    apellidos = rng.choices(APELLIDOS, k=total * 2)
+    filas = []
+    for i in range(total):
+        cuatrimestre = cuatrimestres[i]
+        programa = 1 if cuatrimestre in ('7', '10') else 2
+        sigla, carrera = rng.choices(carreras[programa], cum_weights=acumulados_carrera[programa])[0]
+        # Año de ingreso según el avance: tres cuatrimestres por año
+        ingreso = anio - (int(cuatrimestre) - 1) // 3
+        filas.append((
+            i + 1, f"{ingreso}{i + 1:06d}", nombres[i], apellidos[2 * i], apellidos[2 * i + 1],
+            cuatrimestre, carrera, f"{numeros_grupo[i]}{cuatrimestre}{str(anio)[-2:]}{sigla}",
+            programa, creado, creado,
+        ))
+    return filas
+
+
+def _pesos_estudiantes(rng, total):
+    """Peso de cada estudiante (Pareto) para repartir los registros"""
+    return _acumulados(min(rng.paretovariate(ALFA_PARETO), PESO_MAXIMO_ESTUDIANTE) for _ in range(total))
+
+
+def generar_tutorias(rng, estudiantes, total, fechas, tamano_lote=TAMANO_LOTE_GENERACION):
+    """Lotes de filas de _INSERTAR_TUTORIA (el cuatrimestre es el actual del estudiante)"""
+    acumulados = _pesos_estudiantes(rng, len(estudiantes))
+    fechas, pesos_fechas = fechas
+    acumulados_fechas = _acumulados(pesos_fechas)
+    descripciones = {
+        motivo: (f"Descripción detallada de la tutoría: {motivo.lower()}. Se realizó seguimiento del caso.",
+                 f"El estudiante acude por {motivo.lower()}. Se acordó un plan de trabajo con el tutor.",
+                 f"Entrevista individual: {motivo.lower()}. Se canaliza con el área correspondiente.")
+        for motivo in PESOS_MOTIVO_TUTORIA
+    }
+    observaciones = ("El estudiante mostró disposición para mejorar. Se establecieron compromisos.",
+                     "Se programa una sesión de seguimiento.", "")
+
+    for n in _lotes(total, tamano_lote):
+        elegidos = rng.choices(estudiantes, cum_weights=acumulados, k=n)
+        motivos = _elegir(rng, PESOS_MOTIVO_TUTORIA, None, n)
+        dias = rng.choices(fechas, cum_weights=acumulados_fechas, k=n)
+        horas = rng.choices(HORAS, k=n)
+        variantes = rng.choices(range(3), k=n)
+        seguimientos = _elegir(rng, PESOS_SEGUIMIENTO, None, n)
+        yield [
+            (e[0], e[5], motivo, dia, descripciones[motivo][variante],
+             observaciones[variante], seguimiento, dia + hora)
+            for e, motivo, dia, hora, variante, seguimiento
+            in zip(elegidos, motivos, dias, horas, variantes, seguimientos)
+        ]
+
+
+def generar_asesorias(rng, estudiantes, total, fechas, tamano_lote=TAMANO_LOTE_GENERACION):
+    """Lotes de filas de _INSERTAR_ASESORIA (los temas más comunes son los primeros)"""
+    acumulados = _pesos_estudiantes(rng, len(estudiantes))
+    fechas, pesos_fechas = fechas
+    acumulados_fechas = _acumulados(pesos_fechas)
+    pesos_temas = [len(TEMAS_ASESORIAS) - posicion for posicion in range(len(TEMAS_ASESORIAS))]
+
+    for n in _lotes(total, tamano_lote):
+        elegidos = rng.choices(estudiantes, cum_weights=acumulados, k=n)
+        temas = _elegir(rng, TEMAS_ASESORIAS, pesos_temas, n)
+        dias = rng.choices(fechas, cum_weights=acumulados_fechas, k=n)
+        horas = rng.choices(HORAS, k=n)
+        unidades = rng.choices('12345', k=n)
+        parciales = rng.choices('123', k=n)
+        yield [
+            (e[0], unidad, parcial, periodo, tema, dia, dia + hora)
+            for e, tema, dia, hora, unidad, parcial, periodo
+            in zip(elegidos, temas, dias, horas, unidades, parciales, periodos_de(dias))
+        ]
+
+
+def generar_grupales(rng, grupos, total, fechas, tamano_lote=TAMANO_LOTE_GENERACION):
+    """
+    Lotes de filas de _INSERTAR_GRUPAL. `grupos` es {grupo: (carrera, cuatrimestre, estudiantes)};
+    los grupos grandes reciben más sesiones y los asistentes no rebasan al grupo ni CUPO_SALON.
+    """
+    claves = sorted(grupos)
+    acumulados = _acumulados(grupos[grupo][2] for grupo in claves)
+    fechas, pesos_fechas = fechas
+    acumulados_fechas = _acumulados(pesos_fechas)
+
+    for n in _lotes(total, tamano_lote):
+        elegidos = rng.choices(claves, cum_weights=acumulados, k=n)
+        motivos = _elegir(rng, MOTIVOS_GRUPALES, None, n)
+        dias = rng.choices(fechas, cum_weights=acumulados_fechas, k=n)
+        horas = rng.choices(HORAS, k=n)
+        asistencia = [rng.random() for _ in range(n)]
+        filas = []
+        for grupo, motivo, dia, hora, fraccion in zip(elegidos, motivos, dias, horas, asistencia):
+            carrera, cuatrimestre, tamano = grupos[grupo]
+            asistentes = max(1, round(min(tamano, CUPO_SALON) * (0.6 + 0.4 * fraccion)))
+            filas.append((grupo, carrera, cuatrimestre, motivo, dia,
+                          f"Sesión grupal: {motivo.lower()}.", str(asistentes), '', dia + hora))
+        yield filas
+
+
+# ---------------------------
+# Base completa
+# ---------------------------
+
+def generar_base(conn, estudiantes=50000, tutorias=1000000, asesorias=200000, grupales=50000,
+                 semilla=42, hasta=None, dias=DIAS_HISTORIAL, tamano_lote=TAMANO_LOTE_GENERACION,
+                 busqueda=False, progreso=None):
+    """
+    Llena una base vacía con datos sintéticos y construye el mismo esquema que
+    esquema.preparar_esquema (índices, riesgo, búsqueda, actividad y trabajos de reportes),
+    con su versión en PRAGMA user_version. Hace commit.
+
+    Args:
+        hasta: Fecha (date) del registro más reciente; por defecto, hoy
+        dias: Días hacia atrás que cubren los registros
+        busqueda: Construye también los índices FTS5. Son la parte más lenta (tokenizar cada
+            texto), por eso se omiten por defecto y la aplicación los llena al abrir la base
+        progreso: Función opcional (tabla, filas escritas) que se llama tras cada lote
+
+    Returns:
+        ResumenGeneracion
+    """
+    if estudiantes < 1 and (tutorias or asesorias):
+        raise ValueError("Se necesita al menos un estudiante para generar tutorías o asesorías.")
+    rng = random.Random(semilla)
+    hasta = hasta or date.today()
+    fechas = dias_habiles(hasta, dias)
+    filas = {}
+
+    inicio = time.perf_counter()
+    crear_tablas(conn)
+
+    lista_estudiantes = generar_estudiantes(rng, estudiantes, hasta)
+    conn.executemany(_INSERTAR_ESTUDIANTE, lista_estudiantes)
+    filas['estudiantes'] = len(lista_estudiantes)
+    if progreso:
+        progreso('estudiantes', filas['estudiantes'])
+
+    grupos = {}
+    for e in lista_estudiantes:
+        carrera, cuatrimestre, tamano = grupos.get(e[7], (e[6], e[5], 0))
+        grupos[e[7]] = (carrera, cuatrimestre, tamano + 1)
+
+    for tabla, sentencia, lotes in (
+        ('tutoria', _INSERTAR_TUTORIA, generar_tutorias(rng, lista_estudiantes, tutorias, fechas, tamano_lote)),
+        ('asesoria', _INSERTAR_ASESORIA, generar_asesorias(rng, lista_estudiantes, asesorias, fechas, tamano_lote)),
+        ('tutoria_grupal', _INSERTAR_GRUPAL, generar_grupales(rng, grupos, grupales if grupos else 0, fechas, tamano_lote)),
+    ):
+        filas[tabla] = 0
+        for lote in lotes:
+            conn.executemany(sentencia, lote)
+            filas[tabla] += len(lote)
+            if progreso:
+                progreso(tabla, filas[tabla])
+    generar_usuario_demo(conn)
+    conn.commit()
+    escritura = time.perf_counter() - inicio
+
+    # Estructuras derivadas en el orden de esquema.preparar_esquema; las tablas nuevas se llenan en una pasada
+    inicio = time.perf_counter()
+    crear_indices(conn)
+    crear_vistas(conn)
+    crear_tabla_riesgo(conn)
+    if busqueda:
+        crear_indices_busqueda(conn)
+    crear_tabla_actividad(conn)
+    crear_tabla_trabajos(conn)
+    # Sin los índices de búsqueda la versión queda en 0 y la aplicación los construye al iniciar
+    if busqueda:
+        fijar_version_esquema(conn)
+    conn.commit()
+
+    return ResumenGeneracion(filas=filas, segundos={'datos': escritura, 'derivados': time.perf_counter() - inicio})
+
+
+def crear_base_sintetica(ruta, sobrescribir=False, **opciones):
+    """
+    Crea en `ruta` una base nueva con generar_base. Durante la carga se desactivan el
+    diario y la sincronización (si falla, la base queda incompleta y se borra); al final
+    queda en modo WAL, como la usa la aplicación.
+
+    Raises:
+        FileExistsError: Si la base ya existe y no se pidió sobrescribirla
+    """
+    if os.path.exists(ruta):
+        if not sobrescribir:
+            raise FileExistsError(f"{ruta} ya existe (usa --sobrescribir para reemplazarla)")
+        for sufijo in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(ruta + sufijo):
+                os.remove(ruta + sufijo)
+
+    conn = sqlite3.connect(ruta)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+        conn.execute("PRAGMA cache_size = -262144")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        resumen = generar_base(conn, **opciones)
+        conn.execute("PRAGMA locking_mode = NORMAL")
+        conn.execute("PRAGMA journal_mode = WAL")
+    except BaseException:
+        conn.close()
+        os.remove(ruta)
+        raise
+    conn.close()
+    return resumen
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Genera una base de datos sintética y determinista para pruebas de carga")
+    parser.add_argument('--db', default='asesorias_sintetica.db', help="Ruta de la base nueva (por defecto: asesorias_sintetica.db)")
+    parser.add_argument('--estudiantes', type=int, default=50000)
+    parser.add_argument('--tutorias', type=int, default=1000000)
+    parser.add_argument('--asesorias', type=int, default=200000)
+    parser.add_argument('--grupales', type=int, default=50000)
+    parser.add_argument('--semilla', type=int, default=42, help="Semilla del generador (misma semilla y fecha, misma base)")
+    parser.add_argument('--hasta', type=date.fromisoformat, help="Fecha del registro más reciente, YYYY-MM-DD (por defecto: hoy)")
+    parser.add_argument('--dias', type=int, default=DIAS_HISTORIAL, help="Días de historial hacia atrás")
+    parser.add_argument('--lote', type=int, default=TAMANO_LOTE_GENERACION, help="Filas por executemany")
+    parser.add_argument('--con-busqueda', action='store_true',
+                        help="Construye también los índices FTS5 (sin esta opción la app los llena al iniciar)")
+    parser.add_argument('--sobrescribir', action='store_true', help="Reemplaza la base si ya existe")
+    args = parser.parse_args()
+
+    hasta = args.hasta or date.today()
+    try:
+        resumen = crear_base_sintetica(
+            args.db, args.sobrescribir, estudiantes=args.estudiantes, tutorias=args.tutorias,
+            asesorias=args.asesorias, grupales=args.grupales, semilla=args.semilla, hasta=hasta,
+            dias=args.dias, tamano_lote=args.lote, busqueda=args.con_busqueda,
+            progreso=lambda tabla, escritas: print(f"\r  {tabla:<15}{escritas:>12,} filas", end='', flush=True),
+        )
+    except FileExistsError as error:
+        parser.error(str(error))
+    print()
+    total = sum(resumen.filas.values())
+    segundos = sum(resumen.segundos.values())
+    print(f"✅ Base sintética creada en {args.db} (semilla {args.semilla}, hasta {hasta.isoformat()}):")
+    for tabla, cantidad in resumen.filas.items():
+        print(f"   - {tabla}: {cantidad:,}")
+    print(f"   - Datos: {resumen.segundos['datos']:.1f} s ({total / resumen.segundos['datos']:,.0f} filas/s)")
+    print(f"   - Índices{', búsqueda' if args.con_busqueda else ''} y actividad: {resumen.segundos['derivados']:.1f} s")
+    print(f"   - Total: {segundos:.1f} s")
@@ -0,0 +1,324 @@
+"""
+Módulo de Esquema de la Base de Datos
+Motor único de migraciones: una lista ordenada de pasos numerados que lleva cualquier base
+(nueva, antigua o a medio migrar) hasta la versión de la aplicación, guardada en
+PRAGMA user_version. Al iniciar basta leer esa versión: si la base ya está al día no se
+ejecuta ninguna otra sentencia.
+
+Cada migración corre en su propia transacción junto con el cambio de versión, de modo que
+una falla no deja la base a medias. Las migraciones largas (rellenos de columnas e índices
+sobre tablas grandes) son idempotentes y hacen commit por lotes para no retener el candado
+de escritura durante minutos; si se interrumpen, la versión no avanza y se retoman en el
+siguiente inicio. Un candado de archivo junto a la base evita que varios procesos migren a
+la vez
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from actividad import crear_tabla_actividad, eliminar_triggers_actividad, reconstruir_actividad
+from busqueda import completar_indices_busqueda, crear_indices_busqueda, eliminar_triggers_busqueda, reindexar_filas
+from database import COLUMNAS_IDENTIDAD, DATABASE, activar_wal, conectar, crear_indices, crear_tablas, crear_vistas
+from report_cache import crear_tabla_versiones, eliminar_triggers_versiones
+from report_jobs import crear_tabla_trabajos
+from risk_data import crear_tabla_riesgo, invalidar_riesgo
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Filas por lote (y por commit) de las migraciones largas
+TAMANO_LOTE_MIGRACION = int(os.environ.get('TUTORIAS_LOTE_MIGRACION', 20000))
+
+# Columnas que no existían en bases creadas por versiones anteriores: (tabla, columna, tipo)
+COLUMNAS_AGREGADAS = (
+    ('tutoria', 'estudiante_id', 'INTEGER'),
+    ('estudiantes', 'grupo', 'TEXT'),
+    ('estudiantes', 'programa_educativo', 'INTEGER DEFAULT 2'),
+    ('asesoria', 'matricula', 'TEXT'),
+    ('asesoria', 'created_at', 'TEXT'),
+    ('tutoria', 'created_at', 'TEXT'),
+    ('tutoria_grupal', 'created_at', 'TEXT'),
+    ('asesoria', 'estudiante_id', 'INTEGER REFERENCES estudiantes(id)'),
+)
+
+# Estudiante de un registro antiguo: por matrícula o, si no coincide, por nombre completo
+# cuando un solo estudiante lo lleva
+_ESTUDIANTE_POR_MATRICULA = "(SELECT e.id FROM estudiantes e WHERE e.matricula = {tabla}.matricula)"
+_ESTUDIANTE_POR_NOMBRE = """(
+    SELECT min(e.id) FROM estudiantes e
+    WHERE e.nombre = {tabla}.nombre AND e.apellido_p = {tabla}.apellido_p
+      AND coalesce(e.apellido_m, '') = coalesce({tabla}.apellido_m, '')
+    HAVING count(*) = 1
+)"""
+
+Migracion = namedtuple('Migracion', ['version', 'descripcion', 'aplicar', 'por_lotes'])
+
+
+def columnas_tabla(conn, tabla):
+    """Nombres de las columnas de una tabla"""
+    return [fila[1] for fila in conn.execute(f"PRAGMA table_info({tabla})")]
+
+
+def actualizar_por_lotes(conn, tabla, asignacion, condicion, tamano_lote=TAMANO_LOTE_MIGRACION):
+    """
+    UPDATE {tabla} SET {asignacion} WHERE {condicion}, recorriendo la tabla por rangos de id
+    con un commit por rango
+
+    Returns:
+        int: Filas actualizadas
+    """
+    maximo = conn.execute(f"SELECT max(id) FROM {tabla}").fetchone()[0] or 0
+    actualizadas = 0
+    for desde in range(0, maximo, tamano_lote):
+        actualizadas += conn.execute(
+            f"UPDATE {tabla} SET {asignacion} WHERE id > ? AND id <= ? AND ({condicion})",
+            (desde, desde + tamano_lote)
+        ).rowcount
+        conn.commit()
+    return actualizadas
+
+
+# ---------------------------
+# Migraciones
+# ---------------------------
+def _tablas_base(conn):
+    """Tablas de registros y columnas que les faltan a las bases antiguas"""
+    crear_tablas(conn)
+    for tabla, columna, tipo in COLUMNAS_AGREGADAS:
+        if columna not in columnas_tabla(conn, tabla):
+            conn.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}")
+
+
+def _rellenar_created_at(conn, tamano_lote):
+    """La paginación por (created_at, id) requiere created_at en todas las filas"""
+    for tabla in ('asesoria', 'tutoria', 'tutoria_grupal'):
+        actualizar_por_lotes(conn, tabla, "created_at = coalesce(fecha, '')", "created_at IS NULL", tamano_lote)
+
+
+def _indices_secundarios(conn, tamano_lote):
+    """Índices de database.INDICES, cada uno en su propia transacción"""
+    omitidos = crear_indices(conn)
+    if omitidos:
+        raise sqlite3.OperationalError(f"No se pudieron crear los índices: {', '.join(omitidos)}")
+
+
+def _busqueda(conn, tamano_lote):
+    """Tablas FTS5 y sus triggers; las filas existentes se indexan por lotes"""
+    if crear_indices_busqueda(conn, llenar=False):
+        conn.commit()
+        completar_indices_busqueda(conn, tamano_lote)
+
+
+def _actividad_y_trabajos(conn):
+    """Resumen actividad_mensual, trabajos de reportes y versiones de la caché"""
+    crear_tabla_actividad(conn)
+    crear_tabla_trabajos(conn)
+
+
+def _normalizar_registros(conn, tamano_lote):
+    """
+    Asesorías y tutorías enlazadas a estudiantes.id: se rellena estudiante_id y se vacía la
+    copia de nombre y matrícula de los registros con estudiante (los que no tienen uno la
+    conservan). Los triggers de búsqueda, de actividad y de versiones se quitan mientras tanto;
+    solo se reindexan las filas cuya copia difería del estudiante y actividad_mensual se recalcula
+    """
+    _tablas_base(conn)
+    eliminar_triggers_busqueda(conn)
+    eliminar_triggers_actividad(conn)
+    # Las vistas muestran la misma identidad: los reportes guardados en la caché siguen valiendo
+    eliminar_triggers_versiones(conn)
+    conn.commit()
+    _indices_secundarios(conn, tamano_lote)
+
+    tiene_copia = ' OR '.join(f"{columna} IS NOT NULL" for columna in COLUMNAS_IDENTIDAD)
+    vaciar = ', '.join(f"{columna} = NULL" for columna in COLUMNAS_IDENTIDAD)
+    for tabla in ('asesoria', 'tutoria'):
+        for plantilla in (_ESTUDIANTE_POR_MATRICULA, _ESTUDIANTE_POR_NOMBRE):
+            estudiante = plantilla.format(tabla=tabla)
+            actualizar_por_lotes(conn, tabla, f"estudiante_id = {estudiante}",
+                                 f"estudiante_id IS NULL AND {estudiante} IS NOT NULL", tamano_lote)
+
+        difiere = ' OR '.join(f"e.{columna} IS NOT {tabla}.{columna}" for columna in COLUMNAS_IDENTIDAD)
+        maximo = conn.execute(f"SELECT max(id) FROM {tabla}").fetchone()[0] or 0
+        for desde in range(0, maximo, tamano_lote):
+            rango = f"id > {desde} AND id <= {desde + tamano_lote} AND ({tiene_copia})"
+            # El texto indexado ya sale de estudiantes; solo cambia donde la copia era distinta
+            reindexar_filas(conn, tabla, f"""{rango} AND EXISTS (
+                SELECT 1 FROM estudiantes e WHERE e.id = {tabla}.estudiante_id AND ({difiere}))""")
+            conn.execute(f"UPDATE {tabla} SET {vaciar} WHERE {rango} AND estudiante_id IN (SELECT id FROM estudiantes)")
+            conn.commit()
+
+    crear_indices_busqueda(conn, llenar=False)
+    conn.commit()
+    # Las asesorías se agrupan ahora por la carrera de su estudiante_id
+    reconstruir_actividad(conn)
+    invalidar_riesgo(conn)
+    crear_vistas(conn)
+    # Versión de estudiantes en la caché de reportes (los nombres de las tutorías salen de ahí)
+    crear_tabla_trabajos(conn)
+    conn.commit()
+
+
+# Orden de aplicación. Nunca se reordenan ni se quitan: una base en la versión N solo
+# aplica las de versión mayor. Las de por_lotes reciben el tamaño de lote y hacen commit
+MIGRACIONES = (
+    Migracion(1, "Tablas base y columnas de versiones anteriores", _tablas_base, False),
+    Migracion(2, "created_at de registros antiguos", _rellenar_created_at, True),
+    Migracion(3, "Índices secundarios", _indices_secundarios, True),
+    Migracion(4, "Riesgo materializado por estudiante y ventana", crear_tabla_riesgo, False),
+    Migracion(5, "Índices de búsqueda FTS5", _busqueda, True),
+    Migracion(6, "Actividad mensual y trabajos de reportes", _actividad_y_trabajos, False),
+    Migracion(7, "Asesorías y tutorías enlazadas a estudiantes.id", _normalizar_registros, True),
+    Migracion(8, "Secuencia de cambios del riesgo por estudiante", crear_tabla_riesgo, False),
+    Migracion(9, "Versiones por fila de las tablas de los reportes", crear_tabla_versiones, False),
+    Migracion(10, "Índice de los trabajos de reporte por clave de caché", crear_tabla_trabajos, False),
+)
+
+VERSION_ESQUEMA = MIGRACIONES[-1].version
+
+
+# ---------------------------
+# Motor
+# ---------------------------
+def version_esquema(conn):
+    """Versión guardada en la base (0 en bases nuevas o creadas antes del versionado)"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def fijar_version_esquema(conn, version=VERSION_ESQUEMA):
+    """Guarda la versión del esquema (dentro de la transacción en curso)"""
+    conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
+def esquema_actual(conn):
+    """True si la base ya tiene el esquema de esta versión de la aplicación"""
+    return version_esquema(conn) >= VERSION_ESQUEMA
+
+
+def _ruta_base(conn):
+    """Archivo de la base principal ('' si está en memoria)"""
+    for fila in conn.execute("PRAGMA database_list"):
+        if fila[1] == 'main':
+            return fila[2]
+    return ''
+
+
+@contextmanager
+def bloqueo_migracion(conn):
+    """
+    Candado exclusivo sobre '<base>.migracion.lock' mientras dura la migración. Los demás
+    procesos esperan a que termine y después encuentran la versión ya actualizada
+    """
+    ruta = _ruta_base(conn)
+    if not ruta:
+        yield
+        return
+    with open(ruta + '.migracion.lock', 'a+b') as archivo:
+        if fcntl is not None:
+            fcntl.flock(archivo, fcntl.LOCK_EX)
+        else:
+            archivo.seek(0)
+            while True:
+                try:
+                    # LK_LOCK reintenta durante 10 s antes de fallar
+                    msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(archivo, fcntl.LOCK_UN)
+            else:
+                archivo.seek(0)
+                msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def migrar(conn, hasta=VERSION_ESQUEMA, forzar=False, tamano_lote=TAMANO_LOTE_MIGRACION, progreso=None):
+    """
+    Aplica en orden las migraciones pendientes hasta la versión `hasta`
+
+    Args:
+        conn: Conexión sqlite3 con row_factory = sqlite3.Row, sin transacción abierta
+        forzar: Repetir todas las migraciones aunque la versión guardada esté al día
+            (son idempotentes)
+        tamano_lote: Filas por commit de las migraciones largas
+        progreso: Función opcional (migración, segundos) que se llama tras cada una
+
+    Returns:
+        list: Versiones aplicadas (vacía si la base ya estaba al día)
+    """
+    if not forzar and version_esquema(conn) >= hasta:
+        return []
+    if conn.in_transaction:
+        raise sqlite3.OperationalError("migrar() requiere una conexión sin transacción abierta")
+
+    aplicadas = []
+    with bloqueo_migracion(conn):
+        # Otro proceso pudo terminar la migración mientras se esperaba el candado
+        version = 0 if forzar else version_esquema(conn)
+        # WAL una sola vez, antes de que la aplicación abra las conexiones de sus hilos
+        activar_wal(conn)
+        for migracion in MIGRACIONES:
+            if migracion.version <= version or migracion.version > hasta:
+                continue
+            inicio = time.perf_counter()
+            if migracion.por_lotes:
+                # Hace sus propios commits; la versión se guarda al final en su transacción
+                migracion.aplicar(conn, tamano_lote)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if not migracion.por_lotes:
+                    migracion.aplicar(conn)
+                # Nunca se retrocede la versión (p. ej. al forzar sobre una base al día)
+                fijar_version_esquema(conn, max(migracion.version, version_esquema(conn)))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            aplicadas.append(migracion.version)
+            if progreso:
+                progreso(migracion, time.perf_counter() - inicio)
+    return aplicadas
+
+
+def preparar_esquema(conn, forzar=False):
+    """
+    Lleva la base a la versión actual del esquema (ver migrar)
+
+    Returns:
+        bool: False si la base ya estaba al día y no se hizo nada
+    """
+    return bool(migrar(conn, forzar=forzar))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Aplica las migraciones pendientes de la base de datos")
+    parser.add_argument('--db', default=DATABASE, help="Ruta de la base de datos")
+    parser.add_argument('--hasta', type=int, default=VERSION_ESQUEMA, help="Última versión a aplicar")
+    parser.add_argument('--forzar', action='store_true', help="Repite todas las migraciones aunque la versión esté al día")
+    parser.add_argument('--lote', type=int, default=TAMANO_LOTE_MIGRACION, help="Filas por commit de las migraciones largas")
+    args = parser.parse_args()
+
+    conn = conectar(args.db)
+    try:
+        antes = version_esquema(conn)
+        aplicadas = migrar(conn, hasta=args.hasta, forzar=args.forzar, tamano_lote=args.lote,
+                           progreso=lambda m, s: print(f"  ✓ {m.version}. {m.descripcion} ({s:.1f} s)"))
+        if aplicadas:
+            print(f"✅ Esquema migrado: versión {antes} → {version_esquema(conn)}")
+        else:
+            print(f"✓ El esquema ya está al día (versión {antes})")
+    except sqlite3.Error as e:
+        print(f"❌ Error durante la migración: {e}")
+        raise SystemExit(1)
+    finally:
+        conn.close()
@@ -1,13 +1,18 @@
 """
-Módulo para inicialización automática de datos de prueba
-Se ejecuta automáticamente al iniciar la aplicación si la base de datos está vacía
+Módulo para inicialización de datos de prueba
+Carga estudiantes, asesorías, tutorías y el usuario de demostración en una base vacía.
+Ya no se ejecuta al iniciar la aplicación; se invoca de forma explícita:
+
+Uso: python init_test_data.py [--db asesorias.db]
 """
 
+import argparse
 import sqlite3
 from datetime import datetime, timedelta
 import random
 
-DATABASE = 'asesorias.db'
+from database import DATABASE
+from esquema import preparar_esquema
 
 # Datos de prueba embebidos
 ESTUDIANTES_PRUEBA = [
@@ -49,74 +54,6 @@ TEMAS_ASESORIAS = [
     "Termodinámica"
 ]
 
-def verificar_migracion(conn):
-    """Verifica y ejecuta las migraciones necesarias"""
-    cursor = conn.cursor()
-    
-    try:
-        # Verificar si la columna estudiante_id existe en tutoria
-        cursor.execute("PRAGMA table_info(tutoria)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'estudiante_id' not in columns:
-            print("  → Agregando columna 'estudiante_id' a la tabla 'tutoria'...")
-            cursor.execute("ALTER TABLE tutoria ADD COLUMN estudiante_id INTEGER")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tutoria_estudiante_id ON tutoria(estudiante_id)")
-            conn.commit()
-            print("  ✓ Columna agregada exitosamente.")
-        
-        # Verificar si la tabla estudiantes existe
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='estudiantes'")
-        if not cursor.fetchone():
-            print("  → Creando tabla 'estudiantes'...")
-            cursor.execute('''
-                CREATE TABLE estudiantes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    matricula TEXT UNIQUE NOT NULL,
-                    nombre TEXT NOT NULL,
-                    apellido_p TEXT NOT NULL,
-                    apellido_m TEXT,
-                    cuatrimestre_actual TEXT,
-                    carrera TEXT,
-                    grupo TEXT,
-                    programa_educativo INTEGER DEFAULT 2,
-                    created_at TEXT,
-                    updated_at TEXT
-                )
-            ''')
-            conn.commit()
-            print("  ✓ Tabla 'estudiantes' creada exitosamente.")
-        else:
-            # Verificar si las columnas grupo y programa_educativo existen
-            cursor.execute("PRAGMA table_info(estudiantes)")
-            estudiantes_columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'grupo' not in estudiantes_columns:
-                print("  → Agregando columna 'grupo' a la tabla 'estudiantes'...")
-                cursor.execute("ALTER TABLE estudiantes ADD COLUMN grupo TEXT")
-                conn.commit()
-                print("  ✓ Columna 'grupo' agregada.")
-            
-            if 'programa_educativo' not in estudiantes_columns:
-                print("  → Agregando columna 'programa_educativo' a la tabla 'estudiantes'...")
-                cursor.execute("ALTER TABLE estudiantes ADD COLUMN programa_educativo INTEGER DEFAULT 2")
-                conn.commit()
-                print("  ✓ Columna 'programa_educativo' agregada.")
-        
-        # Verificar si la columna matricula existe en asesoria
-        cursor.execute("PRAGMA table_info(asesoria)")
-        asesoria_columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'matricula' not in asesoria_columns:
-            print("  → Agregando columna 'matricula' a la tabla 'asesoria'...")
-            cursor.execute("ALTER TABLE asesoria ADD COLUMN matricula TEXT")
-            conn.commit()
-            print("  ✓ Columna 'matricula' agregada.")
-        
-    except Exception as e:
-        print(f"  ❌ Error durante la migración: {e}")
-        conn.rollback()
-
 def cargar_estudiantes(conn):
     """Carga estudiantes de prueba en la base de datos"""
     cursor = conn.cursor()
@@ -188,14 +125,11 @@ def generar_asesorias(conn):
                 
                 cursor.execute(
                     '''
-                    INSERT INTO asesoria (nombre, apellido_p, apellido_m, matricula, unidad, parcial, periodo, tema, fecha, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO asesoria (estudiante_id, unidad, parcial, periodo, tema, fecha, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                     ''',
                     (
-                        estudiante[2],  # nombre
-                        estudiante[3],  # apellido_p
-                        estudiante[4],  # apellido_m
-                        estudiante[1],  # matricula
+                        estudiante[0],  # id
                         unidad,
                         parcial,
                         periodo,
@@ -245,15 +179,11 @@ def generar_tutorias(conn):
                 
                 cursor.execute(
                     '''
-                    INSERT INTO tutoria (estudiante_id, nombre, apellido_p, apellido_m, matricula, cuatrimestre, motivo, fecha, descripcion, observaciones, seguimiento, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO tutoria (estudiante_id, cuatrimestre, motivo, fecha, descripcion, observaciones, seguimiento, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                     ''',
                     (
                         estudiante[0],  # id
-                        estudiante[2],  # nombre
-                        estudiante[3],  # apellido_p
-                        estudiante[4],  # apellido_m
-                        estudiante[1],  # matricula
                         estudiante[5],  # cuatrimestre_actual
                         motivo,
                         fecha,
@@ -294,16 +224,18 @@ def generar_usuario_demo(conn):
         print(f"  ❌ Error al crear usuario demo: {e}")
         conn.rollback()
 
-def inicializar_datos_prueba():
+def inicializar_datos_prueba(database=DATABASE):
     """
-    Función principal que inicializa todos los datos de prueba
-    Se ejecuta automáticamente al iniciar la aplicación si la base de datos está vacía
+    Función principal que inicializa todos los datos de prueba si la base de datos está
+    vacía. Antes aplica las migraciones pendientes (ver esquema.py)
     """
-    conn = sqlite3.connect(DATABASE)
+    conn = sqlite3.connect(database)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
     try:
+        preparar_esquema(conn)
+
         # Verificar si hay datos en la base de datos
         cursor.execute("SELECT COUNT(*) FROM estudiantes")
         estudiantes_count = cursor.fetchone()[0]
@@ -320,9 +252,6 @@ def inicializar_datos_prueba():
             print("INICIALIZANDO DATOS DE PRUEBA")
             print("="*60)
             
-            # Ejecutar migraciones
-            verificar_migracion(conn)
-            
             # Cargar datos de prueba
             cargar_estudiantes(conn)
             generar_asesorias(conn)
@@ -337,8 +266,7 @@ def inicializar_datos_prueba():
             print("  Contraseña: demo123")
             print("="*60 + "\n")
         else:
-            # Solo verificar migraciones si hay datos
-            verificar_migracion(conn)
+            print("La base de datos ya tiene registros: no se cargan datos de prueba.")
         
     except Exception as e:
         print(f"❌ Error durante la inicialización: {e}")
@@ -347,4 +275,7 @@ def inicializar_datos_prueba():
         conn.close()
 
 if __name__ == '__main__':
-    inicializar_datos_prueba()
+    parser = argparse.ArgumentParser(description="Carga datos de prueba en una base de datos vacía")
+    parser.add_argument('--db', default=DATABASE, help="Ruta de la base de datos")
+    args = parser.parse_args()
+    inicializar_datos_prueba(args.db)
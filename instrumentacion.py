@@ -0,0 +1,123 @@
+"""
+Módulo de Instrumentación de Consultas SQL
+Registro opcional, por petición, de cada sentencia SQL de la conexión de la app: texto,
+duración (ejecución más lectura de filas) y filas devueltas. Los cursores de
+database.ConexionMonitoreada miden las sentencias y set_trace_callback aporta el texto con
+los parámetros ya sustituidos (el de la primera ejecución en executemany). Las sentencias
+lentas se escriben en el registro 'tutorias.sql_lenta' con la ruta que las ejecutó.
+
+Se activa con la variable de entorno TUTORIAS_INSTRUMENTACION_SQL=1; desactivada no
+agrega trabajo a las consultas
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+ACTIVADA = os.environ.get('TUTORIAS_INSTRUMENTACION_SQL', '') == '1'
+
+# Sentencias que tardan más que esto se escriben en el registro de consultas lentas
+UMBRAL_LENTA_MS = float(os.environ.get('TUTORIAS_SQL_LENTA_MS', 100))
+
+# Peticiones (y consultas lentas) que conserva /debug/requests
+PETICIONES_GUARDADAS = int(os.environ.get('TUTORIAS_DEBUG_PETICIONES', 50))
+
+# Archivo opcional del registro de consultas lentas (sin él se usa el manejador de logging configurado)
+ARCHIVO_LENTAS = os.environ.get('TUTORIAS_SQL_LENTA_LOG')
+
+registro_lentas = logging.getLogger('tutorias.sql_lenta')
+if ARCHIVO_LENTAS:
+    _manejador = logging.FileHandler(ARCHIVO_LENTAS, encoding='utf-8')
+    _manejador.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    registro_lentas.addHandler(_manejador)
+    registro_lentas.setLevel(logging.WARNING)
+
+
+class ConsultaRegistrada:
+    """Una sentencia de la petición; la duración y las filas crecen al leer el resultado"""
+
+    __slots__ = ('sql', 'expandida', 'duracion_ms', 'filas')
+
+    def __init__(self, sql):
+        self.sql = ' '.join(sql.split())
+        self.expandida = None
+        self.duracion_ms = 0.0
+        self.filas = 0
+
+
+class RegistroPeticion:
+    """Sentencias de una petición. Se asigna a la conexión de la petición mientras dura"""
+
+    def __init__(self, metodo, ruta, endpoint=None):
+        self.metodo = metodo
+        self.ruta = ruta
+        self.endpoint = endpoint
+        self.fecha = datetime.now().isoformat(timespec='seconds')
+        self.inicio = time.perf_counter()
+        self.duracion_ms = None
+        self.estado = None
+        self.consultas = []
+        self._actual = None
+
+    def iniciar(self, sql):
+        """Registra una sentencia que está por ejecutarse (CursorMonitoreado)"""
+        consulta = self._actual = ConsultaRegistrada(sql)
+        self.consultas.append(consulta)
+        return consulta
+
+    def finalizar(self):
+        """La sentencia en curso terminó de ejecutarse (sus filas se leen después)"""
+        self._actual = None
+
+    def trazar(self, sql):
+        """Callback de set_trace_callback: texto de la sentencia con sus parámetros"""
+        consulta = self._actual
+        # Se ignoran el BEGIN implícito y las repeticiones de executemany y de los triggers
+        if consulta is not None and consulta.expandida is None and not sql.startswith('BEGIN'):
+            consulta.expandida = ' '.join(sql.split())
+
+    @property
+    def tiempo_sql_ms(self):
+        return sum(consulta.duracion_ms for consulta in self.consultas)
+
+
+def encabezado_server_timing(registro):
+    """Valor del encabezado Server-Timing: tiempo en SQL y total de la petición"""
+    return (f'db;dur={registro.tiempo_sql_ms:.2f};desc="{len(registro.consultas)} consultas", '
+            f'total;dur={registro.duracion_ms:.2f}')
+
+
+class MonitorPeticiones:
+    """Últimas peticiones registradas y consultas lentas (compartido por todos los hilos)"""
+
+    def __init__(self, umbral_ms=UMBRAL_LENTA_MS, capacidad=PETICIONES_GUARDADAS):
+        self.umbral_ms = umbral_ms
+        self._peticiones = deque(maxlen=capacidad)
+        self._lentas = deque(maxlen=capacidad)
+        self._lock = threading.Lock()
+
+    def terminar(self, registro, estado):
+        """Cierra el registro de la petición, escribe sus consultas lentas y lo guarda"""
+        registro.duracion_ms = (time.perf_counter() - registro.inicio) * 1000
+        registro.estado = estado
+        lentas = [consulta for consulta in registro.consultas if consulta.duracion_ms >= self.umbral_ms]
+        for consulta in lentas:
+            registro_lentas.warning("%.1f ms %s %s (%s) filas=%d: %s", consulta.duracion_ms, registro.metodo,
+                                    registro.ruta, registro.endpoint, consulta.filas,
+                                    consulta.expandida or consulta.sql)
+        with self._lock:
+            self._peticiones.append(registro)
+            self._lentas.extend((registro, consulta) for consulta in lentas)
+
+    def peticiones(self):
+        """Peticiones registradas, de la más reciente a la más antigua"""
+        with self._lock:
+            return list(reversed(self._peticiones))
+
+    def lentas(self):
+        """[(petición, consulta)] lentas, de la más reciente a la más antigua"""
+        with self._lock:
+            return list(reversed(self._lentas))
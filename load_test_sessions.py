@@ -7,7 +7,9 @@ import sqlite3
 from datetime import datetime, timedelta
 import random
 
-DATABASE = 'asesorias.db'
+from database import DATABASE
+from risk_data import invalidar_riesgo
+
 
 # Motivos comunes para tutorías
 MOTIVOS_TUTORIAS = [
@@ -43,6 +45,7 @@ def limpiar_datos():
         cursor.execute("DELETE FROM asesoria")
         cursor.execute("DELETE FROM tutoria")
         cursor.execute("DELETE FROM tutoria_grupal")
+        invalidar_riesgo(conn)
         conn.commit()
         print("✓ Datos limpiados correctamente.")
     except Exception as e:
@@ -87,14 +90,11 @@ def generar_datos_prueba():
                 
                 cursor.execute(
                     '''
-                    INSERT INTO asesoria (nombre, apellido_p, apellido_m, matricula, unidad, parcial, periodo, tema, fecha, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO asesoria (estudiante_id, unidad, parcial, periodo, tema, fecha, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                     ''',
                     (
-                        estudiante['nombre'],
-                        estudiante['apellido_p'],
-                        estudiante['apellido_m'],
-                        estudiante['matricula'],
+                        estudiante['id'],
                         unidad,
                         parcial,
                         periodo,
@@ -120,15 +120,11 @@ def generar_datos_prueba():
                 
                 cursor.execute(
                     '''
-                    INSERT INTO tutoria (estudiante_id, nombre, apellido_p, apellido_m, matricula, cuatrimestre, motivo, fecha, descripcion, observaciones, seguimiento, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO tutoria (estudiante_id, cuatrimestre, motivo, fecha, descripcion, observaciones, seguimiento, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                     ''',
                     (
                         estudiante['id'],
-                        estudiante['nombre'],
-                        estudiante['apellido_p'],
-                        estudiante['apellido_m'],
-                        estudiante['matricula'],
                         estudiante['cuatrimestre_actual'],
                         motivo,
                         fecha,
@@ -140,6 +136,8 @@ def generar_datos_prueba():
                 )
                 tutorias_count += 1
         
+        # Las evaluaciones materializadas se renuevan al iniciar el servidor o en la siguiente lectura
+        invalidar_riesgo(conn)
         conn.commit()
         print(f"\n✅ Datos de prueba generados:")
         print(f"   - Asesorías: {asesorias_count}")
@@ -0,0 +1,226 @@
+"""
+Módulo de Métricas
+Contadores e histogramas en memoria del proceso que /metrics publica en el formato de texto
+de Prometheus (versión 0.0.4), sin depender de servicios ni bibliotecas externas. Registran
+la latencia y el total de peticiones por ruta, las sentencias SQL por petición, la duración
+de los reportes PDF, los lotes de evaluación de riesgo y los aciertos de las cachés.
+
+Cada observación toma un candado y suma a una lista: el costo es de unos microsegundos por
+petición. Los valores son por proceso (con varios procesos de servidor cada uno publica los
+suyos). Se desactiva con TUTORIAS_METRICAS=0
+"""
+
+import os
+import threading
+from bisect import bisect_left
+
+ACTIVADAS = os.environ.get('TUTORIAS_METRICAS', '1') != '0'
+
+TIPO_CONTENIDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Límites (en segundos) de los histogramas de duración
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Límites de los histogramas de sentencias por petición y de estudiantes por lote
+LIMITES_SENTENCIAS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+LIMITES_LOTE = (1, 10, 100, 1000, 5000, 10000, 50000, 100000, 500000)
+
+
+def _numero(valor):
+    """Valor en el formato de Prometheus (+Inf, enteros sin decimales)"""
+    if valor == float('inf'):
+        return '+Inf'
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return repr(valor) if isinstance(valor, float) else str(valor)
+
+
+def _etiquetas(nombres, valores, extra=None):
+    """Texto {nombre="valor",...} con los caracteres especiales escapados"""
+    pares = list(zip(nombres, valores))
+    if extra:
+        pares.append(extra)
+    if not pares:
+        return ''
+    texto = ','.join(
+        '{}="{}"'.format(nombre, str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"'))
+        for nombre, valor in pares
+    )
+    return '{' + texto + '}'
+
+
+class Contador:
+    """Contador acumulado, opcionalmente separado por etiquetas"""
+
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores, cantidad=1):
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def valor(self, *valores):
+        with self._lock:
+            return self._valores.get(valores, 0)
+
+    def lineas(self):
+        with self._lock:
+            valores = sorted(self._valores.items())
+        for etiquetas, valor in valores:
+            yield f'{self.nombre}{_etiquetas(self.etiquetas, etiquetas)} {_numero(valor)}'
+
+
+class Histograma:
+    """Histograma con cubetas acumuladas, suma y cuenta por combinación de etiquetas"""
+
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES_SEGUNDOS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.limites = tuple(sorted(limites))
+        # {etiquetas: [conteo por cubeta (la última es +Inf), suma]}
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores):
+        indice = bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * (len(self.limites) + 1), 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    def cuenta(self, *valores):
+        with self._lock:
+            serie = self._series.get(valores)
+            return sum(serie[0]) if serie else 0
+
+    def lineas(self):
+        with self._lock:
+            series = sorted((etiquetas, list(conteos), suma) for etiquetas, (conteos, suma) in self._series.items())
+        for etiquetas, conteos, suma in series:
+            acumulado = 0
+            for limite, conteo in zip(self.limites + (float('inf'),), conteos):
+                acumulado += conteo
+                yield (f'{self.nombre}_bucket{_etiquetas(self.etiquetas, etiquetas, ("le", _numero(float(limite))))} '
+                       f'{acumulado}')
+            yield f'{self.nombre}_sum{_etiquetas(self.etiquetas, etiquetas)} {_numero(suma)}'
+            yield f'{self.nombre}_count{_etiquetas(self.etiquetas, etiquetas)} {acumulado}'
+
+
+class MetricasCache:
+    """
+    Aciertos y fallos por caché. Las cachés propias de la app los cuentan con acierto/fallo;
+    las que ya llevan sus propias estadísticas (lru_cache, ConnectionManager) se registran
+    con una función que los devuelve al momento de publicar
+    """
+
+    def __init__(self, prefijo):
+        self.aciertos = Contador(f'{prefijo}_aciertos_total', 'Lecturas atendidas por la caché', ('cache',))
+        self.fallos = Contador(f'{prefijo}_fallos_total', 'Lecturas que la caché no pudo atender', ('cache',))
+        self.nombre_proporcion = f'{prefijo}_proporcion_aciertos'
+        self._externas = {}
+
+    def acierto(self, cache):
+        self.aciertos.incrementar(cache)
+
+    def fallo(self, cache):
+        self.fallos.incrementar(cache)
+
+    def registrar(self, cache, funcion):
+        """funcion() -> (aciertos, fallos) acumulados de una caché con estadísticas propias"""
+        self._externas[cache] = funcion
+
+    def totales(self):
+        """{cache: (aciertos, fallos)}"""
+        totales = {}
+        with self.aciertos._lock:
+            for (cache,), valor in self.aciertos._valores.items():
+                totales[cache] = (valor, 0)
+        with self.fallos._lock:
+            for (cache,), valor in self.fallos._valores.items():
+                totales[cache] = (totales.get(cache, (0, 0))[0], valor)
+        for cache, funcion in list(self._externas.items()):
+            try:
+                totales[cache] = tuple(funcion())
+            except Exception:
+                # Una caché que no se puede leer no debe romper la publicación del resto
+                continue
+        return totales
+
+    def exponer(self):
+        totales = sorted(self.totales().items())
+        lineas = []
+        for contador, posicion in ((self.aciertos, 0), (self.fallos, 1)):
+            lineas.append(f'# HELP {contador.nombre} {contador.ayuda}')
+            lineas.append(f'# TYPE {contador.nombre} counter')
+            lineas.extend(f'{contador.nombre}{_etiquetas(("cache",), (cache,))} {_numero(valores[posicion])}'
+                          for cache, valores in totales)
+        lineas.append(f'# HELP {self.nombre_proporcion} Aciertos / (aciertos + fallos) desde que inició el proceso')
+        lineas.append(f'# TYPE {self.nombre_proporcion} gauge')
+        for cache, (aciertos, fallos) in totales:
+            proporcion = aciertos / (aciertos + fallos) if aciertos + fallos else 0.0
+            lineas.append(f'{self.nombre_proporcion}{_etiquetas(("cache",), (cache,))} {_numero(round(proporcion, 6))}')
+        return lineas
+
+
+class RegistroMetricas:
+    """Conjunto de métricas que se publican juntas"""
+
+    def __init__(self, prefijo='tutorias'):
+        self.prefijo = prefijo
+        self._metricas = []
+        self.caches = MetricasCache(f'{prefijo}_cache')
+
+    def contador(self, nombre, ayuda, etiquetas=()):
+        metrica = Contador(f'{self.prefijo}_{nombre}', ayuda, etiquetas)
+        self._metricas.append(metrica)
+        return metrica
+
+    def histograma(self, nombre, ayuda, etiquetas=(), limites=LIMITES_SEGUNDOS):
+        metrica = Histograma(f'{self.prefijo}_{nombre}', ayuda, etiquetas, limites)
+        self._metricas.append(metrica)
+        return metrica
+
+    def exponer(self):
+        """Texto de todas las métricas en el formato de exposición de Prometheus"""
+        lineas = []
+        for metrica in self._metricas:
+            lineas.append(f'# HELP {metrica.nombre} {metrica.ayuda}')
+            lineas.append(f'# TYPE {metrica.nombre} {metrica.tipo}')
+            lineas.extend(metrica.lineas())
+        lineas.extend(self.caches.exponer())
+        return '\n'.join(lineas) + '\n'
+
+
+# ---------------------------
+# Métricas de la aplicación
+# ---------------------------
+registro = RegistroMetricas()
+
+duracion_peticiones = registro.histograma(
+    'http_duracion_segundos', 'Duración de las peticiones por ruta y método', ('ruta', 'metodo'))
+peticiones = registro.contador(
+    'http_peticiones_total', 'Peticiones atendidas por ruta, método y código de estado', ('ruta', 'metodo', 'estado'))
+errores = registro.contador(
+    'http_errores_total', 'Peticiones que terminaron con un error del servidor (5xx)', ('ruta', 'metodo'))
+sentencias_peticion = registro.histograma(
+    'sql_sentencias_por_peticion', 'Sentencias SQL ejecutadas en cada petición', ('ruta',), LIMITES_SENTENCIAS)
+duracion_reportes = registro.histograma(
+    'reporte_pdf_duracion_segundos', 'Duración de la generación de reportes PDF por tipo', ('tipo',))
+errores_reportes = registro.contador(
+    'reporte_pdf_errores_total', 'Reportes PDF cuya generación falló, por tipo', ('tipo',))
+tamano_lote_riesgo = registro.histograma(
+    'riesgo_lote_estudiantes', 'Estudiantes evaluados en cada lote de riesgo por ventana', ('ventana',), LIMITES_LOTE)
+duracion_lote_riesgo = registro.histograma(
+    'riesgo_lote_duracion_segundos', 'Duración de cada lote de evaluación de riesgo por ventana', ('ventana',))
+caches = registro.caches
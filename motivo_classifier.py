@@ -0,0 +1,118 @@
+"""
+Módulo de Clasificación de Motivos de Tutoría
+Compila todas las palabras clave de riesgo y de categorías en un solo patrón y memoriza
+la clasificación de cada motivo distinto en una caché LRU acotada
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Pesos de riesgo por palabra clave (el orden define la prioridad: gana la primera contenida)
+MOTIVO_PESOS = {
+    'baja calificación': 3,
+    'inasistencias': 3,
+    'problemas de conducta': 2,
+    'reforzamiento de materia': 1,
+    'asesoría general': 1,
+    'bajo desempeño': 3,
+    'falta de motivación': 2,
+    'dificultades académicas': 2,
+}
+
+# Categorías generales para el historial académico (mismo criterio de prioridad)
+MOTIVO_CATEGORIES = {
+    'baja calificación': 'Baja Calificación',
+    'bajo desempeño': 'Baja Calificación',
+    'inasistencia': 'Inasistencias',
+    'falta de motivación': 'Problemas de Actitud',
+    'problemas de conducta': 'Problemas de Actitud',
+    'reforzamiento': 'Reforzamiento Académico',
+    'asesoría general': 'Asesoría General',
+}
+
+# Indicadores que se cuentan aparte en la evaluación de riesgo
+PALABRAS_INASISTENCIA = ('inasistencia',)
+PALABRAS_BAJA_CALIFICACION = ('baja calificación', 'bajo desempeño')
+
+# Número máximo de motivos distintos memorizados por clasificador
+TAMANO_CACHE = 4096
+
+ClasificacionMotivo = namedtuple('ClasificacionMotivo', [
+    'motivo_normalizado',    # motivo en minúsculas
+    'peso',                  # peso de MOTIVO_PESOS (0 si no coincide)
+    'coincide_peso',         # True si alguna palabra clave de MOTIVO_PESOS está contenida
+    'categoria',             # categoría de MOTIVO_CATEGORIES o el motivo original
+    'es_inasistencia',
+    'es_baja_calificacion',
+])
+
+
+class MotivoClassifier:
+    """Clasificador de motivos con un único patrón compilado y caché por motivo"""
+
+    def __init__(self, pesos=None, categorias=None, tamano_cache=TAMANO_CACHE):
+        self.pesos = dict(MOTIVO_PESOS if pesos is None else pesos)
+        self.categorias = dict(MOTIVO_CATEGORIES if categorias is None else categorias)
+
+        palabras = set(self.pesos) | set(self.categorias) | set(PALABRAS_INASISTENCIA) | set(PALABRAS_BAJA_CALIFICACION)
+        # Alternativas de mayor a menor longitud dentro de una búsqueda anticipada: en cada
+        # posición se reporta la palabra más larga y, con ella, todas las que son su prefijo
+        alternativas = '|'.join(re.escape(p) for p in sorted(palabras, key=len, reverse=True))
+        self._patron = re.compile(f'(?=({alternativas}))')
+        self._prefijos = {p: frozenset(q for q in palabras if p.startswith(q)) for p in palabras}
+
+        self.clasificar = lru_cache(maxsize=tamano_cache)(self._clasificar)
+
+    def palabras_contenidas(self, motivo_normalizado):
+        """Conjunto de palabras clave contenidas en un motivo ya en minúsculas"""
+        encontradas = set()
+        for coincidencia in self._patron.finditer(motivo_normalizado):
+            encontradas |= self._prefijos[coincidencia.group(1)]
+        return encontradas
+
+    def _clasificar(self, motivo):
+        """Clasifica un motivo (se invoca a través de self.clasificar, memorizado)"""
+        motivo = motivo or ''
+        normalizado = motivo.lower()
+        encontradas = self.palabras_contenidas(normalizado)
+
+        peso, coincide_peso = 0, False
+        for palabra_clave, peso_motivo in self.pesos.items():
+            if palabra_clave in encontradas:
+                peso, coincide_peso = peso_motivo, True
+                break
+
+        categoria = motivo  # Se conserva el motivo original si no hay categoría
+        for palabra_clave, nombre in self.categorias.items():
+            if palabra_clave in encontradas:
+                categoria = nombre
+                break
+
+        return ClasificacionMotivo(
+            motivo_normalizado=normalizado,
+            peso=peso,
+            coincide_peso=coincide_peso,
+            categoria=categoria,
+            es_inasistencia=any(p in encontradas for p in PALABRAS_INASISTENCIA),
+            es_baja_calificacion=any(p in encontradas for p in PALABRAS_BAJA_CALIFICACION),
+        )
+
+    def info_cache(self):
+        """Estadísticas de la caché LRU (hits, misses, maxsize, currsize)"""
+        return self.clasificar.cache_info()
+
+
+@lru_cache(maxsize=8)
+def _clasificador_para(pesos, categorias):
+    return MotivoClassifier(dict(pesos), dict(categorias))
+
+
+def obtener_clasificador(pesos=None, categorias=None):
+    """
+    Devuelve el clasificador compartido para una combinación de tablas.
+    Con las tablas por defecto todos los motores comparten la misma instancia y caché.
+    """
+    pesos = MOTIVO_PESOS if pesos is None else pesos
+    categorias = MOTIVO_CATEGORIES if categorias is None else categorias
+    return _clasificador_para(tuple(pesos.items()), tuple(categorias.items()))
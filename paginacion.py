@@ -0,0 +1,153 @@
+"""
+Módulo de Paginación
+Proporciona paginación por cursor (keyset) para los listados de consultas y estudiantes,
+y paginación por desplazamiento para los resultados de búsqueda ordenados por relevancia
+"""
+
+import base64
+import binascii
+import json
+import os
+from collections import namedtuple
+
+# Tamaño de página por defecto (variable de entorno TUTORIAS_TAMANO_PAGINA) y máximo permitido
+TAMANO_PAGINA = int(os.environ.get('TUTORIAS_TAMANO_PAGINA', 50))
+TAMANO_PAGINA_MAXIMO = 200
+
+# Órdenes de los listados: (expresión SQL, valor de la fila). El último campo siempre es id,
+# así la clave es única. Ninguna expresión puede ser NULL (las comparaciones por tupla lo excluirían).
+ORDEN_RECIENTES = (
+    ('created_at', lambda fila: fila['created_at']),
+    ('id', lambda fila: fila['id']),
+)
+ORDEN_APELLIDOS = (
+    ('apellido_p', lambda fila: fila['apellido_p']),
+    ("coalesce(apellido_m, '')", lambda fila: fila['apellido_m'] or ''),
+    ('nombre', lambda fila: fila['nombre']),
+    ('id', lambda fila: fila['id']),
+)
+
+SIGUIENTE = 's'
+ANTERIOR = 'a'
+DESPLAZAMIENTO = 'o'
+
+Pagina = namedtuple('Pagina', ['filas', 'siguiente', 'anterior'])
+
+
+def tamano_pagina(valor):
+    """Convierte el parámetro 'tamano' de la URL a un tamaño de página válido"""
+    try:
+        tamano = int(valor)
+    except (TypeError, ValueError):
+        return TAMANO_PAGINA
+    return max(1, min(tamano, TAMANO_PAGINA_MAXIMO))
+
+
+def codificar_cursor(tipo, valores):
+    """Cursor opaco y seguro para URL"""
+    datos = json.dumps([tipo, valores], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(datos.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """
+    Returns:
+        tuple: (tipo, valores) o (None, None) si no hay cursor o no es válido
+    """
+    if not cursor:
+        return None, None
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        tipo, valores = json.loads(base64.urlsafe_b64decode(cursor + relleno).decode('utf-8'))
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        return None, None
+    if tipo not in (SIGUIENTE, ANTERIOR, DESPLAZAMIENTO):
+        return None, None
+    return tipo, valores
+
+
+def _clave(fila, orden):
+    return [valor(fila) for _, valor in orden]
+
+
+def paginar(db, tabla, orden, descendente=False, cursor=None, tamano=TAMANO_PAGINA, filtros='', parametros=()):
+    """
+    Obtiene una página de `tabla` con paginación keyset: el cursor guarda la clave de orden
+    de la última (o primera) fila mostrada y la consulta continúa desde ahí con un recorrido
+    de índice, así el costo no depende de cuántas páginas se hayan avanzado.
+
+    Args:
+        db: Conexión sqlite3 con row_factory = sqlite3.Row
+        tabla: Tabla a listar
+        orden: ORDEN_RECIENTES, ORDEN_APELLIDOS u otra secuencia (expresión, valor)
+        descendente: Sentido del listado
+        cursor: Cursor recibido (None para la primera página)
+        tamano: Filas por página
+        filtros: Condiciones adicionales ('AND ...') con placeholders
+        parametros: Valores de los placeholders de filtros
+
+    Returns:
+        Pagina: filas, cursor siguiente y cursor anterior (None si no hay)
+    """
+    tipo, valores = decodificar_cursor(cursor)
+    if tipo not in (SIGUIENTE, ANTERIOR) or not isinstance(valores, list) or len(valores) != len(orden):
+        tipo, valores = SIGUIENTE, None
+
+    hacia_atras = tipo == ANTERIOR
+    # Hacia atrás se lee en sentido contrario y luego se invierte
+    desc_consulta = descendente != hacia_atras
+    expresiones = [expresion for expresion, _ in orden]
+
+    condicion = filtros
+    argumentos = list(parametros)
+    if valores is not None:
+        comparador = '<' if desc_consulta else '>'
+        condicion += f" AND ({', '.join(expresiones)}) {comparador} ({', '.join('?' * len(valores))})"
+        argumentos.extend(valores)
+
+    sentido = 'DESC' if desc_consulta else 'ASC'
+    filas = db.execute(
+        f"SELECT * FROM {tabla} WHERE 1=1 {condicion} "
+        f"ORDER BY {', '.join(f'{e} {sentido}' for e in expresiones)} LIMIT ?",
+        (*argumentos, tamano + 1)
+    ).fetchall()
+
+    hay_mas = len(filas) > tamano
+    filas = filas[:tamano]
+    if hacia_atras:
+        filas.reverse()
+    if not filas:
+        return Pagina([], None, None)
+
+    hay_siguiente = hay_mas if not hacia_atras else True
+    hay_anterior = hay_mas if hacia_atras else valores is not None
+    return Pagina(
+        filas,
+        codificar_cursor(SIGUIENTE, _clave(filas[-1], orden)) if hay_siguiente else None,
+        codificar_cursor(ANTERIOR, _clave(filas[0], orden)) if hay_anterior else None,
+    )
+
+
+def paginar_resultados(buscar, cursor=None, tamano=TAMANO_PAGINA):
+    """
+    Pagina resultados ordenados por relevancia (búsquedas). El orden por rank no sirve
+    como clave keyset, así que el cursor guarda el desplazamiento; el costo queda acotado
+    por el número de coincidencias, no por el tamaño del archivo.
+
+    Args:
+        buscar: Función buscar(limite, desplazamiento) que devuelve las filas
+        cursor: Cursor recibido (None para la primera página)
+        tamano: Filas por página
+    """
+    tipo, desplazamiento = decodificar_cursor(cursor)
+    if tipo != DESPLAZAMIENTO or not isinstance(desplazamiento, int) or desplazamiento < 0:
+        desplazamiento = 0
+
+    filas = buscar(tamano + 1, desplazamiento)
+    hay_mas = len(filas) > tamano
+    filas = filas[:tamano]
+    return Pagina(
+        filas,
+        codificar_cursor(DESPLAZAMIENTO, desplazamiento + tamano) if hay_mas else None,
+        codificar_cursor(DESPLAZAMIENTO, max(0, desplazamiento - tamano)) if desplazamiento > 0 else None,
+    )
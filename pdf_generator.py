@@ -7,12 +7,183 @@ from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
+from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
 from io import BytesIO
 import os
 
+COLOR_PRINCIPAL = colors.HexColor('#cc1313')
+INSTITUCION = "Universidad Politécnica de Tecámac"
+SISTEMA = "Universidad Politécnica de Tecámac - Sistema de Asesorías y Tutorías"
+
+# Espacio reservado arriba y abajo de cada página para el encabezado y el pie dibujados
+ALTO_ENCABEZADO = 0.9 * inch
+ALTO_PIE = 0.5 * inch
+
+# Filas por segmento de tabla en el reporte por período: cada segmento es una Table
+# independiente, así ReportLab nunca tiene que dividir (y copiar) una tabla de miles de filas
+TAMANO_SEGMENTO = 100
+
+
+class _HistoriaPerezosa(list):
+    """
+    Lista de flowables que se rellena desde un generador mientras doc.build() la consume:
+    build() pregunta len() en cada vuelta y solo se mantienen unos cuantos flowables por delante.
+
+    Depende del ciclo de BaseDocTemplate.build de ReportLab (verificado con la 5.0; requirements.txt
+    fija <6): `while len(flowables)`, lectura de flowables[0], `del flowables[0]` e inserción al
+    frente de las partes de un flowable dividido. Si una versión copiara la historia (list(),
+    rebanadas, multiBuild) solo vería la reserva; `agotada` permite detectarlo tras build()
+    """
+
+    def __init__(self, flowables, reserva=8):
+        super().__init__()
+        self._fuente = iter(flowables)
+        self._reserva = reserva
+
+    def __len__(self):
+        while self._fuente is not None and super().__len__() < self._reserva:
+            try:
+                self.append(next(self._fuente))
+            except StopIteration:
+                self._fuente = None
+        return super().__len__()
+
+    @property
+    def agotada(self):
+        """True si build() consumió la fuente completa"""
+        return self._fuente is None and super().__len__() == 0
+
+
+def _campo(fila, clave, defecto):
+    """Valor de un dict o sqlite3.Row, con defecto si falta o es NULL"""
+    try:
+        valor = fila[clave]
+    except (KeyError, IndexError):
+        return defecto
+    return defecto if valor is None else valor
+
+
+@lru_cache(maxsize=None)
+def obtener_estilos():
+    """Registro de estilos de párrafo: se construye una sola vez por proceso y lo comparten todos los reportes"""
+    styles = getSampleStyleSheet()
+    return {
+        'table_title': ParagraphStyle(
+            'TableTitle',
+            parent=styles['Heading2'],
+            fontSize=12,
+            textColor=COLOR_PRINCIPAL,
+            spaceAfter=8,
+            fontName='Helvetica-Bold'
+        ),
+        'summary_title': ParagraphStyle(
+            'SummaryTitle',
+            parent=styles['Heading2'],
+            fontSize=12,
+            textColor=COLOR_PRINCIPAL,
+            spaceAfter=8,
+            fontName='Helvetica-Bold'
+        ),
+        'normal': styles['Normal'],
+    }
+
+
+@lru_cache(maxsize=None)
+def _estilo_tabla_info():
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e0f7fa')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ])
+
+
+@lru_cache(maxsize=None)
+def _estilo_tabla_datos(with_header):
+    """Estilo de las tablas de datos; sin encabezado, las filas de datos empiezan en la 0"""
+    first_row = 1 if with_header else 0
+    style = [
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('BACKGROUND', (0, first_row), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('ROWBACKGROUNDS', (0, first_row), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
+        ('FONTSIZE', (0, first_row), (-1, -1), 9),
+        ('TOPPADDING', (0, first_row), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, first_row), (-1, -1), 6),
+    ]
+    if with_header:
+        style[1:1] = [
+            ('BACKGROUND', (0, 0), (-1, 0), COLOR_PRINCIPAL),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('TOPPADDING', (0, 0), (-1, 0), 10),
+        ]
+    return TableStyle(style)
+
+
+def _dibujar_pagina(canvas, doc):
+    """Encabezado y pie de cada página (callback onPage de la plantilla de los reportes)"""
+    ancho, alto = doc.pagesize
+    centro = ancho / 2
+    superior = alto - doc.topMargin
+    canvas.saveState()
+
+    # Encabezado: título del reporte, institución y subtítulo
+    canvas.setFillColor(COLOR_PRINCIPAL)
+    canvas.setFont('Helvetica-Bold', 16)
+    canvas.drawCentredString(centro, superior - 16, doc.report_title)
+    canvas.setFillColor(colors.HexColor('#333333'))
+    canvas.setFont('Helvetica', 10)
+    canvas.drawCentredString(centro, superior - 32, INSTITUCION)
+    if doc.report_subtitle:
+        canvas.drawCentredString(centro, superior - 46, doc.report_subtitle)
+    canvas.setStrokeColor(COLOR_PRINCIPAL)
+    canvas.line(doc.leftMargin, superior - ALTO_ENCABEZADO + 8, ancho - doc.rightMargin, superior - ALTO_ENCABEZADO + 8)
+
+    # Pie: fecha de generación, tutor, sistema y número de página
+    inferior = doc.bottomMargin
+    canvas.setStrokeColor(colors.grey)
+    canvas.line(doc.leftMargin, inferior + ALTO_PIE - 8, ancho - doc.rightMargin, inferior + ALTO_PIE - 8)
+    canvas.setFillColor(colors.grey)
+    canvas.setFont('Helvetica', 8)
+    generado = f"Reporte generado: {doc.date_generated}"
+    if doc.tutor_name:
+        generado = f"Tutor: {doc.tutor_name}    {generado}"
+    canvas.drawString(doc.leftMargin, inferior + 14, generado)
+    canvas.drawRightString(ancho - doc.rightMargin, inferior + 14, f"Página {canvas.getPageNumber()}")
+    canvas.drawCentredString(centro, inferior + 2, SISTEMA)
+    canvas.restoreState()
+
+
+class ReportDocTemplate(BaseDocTemplate):
+    """
+    Documento de los reportes: una plantilla de página con el encabezado y el pie dibujados
+    por _dibujar_pagina. Los estilos y el callback se comparten; el marco se crea por documento
+    porque guarda el estado de la construcción (los reportes se generan en varios hilos).
+    """
+
+    def __init__(self, filename, report_title, report_subtitle="", tutor_name="", **kwargs):
+        super().__init__(filename, **kwargs)
+        self.report_title = report_title
+        self.report_subtitle = report_subtitle
+        self.tutor_name = tutor_name
+        self.date_generated = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        frame = Frame(self.leftMargin, self.bottomMargin + ALTO_PIE,
+                      self.width, self.height - ALTO_ENCABEZADO - ALTO_PIE,
+                      leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0, id='contenido')
+        self.addPageTemplates([PageTemplate(id='reporte', frames=[frame], onPage=_dibujar_pagina)])
+
+
 class PDFReportGenerator:
     """Generador de reportes PDF para asesorías y tutorías"""
     
@@ -22,36 +193,11 @@ class PDFReportGenerator:
         self.width = self.page_size[0] - 2 * self.margin
         self.height = self.page_size[1] - 2 * self.margin
         
-    def _create_header(self, story, title, subtitle=""):
-        """Crea el encabezado del reporte"""
-        styles = getSampleStyleSheet()
-        
-        # Título principal
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor=colors.HexColor('#cc1313'),
-            spaceAfter=6,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Normal'],
-            fontSize=11,
-            textColor=colors.HexColor('#333333'),
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            fontName='Helvetica'
-        )
-        
-        story.append(Paragraph(title, title_style))
-        story.append(Paragraph("Universidad Politécnica de Tecámac", subtitle_style))
-        if subtitle:
-            story.append(Paragraph(subtitle, subtitle_style))
-        story.append(Spacer(1, 0.2*inch))
+    def _create_document(self, filename, title, subtitle="", tutor_name="", **kwargs):
+        """Crea el documento con el encabezado y el pie de página en cada hoja"""
+        return ReportDocTemplate(filename, title, subtitle, tutor_name, pagesize=self.page_size,
+                                 rightMargin=self.margin, leftMargin=self.margin,
+                                 topMargin=self.margin, bottomMargin=self.margin, **kwargs)
         
     def _create_info_table(self, story, info_dict):
         """Crea una tabla de información"""
@@ -60,16 +206,7 @@ class PDFReportGenerator:
             data.append([f"{key}:", str(value)])
         
         table = Table(data, colWidths=[2*inch, 4*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e0f7fa')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ]))
+        table.setStyle(_estilo_tabla_info())
         
         story.append(table)
         story.append(Spacer(1, 0.2*inch))
@@ -77,88 +214,39 @@ class PDFReportGenerator:
     def _create_data_table(self, story, headers, data, title=""):
         """Crea una tabla de datos"""
         if title:
-            styles = getSampleStyleSheet()
-            title_style = ParagraphStyle(
-                'TableTitle',
-                parent=styles['Heading2'],
-                fontSize=12,
-                textColor=colors.HexColor('#cc1313'),
-                spaceAfter=8,
-                fontName='Helvetica-Bold'
-            )
-            story.append(Paragraph(title, title_style))
-        
-        # Preparar datos de la tabla
-        table_data = [headers] + data
+            self._create_table_title(story, title)
+        
+        story.append(self._create_table_segment(headers, data))
+        story.append(Spacer(1, 0.2*inch))
+        
+    def _create_table_title(self, story, title):
+        """Crea el título de una tabla de datos"""
+        story.append(Paragraph(title, obtener_estilos()['table_title']))
+        
+    def _create_table_segment(self, headers, data, with_header=True):
+        """
+        Crea una tabla de datos; sin encabezado sirve como continuación de la anterior
+        (las filas alternas conservan el patrón si los segmentos tienen un número par de filas)
+        """
+        table_data = [headers] + data if with_header else data
         
         # Crear tabla
         col_widths = [self.width / len(headers)] * len(headers)
         table = Table(table_data, colWidths=col_widths)
-        
-        # Estilo de la tabla
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#cc1313')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('TOPPADDING', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ]))
-        
-        story.append(table)
-        story.append(Spacer(1, 0.2*inch))
+        table.setStyle(_estilo_tabla_datos(with_header))
+        return table
         
     def _create_summary_section(self, story, summary_dict):
         """Crea una sección de resumen"""
-        styles = getSampleStyleSheet()
-        
-        summary_style = ParagraphStyle(
-            'SummaryTitle',
-            parent=styles['Heading2'],
-            fontSize=12,
-            textColor=colors.HexColor('#cc1313'),
-            spaceAfter=8,
-            fontName='Helvetica-Bold'
-        )
-        
-        story.append(Paragraph("RESUMEN", summary_style))
+        styles = obtener_estilos()
+        story.append(Paragraph("RESUMEN", styles['summary_title']))
         
         for key, value in summary_dict.items():
             text = f"<b>{key}:</b> {value}"
-            story.append(Paragraph(text, styles['Normal']))
+            story.append(Paragraph(text, styles['normal']))
         
         story.append(Spacer(1, 0.2*inch))
         
-    def _create_footer(self, story, tutor_name="", date_generated=None):
-        """Crea el pie de página del reporte"""
-        if date_generated is None:
-            date_generated = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        
-        styles = getSampleStyleSheet()
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.grey,
-            alignment=TA_CENTER
-        )
-        
-        story.append(Spacer(1, 0.3*inch))
-        story.append(Paragraph("_" * 80, footer_style))
-        
-        if tutor_name:
-            story.append(Paragraph(f"Tutor: {tutor_name}", footer_style))
-        
-        story.append(Paragraph(f"Reporte generado: {date_generated}", footer_style))
-        story.append(Paragraph("Universidad Politécnica de Tecámac - Sistema de Asesorías y Tutorías", footer_style))
-        
     def generate_student_report(self, student_data, tutorias, filename=None):
         """
         Genera un reporte PDF para un estudiante
@@ -171,22 +259,14 @@ class PDFReportGenerator:
         Returns:
             BytesIO o ruta del archivo generado
         """
-        if filename is None:
-            buffer = BytesIO()
-            doc = SimpleDocTemplate(buffer, pagesize=self.page_size, 
-                                   rightMargin=self.margin, leftMargin=self.margin,
-                                   topMargin=self.margin, bottomMargin=self.margin)
-        else:
-            doc = SimpleDocTemplate(filename, pagesize=self.page_size,
-                                   rightMargin=self.margin, leftMargin=self.margin,
-                                   topMargin=self.margin, bottomMargin=self.margin)
+        destino = BytesIO() if filename is None else filename
+        # Encabezado y pie de página en cada hoja
+        doc = self._create_document(destino, "REPORTE DE TUTORÍAS INDIVIDUALES",
+                                    f"Estudiante: {student_data.get('nombre', '')} {student_data.get('apellido_p', '')}",
+                                    tutor_name=student_data.get('tutor') or '')
         
         story = []
         
-        # Encabezado
-        self._create_header(story, "REPORTE DE TUTORÍAS INDIVIDUALES", 
-                           f"Estudiante: {student_data.get('nombre', '')} {student_data.get('apellido_p', '')}")
-        
         # Información del estudiante
         info_dict = {
             "Nombre Completo": f"{student_data.get('nombre', '')} {student_data.get('apellido_p', '')} {student_data.get('apellido_m', '')}",
@@ -204,7 +284,7 @@ class PDFReportGenerator:
                 data.append([
                     tut.get('fecha', 'N/A'),
                     tut.get('motivo', 'N/A'),
-                    tut.get('descripcion', 'N/A')[:50] + "..." if len(tut.get('descripcion', '')) > 50 else tut.get('descripcion', 'N/A'),
+                    self._truncate(_campo(tut, 'descripcion', 'N/A'), 50),
                     tut.get('tutor', 'N/A')
                 ])
             
@@ -218,16 +298,12 @@ class PDFReportGenerator:
         }
         self._create_summary_section(story, summary_dict)
         
-        # Pie de página
-        self._create_footer(story, tutor_name=student_data.get('tutor', ''))
-        
         # Generar PDF
         doc.build(story)
         
         if filename is None:
-            buffer.seek(0)
-            return buffer
-        return filename
+            destino.seek(0)
+        return destino
     
     def generate_group_report(self, group_data, tutorias_grupales, filename=None):
         """
@@ -241,22 +317,13 @@ class PDFReportGenerator:
         Returns:
             BytesIO o ruta del archivo generado
         """
-        if filename is None:
-            buffer = BytesIO()
-            doc = SimpleDocTemplate(buffer, pagesize=self.page_size,
-                                   rightMargin=self.margin, leftMargin=self.margin,
-                                   topMargin=self.margin, bottomMargin=self.margin)
-        else:
-            doc = SimpleDocTemplate(filename, pagesize=self.page_size,
-                                   rightMargin=self.margin, leftMargin=self.margin,
-                                   topMargin=self.margin, bottomMargin=self.margin)
+        destino = BytesIO() if filename is None else filename
+        # Encabezado y pie de página en cada hoja
+        doc = self._create_document(destino, "REPORTE DE TUTORÍAS GRUPALES",
+                                    f"Grupo: {group_data.get('grupo_nombre', '')}")
         
         story = []
         
-        # Encabezado
-        self._create_header(story, "REPORTE DE TUTORÍAS GRUPALES",
-                           f"Grupo: {group_data.get('grupo_nombre', '')}")
-        
         # Información del grupo
         info_dict = {
             "Grupo": group_data.get('grupo_nombre', 'N/A'),
@@ -274,7 +341,7 @@ class PDFReportGenerator:
                     tut.get('fecha', 'N/A'),
                     tut.get('motivo', 'N/A'),
                     tut.get('asistentes', 'N/A'),
-                    tut.get('descripcion', 'N/A')[:40] + "..." if len(tut.get('descripcion', '')) > 40 else tut.get('descripcion', 'N/A'),
+                    self._truncate(_campo(tut, 'descripcion', 'N/A'), 40),
                 ])
             
             self._create_data_table(story, headers, data, "DETALLE DE TUTORÍAS GRUPALES")
@@ -287,95 +354,120 @@ class PDFReportGenerator:
         }
         self._create_summary_section(story, summary_dict)
         
-        # Pie de página
-        self._create_footer(story)
-        
         # Generar PDF
         doc.build(story)
         
         if filename is None:
-            buffer.seek(0)
-            return buffer
-        return filename
+            destino.seek(0)
+        return destino
     
-    def generate_period_report(self, period_data, tutorias, filename=None):
+    def generate_period_report(self, period_data, tutorias, filename=None, segment_size=TAMANO_SEGMENTO, progress=None):
         """
-        Genera un reporte PDF para un período específico
+        Genera un reporte PDF para un período específico.
+        Las tutorías se recorren una sola vez y la tabla se emite por segmentos mientras se
+        construye el documento, así que `tutorias` puede ser un cursor (ver
+        database.recorrer_en_lotes) y las filas nunca están todas en memoria. Las páginas sí:
+        ReportLab guarda el contenido de cada página terminada hasta save(), así que el pico
+        crece con el número de páginas (~16 KiB por página, ver docs/pdf_generator_documentation.md).
         
         Args:
             period_data: Dict con información del período {start_date, end_date, carrera, cuatrimestre}
-            tutorias: Lista de tutorías en el período
-            filename: Nombre del archivo (si es None, retorna BytesIO)
+            tutorias: Iterable de tutorías en el período (dicts o sqlite3.Row)
+            filename: Ruta o archivo abierto de destino (si es None, retorna BytesIO)
+            segment_size: Filas por segmento de la tabla (par, para conservar las filas alternas)
+            progress: Función opcional progress(filas) que se llama después de cada segmento
         
         Returns:
-            BytesIO o ruta del archivo generado
+            BytesIO, ruta o archivo generado
         """
-        if filename is None:
-            buffer = BytesIO()
-            doc = SimpleDocTemplate(buffer, pagesize=self.page_size,
-                                   rightMargin=self.margin, leftMargin=self.margin,
-                                   topMargin=self.margin, bottomMargin=self.margin)
-        else:
-            doc = SimpleDocTemplate(filename, pagesize=self.page_size,
-                                   rightMargin=self.margin, leftMargin=self.margin,
-                                   topMargin=self.margin, bottomMargin=self.margin)
+        destino = BytesIO() if filename is None else filename
+        # Páginas comprimidas: el archivo (y el PDF que save() arma en memoria) ocupa ~8 veces menos
+        doc = self._create_document(destino, "REPORTE DE TUTORÍAS POR PERÍODO",
+                                    f"Período: {period_data.get('start_date', '')} a {period_data.get('end_date', '')}",
+                                    pageCompression=1)
         
-        story = []
+        # Generar PDF
+        historia = _HistoriaPerezosa(self._period_story(period_data, tutorias, segment_size, progress))
+        doc.build(historia)
+        if not historia.agotada:
+            # Un PDF truncado sin aviso es peor que un error
+            raise RuntimeError("ReportLab no consumió la historia completa del reporte por período "
+                               "(ver _HistoriaPerezosa)")
         
-        # Encabezado
-        self._create_header(story, "REPORTE DE TUTORÍAS POR PERÍODO",
-                           f"Período: {period_data.get('start_date', '')} a {period_data.get('end_date', '')}")
+        if filename is None:
+            destino.seek(0)
+        return destino
+    
+    def _period_story(self, period_data, tutorias, segment_size, progress=None):
+        """Genera los flowables del reporte por período conforme se necesitan"""
+        story = []
         
         # Información del período
         info_dict = {
             "Fecha Inicio": period_data.get('start_date', 'N/A'),
             "Fecha Fin": period_data.get('end_date', 'N/A'),
+            "Período Académico": period_data.get('periodo', 'N/A'),
             "Carrera": period_data.get('carrera', 'Todas'),
             "Cuatrimestre": period_data.get('cuatrimestre', 'Todos'),
         }
         self._create_info_table(story, info_dict)
+        yield from story
         
-        # Tabla de tutorías
-        if tutorias:
-            headers = ["Fecha", "Estudiante", "Motivo", "Tipo"]
-            data = []
-            for tut in tutorias:
-                estudiante = f"{tut.get('nombre', '')} {tut.get('apellido_p', '')}"
-                data.append([
-                    tut.get('fecha', 'N/A'),
-                    estudiante,
-                    tut.get('motivo', 'N/A'),
-                    tut.get('tipo', 'Individual'),
-                ])
-            
-            self._create_data_table(story, headers, data, "DETALLE DE TUTORÍAS")
+        # Tabla de tutorías, por segmentos; el resumen se acumula al recorrerlas
+        headers = ["Fecha", "Estudiante", "Motivo", "Tipo"]
+        motives = Counter()
+        total = 0
+        data = []
         
+        def emit_segment(rows, first):
+            if first:
+                title = []
+                self._create_table_title(title, "DETALLE DE TUTORÍAS")
+                yield from title
+            yield self._create_table_segment(headers, rows, with_header=first)
+            if progress:
+                progress(total)
+        
+        for tut in tutorias:
+            motivo = _campo(tut, 'motivo', 'N/A')
+            motives[motivo] += 1
+            data.append([
+                _campo(tut, 'fecha', 'N/A'),
+                f"{_campo(tut, 'nombre', '')} {_campo(tut, 'apellido_p', '')}",
+                motivo,
+                _campo(tut, 'tipo', 'Individual'),
+            ])
+            total += 1
+            if len(data) == segment_size:
+                yield from emit_segment(data, first=total == segment_size)
+                data = []
+        if data:
+            yield from emit_segment(data, first=total == len(data))
+        if total:
+            yield Spacer(1, 0.2*inch)
+        
+        story = []
         # Resumen
         summary_dict = {
-            "Total de Tutorías": len(tutorias),
-            "Motivos Principales": self._get_main_motives(tutorias),
+            "Total de Tutorías": total,
+            "Motivos Principales": self._format_main_motives(motives),
         }
         self._create_summary_section(story, summary_dict)
-        
-        # Pie de página
-        self._create_footer(story)
-        
-        # Generar PDF
-        doc.build(story)
-        
-        if filename is None:
-            buffer.seek(0)
-            return buffer
-        return filename
+        yield from story
+    
+    @staticmethod
+    def _truncate(text, limit):
+        """Recorta un texto largo para una celda de tabla"""
+        return text[:limit] + "..." if len(text) > limit else text
     
     @staticmethod
     def _get_main_motives(tutorias, limit=3):
         """Obtiene los motivos principales de una lista de tutorías"""
-        motives = {}
-        for tut in tutorias:
-            motivo = tut.get('motivo', 'N/A')
-            motives[motivo] = motives.get(motivo, 0) + 1
-        
-        sorted_motives = sorted(motives.items(), key=lambda x: x[1], reverse=True)
-        main_motives = ", ".join([f"{m[0]} ({m[1]})" for m in sorted_motives[:limit]])
+        motives = Counter(tut.get('motivo', 'N/A') for tut in tutorias)
+        return PDFReportGenerator._format_main_motives(motives, limit)
+    
+    @staticmethod
+    def _format_main_motives(motives, limit=3):
+        """Da formato a los motivos más frecuentes de un Counter de motivos"""
+        main_motives = ", ".join([f"{m[0]} ({m[1]})" for m in motives.most_common(limit)])
         return main_motives if main_motives else "N/A"
@@ -0,0 +1,151 @@
+"""
+Módulo de Caché de Reportes
+Guarda los PDF generados en un directorio direccionado por contenido: la clave de cada
+archivo resume el tipo de reporte, sus parámetros y la huella de las filas de origen, así
+que un reporte cuyos datos no cambiaron se entrega sin volver a generarlo. El directorio
+tiene un tamaño máximo y descarta primero los archivos usados hace más tiempo (LRU)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+# Tamaño máximo de la caché en MB
+CAPACIDAD_MB = float(os.environ.get('TUTORIAS_CACHE_REPORTES_MB', 200))
+
+# Tablas de origen de los reportes. Las altas ya cambian la huella (conteo y máximo id, que
+# AUTOINCREMENT nunca repite) y las bajas el conteo. Cada edición estampa la fila en
+# versiones_filas con la siguiente versión de su tabla (triggers): la huella de un reporte
+# toma el máximo de las versiones de sus propias filas, así editar otras no lo invalida
+TABLAS_VERSIONADAS = ('tutoria', 'tutoria_grupal', 'estudiantes')
+
+_SUBIR_VERSION = "UPDATE versiones_datos SET version = version + 1 WHERE tabla = '{tabla}'"
+
+_TRIGGERS_VERSION = {
+    'au': """
+        CREATE TRIGGER version_{tabla}_au AFTER UPDATE ON {tabla} BEGIN
+            {subir};
+            INSERT OR REPLACE INTO versiones_filas (tabla, fila, version)
+            VALUES ('{tabla}', new.id, (SELECT version FROM versiones_datos WHERE tabla = '{tabla}'));
+        END
+    """,
+    'ad': """
+        CREATE TRIGGER version_{tabla}_ad AFTER DELETE ON {tabla} BEGIN
+            DELETE FROM versiones_filas WHERE tabla = '{tabla}' AND fila = old.id;
+        END
+    """,
+}
+
+
+def crear_tabla_versiones(conn):
+    """Crea las tablas de versiones de datos y los triggers que las mantienen (no hace commit)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS versiones_datos (
+            tabla TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    # Última versión de cada fila editada (las que nunca se editaron no tienen entrada)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS versiones_filas (
+            tabla TEXT NOT NULL,
+            fila INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY (tabla, fila)
+        ) WITHOUT ROWID
+    """)
+    for tabla in TABLAS_VERSIONADAS:
+        conn.execute("INSERT OR IGNORE INTO versiones_datos (tabla, version) VALUES (?, 0)", (tabla,))
+        # Se recrean siempre: las bases anteriores tienen triggers que solo subían la versión de la tabla
+        for sufijo, plantilla in _TRIGGERS_VERSION.items():
+            conn.execute(f"DROP TRIGGER IF EXISTS version_{tabla}_{sufijo}")
+            conn.execute(plantilla.format(tabla=tabla, subir=_SUBIR_VERSION.format(tabla=tabla)))
+
+
+def eliminar_triggers_versiones(conn):
+    """Quita los triggers de versión (migraciones masivas que no cambian el contenido de los reportes)"""
+    for tabla in TABLAS_VERSIONADAS:
+        for sufijo in _TRIGGERS_VERSION:
+            conn.execute(f"DROP TRIGGER IF EXISTS version_{tabla}_{sufijo}")
+
+
+def clave_reporte(tipo, parametros, huella):
+    """Clave de caché (sha256) de un reporte; también es su ETag"""
+    contenido = json.dumps([tipo, parametros, huella], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+class ReportCache:
+    """
+    Directorio de PDF por clave con tamaño acotado. Cada lectura actualiza la fecha de
+    modificación del archivo; al superar la capacidad se eliminan los de fecha más antigua.
+    Los archivos se escriben con os.replace, así un lector nunca ve un PDF a medias.
+    """
+
+    def __init__(self, directorio, capacidad_mb=CAPACIDAD_MB):
+        self.directorio = directorio
+        self.capacidad = int(capacidad_mb * 1024 * 1024)
+        self._candado = threading.Lock()
+
+    def ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}.pdf")
+
+    def obtener(self, clave):
+        """Ruta del PDF guardado con la clave (marcado como usado) o None"""
+        ruta = self.ruta(clave)
+        try:
+            os.utime(ruta)
+        except FileNotFoundError:
+            return None
+        return ruta
+
+    def guardar(self, clave, origen):
+        """Agrega a la caché el PDF `origen` con la clave y recorta el directorio a la capacidad"""
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = f"{self.ruta(clave)}.{threading.get_ident()}.tmp"
+        _enlazar(origen, temporal)
+        os.replace(temporal, self.ruta(clave))
+        self.recortar()
+
+    def recortar(self):
+        """
+        Elimina los archivos usados hace más tiempo hasta quedar dentro de la capacidad.
+
+        Returns:
+            int: Archivos eliminados
+        """
+        with self._candado:
+            archivos = []
+            for entrada in os.scandir(self.directorio):
+                if entrada.name.endswith('.pdf'):
+                    try:
+                        estado = entrada.stat()
+                    except FileNotFoundError:
+                        continue
+                    archivos.append((estado.st_mtime, estado.st_size, entrada.path))
+            total = sum(tamano for _, tamano, _ in archivos)
+            eliminados = 0
+            for _, tamano, ruta in sorted(archivos):
+                if total <= self.capacidad:
+                    break
+                try:
+                    os.remove(ruta)
+                except FileNotFoundError:
+                    pass
+                total -= tamano
+                eliminados += 1
+            return eliminados
+
+
+def _enlazar(origen, destino):
+    """Enlace duro de origen en destino; copia el archivo si no se puede enlazar"""
+    if os.path.exists(destino):
+        os.remove(destino)
+    try:
+        os.link(origen, destino)
+    except OSError as error:
+        if isinstance(error, FileNotFoundError):
+            raise
+        shutil.copyfile(origen, destino)
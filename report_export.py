@@ -0,0 +1,194 @@
+"""
+Módulo de Exportación Masiva de Reportes
+Genera el reporte individual de todos los estudiantes de un grupo o carrera en un solo
+ZIP. El grupo de estudiantes y sus tutorías se leen con una sola consulta; cada PDF se
+construye en un proceso aparte y se escribe en el ZIP en cuanto termina, sin acumular
+los reportes en memoria
+"""
+
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import groupby
+
+from carga_diferida import pdf
+from database import recorrer_en_lotes
+
+# Reportes en espera por proceso: acota la memoria aunque el ZIP se escriba más lento
+EN_VUELO_POR_PROCESO = 2
+
+# Nombre del archivo, dentro del ZIP, con los estudiantes cuyo reporte falló
+ARCHIVO_ERRORES = 'errores.txt'
+
+
+# Columnas del estudiante y de sus tutorías que leen los reportes individuales
+_COLUMNAS_REPORTE = """
+    SELECT e.id, e.matricula, e.nombre, e.apellido_p, e.apellido_m, e.carrera, e.cuatrimestre_actual,
+           t.id AS tutoria_id, t.fecha, t.motivo, t.descripcion
+    FROM estudiantes e
+    LEFT JOIN tutoria t ON t.estudiante_id = e.id
+"""
+
+
+def _parametros_cohorte(grupo=None, carrera=None):
+    if not grupo and not carrera:
+        raise ValueError("Indica un grupo o una carrera para la exportación.")
+    return [valor for valor in (grupo, carrera) if valor]
+
+
+def contar_cohorte(db, grupo=None, carrera=None):
+    """Estudiantes que incluye la exportación"""
+    params = _parametros_cohorte(grupo, carrera)
+    query = "SELECT COUNT(*) FROM estudiantes e WHERE 1=1"
+    if grupo:
+        query += " AND e.grupo = ?"
+    if carrera:
+        query += " AND e.carrera = ?"
+    return db.execute(query, params).fetchone()[0]
+
+
+def leer_cohorte(db, grupo=None, carrera=None):
+    """
+    Recorre (estudiante, tutorías) de la cohorte con una sola consulta. Las filas llegan
+    ordenadas por estudiante y se agrupan al vuelo, así solo un estudiante está en memoria.
+    """
+    params = _parametros_cohorte(grupo, carrera)
+    query = _COLUMNAS_REPORTE + " WHERE 1=1"
+    if grupo:
+        query += " AND e.grupo = ?"
+    if carrera:
+        query += " AND e.carrera = ?"
+    query += " ORDER BY e.apellido_p, e.apellido_m, e.nombre, e.id, t.fecha DESC"
+
+    filas = recorrer_en_lotes(db.execute(query, params))
+    for _, filas_estudiante in groupby(filas, key=lambda fila: fila['id']):
+        yield _estudiante_y_tutorias(list(filas_estudiante))
+
+
+def leer_estudiante(db, estudiante_id):
+    """
+    (estudiante, tutorías) de un estudiante con una sola consulta por el índice de
+    estudiante_id, o None si no existe
+    """
+    filas = db.execute(
+        _COLUMNAS_REPORTE + " WHERE e.id = ? ORDER BY t.fecha DESC", (estudiante_id,)
+    ).fetchall()
+    return _estudiante_y_tutorias(filas) if filas else None
+
+
+def _estudiante_y_tutorias(filas):
+    tutorias = [
+        {'fecha': f['fecha'], 'motivo': f['motivo'], 'descripcion': f['descripcion']}
+        for f in filas if f['tutoria_id'] is not None
+    ]
+    return dict(filas[0]), tutorias
+
+
+def datos_estudiante(estudiante, tutor=None):
+    """Diccionario student_data de PDFReportGenerator.generate_student_report"""
+    return {
+        'nombre': estudiante['nombre'],
+        'apellido_p': estudiante['apellido_p'],
+        'apellido_m': estudiante['apellido_m'],
+        'matricula': estudiante['matricula'],
+        'carrera': estudiante['carrera'] or 'No especificada',
+        'cuatrimestre': estudiante['cuatrimestre_actual'],
+        'tutor': tutor,
+    }
+
+
+def nombre_archivo(estudiante):
+    """Nombre del PDF de un estudiante dentro del ZIP"""
+    partes = [estudiante['matricula'], estudiante['apellido_p'], estudiante['nombre']]
+    texto = '_'.join(str(p) for p in partes if p)
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in texto) + '.pdf'
+
+
+def _generar_reporte(estudiante, tutorias, tutor):
+    """Se ejecuta en un proceso del grupo: devuelve el PDF como bytes"""
+    return pdf.PDFReportGenerator().generate_student_report(datos_estudiante(estudiante, tutor), tutorias).getvalue()
+
+
+def exportar_reportes(db, destino, grupo=None, carrera=None, tutor=None, procesos=None, progreso=None):
+    """
+    Escribe en `destino` (ruta o archivo abierto) un ZIP con el reporte de cada estudiante
+    de la cohorte. Si el reporte de un estudiante falla, los demás continúan y la falla
+    se anota en errores.txt dentro del ZIP.
+
+    Args:
+        procesos: Procesos de generación (por defecto, los núcleos disponibles)
+        progreso: Función opcional (terminados, total) que se llama tras cada reporte
+
+    Returns:
+        tuple: (reportes generados, [(estudiante, error)])
+    """
+    total = contar_cohorte(db, grupo, carrera)
+    procesos = procesos or os.cpu_count() or 1
+    generados, fallidos = 0, []
+
+    # spawn: los procesos no heredan hilos ni conexiones del servidor web
+    contexto = multiprocessing.get_context('spawn')
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_STORED) as archivo_zip, \
+            ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as executor:
+        pendientes = {}
+
+        def recoger(bloquear):
+            nonlocal generados
+            if bloquear:
+                listos = wait(pendientes, return_when=FIRST_COMPLETED).done
+            else:
+                listos = [futuro for futuro in pendientes if futuro.done()]
+            for futuro in listos:
+                estudiante = pendientes.pop(futuro)
+                try:
+                    archivo_zip.writestr(nombre_archivo(estudiante), futuro.result())
+                    generados += 1
+                except Exception as error:
+                    fallidos.append((estudiante, error))
+                if progreso:
+                    progreso(generados + len(fallidos), total)
+
+        for estudiante, tutorias in leer_cohorte(db, grupo, carrera):
+            if len(pendientes) >= procesos * EN_VUELO_POR_PROCESO:
+                recoger(bloquear=True)
+            pendientes[executor.submit(_generar_reporte, estudiante, tutorias, tutor)] = estudiante
+            recoger(bloquear=False)
+        while pendientes:
+            recoger(bloquear=True)
+
+        if fallidos:
+            archivo_zip.writestr(ARCHIVO_ERRORES, '\n'.join(
+                f"{e['matricula']} {e['nombre']} {e['apellido_p']}: {error}" for e, error in fallidos
+            ))
+    return generados, fallidos
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from database import DATABASE, conectar
+
+    parser = argparse.ArgumentParser(description="Exporta en un ZIP el reporte PDF de cada estudiante de un grupo o carrera")
+    parser.add_argument('--db', default=DATABASE, help=f"Ruta de la base de datos (por defecto: {DATABASE})")
+    parser.add_argument('--grupo', help="Grupo de los estudiantes (columna estudiantes.grupo)")
+    parser.add_argument('--carrera', help="Carrera de los estudiantes")
+    parser.add_argument('--tutor', help="Nombre del tutor que aparece en los reportes")
+    parser.add_argument('--procesos', type=int, help="Procesos de generación (por defecto: núcleos disponibles)")
+    parser.add_argument('--salida', default='reportes_estudiantes.zip', help="Archivo ZIP de salida")
+    args = parser.parse_args()
+    if not args.grupo and not args.carrera:
+        parser.error("indica --grupo o --carrera")
+
+    conn = conectar(args.db)
+    try:
+        generados, fallidos = exportar_reportes(
+            conn, args.salida, args.grupo, args.carrera, args.tutor, args.procesos,
+            progreso=lambda hechos, total: print(f"\r  {hechos}/{total} reportes", end='', flush=True)
+        )
+        print()
+        print(f"✅ {generados} reportes exportados en {args.salida}.")
+        for estudiante, error in fallidos:
+            print(f"  ❌ {estudiante['matricula']}: {error}")
+    finally:
+        conn.close()
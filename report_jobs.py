@@ -0,0 +1,543 @@
+"""
+Módulo de Trabajos de Reportes
+Genera los reportes PDF en segundo plano con un grupo acotado de hilos. El estado de cada
+trabajo se guarda en la tabla trabajos_reporte (sobrevive a reinicios) y los archivos
+terminados se borran al vencer su vigencia. Un reporte cuyas filas de origen no cambiaron
+se toma de la caché de reportes sin volver a generarlo
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import metricas
+from carga_diferida import pdf
+from database import DATABASE, ConnectionManager, recorrer_en_lotes
+from report_export import contar_cohorte, datos_estudiante, exportar_reportes, leer_estudiante
+from report_cache import ReportCache, clave_reporte, crear_tabla_versiones
+from utils import calendario
+
+# Fallas de los hilos de la cola (nadie lee el resultado de sus futuros)
+registro = logging.getLogger('tutorias.reportes')
+
+# Directorio de los PDF generados, hilos de generación y horas que se conserva cada archivo
+DIRECTORIO_REPORTES = os.environ.get('TUTORIAS_REPORTES_DIR', 'reportes')
+TRABAJADORES = int(os.environ.get('TUTORIAS_REPORTES_TRABAJADORES', 2))
+VIGENCIA_HORAS = float(os.environ.get('TUTORIAS_REPORTES_VIGENCIA_HORAS', 24))
+# Minutos entre barridos de los reportes vencidos con el servidor en marcha
+LIMPIEZA_MINUTOS = float(os.environ.get('TUTORIAS_REPORTES_LIMPIEZA_MIN', 10))
+
+# El progreso se guarda solo cuando avanza al menos este porcentaje
+PASO_PROGRESO = 5
+
+# Extensión y tipo MIME del archivo de cada tipo de trabajo (por defecto, PDF)
+FORMATOS = {
+    'lote': ('zip', 'application/zip'),
+}
+FORMATO_PDF = ('pdf', 'application/pdf')
+
+PENDIENTE = 'pendiente'
+EN_PROCESO = 'en_proceso'
+TERMINADO = 'terminado'
+ERROR = 'error'
+
+
+def crear_tabla_trabajos(conn):
+    """Crea la tabla de trabajos de reporte, sus índices y las versiones de datos de la caché (no hace commit)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS trabajos_reporte (
+            id TEXT PRIMARY KEY,
+            tipo TEXT NOT NULL,
+            parametros TEXT NOT NULL,
+            usuario TEXT,
+            estado TEXT NOT NULL,
+            progreso INTEGER NOT NULL DEFAULT 0,
+            mensaje TEXT,
+            nombre_descarga TEXT,
+            clave TEXT,
+            creado TEXT NOT NULL,
+            iniciado TEXT,
+            terminado TEXT,
+            expira TEXT
+        )
+    """)
+    # Bases creadas antes de la caché de reportes
+    columnas = [fila[1] for fila in conn.execute("PRAGMA table_info(trabajos_reporte)")]
+    if 'clave' not in columnas:
+        conn.execute("ALTER TABLE trabajos_reporte ADD COLUMN clave TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_trabajos_reporte_estado ON trabajos_reporte(estado, creado)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_trabajos_reporte_expira ON trabajos_reporte(expira)")
+    # Descarga estable de la caché (/reportes/cache/<clave>)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_trabajos_reporte_clave ON trabajos_reporte(clave)")
+    crear_tabla_versiones(conn)
+
+
+def _ahora():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+# ---------------------------
+# Generadores por tipo de reporte: (db, parámetros, ruta destino, progreso) -> nombre de descarga
+# ---------------------------
+
+def _reporte_estudiante(db, parametros, destino, progreso):
+    # Tutoría cuyo estudiante no está registrado en estudiantes (id de la tutoría)
+    if 'estudiante_id' not in parametros:
+        return _reporte_estudiante_por_nombre(db, parametros, destino, progreso)
+
+    # Estudiante y tutorías en una sola consulta por el índice de estudiante_id
+    leido = leer_estudiante(db, parametros['estudiante_id'])
+    if leido is None:
+        raise LookupError("Estudiante no encontrado.")
+    estudiante, tutorias = leido
+    progreso(0.5)
+    pdf.PDFReportGenerator().generate_student_report(datos_estudiante(estudiante, parametros.get('tutor')), tutorias, destino)
+    return f"Reporte_Tutorias_{estudiante['nombre']}_{estudiante['apellido_p']}.pdf"
+
+
+def _reporte_estudiante_por_nombre(db, parametros, destino, progreso):
+    """Tutorías sin estudiante_id (conservan su copia del nombre): se reúnen por nombre a partir de una de ellas"""
+    tutoria = db.execute("SELECT * FROM tutoria WHERE id = ?", (parametros['student_id'],)).fetchone()
+    if not tutoria:
+        raise LookupError("Estudiante no encontrado.")
+
+    # Todas las tutorías del estudiante
+    tutorias = db.execute(
+        "SELECT * FROM tutoria WHERE nombre = ? AND apellido_p = ? AND apellido_m = ? ORDER BY fecha DESC",
+        (tutoria['nombre'], tutoria['apellido_p'], tutoria['apellido_m'])
+    ).fetchall()
+
+    student_data = {
+        'nombre': tutoria['nombre'],
+        'apellido_p': tutoria['apellido_p'],
+        'apellido_m': tutoria['apellido_m'],
+        'matricula': tutoria['matricula'],
+        'cuatrimestre': tutoria['cuatrimestre'],
+        'carrera': 'No especificada',
+        'tutor': parametros.get('tutor'),
+    }
+    progreso(0.5)
+    pdf.PDFReportGenerator().generate_student_report(student_data, [dict(t) for t in tutorias], destino)
+    return f"Reporte_Tutorias_{tutoria['nombre']}_{tutoria['apellido_p']}.pdf"
+
+
+def _reporte_grupo(db, parametros, destino, progreso):
+    grupo = db.execute("SELECT * FROM tutoria_grupal WHERE id = ?", (parametros['group_id'],)).fetchone()
+    if not grupo:
+        raise LookupError("Grupo no encontrado.")
+
+    tutorias_grupales = db.execute(
+        "SELECT * FROM tutoria_grupal WHERE grupo_nombre = ? ORDER BY fecha DESC",
+        (grupo['grupo_nombre'],)
+    ).fetchall()
+
+    group_data = {
+        'grupo_nombre': grupo['grupo_nombre'],
+        'carrera': grupo['carrera'],
+        'cuatrimestre': grupo['cuatrimestre'],
+    }
+    progreso(0.5)
+    pdf.PDFReportGenerator().generate_group_report(group_data, [dict(t) for t in tutorias_grupales], destino)
+    return f"Reporte_Tutorias_Grupo_{grupo['grupo_nombre']}.pdf"
+
+
+def _periodos_academicos(start_date, end_date):
+    """Períodos académicos que cubre el rango (ej. 'Enero - Abril 2026, Mayo - Agosto 2026')"""
+    try:
+        return ', '.join(periodo.etiqueta for periodo in calendario.periodos_entre(start_date, end_date)) or 'N/A'
+    except (TypeError, ValueError, KeyError):
+        return 'N/A'
+
+
+def _reporte_periodo(db, parametros, destino, progreso):
+    start_date, end_date = parametros['start_date'], parametros['end_date']
+    cuatrimestre = parametros.get('cuatrimestre', '')
+
+    # Nota: La tabla tutoria no tiene columna 'carrera', solo 'cuatrimestre'. Los nombres
+    # salen de la vista (estudiantes o la copia de las tutorías sin estudiante)
+    query = "SELECT fecha, nombre, apellido_p, motivo FROM vista_tutoria WHERE fecha >= ? AND fecha <= ?"
+    conteo = "SELECT COUNT(*) FROM tutoria WHERE fecha >= ? AND fecha <= ?"
+    params = [start_date, end_date]
+    if cuatrimestre:
+        query += " AND cuatrimestre = ?"
+        conteo += " AND cuatrimestre = ?"
+        params.append(cuatrimestre)
+    query += " ORDER BY fecha DESC"
+
+    total = db.execute(conteo, params).fetchone()[0]
+    # El cursor se recorre por lotes mientras se construye el PDF
+    tutorias = recorrer_en_lotes(db.execute(query, params))
+    period_data = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'periodo': _periodos_academicos(start_date, end_date),
+        'carrera': parametros.get('carrera') or 'Todas',
+        'cuatrimestre': cuatrimestre or 'Todos',
+    }
+    pdf.PDFReportGenerator().generate_period_report(
+        period_data, tutorias, destino, progress=lambda filas: progreso(filas / total) if total else None
+    )
+    return f"Reporte_Periodo_{start_date}_a_{end_date}.pdf"
+
+
+# ---------------------------
+# Huellas de las filas de origen: (db, parámetros) -> (nombre de descarga, huella) o None.
+# La huella (conteo, máximo id y máxima versión de fila, ver report_cache.py) solo cambia con
+# las altas, ediciones y bajas de las filas que usa el reporte, no con las de otros reportes
+# ---------------------------
+
+def _huella_estudiante(db, parametros):
+    if 'estudiante_id' not in parametros:
+        return _huella_estudiante_por_nombre(db, parametros)
+    # Los datos del estudiante también aparecen en el reporte
+    estudiante = db.execute(
+        "SELECT nombre, apellido_p, apellido_m, matricula, carrera, cuatrimestre_actual FROM estudiantes WHERE id = ?",
+        (parametros['estudiante_id'],)
+    ).fetchone()
+    if not estudiante:
+        return None
+    conteo, maximo, version = db.execute(
+        "SELECT COUNT(*), MAX(t.id), MAX(v.version) FROM tutoria t "
+        "LEFT JOIN versiones_filas v ON v.tabla = 'tutoria' AND v.fila = t.id "
+        "WHERE t.estudiante_id = ?", (parametros['estudiante_id'],)
+    ).fetchone()
+    nombre = f"Reporte_Tutorias_{estudiante['nombre']}_{estudiante['apellido_p']}.pdf"
+    return nombre, [list(estudiante), conteo, maximo, version]
+
+
+def _huella_estudiante_por_nombre(db, parametros):
+    tutoria = db.execute(
+        "SELECT nombre, apellido_p, apellido_m FROM tutoria WHERE id = ?", (parametros['student_id'],)
+    ).fetchone()
+    if not tutoria:
+        return None
+    conteo, maximo, version = db.execute(
+        "SELECT COUNT(*), MAX(t.id), MAX(v.version) FROM tutoria t "
+        "LEFT JOIN versiones_filas v ON v.tabla = 'tutoria' AND v.fila = t.id "
+        "WHERE t.nombre = ? AND t.apellido_p = ? AND t.apellido_m = ?",
+        (tutoria['nombre'], tutoria['apellido_p'], tutoria['apellido_m'])
+    ).fetchone()
+    nombre = f"Reporte_Tutorias_{tutoria['nombre']}_{tutoria['apellido_p']}.pdf"
+    return nombre, [conteo, maximo, version]
+
+
+def _huella_grupo(db, parametros):
+    grupo = db.execute("SELECT grupo_nombre FROM tutoria_grupal WHERE id = ?", (parametros['group_id'],)).fetchone()
+    if not grupo:
+        return None
+    conteo, maximo, version = db.execute(
+        "SELECT COUNT(*), MAX(g.id), MAX(v.version) FROM tutoria_grupal g "
+        "LEFT JOIN versiones_filas v ON v.tabla = 'tutoria_grupal' AND v.fila = g.id "
+        "WHERE g.grupo_nombre = ?", (grupo['grupo_nombre'],)
+    ).fetchone()
+    nombre = f"Reporte_Tutorias_Grupo_{grupo['grupo_nombre']}.pdf"
+    return nombre, [conteo, maximo, version]
+
+
+def _huella_periodo(db, parametros):
+    start_date, end_date = parametros['start_date'], parametros['end_date']
+    # Los nombres salen de estudiantes: también cuenta la versión de los estudiantes del rango
+    huella = ("SELECT COUNT(*), MAX(t.id), MAX(vt.version), MAX(ve.version) FROM tutoria t "
+              "LEFT JOIN versiones_filas vt ON vt.tabla = 'tutoria' AND vt.fila = t.id "
+              "LEFT JOIN versiones_filas ve ON ve.tabla = 'estudiantes' AND ve.fila = t.estudiante_id "
+              "WHERE t.fecha >= ? AND t.fecha <= ?")
+    params = [start_date, end_date]
+    if parametros.get('cuatrimestre'):
+        huella += " AND t.cuatrimestre = ?"
+        params.append(parametros['cuatrimestre'])
+    conteo, maximo, version, version_estudiantes = db.execute(huella, params).fetchone()
+    nombre = f"Reporte_Periodo_{start_date}_a_{end_date}.pdf"
+    return nombre, [conteo, maximo, version, version_estudiantes, _periodos_academicos(start_date, end_date)]
+
+
+HUELLAS = {
+    'estudiante': _huella_estudiante,
+    'grupo': _huella_grupo,
+    'periodo': _huella_periodo,
+}
+
+
+def clave_trabajo(db, tipo, parametros):
+    """
+    (clave de caché, nombre de descarga) del reporte, o (None, None) si sus datos no
+    existen o el tipo no se guarda en la caché
+    """
+    origen = HUELLAS[tipo](db, parametros) if tipo in HUELLAS else None
+    if origen is None:
+        return None, None
+    nombre, huella = origen
+    return clave_reporte(tipo, parametros, huella), nombre
+
+
+def _reporte_lote(db, parametros, destino, progreso):
+    grupo, carrera = parametros.get('grupo'), parametros.get('carrera')
+    if not contar_cohorte(db, grupo, carrera):
+        raise LookupError("No hay estudiantes con ese grupo o carrera.")
+    exportar_reportes(db, destino, grupo, carrera, parametros.get('tutor'),
+                      progreso=lambda hechos, total: progreso(hechos / total))
+    return f"Reportes_Estudiantes_{grupo or carrera}.zip"
+
+
+GENERADORES = {
+    'estudiante': _reporte_estudiante,
+    'grupo': _reporte_grupo,
+    'periodo': _reporte_periodo,
+    'lote': _reporte_lote,
+}
+
+
+class ReportJobQueue:
+    """
+    Cola de trabajos de reporte: las rutas encolan y responden de inmediato; un grupo de
+    TRABAJADORES hilos construye los PDF en DIRECTORIO_REPORTES. Cada hilo toma una conexión
+    del grupo de la cola (ConnectionManager, una por hilo) y toma el trabajo con un UPDATE
+    condicional, así un trabajo nunca se genera dos veces. Si la caché (por defecto DIRECTORIO_REPORTES/cache)
+    ya tiene el reporte con la misma clave, el trabajo se registra terminado sin generarse ni
+    copiarse: su archivo es el de la caché.
+    """
+
+    def __init__(self, database=DATABASE, directorio=DIRECTORIO_REPORTES, trabajadores=TRABAJADORES,
+                 vigencia_horas=VIGENCIA_HORAS, cache=None):
+        self.gestor = ConnectionManager(database, tamano=trabajadores)
+        self.directorio = directorio
+        self.cache = cache if cache is not None else ReportCache(os.path.join(directorio, 'cache'))
+        self.vigencia = timedelta(hours=vigencia_horas)
+        self.trabajadores = trabajadores
+        # Los hilos se crean con el primer trabajo: importar la app no arranca ninguno
+        self._executor = None
+        self._candado = threading.Lock()
+        self._limpieza = None
+        self._detener_limpieza = threading.Event()
+
+    def ruta_archivo(self, trabajo_id, tipo=None):
+        extension, _ = FORMATOS.get(tipo, FORMATO_PDF)
+        return os.path.join(self.directorio, f"{trabajo_id}.{extension}")
+
+    def encolar(self, db, tipo, parametros, usuario=None):
+        """
+        Registra un trabajo (hace commit) y lo envía al grupo de hilos. Si el reporte está
+        en la caché el trabajo queda terminado de inmediato.
+
+        Returns:
+            str: Identificador del trabajo
+        """
+        if tipo not in GENERADORES:
+            raise ValueError(f"Tipo de reporte desconocido: {tipo}")
+        trabajo_id = uuid.uuid4().hex
+        clave, nombre = clave_trabajo(db, tipo, parametros)
+        os.makedirs(self.directorio, exist_ok=True)
+        if clave and self.cache.obtener(clave):
+            metricas.caches.acierto('reportes')
+            db.execute(
+                "INSERT INTO trabajos_reporte (id, tipo, parametros, usuario, estado, progreso, nombre_descarga, clave, "
+                "creado, iniciado, terminado, expira) VALUES (?, ?, ?, ?, ?, 100, ?, ?, ?, ?, ?, ?)",
+                (trabajo_id, tipo, json.dumps(parametros, ensure_ascii=False), usuario, TERMINADO, nombre, clave,
+                 _ahora(), _ahora(), _ahora(), (datetime.now() + self.vigencia).isoformat(timespec='seconds'))
+            )
+            db.commit()
+            self.limpiar_expirados(db)
+            return trabajo_id
+        if clave:
+            metricas.caches.fallo('reportes')
+
+        db.execute(
+            "INSERT INTO trabajos_reporte (id, tipo, parametros, usuario, estado, clave, creado) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (trabajo_id, tipo, json.dumps(parametros, ensure_ascii=False), usuario, PENDIENTE, clave, _ahora())
+        )
+        db.commit()
+        self.limpiar_expirados(db)
+        self._enviar(trabajo_id)
+        return trabajo_id
+
+    def obtener(self, db, trabajo_id):
+        """Fila del trabajo o None"""
+        return db.execute("SELECT * FROM trabajos_reporte WHERE id = ?", (trabajo_id,)).fetchone()
+
+    def ruta_resultado(self, trabajo):
+        """
+        Archivo de un trabajo terminado: el propio si no se guardó en la caché; si no, el de
+        la caché (None si ya se descartó)
+        """
+        ruta = self.ruta_archivo(trabajo['id'], trabajo['tipo'])
+        if not trabajo['clave'] or os.path.exists(ruta):
+            return ruta
+        return self.cache.obtener(trabajo['clave'])
+
+    def reanudar(self, db):
+        """
+        Al iniciar: los trabajos que quedaron en proceso (el proceso anterior terminó a medias)
+        vuelven a pendiente y todos los pendientes se envían de nuevo al grupo de hilos.
+
+        Returns:
+            int: Trabajos reanudados
+        """
+        db.execute("UPDATE trabajos_reporte SET estado = ?, progreso = 0 WHERE estado = ?", (PENDIENTE, EN_PROCESO))
+        db.commit()
+        self.limpiar_expirados(db)
+        pendientes = db.execute(
+            "SELECT id FROM trabajos_reporte WHERE estado = ? ORDER BY creado", (PENDIENTE,)
+        ).fetchall()
+        for trabajo in pendientes:
+            self._enviar(trabajo['id'])
+        return len(pendientes)
+
+    def limpiar_expirados(self, db):
+        """Borra archivos y registros vencidos (hace commit)"""
+        vencidos = db.execute(
+            "SELECT id, tipo FROM trabajos_reporte WHERE expira < ?", (_ahora(),)
+        ).fetchall()
+        for trabajo in vencidos:
+            try:
+                os.remove(self.ruta_archivo(trabajo['id'], trabajo['tipo']))
+            except FileNotFoundError:
+                pass
+        if vencidos:
+            db.executemany("DELETE FROM trabajos_reporte WHERE id = ?", [(t['id'],) for t in vencidos])
+            db.commit()
+        return len(vencidos)
+
+    def iniciar_limpieza(self, intervalo_s=LIMPIEZA_MINUTOS * 60):
+        """
+        Arranca (una sola vez) el hilo que borra los reportes vencidos cada `intervalo_s`
+        segundos; sin él solo se borran al encolar o al reanudar
+        """
+        with self._candado:
+            if self._limpieza is not None:
+                return
+            self._detener_limpieza.clear()
+            self._limpieza = threading.Thread(target=self._limpiar_periodicamente, args=(intervalo_s,),
+                                              name='reportes-limpieza', daemon=True)
+            self._limpieza.start()
+
+    def detener_limpieza(self):
+        """Detiene el hilo de limpieza y espera a que termine su barrido en curso"""
+        with self._candado:
+            hilo, self._limpieza = self._limpieza, None
+        if hilo is not None:
+            self._detener_limpieza.set()
+            hilo.join()
+
+    def _limpiar_periodicamente(self, intervalo_s):
+        while not self._detener_limpieza.wait(intervalo_s):
+            conn = None
+            try:
+                conn = self.gestor.obtener()
+                self.limpiar_expirados(conn)
+            except Exception:
+                # El siguiente barrido lo vuelve a intentar
+                registro.exception("Falló la limpieza de reportes vencidos")
+            finally:
+                if conn is not None:
+                    self.gestor.liberar(conn)
+
+    def _enviar(self, trabajo_id):
+        """Envía el trabajo al grupo de hilos, creándolo si aún no existe"""
+        with self._candado:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.trabajadores, thread_name_prefix='reportes')
+            self._executor.submit(self._ejecutar, trabajo_id)
+
+    def _ejecutar(self, trabajo_id):
+        """
+        Cuerpo de cada hilo. Cualquier excepción (también al abrir la conexión o al tomar el
+        trabajo, p. ej. 'database is locked') deja el trabajo en error: si escapara al futuro
+        del executor nadie la vería y el trabajo quedaría pendiente para siempre
+        """
+        conn = None
+        try:
+            conn = self.gestor.obtener()
+            self._procesar(conn, trabajo_id)
+        except Exception as error:
+            registro.exception("Falló el trabajo de reporte %s", trabajo_id)
+            self._marcar_error(conn, trabajo_id, error)
+        finally:
+            if conn is not None:
+                self.gestor.liberar(conn)
+
+    def _marcar_error(self, conn, trabajo_id, error):
+        """Deja en error un trabajo que no terminó (hace commit); con vigencia, para que venza"""
+        try:
+            if conn is None:
+                conn = self.gestor.obtener()
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute(
+                "UPDATE trabajos_reporte SET estado = ?, mensaje = ?, terminado = ?, expira = ? "
+                "WHERE id = ? AND estado IN (?, ?)",
+                (ERROR, str(error), _ahora(), (datetime.now() + self.vigencia).isoformat(timespec='seconds'),
+                 trabajo_id, PENDIENTE, EN_PROCESO)
+            )
+            conn.commit()
+        except sqlite3.Error:
+            # Queda en proceso y reanudar() lo vuelve a enviar en el siguiente inicio
+            registro.exception("No se pudo marcar con error el trabajo %s", trabajo_id)
+
+    def _procesar(self, conn, trabajo_id):
+        """Toma el trabajo con un UPDATE condicional y genera el reporte"""
+        tomado = conn.execute(
+            "UPDATE trabajos_reporte SET estado = ?, iniciado = ?, progreso = 0 WHERE id = ? AND estado = ?",
+            (EN_PROCESO, _ahora(), trabajo_id, PENDIENTE)
+        ).rowcount
+        conn.commit()
+        if not tomado:
+            return
+        trabajo = self.obtener(conn, trabajo_id)
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = self.ruta_archivo(trabajo_id, trabajo['tipo'])
+
+        guardado = [0]
+
+        def progreso(fraccion):
+            porcentaje = min(99, int(fraccion * 100))
+            if porcentaje - guardado[0] >= PASO_PROGRESO:
+                guardado[0] = porcentaje
+                conn.execute("UPDATE trabajos_reporte SET progreso = ? WHERE id = ?", (porcentaje, trabajo_id))
+                conn.commit()
+
+        inicio = time.perf_counter()
+        try:
+            nombre = GENERADORES[trabajo['tipo']](conn, json.loads(trabajo['parametros']), ruta, progreso)
+        except Exception as error:
+            metricas.errores_reportes.incrementar(trabajo['tipo'])
+            conn.rollback()
+            if os.path.exists(ruta):
+                os.remove(ruta)
+            # Los trabajos con error también vencen para no acumularse
+            self._marcar_error(conn, trabajo_id, error)
+            return
+        metricas.duracion_reportes.observar(time.perf_counter() - inicio, trabajo['tipo'])
+
+        # Solo se guarda en la caché si los datos no cambiaron mientras se generaba
+        parametros = json.loads(trabajo['parametros'])
+        if trabajo['clave'] and clave_trabajo(conn, trabajo['tipo'], parametros)[0] == trabajo['clave']:
+            try:
+                self.cache.guardar(trabajo['clave'], ruta)
+                # Se descarga desde la caché; una segunda copia por trabajo sobra (salvo que
+                # el recorte ya lo haya descartado, p. ej. un PDF mayor que la capacidad)
+                if self.cache.obtener(trabajo['clave']):
+                    os.remove(ruta)
+            except OSError:
+                # Sin caché el reporte se vuelve a generar la próxima vez
+                pass
+
+        conn.execute(
+            "UPDATE trabajos_reporte SET estado = ?, progreso = 100, nombre_descarga = ?, terminado = ?, expira = ? "
+            "WHERE id = ?",
+            (TERMINADO, nombre, _ahora(), (datetime.now() + self.vigencia).isoformat(timespec='seconds'), trabajo_id)
+        )
+        conn.commit()
+
+    def esperar(self):
+        """Espera a que terminen los trabajos enviados y cierra el grupo de hilos (pruebas y CLI)"""
+        self.detener_limpieza()
+        with self._candado:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self.gestor.cerrar_todas()
@@ -6,20 +6,22 @@ Proporciona funciones para clasificar estudiantes según su nivel de riesgo acad
 from collections import defaultdict
 from datetime import datetime, timedelta
 
+from motivo_classifier import MOTIVO_PESOS, obtener_clasificador
+
+
+def puntos_cubeta(valor, cubetas, defecto=0):
+    """Puntos de la primera cubeta (mínimo, puntos) cuyo mínimo alcanza el valor; `defecto` si ninguna"""
+    for minimo, puntos in cubetas:
+        if valor >= minimo:
+            return puntos
+    return defecto
+
+
 class RiskAssessmentEngine:
     """Motor de evaluación de riesgo académico"""
     
     # Pesos y criterios de clasificación
-    MOTIVO_PESOS = {
-        'baja calificación': 3,
-        'inasistencias': 3,
-        'problemas de conducta': 2,
-        'reforzamiento de materia': 1,
-        'asesoría general': 1,
-        'bajo desempeño': 3,
-        'falta de motivación': 2,
-        'dificultades académicas': 2,
-    }
+    MOTIVO_PESOS = MOTIVO_PESOS
     
     FRECUENCIA_THRESHOLDS = {
         'alto': 5,      # >= 5 tutorías
@@ -39,9 +41,28 @@ class RiskAssessmentEngine:
         'bajo': 0       # 0
     }
     
+    # Puntos de la puntuación por nivel de los *_THRESHOLDS ('bajo': por debajo de 'medio')
+    FRECUENCIA_PUNTOS = {'alto': 8, 'medio': 4, 'bajo': 1}
+    INDICADOR_PUNTOS = {'alto': 6, 'medio': 3, 'bajo': 0}  # Inasistencias y bajas calificaciones
+    
+    # Cubetas (mínimo, puntos) del desglose, de mayor a menor; por debajo de la última, 0.
+    # Las usan tanto el cálculo por estudiante como evaluar_lote
+    FRECUENCIA_DESGLOSE = ((7, 8), (5, 6), (3, 3), (1, 1))
+    INDICADOR_DESGLOSE = ((3, 6), (2, 4), (1, 2))  # Inasistencias y bajas calificaciones
+    
     def __init__(self):
         pass
     
+    @property
+    def clasificador(self):
+        """Clasificador de motivos compartido para la tabla MOTIVO_PESOS vigente"""
+        return obtener_clasificador(pesos=self.MOTIVO_PESOS)
+    
+    @staticmethod
+    def _cubetas_puntuacion(umbrales, puntos):
+        """(cubetas, defecto) de la puntuación a partir de unos *_THRESHOLDS y sus puntos por nivel"""
+        return ((umbrales['alto'], puntos['alto']), (umbrales['medio'], puntos['medio'])), puntos['bajo']
+    
     def calcular_desglose_puntuacion(self, tutorias, inasistencias=0, bajas_calificaciones=0):
         """
         Calcula el desglose detallado de la puntuación de riesgo
@@ -58,41 +79,19 @@ class RiskAssessmentEngine:
         }
         
         # 1. Puntuación por motivos
+        clasificar = self.clasificador.clasificar
         for tutoria in tutorias:
-            motivo = tutoria.get('motivo', '').lower()
-            for key, peso in self.MOTIVO_PESOS.items():
-                if key in motivo:
-                    desglose['motivos'] += peso
-                    break
-            else:
-                desglose['motivos'] += 1
+            clasificacion = clasificar(tutoria.get('motivo', ''))
+            desglose['motivos'] += clasificacion.peso if clasificacion.coincide_peso else 1
         
         # 2. Puntuación por frecuencia
-        num_tutorias = len(tutorias)
-        if num_tutorias >= 7:
-            desglose['frecuencia'] = 8
-        elif num_tutorias >= 5:
-            desglose['frecuencia'] = 6
-        elif num_tutorias >= 3:
-            desglose['frecuencia'] = 3
-        elif num_tutorias >= 1:
-            desglose['frecuencia'] = 1
+        desglose['frecuencia'] = puntos_cubeta(len(tutorias), self.FRECUENCIA_DESGLOSE)
         
         # 3. Puntuación por inasistencias
-        if inasistencias >= 3:
-            desglose['inasistencias'] = 6
-        elif inasistencias >= 2:
-            desglose['inasistencias'] = 4
-        elif inasistencias >= 1:
-            desglose['inasistencias'] = 2
+        desglose['inasistencias'] = puntos_cubeta(inasistencias, self.INDICADOR_DESGLOSE)
         
         # 4. Puntuación por bajas calificaciones
-        if bajas_calificaciones >= 3:
-            desglose['bajas_calificaciones'] = 6
-        elif bajas_calificaciones >= 2:
-            desglose['bajas_calificaciones'] = 4
-        elif bajas_calificaciones >= 1:
-            desglose['bajas_calificaciones'] = 2
+        desglose['bajas_calificaciones'] = puntos_cubeta(bajas_calificaciones, self.INDICADOR_DESGLOSE)
         
         desglose['total'] = sum([desglose['motivos'], desglose['frecuencia'], 
                                 desglose['inasistencias'], desglose['bajas_calificaciones']])
@@ -148,46 +147,31 @@ class RiskAssessmentEngine:
         """Calcula el peso según los motivos de las tutorías"""
         peso = 0
         motivos_encontrados = set()
+        clasificar = self.clasificador.clasificar
         
         for tutoría in tutorias:
-            motivo = tutoría.get('motivo', '').lower()
+            clasificacion = clasificar(tutoría.get('motivo', ''))
             
-            # Buscar coincidencia con palabras clave
-            for palabra_clave, peso_motivo in self.MOTIVO_PESOS.items():
-                if palabra_clave in motivo:
-                    if motivo not in motivos_encontrados:
-                        peso += peso_motivo
-                        motivos_encontrados.add(motivo)
-                    break
+            # Cada motivo distinto con palabra clave suma su peso una sola vez
+            if clasificacion.coincide_peso and clasificacion.motivo_normalizado not in motivos_encontrados:
+                peso += clasificacion.peso
+                motivos_encontrados.add(clasificacion.motivo_normalizado)
         
         return peso
     
     def _calcular_peso_frecuencia(self, num_tutorias):
         """Calcula el peso según la frecuencia de tutorías"""
-        if num_tutorias >= self.FRECUENCIA_THRESHOLDS['alto']:
-            return 8  # Alto riesgo
-        elif num_tutorias >= self.FRECUENCIA_THRESHOLDS['medio']:
-            return 4  # Medio riesgo
-        else:
-            return 1  # Bajo riesgo
+        return puntos_cubeta(num_tutorias, *self._cubetas_puntuacion(self.FRECUENCIA_THRESHOLDS, self.FRECUENCIA_PUNTOS))
     
     def _calcular_peso_inasistencias(self, num_inasistencias):
         """Calcula el peso según el número de inasistencias"""
-        if num_inasistencias >= self.INASISTENCIA_THRESHOLDS['alto']:
-            return 6  # Alto riesgo
-        elif num_inasistencias >= self.INASISTENCIA_THRESHOLDS['medio']:
-            return 3  # Medio riesgo
-        else:
-            return 0  # Bajo riesgo
+        return puntos_cubeta(num_inasistencias,
+                             *self._cubetas_puntuacion(self.INASISTENCIA_THRESHOLDS, self.INDICADOR_PUNTOS))
     
     def _calcular_peso_bajas_calificaciones(self, num_bajas_calificaciones):
         """Calcula el peso según el número de bajas calificaciones"""
-        if num_bajas_calificaciones >= self.BAJAS_CALIFICACIONES_THRESHOLDS['alto']:
-            return 6  # Alto riesgo
-        elif num_bajas_calificaciones >= self.BAJAS_CALIFICACIONES_THRESHOLDS['medio']:
-            return 3  # Medio riesgo
-        else:
-            return 0  # Bajo riesgo
+        return puntos_cubeta(num_bajas_calificaciones,
+                             *self._cubetas_puntuacion(self.BAJAS_CALIFICACIONES_THRESHOLDS, self.INDICADOR_PUNTOS))
     
     def clasificar_riesgo(self, puntuacion):
         """
@@ -307,6 +291,181 @@ class RiskAssessmentEngine:
         # Ordenar por puntuación descendente
         return sorted(evaluaciones, key=lambda x: x['puntuacion'], reverse=True)
     
+    def evaluar_lote(self, tutorias, estudiantes_info=None, fecha_inicio=None):
+        """
+        Evalúa en bloque a todos los estudiantes de un conjunto columnar de tutorías.
+        Usa operaciones vectorizadas de pandas; si pandas no está instalado recurre
+        a evaluar_multiples_estudiantes con el mismo resultado.
+        
+        Args:
+            tutorias: DataFrame (o dict de listas) con columnas student_id, motivo y fecha.
+                      El orden de las filas de cada estudiante desempata motivos_frecuentes,
+                      igual que el orden de la lista en evaluar_estudiante.
+            estudiantes_info: Dict {student_id: dict con información del estudiante} (opcional)
+            fecha_inicio: Si se indica, solo se consideran tutorías con fecha >= fecha_inicio
+        
+        Returns:
+            Lista de evaluaciones ordenadas por puntuación de riesgo, con el mismo formato
+            que evaluar_multiples_estudiantes. Solo incluye estudiantes con tutorías.
+        """
+        estudiantes_info = estudiantes_info or {}
+        try:
+            import pandas as pd  # Solo se necesita en el modo por lotes
+        except ImportError:
+            return self._evaluar_lote_sin_pandas(tutorias, estudiantes_info, fecha_inicio)
+        import numpy as np
+        
+        df = pd.DataFrame({
+            'student_id': tutorias['student_id'],
+            'motivo': tutorias['motivo'],
+            'fecha': tutorias['fecha'],
+        })
+        if df.empty:
+            # Sin filas la columna fecha queda como float64 y no se puede comparar con la fecha
+            return []
+        if fecha_inicio is not None:
+            df = df[df['fecha'].notna() & (df['fecha'] >= fecha_inicio)]
+        if df.empty:
+            return []
+        df = df.reset_index(drop=True)
+        
+        # 1. Clasificar una sola vez cada motivo distinto y propagar por código (vectorizado).
+        #    El clasificador trata un motivo NULL como ''; motivos_frecuentes conserva el NULL
+        codigos, motivos_unicos = pd.factorize(df['motivo'].fillna('').str.lower())
+        clasificar = self.clasificador.clasificar
+        clasif = [clasificar(m) for m in motivos_unicos]
+        peso_unico = np.array([c.peso for c in clasif], dtype=np.int64)
+        coincide_unico = np.array([c.coincide_peso for c in clasif], dtype=bool)
+        inasistencia_unico = np.array([c.es_inasistencia for c in clasif], dtype=np.int64)
+        baja_unico = np.array([c.es_baja_calificacion for c in clasif], dtype=np.int64)
+        
+        df['codigo'] = codigos
+        df['peso_desglose'] = np.where(coincide_unico[codigos], peso_unico[codigos], 1)
+        df['inasistencia'] = inasistencia_unico[codigos]
+        df['baja'] = baja_unico[codigos]
+        
+        # 2. Agregados por estudiante (en orden de primera aparición)
+        grupos = df.groupby('student_id', sort=False)
+        agregados = grupos.agg(
+            num_tutorias=('codigo', 'size'),
+            motivos_desglose=('peso_desglose', 'sum'),
+            inasistencias=('inasistencia', 'sum'),
+            bajas=('baja', 'sum'),
+        )
+        
+        # Peso de motivos del detalle: cada motivo distinto cuenta una vez por estudiante
+        distintos = df.drop_duplicates(['student_id', 'codigo'])
+        motivos_peso = (pd.Series(np.where(coincide_unico[distintos['codigo']], peso_unico[distintos['codigo']], 0),
+                                  index=distintos['student_id'])
+                        .groupby(level=0, sort=False).sum()
+                        .reindex(agregados.index, fill_value=0))
+        
+        n = agregados['num_tutorias'].to_numpy()
+        ina = agregados['inasistencias'].to_numpy()
+        bajas = agregados['bajas'].to_numpy()
+        
+        def cubetas(valores, cubetas, defecto=0):
+            """puntos_cubeta sobre un arreglo"""
+            return np.select([valores >= minimo for minimo, _ in cubetas], [puntos for _, puntos in cubetas], defecto)
+        
+        # 3. Cubetas del desglose (calcular_desglose_puntuacion)
+        frecuencia_desglose = cubetas(n, self.FRECUENCIA_DESGLOSE)
+        ina_desglose = cubetas(ina, self.INDICADOR_DESGLOSE)
+        bajas_desglose = cubetas(bajas, self.INDICADOR_DESGLOSE)
+        motivos_desglose = agregados['motivos_desglose'].to_numpy()
+        total_desglose = motivos_desglose + frecuencia_desglose + ina_desglose + bajas_desglose
+        
+        # 4. Cubetas de la puntuación (calcular_puntuacion_riesgo)
+        frecuencia_peso = cubetas(n, *self._cubetas_puntuacion(self.FRECUENCIA_THRESHOLDS, self.FRECUENCIA_PUNTOS))
+        ina_peso = cubetas(ina, *self._cubetas_puntuacion(self.INASISTENCIA_THRESHOLDS, self.INDICADOR_PUNTOS))
+        bajas_peso = cubetas(bajas, *self._cubetas_puntuacion(self.BAJAS_CALIFICACIONES_THRESHOLDS, self.INDICADOR_PUNTOS))
+        motivos_peso = motivos_peso.to_numpy()
+        total = motivos_peso + frecuencia_peso + ina_peso + bajas_peso
+        
+        # 5. Motivos principales: frecuencia descendente, desempate por primera aparición
+        df['motivo_codigo'], motivos_originales = pd.factorize(df['motivo'], use_na_sentinel=False)
+        motivos_originales = [None if pd.isna(m) else m for m in motivos_originales.tolist()]
+        conteo_motivos = (df.reset_index()
+                          .groupby(['student_id', 'motivo_codigo'], sort=False)
+                          .agg(cantidad=('index', 'size'), primera=('index', 'min'))
+                          .reset_index()
+                          .sort_values(['cantidad', 'primera'], ascending=[False, True], kind='stable'))
+        motivos_principales = conteo_motivos.groupby('student_id', sort=False).head(3)
+        motivos_por_estudiante = {}
+        for student_id, codigo in zip(motivos_principales['student_id'].tolist(),
+                                      motivos_principales['motivo_codigo'].tolist()):
+            motivos_por_estudiante.setdefault(student_id, []).append(motivos_originales[codigo])
+        
+        # 6. Construir los mismos dicts que evaluar_estudiante
+        fecha_evaluacion = datetime.now().isoformat()
+        clasificaciones = {t: self.clasificar_riesgo(t) for t in set(total.tolist())}
+        columnas = zip(agregados.index.tolist(), n.tolist(), ina.tolist(), bajas.tolist(),
+                       motivos_peso.tolist(), frecuencia_peso.tolist(), ina_peso.tolist(), bajas_peso.tolist(), total.tolist(),
+                       motivos_desglose.tolist(), frecuencia_desglose.tolist(), ina_desglose.tolist(),
+                       bajas_desglose.tolist(), total_desglose.tolist())
+        evaluaciones = []
+        for (student_id, num, n_ina, n_bajas, m_peso, f_peso, i_peso, b_peso, tot,
+             m_des, f_des, i_des, b_des, tot_des) in columnas:
+            student_data = estudiantes_info.get(student_id, {'student_id': student_id})
+            evaluaciones.append({
+                'student_id': student_data.get('student_id') or student_data.get('id'),
+                'matricula': student_data.get('matricula', 'N/A'),
+                'nombre': student_data.get('nombre', 'N/A'),
+                'apellido_p': student_data.get('apellido_p', 'N/A'),
+                'apellido_m': student_data.get('apellido_m', 'N/A'),
+                'carrera': student_data.get('carrera', 'N/A'),
+                'cuatrimestre': student_data.get('cuatrimestre', 'N/A'),
+                'puntuacion': tot,
+                'detalles_puntuacion': {
+                    'motivos_peso': m_peso,
+                    'frecuencia_peso': f_peso,
+                    'inasistencias_peso': i_peso,
+                    'bajas_calificaciones_peso': b_peso,
+                    'total': tot
+                },
+                'desglose_puntuacion': {
+                    'motivos': m_des,
+                    'frecuencia': f_des,
+                    'inasistencias': i_des,
+                    'bajas_calificaciones': b_des,
+                    'total': tot_des
+                },
+                'clasificacion': dict(clasificaciones[tot]),
+                'motivos_frecuentes': motivos_por_estudiante.get(student_id, []),
+                'num_tutorias': num,
+                'num_inasistencias': n_ina,
+                'num_bajas_calificaciones': n_bajas,
+                'fecha_evaluacion': fecha_evaluacion
+            })
+        
+        # Ordenar por puntuación descendente
+        return sorted(evaluaciones, key=lambda x: x['puntuacion'], reverse=True)
+    
+    def _evaluar_lote_sin_pandas(self, tutorias, estudiantes_info, fecha_inicio):
+        """Equivalente de evaluar_lote sin pandas: agrupa las columnas y usa evaluar_multiples_estudiantes"""
+        por_estudiante = {}
+        for student_id, motivo, fecha in zip(tutorias['student_id'], tutorias['motivo'], tutorias['fecha']):
+            if fecha_inicio is not None and (fecha is None or fecha < fecha_inicio):
+                continue
+            por_estudiante.setdefault(student_id, []).append({'motivo': motivo, 'fecha': fecha})
+        
+        clasificar = self.clasificador.clasificar
+        estudiantes_data = []
+        for student_id, tuts in por_estudiante.items():
+            clasificaciones = [clasificar(t['motivo']) for t in tuts]
+            estudiantes_data.append({
+                'info': estudiantes_info.get(student_id, {'student_id': student_id}),
+                'tutorias': tuts,
+                'inasistencias': sum(c.es_inasistencia for c in clasificaciones),
+                'bajas_calificaciones': sum(c.es_baja_calificacion for c in clasificaciones)
+            })
+        return self.evaluar_multiples_estudiantes(estudiantes_data)
+    
+    def _clasificar_motivo(self, motivo):
+        """Devuelve (peso, coincide) del primer MOTIVO_PESOS contenido en el motivo"""
+        clasificacion = self.clasificador.clasificar(motivo)
+        return clasificacion.peso, clasificacion.coincide_peso
+    
     def generar_estadisticas_riesgo(self, evaluaciones):
         """
         Genera estadísticas generales de riesgo
@@ -0,0 +1,458 @@
+"""
+Módulo de Acceso a Datos de Riesgo Académico
+Proporciona funciones para cargar en bloque la información que consume RiskAssessmentEngine
+y para mantener la tabla materializada riesgo_estudiante
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import metricas
+from database import DATABASE, conectar, recorrer_en_lotes
+from risk_assessment import RiskAssessmentEngine
+from motivo_classifier import obtener_clasificador
+from utils import calendario
+
+
+# Fallas de las reconstrucciones en segundo plano (nadie espera a esos hilos)
+registro = logging.getLogger('tutorias.riesgo')
+
+# Ventanas de tiempo que se materializan (valores de time_filter del panel de riesgo)
+VENTANAS_RIESGO = ('todo', 'cuatrimestre', 'mes', 'semana')
+
+# Todas las tutorías en una sola pasada para RiskAssessmentEngine.evaluar_lote, ordenadas por
+# estudiante y de la más reciente a la más antigua (usa idx_tutoria_estudiante_fecha)
+CONSULTA_TUTORIAS_LOTE = """
+    SELECT t.estudiante_id, t.motivo, t.fecha
+    FROM tutoria t
+    JOIN estudiantes e ON e.id = t.estudiante_id
+    ORDER BY t.estudiante_id, t.fecha DESC, t.id
+"""
+
+
+def _info_estudiante(estudiante):
+    """Datos de identificación que RiskAssessmentEngine copia en cada evaluación"""
+    return {
+        'nombre': estudiante['nombre'],
+        'apellido_p': estudiante['apellido_p'],
+        'apellido_m': estudiante['apellido_m'],
+        'matricula': estudiante['matricula'],
+        'carrera': estudiante['carrera'] or 'No especificada',
+        'cuatrimestre': estudiante['cuatrimestre_actual'],
+        'student_id': estudiante['id']
+    }
+
+
+def cargar_tutorias_lote(db):
+    """
+    Carga todas las tutorías en formato columnar para RiskAssessmentEngine.evaluar_lote
+
+    Returns:
+        tuple: (dict de columnas student_id/motivo/fecha, dict {student_id: info del estudiante})
+    """
+    student_ids, motivos, fechas = [], [], []
+    # Por lotes directo a las columnas: nunca se tienen a la vez todas las filas y las columnas
+    for student_id, motivo, fecha in recorrer_en_lotes(db.execute(CONSULTA_TUTORIAS_LOTE)):
+        student_ids.append(student_id)
+        motivos.append(motivo)
+        fechas.append(fecha)
+    estudiantes_info = {e['id']: _info_estudiante(e) for e in db.execute(
+        "SELECT id, nombre, apellido_p, apellido_m, matricula, carrera, cuatrimestre_actual FROM estudiantes"
+    )}
+    return {'student_id': student_ids, 'motivo': motivos, 'fecha': fechas}, estudiantes_info
+
+
+# ---------------------------
+# Tabla materializada de riesgo
+# ---------------------------
+def crear_tabla_riesgo(db):
+    """Crea las tablas riesgo_estudiante, riesgo_cambios y riesgo_ventana si no existen"""
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS riesgo_estudiante (
+            estudiante_id INTEGER NOT NULL,
+            ventana TEXT NOT NULL,
+            puntuacion INTEGER NOT NULL,
+            nivel TEXT NOT NULL,
+            detalles TEXT NOT NULL,
+            desglose TEXT NOT NULL,
+            motivos_frecuentes TEXT NOT NULL,
+            num_tutorias INTEGER NOT NULL,
+            num_inasistencias INTEGER NOT NULL,
+            num_bajas_calificaciones INTEGER NOT NULL,
+            fecha_evaluacion TEXT NOT NULL,
+            PRIMARY KEY (estudiante_id, ventana),
+            FOREIGN KEY (estudiante_id) REFERENCES estudiantes(id)
+        )
+    ''')
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_riesgo_ventana_puntuacion
+        ON riesgo_estudiante(ventana, puntuacion DESC, estudiante_id)
+    ''')
+    # Último cambio de cada estudiante (secuencia creciente). reconstruir_riesgo compara con la
+    # secuencia de su lectura para volver a evaluar a quien cambió mientras evaluaba
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS riesgo_cambios (
+            estudiante_id INTEGER PRIMARY KEY,
+            secuencia INTEGER NOT NULL
+        )
+    ''')
+    db.execute("CREATE INDEX IF NOT EXISTS idx_riesgo_cambios_secuencia ON riesgo_cambios(secuencia)")
+    # Estado de cada ventana: fecha de inicio con la que se construyó y firma de los pesos
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS riesgo_ventana (
+            ventana TEXT PRIMARY KEY,
+            fecha_inicio TEXT NOT NULL,
+            firma TEXT NOT NULL,
+            actualizado TEXT NOT NULL
+        )
+    ''')
+
+
+def normalizar_ventana(time_filter):
+    """Devuelve la ventana materializada correspondiente a un time_filter"""
+    return time_filter if time_filter in VENTANAS_RIESGO else 'todo'
+
+
+def fecha_inicio_ventana(ventana):
+    """Fecha de inicio (YYYY-MM-DD) de una ventana, igual que en el panel de riesgo"""
+    return calendario.fecha_inicio_filtro(ventana)
+
+
+def firma_pesos(engine):
+    """Huella de los pesos, umbrales y cubetas del motor; cambia si se modifica MOTIVO_PESOS"""
+    config = [engine.MOTIVO_PESOS, engine.FRECUENCIA_THRESHOLDS,
+              engine.INASISTENCIA_THRESHOLDS, engine.BAJAS_CALIFICACIONES_THRESHOLDS,
+              engine.FRECUENCIA_PUNTOS, engine.INDICADOR_PUNTOS, engine.FRECUENCIA_DESGLOSE, engine.INDICADOR_DESGLOSE]
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def contar_indicadores(tutorias):
+    """Cuenta inasistencias y bajas calificaciones con el clasificador de motivos, igual que evaluar_lote"""
+    inasistencias = 0
+    bajas_calificaciones = 0
+    clasificar = obtener_clasificador().clasificar
+    for tutoria in tutorias:
+        clasificacion = clasificar(tutoria.get('motivo'))
+        inasistencias += clasificacion.es_inasistencia
+        bajas_calificaciones += clasificacion.es_baja_calificacion
+    return inasistencias, bajas_calificaciones
+
+
+def _fila_riesgo(estudiante_id, ventana, evaluacion):
+    """Convierte una evaluación en la tupla que se guarda en riesgo_estudiante"""
+    return (
+        estudiante_id,
+        ventana,
+        evaluacion['puntuacion'],
+        evaluacion['clasificacion']['nivel'],
+        json.dumps(evaluacion['detalles_puntuacion']),
+        json.dumps(evaluacion['desglose_puntuacion']),
+        json.dumps(evaluacion['motivos_frecuentes'], ensure_ascii=False),
+        evaluacion['num_tutorias'],
+        evaluacion['num_inasistencias'],
+        evaluacion['num_bajas_calificaciones'],
+        evaluacion['fecha_evaluacion'],
+    )
+
+
+INSERTAR_RIESGO = '''
+    INSERT OR REPLACE INTO riesgo_estudiante
+        (estudiante_id, ventana, puntuacion, nivel, detalles, desglose, motivos_frecuentes,
+         num_tutorias, num_inasistencias, num_bajas_calificaciones, fecha_evaluacion)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def _registrar_cambio(db, estudiante_id):
+    """Anota en riesgo_cambios que las filas del estudiante cambiaron (no hace commit)"""
+    db.execute('''
+        INSERT INTO riesgo_cambios (estudiante_id, secuencia)
+        VALUES (?, (SELECT coalesce(max(secuencia), 0) + 1 FROM riesgo_cambios))
+        ON CONFLICT (estudiante_id) DO UPDATE SET secuencia = excluded.secuencia
+    ''', (estudiante_id,))
+
+
+def recalcular_riesgo_estudiante(db, estudiante_id, engine=None):
+    """
+    Recalcula las filas de riesgo_estudiante de un solo estudiante en todas las ventanas.
+    No hace commit: se ejecuta dentro de la transacción de la escritura que lo provoca.
+
+    Args:
+        db: Conexión sqlite3 con row_factory = sqlite3.Row
+        estudiante_id: id del estudiante afectado
+        engine: RiskAssessmentEngine a utilizar (opcional)
+    """
+    engine = engine or RiskAssessmentEngine()
+    estudiante = db.execute("SELECT * FROM estudiantes WHERE id = ?", (estudiante_id,)).fetchone()
+    if not estudiante:
+        eliminar_riesgo_estudiante(db, estudiante_id)
+        return
+    _registrar_cambio(db, estudiante_id)
+
+    tutorias = [dict(t) for t in db.execute(
+        "SELECT * FROM tutoria WHERE estudiante_id = ? ORDER BY fecha DESC, id", (estudiante_id,)
+    )]
+    info = _info_estudiante(estudiante)
+
+    for ventana in VENTANAS_RIESGO:
+        fecha_inicio = fecha_inicio_ventana(ventana)
+        tutorias_ventana = [t for t in tutorias if t['fecha'] is not None and t['fecha'] >= fecha_inicio]
+        if not tutorias_ventana:
+            # Igual que en el panel: sin tutorías en el período no hay evaluación
+            db.execute("DELETE FROM riesgo_estudiante WHERE estudiante_id = ? AND ventana = ?",
+                       (estudiante_id, ventana))
+            continue
+
+        inasistencias, bajas_calificaciones = contar_indicadores(tutorias_ventana)
+        evaluacion = engine.evaluar_estudiante(info, tutorias_ventana, inasistencias, bajas_calificaciones)
+        db.execute(INSERTAR_RIESGO, _fila_riesgo(estudiante_id, ventana, evaluacion))
+
+
+def eliminar_riesgo_estudiante(db, estudiante_id):
+    """Elimina las filas materializadas de un estudiante (no hace commit)"""
+    db.execute("DELETE FROM riesgo_estudiante WHERE estudiante_id = ?", (estudiante_id,))
+    _registrar_cambio(db, estudiante_id)
+
+
+def reconstruir_riesgo(db, ventanas=VENTANAS_RIESGO, engine=None):
+    """
+    Reconstruye por completo las ventanas indicadas y hace commit.
+    Necesario cuando cambian los pesos en MOTIVO_PESOS o la fecha de inicio de una ventana.
+
+    La lectura y la escritura van en transacciones separadas para no retener el candado de
+    escritura mientras se evalúa. Los estudiantes que recalcular_riesgo_estudiante actualizó
+    entre ambas (su secuencia en riesgo_cambios es mayor que la de la lectura) se vuelven a
+    evaluar dentro de la transacción de escritura, así la reconstrucción no pisa sus filas.
+
+    Returns:
+        dict: {ventana: número de estudiantes evaluados}
+    """
+    engine = engine or RiskAssessmentEngine()
+    firma = firma_pesos(engine)
+
+    # Una sola lectura para todas las ventanas; las tutorías y la secuencia salen de la misma instantánea
+    if not db.in_transaction:
+        db.execute("BEGIN")
+    secuencia = db.execute("SELECT coalesce(max(secuencia), 0) FROM riesgo_cambios").fetchone()[0]
+    tutorias, estudiantes_info = cargar_tutorias_lote(db)
+    db.commit()
+
+    # Cada ventana se evalúa en modo vectorizado, sin ninguna transacción abierta
+    evaluaciones = {}
+    for ventana in ventanas:
+        fecha_inicio = fecha_inicio_ventana(ventana)
+        inicio = time.perf_counter()
+        evaluaciones[ventana] = (fecha_inicio, engine.evaluar_lote(tutorias, estudiantes_info, fecha_inicio))
+        metricas.duracion_lote_riesgo.observar(time.perf_counter() - inicio, ventana)
+        metricas.tamano_lote_riesgo.observar(len(evaluaciones[ventana][1]), ventana)
+    del tutorias
+
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        cambiados = [fila[0] for fila in db.execute(
+            "SELECT estudiante_id FROM riesgo_cambios WHERE secuencia > ?", (secuencia,)
+        )]
+        for ventana, (fecha_inicio, evaluaciones_ventana) in evaluaciones.items():
+            db.execute("DELETE FROM riesgo_estudiante WHERE ventana = ?", (ventana,))
+            db.executemany(INSERTAR_RIESGO, (_fila_riesgo(e['student_id'], ventana, e) for e in evaluaciones_ventana))
+            db.execute(
+                "INSERT OR REPLACE INTO riesgo_ventana (ventana, fecha_inicio, firma, actualizado) VALUES (?, ?, ?, ?)",
+                (ventana, fecha_inicio, firma, datetime.now().isoformat())
+            )
+        for estudiante_id in cambiados:
+            recalcular_riesgo_estudiante(db, estudiante_id, engine)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return {ventana: len(e) for ventana, (_, e) in evaluaciones.items()}
+
+
+def invalidar_riesgo(db):
+    """
+    Marca todas las ventanas como desactualizadas: se siguen sirviendo y la siguiente lectura
+    las reconstruye en segundo plano. Útil tras cargas masivas hechas fuera de la aplicación.
+    No hace commit.
+    """
+    try:
+        db.execute("UPDATE riesgo_ventana SET firma = ''")
+    except sqlite3.OperationalError:
+        pass  # La tabla aún no existe: se construirá en la primera lectura
+
+
+def ventanas_vencidas(db, engine=None, ventanas=VENTANAS_RIESGO):
+    """Ventanas que nunca se construyeron, cuya fecha de inicio cambió de día o cuyos pesos cambiaron"""
+    firma = firma_pesos(engine or RiskAssessmentEngine())
+    estados = {f['ventana']: f for f in db.execute("SELECT ventana, fecha_inicio, firma FROM riesgo_ventana")}
+    return tuple(v for v in ventanas
+                 if v not in estados or estados[v]['fecha_inicio'] != fecha_inicio_ventana(v) or estados[v]['firma'] != firma)
+
+
+def renovar_ventanas(db, engine=None):
+    """
+    Reconstruye solo las ventanas vencidas y hace commit. Se ejecuta al iniciar el servidor
+    (antes de atender peticiones) y desde la línea de comandos (--vencidas, p. ej. en cron)
+
+    Returns:
+        dict: {ventana: número de estudiantes evaluados}
+    """
+    engine = engine or RiskAssessmentEngine()
+    vencidas = ventanas_vencidas(db, engine)
+    return reconstruir_riesgo(db, vencidas, engine) if vencidas else {}
+
+
+# Reconstrucciones en curso en este proceso: {ruta de la base: hilo}
+_renovaciones = {}
+_lock_renovaciones = threading.Lock()
+
+
+def _ruta_base(db):
+    """Archivo de la base principal de la conexión ('' si está en memoria)"""
+    return next((f['file'] for f in db.execute("PRAGMA database_list") if f['name'] == 'main'), '')
+
+
+def _renovar(ruta, engine):
+    try:
+        conn = conectar(ruta)
+        try:
+            renovar_ventanas(conn, engine)
+        finally:
+            conn.close()
+    except Exception:
+        registro.exception("Falló la reconstrucción del riesgo en %s", ruta)
+    finally:
+        with _lock_renovaciones:
+            _renovaciones.pop(ruta, None)
+
+
+def renovar_en_segundo_plano(db, engine=None):
+    """
+    Reconstruye las ventanas vencidas en un hilo con su propia conexión; mientras tanto las
+    lecturas sirven la última versión materializada. Como mucho hay una reconstrucción por base.
+
+    Returns:
+        bool: True si se inició una reconstrucción nueva
+    """
+    ruta = _ruta_base(db)
+    if not ruta:
+        # Ninguna otra conexión ve una base en memoria
+        renovar_ventanas(db, engine)
+        return False
+    with _lock_renovaciones:
+        if ruta in _renovaciones:
+            return False
+        hilo = _renovaciones[ruta] = threading.Thread(target=_renovar, args=(ruta, engine or RiskAssessmentEngine()),
+                                                      name='riesgo-renovacion', daemon=True)
+    hilo.start()
+    return True
+
+
+def esperar_renovaciones(timeout=None):
+    """Espera a que terminen las reconstrucciones en segundo plano (pruebas y CLI)"""
+    with _lock_renovaciones:
+        hilos = list(_renovaciones.values())
+    for hilo in hilos:
+        hilo.join(timeout)
+
+
+def _asegurar_ventana(db, ventana, engine):
+    """
+    Construye la ventana si nunca se construyó (no hay nada que servir). Si cambió de día o
+    cambiaron los pesos se sigue sirviendo la versión materializada y se reconstruye en segundo
+    plano: una petición nunca paga la reconstrucción completa de una ventana vencida
+    """
+    estado = db.execute("SELECT fecha_inicio, firma FROM riesgo_ventana WHERE ventana = ?", (ventana,)).fetchone()
+    if estado is None:
+        metricas.caches.fallo('riesgo_ventanas')
+        reconstruir_riesgo(db, (ventana,), engine)
+    elif estado['fecha_inicio'] != fecha_inicio_ventana(ventana) or estado['firma'] != firma_pesos(engine):
+        metricas.caches.fallo('riesgo_ventanas')
+        renovar_en_segundo_plano(db, engine)
+    else:
+        metricas.caches.acierto('riesgo_ventanas')
+
+
+def _evaluacion_desde_fila(fila, engine):
+    """Reconstruye el dict de evaluación que devuelve RiskAssessmentEngine.evaluar_estudiante"""
+    return {
+        'student_id': fila['estudiante_id'],
+        'matricula': fila['matricula'],
+        'nombre': fila['nombre'],
+        'apellido_p': fila['apellido_p'],
+        'apellido_m': fila['apellido_m'],
+        'carrera': fila['carrera'] or 'No especificada',
+        'cuatrimestre': fila['cuatrimestre_actual'],
+        'puntuacion': fila['puntuacion'],
+        'detalles_puntuacion': json.loads(fila['detalles']),
+        'desglose_puntuacion': json.loads(fila['desglose']),
+        'clasificacion': engine.clasificar_riesgo(fila['puntuacion']),
+        'motivos_frecuentes': json.loads(fila['motivos_frecuentes']),
+        'num_tutorias': fila['num_tutorias'],
+        'num_inasistencias': fila['num_inasistencias'],
+        'num_bajas_calificaciones': fila['num_bajas_calificaciones'],
+        'fecha_evaluacion': fila['fecha_evaluacion']
+    }
+
+
+CONSULTA_RIESGO_MATERIALIZADO = """
+    SELECT r.*, e.matricula, e.nombre, e.apellido_p, e.apellido_m, e.carrera, e.cuatrimestre_actual
+    FROM riesgo_estudiante r
+    JOIN estudiantes e ON e.id = r.estudiante_id
+    WHERE r.ventana = ?
+"""
+
+
+def obtener_evaluaciones_riesgo(db, time_filter='todo', engine=None):
+    """
+    Lee las evaluaciones materializadas de una ventana, ordenadas por puntuación descendente
+
+    Returns:
+        list: Mismo formato que RiskAssessmentEngine.evaluar_multiples_estudiantes
+    """
+    engine = engine or RiskAssessmentEngine()
+    ventana = normalizar_ventana(time_filter)
+    _asegurar_ventana(db, ventana, engine)
+
+    filas = db.execute(CONSULTA_RIESGO_MATERIALIZADO + " ORDER BY r.puntuacion DESC, r.estudiante_id", (ventana,))
+    return [_evaluacion_desde_fila(f, engine) for f in filas]
+
+
+def obtener_evaluacion_estudiante(db, estudiante_id, time_filter='todo', engine=None):
+    """Lee la evaluación materializada de un estudiante (None si no tiene tutorías)"""
+    engine = engine or RiskAssessmentEngine()
+    ventana = normalizar_ventana(time_filter)
+    _asegurar_ventana(db, ventana, engine)
+
+    fila = db.execute(CONSULTA_RIESGO_MATERIALIZADO + " AND r.estudiante_id = ?", (ventana, estudiante_id)).fetchone()
+    return _evaluacion_desde_fila(fila, engine) if fila else None
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reconstruye la tabla materializada riesgo_estudiante")
+    parser.add_argument('--db', default=DATABASE, help=f"Ruta de la base de datos (por defecto: {DATABASE})")
+    parser.add_argument('--ventana', choices=VENTANAS_RIESGO, action='append',
+                        help="Ventana a reconstruir (se puede repetir; por defecto todas)")
+    parser.add_argument('--vencidas', action='store_true',
+                        help="Solo las ventanas que cambiaron de día o de pesos (p. ej. en cron, después de medianoche)")
+    args = parser.parse_args()
+
+    conn = conectar(args.db)
+    try:
+        crear_tabla_riesgo(conn)
+        print("Reconstruyendo evaluaciones de riesgo...")
+        if args.vencidas:
+            reconstruidas = renovar_ventanas(conn)
+        else:
+            reconstruidas = reconstruir_riesgo(conn, tuple(args.ventana or VENTANAS_RIESGO))
+        for ventana, total in reconstruidas.items():
+            print(f"  ✓ Ventana '{ventana}': {total} estudiantes evaluados.")
+        print("\n✅ Reconstrucción completada.")
+    finally:
+        conn.close()
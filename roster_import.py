@@ -0,0 +1,263 @@
+"""
+Módulo de Importación de Listas de Estudiantes
+Carga listas de estudiantes desde Excel (una hoja por grupo, p. ej. "1725 IS") o CSV
+(columnas nombre, apellido_p, apellido_m, matricula, grupo). Los archivos se leen en
+streaming, las filas se validan por lotes y se escriben con executemany e
+INSERT ... ON CONFLICT(matricula) en una sola transacción
+"""
+
+import csv
+import json
+import os
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from utils import decodificar_grupo, obtener_carreras_por_programa
+
+# Filas validadas que se escriben en cada executemany
+TAMANO_LOTE_IMPORTACION = 1000
+
+# Filas inválidas que se conservan con su motivo (el resto solo se cuenta)
+MAX_ERRORES_DETALLE = 50
+
+COLUMNAS_CSV = ('nombre', 'apellido_p', 'apellido_m', 'matricula', 'grupo')
+
+ResumenImportacion = namedtuple('ResumenImportacion', [
+    'leidas',        # filas no vacías leídas del archivo
+    'insertadas',    # estudiantes nuevos
+    'actualizadas',  # matrículas existentes con datos distintos
+    'sin_cambios',   # matrículas existentes con los mismos datos (o omitidas con solo_nuevos)
+    'invalidas',     # filas rechazadas por la validación
+    'errores',       # [(ubicación, motivo)] de las primeras MAX_ERRORES_DETALLE filas inválidas
+    'segundos',      # duración de la importación
+])
+
+_INSERTAR = """
+    INSERT INTO estudiantes (matricula, nombre, apellido_p, apellido_m, cuatrimestre_actual, carrera, grupo,
+                             programa_educativo, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Solo se reescriben las filas que cambian, así los triggers de estudiantes no se disparan de más
+_CONFLICTO_ACTUALIZAR = """
+    ON CONFLICT(matricula) DO UPDATE SET
+        nombre = excluded.nombre, apellido_p = excluded.apellido_p, apellido_m = excluded.apellido_m,
+        cuatrimestre_actual = excluded.cuatrimestre_actual, carrera = excluded.carrera, grupo = excluded.grupo,
+        programa_educativo = excluded.programa_educativo, updated_at = excluded.updated_at
+    WHERE (estudiantes.nombre, estudiantes.apellido_p, estudiantes.apellido_m, estudiantes.cuatrimestre_actual,
+           estudiantes.carrera, estudiantes.grupo, estudiantes.programa_educativo)
+       IS NOT (excluded.nombre, excluded.apellido_p, excluded.apellido_m, excluded.cuatrimestre_actual,
+               excluded.carrera, excluded.grupo, excluded.programa_educativo)
+"""
+
+_CONFLICTO_OMITIR = " ON CONFLICT(matricula) DO NOTHING"
+
+
+# ---------------------------
+# Lectura en streaming: cada fuente produce (ubicación, grupo, (nombre, apellido_p, apellido_m, matricula))
+# ---------------------------
+
+def leer_excel(ruta):
+    """Filas de todas las hojas; el nombre de la hoja es el grupo (modo read_only, sin cargar el libro)"""
+    import openpyxl
+
+    libro = openpyxl.load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        for hoja in libro.worksheets:
+            grupo_id = hoja.title.replace(" ", "")
+            for numero, fila in enumerate(hoja.iter_rows(min_row=2, max_col=4, values_only=True), start=2):
+                yield f"{hoja.title}:{numero}", grupo_id, tuple(fila) + (None,) * (4 - len(fila))
+    finally:
+        libro.close()
+
+
+def leer_csv(ruta):
+    """Filas de un CSV con encabezado (COLUMNAS_CSV); acepta UTF-8 con o sin BOM"""
+    with open(ruta, encoding='utf-8-sig', newline='') as archivo:
+        lector = csv.DictReader(archivo)
+        faltantes = [c for c in COLUMNAS_CSV if c not in (lector.fieldnames or [])]
+        if faltantes:
+            raise ValueError(f"Al CSV le faltan las columnas: {', '.join(faltantes)}")
+        for fila in lector:
+            yield (f"línea {lector.line_num}", (fila['grupo'] or '').replace(" ", ""),
+                   (fila['nombre'], fila['apellido_p'], fila['apellido_m'], fila['matricula']))
+
+
+def leer_archivo(ruta):
+    """Fuente según la extensión del archivo (.xlsx/.xlsm o .csv)"""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension in ('.xlsx', '.xlsm'):
+        return leer_excel(ruta)
+    if extension == '.csv':
+        return leer_csv(ruta)
+    raise ValueError(f"Formato no soportado: {extension or ruta}")
+
+
+# ---------------------------
+# Validación
+# ---------------------------
+
+def datos_grupo(grupo_id):
+    """
+    (cuatrimestre, carrera, programa educativo) de un id de grupo como 1725IS. Programa 1:
+    7° y 10° cuatrimestre; programa 2: el resto.
+
+    Raises:
+        ValueError: Si el grupo no tiene el formato [Grupo][Cuatrimestre][Año][Carrera]
+    """
+    grupo = decodificar_grupo(grupo_id)
+    if grupo is None or not grupo['cuatrimestre'].isdigit():
+        raise ValueError(f"grupo inválido '{grupo_id}'")
+    programa = 1 if grupo['cuatrimestre'] in ('7', '10') else 2
+    carrera = obtener_carreras_por_programa(programa).get(grupo['carrera_sigla'], "No especificada")
+    return grupo['cuatrimestre'], carrera, programa
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    # Excel entrega las matrículas numéricas como int o float
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def validar_fila(grupo_id, valores, cache_grupos):
+    """
+    Parámetros de _INSERTAR para una fila, o None si la fila está vacía.
+
+    Raises:
+        ValueError: Si la fila no tiene los datos obligatorios o su grupo es inválido
+    """
+    nombre, apellido_p, apellido_m, matricula = (_texto(v) for v in valores)
+    if not any((nombre, apellido_p, apellido_m, matricula)):
+        return None
+    if not nombre or not apellido_p or not matricula:
+        raise ValueError("faltan nombre, apellido paterno o matrícula")
+    if grupo_id not in cache_grupos:
+        try:
+            cache_grupos[grupo_id] = datos_grupo(grupo_id)
+        except ValueError as error:
+            cache_grupos[grupo_id] = error
+    datos = cache_grupos[grupo_id]
+    if isinstance(datos, ValueError):
+        raise datos
+    cuatrimestre, carrera, programa = datos
+    return [matricula, nombre, apellido_p, apellido_m, cuatrimestre, carrera, grupo_id, programa]
+
+
+# ---------------------------
+# Importación
+# ---------------------------
+
+def importar_estudiantes(conn, filas, dry_run=False, solo_nuevos=False, tamano_lote=TAMANO_LOTE_IMPORTACION):
+    """
+    Valida y escribe las filas (ubicación, grupo, valores) por lotes en una sola transacción.
+    Con dry_run todo se ejecuta y se cuenta igual, pero al final se hace rollback.
+
+    Args:
+        solo_nuevos: Omite las matrículas existentes en lugar de actualizarlas
+
+    Returns:
+        ResumenImportacion
+    """
+    inicio = time.perf_counter()
+    sentencia = _INSERTAR + (_CONFLICTO_OMITIR if solo_nuevos else _CONFLICTO_ACTUALIZAR)
+    leidas = insertadas = cambios = existentes = invalidas = 0
+    errores = []
+    cache_grupos = {}
+    lote = {}
+
+    def escribir():
+        nonlocal insertadas, cambios, existentes
+        ahora = datetime.now().isoformat()
+        ya_registradas = conn.execute(
+            "SELECT COUNT(*) FROM estudiantes WHERE matricula IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(lote)),)
+        ).fetchone()[0]
+        # rowcount suma las filas insertadas o actualizadas por el upsert (sin las de los triggers)
+        escritas = conn.executemany(sentencia, [parametros + [ahora, ahora] for parametros in lote.values()]).rowcount
+        existentes += ya_registradas
+        insertadas += len(lote) - ya_registradas
+        cambios += escritas - (len(lote) - ya_registradas)
+        lote.clear()
+
+    try:
+        for ubicacion, grupo_id, valores in filas:
+            try:
+                parametros = validar_fila(grupo_id, valores, cache_grupos)
+            except ValueError as error:
+                leidas += 1
+                invalidas += 1
+                if len(errores) < MAX_ERRORES_DETALLE:
+                    errores.append((ubicacion, str(error)))
+                continue
+            if parametros is None:
+                continue
+            leidas += 1
+            # Una matrícula repetida dentro del lote se queda con su última fila
+            lote[parametros[0]] = parametros
+            if len(lote) >= tamano_lote:
+                escribir()
+        if lote:
+            escribir()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if dry_run:
+        conn.rollback()
+    else:
+        conn.commit()
+
+    return ResumenImportacion(
+        leidas=leidas,
+        insertadas=insertadas,
+        actualizadas=cambios,
+        sin_cambios=existentes - cambios,
+        invalidas=invalidas,
+        errores=errores,
+        segundos=time.perf_counter() - inicio,
+    )
+
+
+def importar_archivo(conn, ruta, dry_run=False, solo_nuevos=False, tamano_lote=TAMANO_LOTE_IMPORTACION):
+    """Importa un archivo Excel o CSV (ver importar_estudiantes)"""
+    return importar_estudiantes(conn, leer_archivo(ruta), dry_run, solo_nuevos, tamano_lote)
+
+
+def imprimir_resumen(resumen, dry_run=False):
+    velocidad = resumen.leidas / resumen.segundos if resumen.segundos else 0
+    print(f"\n{'🔎 Simulación completada (sin cambios en la base)' if dry_run else '✅ Importación completada'}:")
+    print(f"   - Filas leídas: {resumen.leidas}")
+    print(f"   - Estudiantes insertados: {resumen.insertadas}")
+    print(f"   - Estudiantes actualizados: {resumen.actualizadas}")
+    print(f"   - Sin cambios u omitidos: {resumen.sin_cambios}")
+    print(f"   - Filas inválidas: {resumen.invalidas}")
+    print(f"   - Tiempo: {resumen.segundos:.2f} s ({velocidad:,.0f} filas/s)")
+    for ubicacion, motivo in resumen.errores:
+        print(f"  ❌ {ubicacion}: {motivo}")
+    if resumen.invalidas > len(resumen.errores):
+        print(f"  ... y {resumen.invalidas - len(resumen.errores)} filas inválidas más")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from database import DATABASE, conectar
+
+    parser = argparse.ArgumentParser(description="Importa una lista de estudiantes desde Excel o CSV")
+    parser.add_argument('archivo', help="Archivo .xlsx (una hoja por grupo) o .csv (columnas: " + ', '.join(COLUMNAS_CSV) + ")")
+    parser.add_argument('--db', default=DATABASE, help=f"Ruta de la base de datos (por defecto: {DATABASE})")
+    parser.add_argument('--dry-run', action='store_true', help="Valida y cuenta sin guardar cambios")
+    parser.add_argument('--solo-nuevos', action='store_true', help="No actualiza las matrículas que ya existen")
+    parser.add_argument('--lote', type=int, default=TAMANO_LOTE_IMPORTACION, help="Filas por executemany")
+    args = parser.parse_args()
+
+    conn = conectar(args.db)
+    try:
+        resumen = importar_archivo(conn, args.archivo, args.dry_run, args.solo_nuevos, args.lote)
+        imprimir_resumen(resumen, args.dry_run)
+    finally:
+        conn.close()
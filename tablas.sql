@@ -1,38 +1,70 @@
-CREATE TABLE IF NOT EXISTS asesorias (
+-- Tablas base de la aplicación (referencia). La definición que usa la aplicación está en
+-- database.TABLAS y las migraciones de esquema.py la aplican; test_logic.py verifica que coincidan.
+-- Las tablas derivadas (riesgo, búsqueda, actividad, trabajos) las crean sus módulos y las
+-- vistas vista_asesoria y vista_tutoria, database.crear_vistas.
+
+CREATE TABLE IF NOT EXISTS usuarios (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     nombre TEXT NOT NULL,
-    apellido_p TEXT NOT NULL,
-    apellido_m TEXT NOT NULL,
-    unidad TEXT NOT NULL,
-    parcial TEXT NOT NULL,
-    periodo TEXT NOT NULL,
-    tema TEXT NOT NULL,
-    fecha TEXT NOT NULL
+    usuario TEXT UNIQUE NOT NULL,
+    password TEXT NOT NULL
 );
 
-CREATE TABLE IF NOT EXISTS tutorias (
+CREATE TABLE IF NOT EXISTS asesoria (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
-    nombre TEXT NOT NULL,
-    apellido_p TEXT NOT NULL,
-    apellido_m TEXT NOT NULL,
-    matricula TEXT NOT NULL,
-    cuatrimestre TEXT NOT NULL,
-    motivo TEXT NOT NULL,
-    fecha TEXT NOT NULL,
+    estudiante_id INTEGER REFERENCES estudiantes(id),
+    nombre TEXT,
+    apellido_p TEXT,
+    apellido_m TEXT,
+    matricula TEXT,
+    unidad TEXT,
+    parcial TEXT,
+    periodo TEXT,
+    tema TEXT,
+    fecha TEXT,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS tutoria (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    estudiante_id INTEGER,
+    nombre TEXT,
+    apellido_p TEXT,
+    apellido_m TEXT,
+    matricula TEXT,
+    cuatrimestre TEXT,
+    motivo TEXT,
+    fecha TEXT,
     descripcion TEXT,
     observaciones TEXT,
-    seguimiento TEXT
+    seguimiento TEXT,
+    created_at TEXT,
+    FOREIGN KEY (estudiante_id) REFERENCES estudiantes(id)
 );
 
-CREATE TABLE IF NOT EXISTS tutorias_grupales (
+CREATE TABLE IF NOT EXISTS tutoria_grupal (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
-    grupo TEXT NOT NULL,
-    cuatrimestre TEXT NOT NULL,
-    motivo TEXT NOT NULL,
-    fecha TEXT NOT NULL,
+    grupo_nombre TEXT,
+    carrera TEXT,
+    cuatrimestre TEXT,
+    motivo TEXT,
+    fecha TEXT,
     descripcion TEXT,
+    asistentes TEXT,
     observaciones TEXT,
-    seguimiento TEXT
+    created_at TEXT
 );
 
-
+CREATE TABLE IF NOT EXISTS estudiantes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    matricula TEXT UNIQUE NOT NULL,
+    nombre TEXT NOT NULL,
+    apellido_p TEXT NOT NULL,
+    apellido_m TEXT,
+    cuatrimestre_actual TEXT,
+    carrera TEXT,
+    grupo TEXT,
+    programa_educativo INTEGER DEFAULT 2,
+    created_at TEXT,
+    updated_at TEXT
+);
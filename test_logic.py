@@ -1,8 +1,41 @@
+import base64
+import json
+import os
 import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zipfile
+import csv
+import re
+import zlib
+from io import BytesIO
+from itertools import groupby
+import openpyxl
 from risk_assessment import RiskAssessmentEngine
 from academic_history import AcademicHistoryAnalyzer
-from pdf_generator import PDFReportGenerator
-from datetime import datetime
+from pdf_generator import PDFReportGenerator, _HistoriaPerezosa, obtener_estilos, TAMANO_SEGMENTO
+from reportlab.platypus import Table
+from actividad import crear_tabla_actividad, reconstruir_actividad, obtener_resumen_actividad
+from busqueda import crear_indices_busqueda, buscar_asesorias, buscar_tutorias, buscar_estudiantes
+from database import ConnectionManager, activar_wal, conectar, configurar_conexion, crear_esquema, recorrer_en_lotes
+from report_jobs import ReportJobQueue, crear_tabla_trabajos, clave_trabajo, TERMINADO, ERROR
+from report_cache import ReportCache
+from roster_import import importar_archivo, COLUMNAS_CSV
+from report_export import exportar_reportes, leer_estudiante, datos_estudiante, ARCHIVO_ERRORES
+from datos_sinteticos import crear_base_sintetica
+from instrumentacion import MonitorPeticiones, RegistroPeticion, encabezado_server_timing
+from metricas import RegistroMetricas
+from esquema import migrar, preparar_esquema, version_esquema, columnas_tabla, VERSION_ESQUEMA
+from utils import AcademicCalendar, obtener_carreras_por_programa
+from paginacion import paginar, paginar_resultados, ORDEN_RECIENTES, ORDEN_APELLIDOS
+from motivo_classifier import MotivoClassifier, MOTIVO_PESOS, MOTIVO_CATEGORIES
+from risk_data import cargar_tutorias_lote, contar_indicadores, crear_tabla_riesgo, recalcular_riesgo_estudiante, eliminar_riesgo_estudiante, obtener_evaluaciones_riesgo, reconstruir_riesgo, renovar_ventanas, renovar_en_segundo_plano, esperar_renovaciones, ventanas_vencidas, invalidar_riesgo, fecha_inicio_ventana, VENTANAS_RIESGO
+from datetime import timedelta
+from datetime import datetime, date
 
 DATABASE = 'asesorias.db'
 
@@ -232,8 +265,1400 @@ def test_pdf_generation():
         
     conn.close()
 
+def crear_db_memoria():
+    """Crea una base de datos en memoria con las tablas estudiantes y tutoria."""
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.execute("""
+        CREATE TABLE estudiantes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            matricula TEXT UNIQUE NOT NULL,
+            nombre TEXT NOT NULL,
+            apellido_p TEXT NOT NULL,
+            apellido_m TEXT,
+            cuatrimestre_actual TEXT,
+            carrera TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE tutoria (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            estudiante_id INTEGER,
+            nombre TEXT,
+            apellido_p TEXT,
+            apellido_m TEXT,
+            matricula TEXT,
+            cuatrimestre TEXT,
+            motivo TEXT,
+            fecha TEXT,
+            descripcion TEXT,
+            observaciones TEXT,
+            seguimiento TEXT,
+            created_at TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX idx_tutoria_estudiante_fecha ON tutoria(estudiante_id, fecha)")
+    return conn
+
+def datos_riesgo_por_estudiante(conn, fecha_inicio):
+    """Referencia: las tutorías de cada estudiante con una consulta por estudiante (patrón N+1 original)"""
+    datos = []
+    for est in conn.execute("SELECT * FROM estudiantes ORDER BY id").fetchall():
+        tuts = [dict(t) for t in conn.execute(
+            "SELECT * FROM tutoria WHERE estudiante_id = ? AND fecha >= ? ORDER BY fecha DESC, id", (est['id'], fecha_inicio)
+        )]
+        if not tuts:
+            continue
+        inasistencias, bajas_calificaciones = contar_indicadores(tuts)
+        datos.append({
+            'info': {'nombre': est['nombre'], 'apellido_p': est['apellido_p'], 'apellido_m': est['apellido_m'],
+                     'matricula': est['matricula'], 'carrera': est['carrera'] or 'No especificada',
+                     'cuatrimestre': est['cuatrimestre_actual'], 'student_id': est['id']},
+            'tutorias': tuts,
+            'inasistencias': inasistencias,
+            'bajas_calificaciones': bajas_calificaciones,
+        })
+    return datos
+
+def test_carga_masiva_riesgo():
+    """Verifica que la carga en bloque (columnar) equivale a la consulta por estudiante."""
+    print("\n--- Prueba de Carga Masiva de Riesgo ---")
+    conn = crear_db_memoria()
+    estudiantes = [('A1', 'Ana', 'Ávila', 'Ruiz', '4', None), ('B2', 'Beto', 'Luna', 'Sol', '7', 'Ingeniería en Software'),
+                   ('C3', 'Caro', 'Mar', 'Río', '1', 'Ingeniería Financiera')]
+    for e in estudiantes:
+        conn.execute("INSERT INTO estudiantes (matricula, nombre, apellido_p, apellido_m, cuatrimestre_actual, carrera) VALUES (?, ?, ?, ?, ?, ?)", e)
+    tutorias = [
+        (1, 'Inasistencias frecuentes', '2025-01-10'), (1, 'BAJA CALIFICACIÓN en examen', '2025-02-10'),
+        (1, 'Bajo desempeño académico', '2024-06-01'), (2, 'Problemas de conducta', '2025-03-01'),
+        (99, 'Inasistencias frecuentes', '2025-03-01'),  # Tutoría huérfana
+        (2, 'Inasistencia a clase', '2025-03-05'), (3, 'Reforzamiento de materia', '2023-01-01'),
+    ]
+    for estudiante_id, motivo, fecha in tutorias:
+        conn.execute("INSERT INTO tutoria (estudiante_id, motivo, fecha) VALUES (?, ?, ?)", (estudiante_id, motivo, fecha))
+
+    columnas, estudiantes_info = cargar_tutorias_lote(conn)
+    for fecha_inicio in ('2025-01-01', '2024-01-01', '1-01-01'):
+        esperado = datos_riesgo_por_estudiante(conn, fecha_inicio)
+        filas = [fila for fila in zip(columnas['student_id'], columnas['motivo'], columnas['fecha']) if fila[2] >= fecha_inicio]
+        obtenido = [(student_id, [(motivo, fecha) for _, motivo, fecha in grupo])
+                    for student_id, grupo in groupby(filas, key=lambda fila: fila[0])]
+        assert obtenido == [(d['info']['student_id'], [(t['motivo'], t['fecha']) for t in d['tutorias']]) for d in esperado], \
+            f"Fallo: la carga en bloque difiere para fecha_inicio={fecha_inicio}"
+        assert [estudiantes_info[d['info']['student_id']] for d in esperado] == [d['info'] for d in esperado], \
+            "Fallo: información de estudiantes de la carga en bloque"
+
+        # Los indicadores siguen la regla por palabras clave del panel
+        for d in esperado:
+            motivos = [t['motivo'].lower() for t in d['tutorias']]
+            assert d['inasistencias'] == sum('inasistencia' in m for m in motivos), "Fallo: conteo de inasistencias"
+            assert d['bajas_calificaciones'] == sum('baja calificación' in m or 'bajo desempeño' in m for m in motivos), \
+                "Fallo: conteo de bajas calificaciones"
+
+    assert estudiantes_info[1]['carrera'] == 'No especificada', "Fallo: carrera por defecto incorrecta"
+    print("✅ Verificación de Carga Masiva exitosa.")
+    conn.close()
+
+def test_riesgo_materializado():
+    """Verifica que la tabla riesgo_estudiante coincide con la evaluación en vivo tras cada escritura."""
+    print("\n--- Prueba de Riesgo Materializado ---")
+    conn = crear_db_memoria()
+    crear_tabla_riesgo(conn)
+    engine = RiskAssessmentEngine()
+    hoy = datetime.now()
+    for matricula, nombre in (('M1', 'Uno'), ('M2', 'Dos')):
+        conn.execute("INSERT INTO estudiantes (matricula, nombre, apellido_p, cuatrimestre_actual) VALUES (?, ?, 'X', '4')", (matricula, nombre))
+    for estudiante_id, motivo, dias in ((1, 'Inasistencias frecuentes', 3), (1, 'Baja calificación', 20), (1, 'Problemas de conducta', 200),
+                                        (2, 'Reforzamiento de materia', 10)):
+        conn.execute("INSERT INTO tutoria (estudiante_id, motivo, fecha) VALUES (?, ?, ?)",
+                     (estudiante_id, motivo, (hoy - timedelta(days=dias)).strftime('%Y-%m-%d')))
+
+    def comparar():
+        for ventana in VENTANAS_RIESGO:
+            en_vivo = engine.evaluar_multiples_estudiantes(datos_riesgo_por_estudiante(conn, fecha_inicio_ventana(ventana)))
+            materializado = obtener_evaluaciones_riesgo(conn, ventana, engine)
+            campos = ('student_id', 'puntuacion', 'desglose_puntuacion', 'detalles_puntuacion', 'clasificacion',
+                      'motivos_frecuentes', 'num_tutorias', 'num_inasistencias', 'num_bajas_calificaciones')
+            assert [[e[c] for c in campos] for e in materializado] == [[e[c] for c in campos] for e in en_vivo], \
+                f"Fallo: riesgo materializado desactualizado en ventana '{ventana}'"
+
+    comparar()  # Construcción inicial
+
+    # Alta, edición y baja de tutorías: solo se recalcula el estudiante afectado
+    conn.execute("INSERT INTO tutoria (estudiante_id, motivo, fecha) VALUES (2, 'Bajo desempeño', ?)", (hoy.strftime('%Y-%m-%d'),))
+    recalcular_riesgo_estudiante(conn, 2, engine)
+    comparar()
+    conn.execute("UPDATE tutoria SET motivo = 'Asesoría general' WHERE id = 1")
+    recalcular_riesgo_estudiante(conn, 1, engine)
+    comparar()
+    conn.execute("DELETE FROM tutoria WHERE estudiante_id = 2")
+    recalcular_riesgo_estudiante(conn, 2, engine)
+    comparar()
+
+    # Baja de estudiante
+    conn.execute("DELETE FROM tutoria WHERE estudiante_id = 1")
+    conn.execute("DELETE FROM estudiantes WHERE id = 1")
+    eliminar_riesgo_estudiante(conn, 1)
+    comparar()
+    assert conn.execute("SELECT COUNT(*) FROM riesgo_estudiante").fetchone()[0] == 0, "Fallo: quedaron filas huérfanas"
+    print("✅ Verificación de Riesgo Materializado exitosa.")
+    conn.close()
+
+def test_reconstruccion_riesgo_concurrente():
+    """Verifica que la reconstrucción del riesgo no pisa una tutoría registrada mientras evalúa."""
+    print("\n--- Verificando Reconstrucción de Riesgo Concurrente ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'riesgo.db')
+        conn = conectar(ruta)
+        migrar(conn)
+        hoy = datetime.now().strftime('%Y-%m-%d')
+        conn.executemany("INSERT INTO estudiantes (matricula, nombre, apellido_p) VALUES (?, ?, 'X')", [('R1', 'Uno'), ('R2', 'Dos')])
+        conn.executemany("INSERT INTO tutoria (estudiante_id, motivo, fecha) VALUES (?, ?, ?)",
+                         [(1, 'Inasistencias frecuentes', hoy)] * 13 + [(2, 'Asesoría general', hoy)])
+        conn.commit()
+
+        otra = conectar(ruta)
+
+        class MotorConEscritura(RiskAssessmentEngine):
+            """Otra petición registra una tutoría del estudiante 1 mientras se evalúa la primera ventana"""
+            escrita = False
+
+            def evaluar_lote(self, *args, **kwargs):
+                if not self.escrita:
+                    self.escrita = True
+                    otra.execute("INSERT INTO tutoria (estudiante_id, motivo, fecha) VALUES (1, 'Baja calificación', ?)", (hoy,))
+                    recalcular_riesgo_estudiante(otra, 1)
+                    otra.commit()
+                return super().evaluar_lote(*args, **kwargs)
+
+        assert reconstruir_riesgo(conn, engine=MotorConEscritura()) == {v: 2 for v in VENTANAS_RIESGO}, \
+            "Fallo: estudiantes evaluados"
+        for ventana, num_tutorias, bajas in conn.execute(
+                "SELECT ventana, num_tutorias, num_bajas_calificaciones FROM riesgo_estudiante WHERE estudiante_id = 1"):
+            assert (num_tutorias, bajas) == (14, 1), f"Fallo: la reconstrucción pisó la tutoría nueva en '{ventana}'"
+        assert conn.execute("SELECT COUNT(*) FROM riesgo_estudiante").fetchone()[0] == 2 * len(VENTANAS_RIESGO), \
+            "Fallo: ventanas incompletas"
+        otra.close()
+        conn.close()
+    print("✅ Verificación de Reconstrucción de Riesgo Concurrente exitosa.")
+
+def test_renovacion_ventanas_riesgo():
+    """Verifica que una ventana vencida se sigue sirviendo mientras se reconstruye en segundo plano."""
+    print("\n--- Verificando Renovación de Ventanas de Riesgo ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        conn = conectar(os.path.join(directorio, 'ventanas.db'))
+        migrar(conn)
+        hoy = datetime.now().strftime('%Y-%m-%d')
+        conn.executemany("INSERT INTO estudiantes (matricula, nombre, apellido_p) VALUES (?, ?, 'X')", [('V1', 'Uno'), ('V2', 'Dos')])
+        conn.execute("INSERT INTO tutoria (estudiante_id, motivo, fecha) VALUES (1, 'Inasistencias frecuentes', ?)", (hoy,))
+        conn.commit()
+        engine = RiskAssessmentEngine()
+        # Nunca construida: no hay nada que servir y la primera lectura la construye
+        assert [e['student_id'] for e in obtener_evaluaciones_riesgo(conn, 'semana', engine)] == [1], "Fallo: construcción inicial"
+
+        # Cambio de día con una tutoría cargada fuera de la aplicación (sin recalcular)
+        conn.execute("INSERT INTO tutoria (estudiante_id, motivo, fecha) VALUES (2, 'Baja calificación', ?)", (hoy,))
+        conn.execute("UPDATE riesgo_ventana SET fecha_inicio = '2000-01-01' WHERE ventana = 'semana'")
+        conn.commit()
+        continuar = threading.Event()
+
+        class MotorDetenido(RiskAssessmentEngine):
+            """La reconstrucción no termina hasta que la prueba lo indica"""
+            def evaluar_lote(self, *args, **kwargs):
+                assert continuar.wait(10), "Fallo: la reconstrucción no se liberó"
+                return super().evaluar_lote(*args, **kwargs)
+
+        # La lectura responde con la versión materializada sin esperar la reconstrucción
+        servidas = obtener_evaluaciones_riesgo(conn, 'semana', MotorDetenido())
+        assert [e['student_id'] for e in servidas] == [1], "Fallo: la lectura no sirvió la ventana materializada"
+        assert not renovar_en_segundo_plano(conn, MotorDetenido()), "Fallo: dos reconstrucciones de la misma base"
+        continuar.set()
+        esperar_renovaciones()
+        assert ventanas_vencidas(conn, engine) == (), "Fallo: quedaron ventanas vencidas tras la renovación"
+        assert sorted(e['student_id'] for e in obtener_evaluaciones_riesgo(conn, 'semana', engine)) == [1, 2], \
+            "Fallo: la ventana renovada no incluye la tutoría nueva"
+
+        # Arranque del servidor y CLI: solo se reconstruye lo vencido
+        assert renovar_ventanas(conn, engine) == {}, "Fallo: se reconstruyeron ventanas vigentes"
+        invalidar_riesgo(conn)
+        conn.commit()
+        assert renovar_ventanas(conn, engine) == {v: 2 for v in VENTANAS_RIESGO}, "Fallo: ventanas invalidadas sin reconstruir"
+        conn.close()
+    print("✅ Verificación de Renovación de Ventanas de Riesgo exitosa.")
+
+def test_evaluacion_por_lotes():
+    """Verifica que evaluar_lote produce las mismas evaluaciones que evaluar_multiples_estudiantes."""
+    print("\n--- Prueba de Evaluación por Lotes ---")
+    engine = RiskAssessmentEngine()
+    motivos = ['Baja calificación en examen', 'Inasistencias frecuentes', 'Problemas de conducta', 'Bajo desempeño académico',
+               'Asesoría general', 'Necesita apoyo en proyecto final', 'INASISTENCIA a laboratorio', 'Falta de motivación']
+    filas = []
+    for student_id in range(1, 41):
+        for i in range(student_id % 9):
+            filas.append((student_id, motivos[(student_id * 7 + i * 3) % len(motivos)], f"2025-{(student_id + i) % 12 + 1:02d}-15"))
+    # Motivos NULL (se conservan como None en motivos_frecuentes, distintos de '')
+    for student_id in range(4, 41, 4):
+        filas.extend((student_id, None, f"2025-{m:02d}-20") for m in (3, 7, 11))
+        if student_id % 8 == 0:
+            filas.extend((student_id, '', fecha) for fecha in ('2025-09-20', '2025-10-20'))
+    columnas = {'student_id': [f[0] for f in filas], 'motivo': [f[1] for f in filas], 'fecha': [f[2] for f in filas]}
+    info = {sid: {'student_id': sid, 'matricula': f'M{sid}', 'nombre': f'Est{sid}', 'apellido_p': 'A', 'apellido_m': 'B',
+                  'carrera': 'Ingeniería en Software', 'cuatrimestre': '4'} for sid in range(1, 41)}
+
+    def sin_fecha(evaluaciones):
+        return [{k: v for k, v in e.items() if k != 'fecha_evaluacion'} for e in evaluaciones]
+
+    # Las cubetas son constantes de la clase que usan ambos caminos: cambiarlas no los separa
+    class MotorOtrasCubetas(RiskAssessmentEngine):
+        FRECUENCIA_DESGLOSE = ((4, 7), (2, 2))
+        INDICADOR_DESGLOSE = ((2, 5), (1, 1))
+        FRECUENCIA_PUNTOS = {'alto': 9, 'medio': 5, 'bajo': 2}
+        INDICADOR_PUNTOS = {'alto': 7, 'medio': 4, 'bajo': 1}
+
+    for engine, fecha_inicio in ((engine, None), (engine, '2025-06-01'), (MotorOtrasCubetas(), None)):
+        estudiantes_data = {}
+        for student_id, motivo, fecha in filas:
+            if fecha_inicio is None or fecha >= fecha_inicio:
+                estudiantes_data.setdefault(student_id, []).append({'motivo': motivo, 'fecha': fecha})
+        esperado = engine.evaluar_multiples_estudiantes([{
+            'info': info[sid],
+            'tutorias': tuts,
+            'inasistencias': sum(1 for t in tuts if 'inasistencia' in (t['motivo'] or '').lower()),
+            'bajas_calificaciones': sum(1 for t in tuts if 'baja calificación' in (t['motivo'] or '').lower()
+                                        or 'bajo desempeño' in (t['motivo'] or '').lower()),
+        } for sid, tuts in estudiantes_data.items()])
+        assert any(None in e['motivos_frecuentes'] and '' in e['motivos_frecuentes'] for e in esperado), \
+            "Fallo: la prueba no cubre motivos NULL y vacíos a la vez"
+
+        lote = engine.evaluar_lote(columnas, info, fecha_inicio)
+        assert sin_fecha(lote) == sin_fecha(esperado), \
+            f"Fallo: evaluar_lote difiere ({type(engine).__name__}, fecha_inicio={fecha_inicio})"
+        sin_pandas = engine._evaluar_lote_sin_pandas(columnas, info, fecha_inicio)
+        assert sin_fecha(sin_pandas) == sin_fecha(esperado), "Fallo: la alternativa sin pandas difiere"
+
+    assert lote[0]['desglose_puntuacion']['frecuencia'] == 7 and lote[0]['detalles_puntuacion']['frecuencia_peso'] in (9, 5), \
+        "Fallo: evaluar_lote no usó las cubetas de la clase"
+    engine = RiskAssessmentEngine()
+    assert engine.evaluar_lote({'student_id': [], 'motivo': [], 'fecha': []}) == [], "Fallo: lote vacío"
+    assert engine.evaluar_lote({'student_id': [], 'motivo': [], 'fecha': []}, fecha_inicio='2025-01-01') == [], \
+        "Fallo: lote vacío con fecha de inicio"
+    print("✅ Verificación de Evaluación por Lotes exitosa.")
+
+def test_clasificador_motivos():
+    """Verifica que el clasificador compilado coincide con la búsqueda anidada original."""
+    print("\n--- Verificando Clasificador de Motivos ---")
+
+    def peso_anidado(motivo):
+        for clave, peso in MOTIVO_PESOS.items():
+            if clave in motivo.lower():
+                return peso, True
+        return 0, False
+
+    def categoria_anidada(motivo):
+        for clave, categoria in MOTIVO_CATEGORIES.items():
+            if clave in motivo.lower():
+                return categoria
+        return motivo
+
+    clasificador = MotivoClassifier(tamano_cache=4)
+    motivos = [
+        "Baja calificación en examen", "Inasistencias frecuentes", "INASISTENCIA única",
+        "Reforzamiento de materia y bajo desempeño", "Falta de motivación; problemas de conducta",
+        "Asesoría general", "Dificultades académicas", "Solicitud de asesoría académica", "",
+    ]
+    for motivo in motivos * 2:
+        c = clasificador.clasificar(motivo)
+        assert (c.peso, c.coincide_peso) == peso_anidado(motivo), f"Fallo: peso de '{motivo}'"
+        assert c.categoria == categoria_anidada(motivo), f"Fallo: categoría de '{motivo}'"
+        assert c.es_inasistencia == ('inasistencia' in motivo.lower()), f"Fallo: inasistencia en '{motivo}'"
+        assert c.es_baja_calificacion == ('baja calificación' in motivo.lower() or 'bajo desempeño' in motivo.lower())
+
+    info = clasificador.info_cache()
+    assert info.currsize <= 4, "Fallo: la caché no respeta su tamaño máximo"
+    assert RiskAssessmentEngine().clasificador is AcademicHistoryAnalyzer().clasificador, "Fallo: los motores no comparten el clasificador"
+    print("✅ Verificación de Clasificador de Motivos exitosa.")
+
+def test_gestor_conexiones():
+    """Verifica la reutilización entre hilos, el límite del grupo, los PRAGMAs y las estadísticas del gestor de conexiones."""
+    print("\n--- Verificando Gestor de Conexiones ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        gestor = ConnectionManager(os.path.join(directorio, 'prueba.db'), tamano=2, cache_size_kib=2048, mmap_size=0,
+                                   busy_timeout_ms=200)
+        db = gestor.obtener()
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == 'wal', "Fallo: WAL no activado"
+        assert db.execute("PRAGMA synchronous").fetchone()[0] == 1, "Fallo: synchronous no es NORMAL"
+        assert db.execute("PRAGMA foreign_keys").fetchone()[0] == 1, "Fallo: foreign_keys desactivado"
+        assert db.execute("PRAGMA cache_size").fetchone()[0] == -2048, "Fallo: cache_size no configurado"
+
+        # En una base que ya está en WAL las conexiones nuevas no vuelven a cambiar el modo
+        # (requiere candado exclusivo) y busy_timeout va antes que cualquier otro PRAGMA
+        otra, sentencias = sqlite3.connect(os.path.join(directorio, 'prueba.db')), []
+        otra.set_trace_callback(sentencias.append)
+        configurar_conexion(otra)
+        assert sentencias[0].startswith('PRAGMA busy_timeout') and 'PRAGMA journal_mode = WAL' not in sentencias, \
+            f"Fallo: PRAGMAs por conexión {sentencias}"
+        otra.close()
+
+        db.execute("CREATE TABLE t (x INTEGER)")
+        db.execute("INSERT INTO t VALUES (1)")
+        db.commit()
+        db.execute("INSERT INTO t VALUES (2)")
+        gestor.liberar(db)  # Fin de petición sin commit: se descarta
+        assert not db.in_transaction, "Fallo: liberar no deshizo la transacción"
+
+        # Cada petición llega en un hilo nuevo (servidor threaded): la conexión liberada se reutiliza
+        otras = []
+        for _ in range(3):
+            hilo = threading.Thread(target=lambda: (otras.append(gestor.obtener()), gestor.liberar(otras[-1])))
+            hilo.start()
+            hilo.join()
+        assert all(c is db for c in otras), "Fallo: la conexión liberada no se reutiliza en otro hilo"
+        assert otras[0].execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1, "Fallo: quedó la escritura sin commit"
+
+        # Dos en uso a la vez son conexiones distintas; con el grupo lleno la tercera espera
+        primera, segunda = gestor.obtener(), gestor.obtener()
+        assert primera is not segunda, "Fallo: dos peticiones comparten conexión"
+        try:
+            gestor.obtener()
+            assert False, "Fallo: el grupo abrió más conexiones que su tamaño"
+        except sqlite3.OperationalError:
+            pass
+        recibida = []
+        hilo = threading.Thread(target=lambda: recibida.append(gestor.obtener()))
+        hilo.start()
+        time.sleep(0.05)
+        gestor.liberar(segunda)
+        hilo.join()
+        assert recibida == [segunda], "Fallo: la petición en espera no recibió la conexión liberada"
+
+        estadisticas = gestor.obtener_estadisticas()
+        assert estadisticas['conexiones_abiertas'] == 2, "Fallo: conteo de conexiones abiertas"
+        assert estadisticas['conexiones_reutilizadas'] == 5, "Fallo: conteo de reutilizaciones"
+        assert estadisticas['esperas_pool'] == 2 and estadisticas['conexiones_en_uso'] == 2, "Fallo: conteo de esperas"
+        assert estadisticas['escrituras'] >= 3 and estadisticas['errores_bloqueo'] == 0, "Fallo: conteo de escrituras"
+
+        # Al cerrar el grupo las conexiones en uso se cierran cuando se liberan
+        gestor.liberar(primera)
+        gestor.cerrar_todas()
+        gestor.liberar(segunda)
+        for conn in (primera, segunda):
+            try:
+                conn.execute("SELECT 1")
+                assert False, "Fallo: quedó abierta una conexión del grupo cerrado"
+            except sqlite3.ProgrammingError:
+                pass
+        assert gestor.obtener_estadisticas()['conexiones_activas'] == 0, "Fallo: conexiones activas tras cerrar"
+    print("✅ Verificación de Gestor de Conexiones exitosa.")
+
+# Servidor real con un hilo por petición (como app.run): 20 inicios de sesión fallidos (cada uno consulta
+# la base), la mitad desde 4 clientes a la vez; imprime las estadísticas del grupo de conexiones
+CODIGO_SERVIDOR_HILOS = """
+import json, threading, urllib.parse, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import make_server
+import app
+servidor = make_server('127.0.0.1', 0, app.app, threaded=True)
+threading.Thread(target=servidor.serve_forever, daemon=True).start()
+datos = urllib.parse.urlencode({'usuario': 'nadie@x', 'password': 'x'}).encode()
+def pedir(_):
+    with urllib.request.urlopen(f'http://127.0.0.1:{servidor.server_port}/login', datos) as respuesta:
+        assert respuesta.status == 200
+list(map(pedir, range(10)))
+with ThreadPoolExecutor(4) as clientes:
+    list(clientes.map(pedir, range(10)))
+servidor.shutdown()
+print(json.dumps(app.gestor_db.obtener_estadisticas()))
+"""
+
+def test_conexiones_servidor_hilos():
+    """Verifica que un servidor con un hilo por petición reutiliza las conexiones del grupo."""
+    print("\n--- Verificando Conexiones en Servidor con Hilos ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        entorno = dict(os.environ, TUTORIAS_DB=os.path.join(directorio, 'servidor.db'), TUTORIAS_DB_POOL='4',
+                       TUTORIAS_REPORTES_DIR=os.path.join(directorio, 'reportes'),
+                       PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+        proceso = subprocess.run([sys.executable, '-c', CODIGO_SERVIDOR_HILOS], env=entorno, cwd=directorio,
+                                 capture_output=True, text=True)
+        assert proceso.returncode == 0, f"Fallo: servidor con hilos\n{proceso.stderr[-2000:]}"
+        estadisticas = json.loads(proceso.stdout.strip().splitlines()[-1])
+        # Una conexión del arranque (init_db) más, como mucho, una por cliente simultáneo
+        assert estadisticas['conexiones_abiertas'] <= 4, f"Fallo: conexiones sin reutilizar {estadisticas}"
+        assert estadisticas['conexiones_reutilizadas'] >= 17 and estadisticas['tasa_reutilizacion'] >= 0.8, \
+            f"Fallo: reutilización {estadisticas}"
+        assert estadisticas['conexiones_en_uso'] == 0, f"Fallo: conexiones sin devolver al grupo {estadisticas}"
+    print("✅ Verificación de Conexiones en Servidor con Hilos exitosa.")
+
+def test_busqueda_texto_completo():
+    """Verifica la búsqueda sin acentos, la sincronización por triggers y el orden por relevancia."""
+    print("\n--- Verificando Búsqueda de Texto Completo ---")
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    crear_esquema(conn)
+    conn.executemany(
+        "INSERT INTO estudiantes (matricula, nombre, apellido_p, apellido_m, cuatrimestre_actual) VALUES (?, ?, ?, ?, ?)",
+        [('2023001', 'José', 'Pérez', 'Núñez', '3'), ('2023002', 'Ana', 'Peralta', 'Ruiz', '5')]
+    )
+    # Filas existentes antes de crear el índice se cargan al crearlo
+    crear_indices_busqueda(conn)
+    conn.execute("INSERT INTO tutoria (estudiante_id, nombre, apellido_p, apellido_m, matricula, motivo, descripcion, created_at) "
+                 "VALUES (1, 'José', 'Pérez', 'Núñez', '2023001', 'Baja calificación', 'Matemáticas', '2025-01-01')")
+    conn.execute("INSERT INTO tutoria (estudiante_id, nombre, apellido_p, apellido_m, matricula, motivo, descripcion, created_at) "
+                 "VALUES (2, 'Ana', 'Peralta', 'Ruiz', '2023002', 'Asesoría general', 'Dudas de calificación', '2025-01-02')")
+
+    assert [e['matricula'] for e in buscar_estudiantes(conn, 'perez')] == ['2023001'], "Fallo: 'perez' no encuentra 'Pérez'"
+    assert [e['matricula'] for e in buscar_estudiantes(conn, 'JOSE NUNEZ')] == ['2023001'], "Fallo: búsqueda de varios términos"
+    assert [e['matricula'] for e in buscar_estudiantes(conn, 'per', '5')] == ['2023002'], "Fallo: filtro de cuatrimestre"
+    assert len(buscar_estudiantes(conn, 'ru')) == 1, "Fallo: término corto (LIKE sobre el índice)"
+    assert [t['matricula'] for t in buscar_tutorias(conn, 'matematicas')] == ['2023001'], "Fallo: búsqueda en descripción"
+    assert len(buscar_tutorias(conn, 'calificacion')) == 2, "Fallo: búsqueda en motivo y descripción"
+
+    conn.execute("UPDATE estudiantes SET apellido_p = 'Gómez' WHERE id = 1")
+    assert buscar_estudiantes(conn, 'perez') == [] and len(buscar_estudiantes(conn, 'gomez')) == 1, "Fallo: trigger de actualización"
+    conn.execute("DELETE FROM tutoria WHERE estudiante_id = 1")
+    assert buscar_tutorias(conn, 'matematicas') == [], "Fallo: trigger de eliminación"
+    conn.close()
+    print("✅ Verificación de Búsqueda de Texto Completo exitosa.")
+
+def test_paginacion_keyset():
+    """Verifica que recorrer las páginas hacia adelante y hacia atrás cubre cada fila una sola vez."""
+    print("\n--- Verificando Paginación Keyset ---")
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    crear_esquema(conn)
+    # Fechas repetidas y apellido materno nulo para ejercitar el desempate por id
+    conn.executemany("INSERT INTO tutoria (nombre, created_at) VALUES (?, ?)",
+                     [(f"T{i}", f"2025-01-{i % 4 + 1:02d}") for i in range(23)])
+    conn.executemany("INSERT INTO estudiantes (matricula, nombre, apellido_p, apellido_m) VALUES (?, ?, ?, ?)",
+                     [(f"M{i}", f"N{i % 3}", f"A{i % 5}", None if i % 2 else f"B{i % 3}") for i in range(17)])
+
+    casos = [
+        ('tutoria', ORDEN_RECIENTES, True, "SELECT id FROM tutoria ORDER BY created_at DESC, id DESC"),
+        ('estudiantes', ORDEN_APELLIDOS, False, "SELECT id FROM estudiantes ORDER BY apellido_p, coalesce(apellido_m, ''), nombre, id"),
+    ]
+    for tabla, orden, descendente, consulta in casos:
+        esperado = [fila['id'] for fila in conn.execute(consulta)]
+        paginas, cursor = [], None
+        while True:
+            pagina = paginar(conn, tabla, orden, descendente, cursor, tamano=5)
+            paginas.append(pagina)
+            if not pagina.siguiente:
+                break
+            cursor = pagina.siguiente
+        assert [f['id'] for p in paginas for f in p.filas] == esperado, f"Fallo: recorrido hacia adelante de {tabla}"
+        assert paginas[0].anterior is None, "Fallo: la primera página no debe tener anterior"
+
+        # Hacia atrás desde la última página se obtienen las mismas páginas
+        cursor = paginas[-1].anterior
+        for indice in range(len(paginas) - 2, -1, -1):
+            pagina = paginar(conn, tabla, orden, descendente, cursor, tamano=5)
+            assert [f['id'] for f in pagina.filas] == [f['id'] for f in paginas[indice].filas], f"Fallo: página anterior de {tabla}"
+            cursor = pagina.anterior
+        assert cursor is None, "Fallo: al volver a la primera página no debe haber anterior"
+
+    assert len(paginar(conn, 'tutoria', ORDEN_RECIENTES, True, 'cursor-invalido', tamano=5).filas) == 5, "Fallo: cursor inválido"
+
+    datos = list(range(12))
+    pagina = paginar_resultados(lambda limite, desplazamiento: datos[desplazamiento:desplazamiento + limite], tamano=5)
+    siguiente = paginar_resultados(lambda limite, desplazamiento: datos[desplazamiento:desplazamiento + limite], pagina.siguiente, tamano=5)
+    assert pagina.filas == [0, 1, 2, 3, 4] and siguiente.filas == [5, 6, 7, 8, 9], "Fallo: paginación de resultados"
+    conn.close()
+    print("✅ Verificación de Paginación Keyset exitosa.")
+
+def test_actividad_mensual():
+    """Verifica que los triggers mantienen actividad_mensual igual a recalcularla desde cero."""
+    print("\n--- Verificando Resumen de Actividad Mensual ---")
+    conn = sqlite3.connect(':memory:')
+    crear_esquema(conn)
+    conn.executemany("INSERT INTO estudiantes (matricula, nombre, apellido_p, cuatrimestre_actual, carrera) VALUES (?, ?, 'X', ?, ?)",
+                     [('A1', 'Ana', '3', 'ISC'), ('B2', 'Beto', '5', 'IGE')])
+    conn.execute("INSERT INTO asesoria (estudiante_id, fecha) VALUES (1, '2025-01-10')")
+    # Filas existentes antes de crear la tabla se cargan al crearla
+    crear_tabla_actividad(conn)
+
+    def resumen():
+        return sorted(conn.execute("SELECT * FROM actividad_mensual WHERE cantidad <> 0").fetchall())
+
+    def verificar(paso):
+        actual = resumen()
+        reconstruir_actividad(conn)
+        assert actual == resumen(), f"Fallo: el resumen no coincide con el recalculado ({paso})"
+
+    conn.executemany("INSERT INTO asesoria (estudiante_id, fecha) VALUES (?, ?)",
+                     [(1, '2025-02-03'), (2, '2025-02-04'), (None, '2025-03-01'), (1, '')])
+    conn.executemany("INSERT INTO tutoria (estudiante_id, cuatrimestre, fecha) VALUES (?, ?, ?)",
+                     [(1, '3', '2025-01-15'), (2, '5', '2025-03-20'), (None, '3', '2025-03-21')])
+    conn.executemany("INSERT INTO tutoria_grupal (carrera, cuatrimestre, fecha) VALUES (?, ?, ?)",
+                     [('ISC', '3', '2024-12-01'), ('IGE', '5', '2025-02-11')])
+    verificar("altas")
+
+    conn.execute("UPDATE asesoria SET fecha = '2025-04-01' WHERE id = 1")
+    conn.execute("UPDATE tutoria SET estudiante_id = 1 WHERE id = 3")
+    conn.execute("UPDATE tutoria_grupal SET carrera = 'IGE' WHERE id = 1")
+    verificar("cambios en registros")
+
+    conn.execute("UPDATE estudiantes SET carrera = 'IIA' WHERE id = 1")
+    conn.execute("UPDATE estudiantes SET id = 5 WHERE id = 2")
+    conn.execute("INSERT INTO estudiantes (id, matricula, nombre, apellido_p, carrera) VALUES (2, 'C3', 'Caro', 'Y', 'ISC')")
+    verificar("cambios en estudiantes")
+
+    conn.execute("DELETE FROM estudiantes WHERE id = 1")
+    conn.execute("DELETE FROM tutoria WHERE id = 2")
+    conn.execute("DELETE FROM asesoria WHERE estudiante_id = 2")
+    verificar("bajas")
+
+    # Totales incluyen registros sin fecha; las tres series comparten los meses
+    resumen_dashboard = obtener_resumen_actividad(conn)
+    assert resumen_dashboard.totales == {'asesoria': 4, 'tutoria': 2, 'tutoria_grupal': 2}, f"Fallo: totales {resumen_dashboard.totales}"
+    assert resumen_dashboard.meses == ['Dic 2024', 'Ene 2025', 'Feb 2025', 'Mar 2025', 'Abr 2025'], "Fallo: meses de la gráfica"
+    assert all(len(serie) == len(resumen_dashboard.meses) for serie in resumen_dashboard.series.values()), "Fallo: series desalineadas"
+    assert resumen_dashboard.series['tutoria_grupal'] == [1, 0, 1, 0, 0], "Fallo: serie de tutorías grupales"
+
+    filtrado = obtener_resumen_actividad(conn, carrera='IGE', cuatrimestre='5')
+    assert filtrado.totales == {'asesoria': 0, 'tutoria': 0, 'tutoria_grupal': 1}, f"Fallo: filtro {filtrado.totales}"
+    assert 'IGE' in filtrado.carreras and filtrado.cuatrimestres == ['3', '5'], "Fallo: opciones de filtro"
+    conn.close()
+    print("✅ Verificación de Resumen de Actividad Mensual exitosa.")
+
+def test_reporte_periodo_por_lotes():
+    """Verifica que el reporte por período se arma por segmentos desde un cursor, sin cargarlo completo."""
+    print("\n--- Verificando Reporte por Período por Lotes ---")
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    crear_esquema(conn)
+    conn.executemany("INSERT INTO tutoria (nombre, apellido_p, motivo, fecha) VALUES (?, 'X', ?, ?)",
+                     [(f"E{i}", 'Inasistencias' if i % 3 else 'Baja calificación', '2025-03-01') for i in range(25)])
+
+    # La historia solo adelanta `reserva` flowables de la fuente
+    consumidos = []
+    historia = _HistoriaPerezosa((consumidos.append(i) or i for i in range(100)), reserva=4)
+    assert len(historia) == 4 and len(consumidos) == 4, "Fallo: la historia consume la fuente por adelantado"
+
+    generator = PDFReportGenerator()
+    cursor = conn.execute("SELECT fecha, nombre, apellido_p, motivo FROM tutoria ORDER BY fecha DESC")
+    flowables = list(generator._period_story({'start_date': '2025-01-01'}, recorrer_en_lotes(cursor, 7), segment_size=10))
+    segmentos = [f for f in flowables if isinstance(f, Table)][1:]  # la primera es la tabla de información
+    assert [len(s._cellvalues) for s in segmentos] == [11, 10, 5], "Fallo: segmentos de la tabla"
+    assert segmentos[0]._cellvalues[0] == ["Fecha", "Estudiante", "Motivo", "Tipo"], "Fallo: encabezado solo en el primer segmento"
+    assert segmentos[1]._cellvalues[0][3] == 'Individual', "Fallo: tipo por defecto"
+
+    with tempfile.TemporaryFile() as salida:
+        cursor = conn.execute("SELECT fecha, nombre, apellido_p, motivo FROM tutoria ORDER BY fecha DESC")
+        generator.generate_period_report({'start_date': '2025-01-01'}, recorrer_en_lotes(cursor, 7), salida, segment_size=10)
+        salida.seek(0)
+        assert salida.read(5) == b'%PDF-', "Fallo: el archivo temporal no contiene un PDF"
+
+    # Con varios segmentos (TAMANO_SEGMENTO) el PDF trae todas las filas y las mismas páginas
+    # que construir la historia completa en memoria: la historia perezosa no trunca nada
+    total = 2 * TAMANO_SEGMENTO + 37
+    conn.executemany("INSERT INTO tutoria (nombre, apellido_p, motivo, fecha) VALUES (?, 'X', 'Inasistencias', '2025-04-01')",
+                     [(f"Alumno{i:04d}",) for i in range(total)])
+    consulta = "SELECT fecha, nombre, apellido_p, motivo FROM tutoria WHERE fecha = '2025-04-01' ORDER BY id"
+    filas_progreso = []
+    pdf = generator.generate_period_report({'start_date': '2025-04-01'}, recorrer_en_lotes(conn.execute(consulta), 50),
+                                           progress=filas_progreso.append).getvalue()
+    referencia = BytesIO()
+    generator._create_document(referencia, "REPORTE DE TUTORÍAS POR PERÍODO", "", pageCompression=1).build(
+        list(generator._period_story({'start_date': '2025-04-01'}, conn.execute(consulta).fetchall(), TAMANO_SEGMENTO)))
+
+    def paginas(contenido):
+        return len(re.findall(rb'/Type /Page\b(?!s)', contenido))
+
+    def texto(contenido):
+        # Flujos de página de ReportLab: ASCII85 y después Flate
+        return b''.join(zlib.decompress(base64.a85decode(flujo.strip().removesuffix(b'~>')))
+                        for flujo in re.findall(rb'stream\r?\n(.*?)endstream', contenido, re.S))
+
+    dibujadas = set(re.findall(rb'Alumno(\d{4})', texto(pdf)))
+    assert dibujadas == {f"{i:04d}".encode() for i in range(total)}, f"Fallo: el PDF tiene {len(dibujadas)} de {total} filas"
+    assert filas_progreso[-1] == total, "Fallo: progreso del reporte"
+    assert paginas(pdf) == paginas(referencia.getvalue()) > 1, \
+        f"Fallo: páginas {paginas(pdf)} frente a {paginas(referencia.getvalue())} de la historia completa"
+
+    # Si ReportLab dejara de consumir la historia (p. ej. la copiara) el reporte falla en vez de truncarse
+    historia = _HistoriaPerezosa(iter(range(20)), reserva=4)
+    list(historia)
+    assert not historia.agotada and len(historia) == 4, "Fallo: historia sin consumir"
+    conn.close()
+    print("✅ Verificación de Reporte por Período por Lotes exitosa.")
+
+# Cota del pico de memoria del reporte por período (medido: ~0.5 MiB fijos y ~16 KiB por
+# página, que ReportLab retiene hasta save(); ver docs/pdf_generator_documentation.md)
+MEMORIA_PERIODO_BASE_KIB = 1024
+MEMORIA_PERIODO_PAGINA_KIB = 20
+
+def test_memoria_reporte_periodo():
+    """Verifica que el pico de memoria del reporte por período respeta la cota documentada por página."""
+    print("\n--- Verificando Memoria del Reporte por Período ---")
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    crear_esquema(conn)
+    conn.executemany("INSERT INTO tutoria (nombre, apellido_p, motivo, fecha) VALUES (?, 'Ramírez', ?, '2025-04-01')",
+                     [(f"Alumno{i:05d}", f"Motivo de prueba número {i % 40}") for i in range(900)])
+    generator = PDFReportGenerator()
+    generator.generate_period_report({}, [])  # Fuentes y estilos se cargan una vez por proceso
+
+    mediciones = []
+    for filas in (300, 900):
+        cursor = conn.execute("SELECT fecha, nombre, apellido_p, motivo FROM tutoria ORDER BY id LIMIT ?", (filas,))
+        with tempfile.TemporaryFile() as salida:
+            tracemalloc.start()
+            try:
+                generator.generate_period_report({'start_date': '2025-04-01'}, recorrer_en_lotes(cursor), salida)
+                pico = tracemalloc.get_traced_memory()[1] / 1024
+            finally:
+                tracemalloc.stop()
+            salida.seek(0)
+            paginas = len(re.findall(rb'/Type /Page\b(?!s)', salida.read()))
+        cota = MEMORIA_PERIODO_BASE_KIB + MEMORIA_PERIODO_PAGINA_KIB * paginas
+        assert pico <= cota, f"Fallo: {filas} filas ({paginas} páginas) usaron {pico:.0f} KiB (cota {cota} KiB)"
+        mediciones.append(f"{paginas} páginas: {pico:.0f} KiB")
+    conn.close()
+    print(f"✅ Verificación de Memoria del Reporte por Período exitosa ({', '.join(mediciones)}).")
+
+def test_cola_reportes():
+    """Verifica la generación en segundo plano, la reanudación tras reiniciar y el vencimiento de reportes."""
+    print("\n--- Verificando Cola de Reportes ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_db = os.path.join(directorio, 'trabajos.db')
+        conn = sqlite3.connect(ruta_db)
+        conn.row_factory = sqlite3.Row
+        # Como tras esquema.migrar: los hilos de la cola encuentran la base ya en WAL
+        assert activar_wal(conn) == 'wal', "Fallo: la base no quedó en WAL"
+        crear_esquema(conn)
+        crear_tabla_trabajos(conn)
+        conn.execute("INSERT INTO tutoria_grupal (grupo_nombre, carrera, cuatrimestre, motivo, fecha, descripcion, asistentes) "
+                     "VALUES ('IS-701', 'ISC', '7', 'Integración', '2025-03-01', 'Dinámica de grupo', '25')")
+        conn.executemany("INSERT INTO tutoria (nombre, apellido_p, motivo, fecha) VALUES (?, 'X', 'Inasistencias', '2025-03-02')",
+                         [(f"E{i}",) for i in range(150)])
+        conn.commit()
+
+        cola = ReportJobQueue(ruta_db, os.path.join(directorio, 'reportes'), trabajadores=2)
+        grupo = cola.encolar(conn, 'grupo', {'group_id': 1}, 'tutor@x')
+        periodo = cola.encolar(conn, 'periodo', {'start_date': '2025-01-01', 'end_date': '2025-12-31'}, 'tutor@x')
+        inexistente = cola.encolar(conn, 'grupo', {'group_id': 99}, 'tutor@x')
+        cola.esperar()
+
+        for trabajo_id in (grupo, periodo):
+            trabajo = cola.obtener(conn, trabajo_id)
+            assert trabajo['estado'] == TERMINADO and trabajo['progreso'] == 100, f"Fallo: trabajo {trabajo['tipo']} sin terminar"
+            with open(cola.ruta_resultado(trabajo), 'rb') as archivo:
+                assert archivo.read(5) == b'%PDF-', "Fallo: el archivo del trabajo no es un PDF"
+        fallido = cola.obtener(conn, inexistente)
+        assert fallido['estado'] == ERROR and 'no encontrado' in fallido['mensaje'], "Fallo: trabajo con error"
+
+        # Una falla fuera del generador (al abrir la conexión del hilo) también deja el trabajo en
+        # error; el período es otro para que no salga de la caché
+        cola = ReportJobQueue(ruta_db, os.path.join(directorio, 'reportes'), trabajadores=1)
+        obtener_conexion, fallas = cola.gestor.obtener, [sqlite3.OperationalError('database is locked')]
+        def obtener_con_falla():
+            if fallas:
+                raise fallas.pop()
+            return obtener_conexion()
+        cola.gestor.obtener = obtener_con_falla
+        bloqueado = cola.encolar(conn, 'periodo', {'start_date': '2025-03-01', 'end_date': '2025-03-31'}, 'tutor@x')
+        cola.esperar()
+        trabajo = cola.obtener(conn, bloqueado)
+        assert trabajo['estado'] == ERROR and 'locked' in trabajo['mensaje'] and trabajo['expira'], \
+            f"Fallo: trabajo con falla de conexión quedó {trabajo['estado']}"
+
+        # Un trabajo que quedó en proceso al reiniciar se vuelve a generar
+        conn.execute("INSERT INTO trabajos_reporte (id, tipo, parametros, estado, creado) VALUES ('r1', 'grupo', '{\"group_id\": 1}', 'en_proceso', '2025-01-01')")
+        conn.commit()
+        cola = ReportJobQueue(ruta_db, os.path.join(directorio, 'reportes'), trabajadores=1)
+        assert cola.reanudar(conn) == 1, "Fallo: reanudación de trabajos pendientes"
+        cola.esperar()
+        assert cola.obtener(conn, 'r1')['estado'] == TERMINADO, "Fallo: trabajo reanudado"
+
+        # Al vencer se borran el archivo y el registro
+        conn.execute("UPDATE trabajos_reporte SET expira = '2000-01-01' WHERE id = ?", (grupo,))
+        conn.commit()
+        assert cola.limpiar_expirados(conn) == 1, "Fallo: limpieza de trabajos vencidos"
+        assert cola.obtener(conn, grupo) is None and not os.path.exists(cola.ruta_archivo(grupo)), "Fallo: archivo vencido"
+
+        # Con el servidor en marcha el barrido periódico borra lo vencido aunque nadie encole
+        conn.execute("INSERT INTO trabajos_reporte (id, tipo, parametros, estado, creado, expira) "
+                     "VALUES ('v1', 'lote', '{}', 'terminado', '2000-01-01', '2000-01-02')")
+        conn.commit()
+        with open(cola.ruta_archivo('v1', 'lote'), 'wb') as archivo:
+            archivo.write(b'PK')
+        cola = ReportJobQueue(ruta_db, os.path.join(directorio, 'reportes'), trabajadores=1)
+        cola.iniciar_limpieza(intervalo_s=0.05)
+        limite = time.monotonic() + 5
+        while os.path.exists(cola.ruta_archivo('v1', 'lote')) and time.monotonic() < limite:
+            time.sleep(0.05)
+        cola.esperar()
+        assert not os.path.exists(cola.ruta_archivo('v1', 'lote')) and cola.obtener(conn, 'v1') is None, \
+            "Fallo: el barrido periódico no borró el reporte vencido"
+        conn.close()
+    print("✅ Verificación de Cola de Reportes exitosa.")
+
+def test_estilos_compartidos():
+    """Verifica que los estilos se crean una vez y que encabezado y pie salen de la plantilla de página."""
+    print("\n--- Verificando Estilos y Plantilla de Página Compartidos ---")
+    assert obtener_estilos() is obtener_estilos(), "Fallo: los estilos se vuelven a crear"
+
+    tutorias = [{'fecha': '2025-03-01', 'motivo': 'Inasistencias', 'descripcion': None, 'tutor': 'T'}]
+    student_data = {'nombre': 'Juan', 'apellido_p': 'Pérez', 'apellido_m': 'García', 'tutor': 'Tutor de prueba'}
+    pdf = PDFReportGenerator().generate_student_report(student_data, tutorias).getvalue()
+    assert pdf.startswith(b'%PDF-'), "Fallo: el reporte no es un PDF"
+
+    # Dos reportes a la vez en hilos distintos no comparten el estado del documento
+    errores = []
+    def generar():
+        try:
+            PDFReportGenerator().generate_group_report({'grupo_nombre': 'IS-701'}, tutorias * 50)
+        except Exception as e:
+            errores.append(e)
+    hilos = [threading.Thread(target=generar) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert not errores, f"Fallo: generación concurrente {errores}"
+    print("✅ Verificación de Estilos y Plantilla de Página Compartidos exitosa.")
+
+def test_cache_reportes():
+    """Verifica que un reporte sin cambios sale de la caché y que editar sus filas lo invalida."""
+    print("\n--- Verificando Caché de Reportes ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_db = os.path.join(directorio, 'cache.db')
+        reportes = os.path.join(directorio, 'reportes')
+        conn = sqlite3.connect(ruta_db)
+        conn.row_factory = sqlite3.Row
+        crear_esquema(conn)
+        crear_tabla_trabajos(conn)
+        conn.execute("INSERT INTO tutoria_grupal (grupo_nombre, carrera, cuatrimestre, motivo, fecha, descripcion, asistentes) "
+                     "VALUES ('IS-701', 'ISC', '7', 'Integración', '2025-03-01', 'Dinámica de grupo', '25')")
+        conn.commit()
+
+        def encolar_grupo():
+            cola = ReportJobQueue(ruta_db, reportes, trabajadores=1)
+            trabajo_id = cola.encolar(conn, 'grupo', {'group_id': 1}, 'tutor@x')
+            cola.esperar()
+            return cola.obtener(conn, trabajo_id)
+
+        primero = encolar_grupo()
+        assert primero['estado'] == TERMINADO and primero['iniciado'] is not None, "Fallo: primer reporte"
+        segundo = encolar_grupo()
+        assert segundo['clave'] == primero['clave'], "Fallo: misma huella, distinta clave"
+        assert segundo['estado'] == TERMINADO and segundo['nombre_descarga'] == primero['nombre_descarga'], "Fallo: acierto de caché"
+        # Ni el acierto ni el reporte generado dejan una copia por trabajo: ambos se sirven de la caché
+        assert not any(os.path.exists(os.path.join(reportes, f"{t['id']}.pdf")) for t in (primero, segundo)), \
+            "Fallo: copia del reporte por trabajo"
+        with open(os.path.join(reportes, 'cache', f"{segundo['clave']}.pdf"), 'rb') as archivo:
+            assert archivo.read(5) == b'%PDF-', "Fallo: el reporte de la caché no es un PDF"
+
+        # Editar una fila de origen cambia la clave (trigger de versión); editar la de otro grupo no
+        conn.execute("INSERT INTO tutoria_grupal (grupo_nombre, carrera, cuatrimestre, motivo, fecha, descripcion, asistentes) "
+                     "VALUES ('IS-702', 'ISC', '7', 'Integración', '2025-03-02', 'Dinámica de grupo', '20')")
+        conn.execute("UPDATE tutoria_grupal SET descripcion = 'Otra dinámica' WHERE id = 2")
+        conn.commit()
+        assert clave_trabajo(conn, 'grupo', {'group_id': 1})[0] == primero['clave'], "Fallo: editar otro grupo invalidó la caché"
+        conn.execute("UPDATE tutoria_grupal SET descripcion = 'Otra dinámica' WHERE id = 1")
+        conn.commit()
+        assert encolar_grupo()['clave'] != primero['clave'], "Fallo: la edición no invalidó la caché"
+
+        # Reportes de estudiante y de período: solo cuentan sus propias filas
+        conn.executemany("INSERT INTO estudiantes (matricula, nombre, apellido_p) VALUES (?, ?, 'Ruiz')", [('C1', 'Ana'), ('C2', 'Beto')])
+        conn.executemany("INSERT INTO tutoria (estudiante_id, motivo, fecha) VALUES (?, 'Inasistencias', ?)",
+                         [(1, '2025-01-10'), (2, '2025-05-10')])
+        conn.commit()
+        estudiante = {'estudiante_id': 1, 'tutor': 'T'}
+        periodo = {'start_date': '2025-01-01', 'end_date': '2025-01-31', 'carrera': '', 'cuatrimestre': ''}
+        claves = lambda: (clave_trabajo(conn, 'estudiante', estudiante)[0], clave_trabajo(conn, 'periodo', periodo)[0])
+        antes = claves()
+        conn.execute("UPDATE tutoria SET motivo = 'Baja calificación' WHERE estudiante_id = 2")
+        conn.execute("UPDATE estudiantes SET nombre = 'Alberto' WHERE id = 2")
+        conn.commit()
+        assert claves() == antes, "Fallo: editar a otro estudiante invalidó sus reportes"
+        conn.execute("UPDATE estudiantes SET nombre = 'Anabel' WHERE id = 1")
+        conn.commit()
+        renombrado = claves()
+        assert renombrado[0] != antes[0] and renombrado[1] != antes[1], "Fallo: renombrar al estudiante no invalidó sus reportes"
+        conn.execute("UPDATE tutoria SET motivo = 'Baja calificación' WHERE estudiante_id = 1")
+        conn.commit()
+        editado = claves()
+        assert editado[0] != renombrado[0] and editado[1] != renombrado[1], "Fallo: editar la tutoría no invalidó sus reportes"
+        conn.execute("DELETE FROM tutoria WHERE estudiante_id = 1")
+        conn.commit()
+        assert clave_trabajo(conn, 'periodo', periodo)[0] != editado[1], "Fallo: la baja no invalidó el reporte del período"
+        conn.close()
+
+        # LRU: al superar la capacidad se descarta el archivo usado hace más tiempo
+        cache = ReportCache(os.path.join(directorio, 'lru'), capacidad_mb=2.5 / 1024)
+        def guardar(clave):
+            origen = os.path.join(directorio, f"{clave}.pdf")
+            with open(origen, 'wb') as archivo:
+                archivo.write(b'x' * 1024)
+            cache.guardar(clave, origen)
+
+        guardar('a')
+        guardar('b')
+        os.utime(cache.ruta('a'), (1, 1))
+        os.utime(cache.ruta('b'), (2, 2))
+        cache.obtener('a')  # 'a' pasa a ser el usado más recientemente
+        guardar('c')
+        assert [c for c in 'abc' if os.path.exists(cache.ruta(c))] == ['a', 'c'], "Fallo: descarte LRU"
+    print("✅ Verificación de Caché de Reportes exitosa.")
+
+def test_exportacion_masiva():
+    """Verifica el ZIP de reportes por grupo: un PDF por estudiante y las fallas sin cancelar el resto."""
+    print("\n--- Verificando Exportación Masiva de Reportes ---")
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    crear_esquema(conn)
+    conn.executemany("INSERT INTO estudiantes (matricula, nombre, apellido_p, carrera, grupo) VALUES (?, ?, 'X', 'IS', ?)",
+                     [(f"M{i}", f"E{i}", '1725IS' if i < 4 else '2725IS') for i in range(5)])
+    conn.executemany("INSERT INTO tutoria (estudiante_id, motivo, fecha, descripcion) VALUES (?, 'Inasistencias', ?, ?)",
+                     [(1, '2025-03-01', 'Seguimiento'), (1, '2025-04-01', 'Seguimiento'), (2, '2025-03-02', 'Plática')])
+    # Una descripción con bytes inválidos (importación dañada) hace fallar el reporte de M2
+    conn.execute("INSERT INTO tutoria (estudiante_id, motivo, fecha, descripcion) VALUES (3, 'Inasistencias', '2025-03-03', X'FF')")
+
+    avance = []
+    with tempfile.TemporaryFile() as salida:
+        generados, fallidos = exportar_reportes(conn, salida, grupo='1725IS', procesos=2,
+                                                progreso=lambda hechos, total: avance.append((hechos, total)))
+        salida.seek(0)
+        with zipfile.ZipFile(salida) as archivo_zip:
+            nombres = sorted(archivo_zip.namelist())
+            assert nombres == ['M0_X_E0.pdf', 'M1_X_E1.pdf', 'M3_X_E3.pdf', ARCHIVO_ERRORES], f"Fallo: contenido del ZIP {nombres}"
+            assert archivo_zip.read('M0_X_E0.pdf')[:5] == b'%PDF-', "Fallo: el ZIP no contiene PDF"
+            assert 'M2' in archivo_zip.read(ARCHIVO_ERRORES).decode(), "Fallo: registro de errores"
+    assert generados == 3 and [e['matricula'] for e, _ in fallidos] == ['M2'], "Fallo: conteo de generados y fallidos"
+    assert avance[-1] == (4, 4) and len(avance) == 4, f"Fallo: progreso {avance}"
+    conn.close()
+    print("✅ Verificación de Exportación Masiva de Reportes exitosa.")
+
+def test_reporte_estudiante_por_id():
+    """Verifica el reporte individual por estudiantes.id: sin mezclar homónimos y con la carrera real."""
+    print("\n--- Verificando Reporte de Estudiante por Id ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_db = os.path.join(directorio, 'estudiante.db')
+        conn = sqlite3.connect(ruta_db)
+        conn.row_factory = sqlite3.Row
+        crear_esquema(conn)
+        crear_tabla_trabajos(conn)
+        # Dos estudiantes homónimos
+        conn.executemany("INSERT INTO estudiantes (matricula, nombre, apellido_p, apellido_m, carrera, cuatrimestre_actual) "
+                         "VALUES (?, 'Ana', 'López', 'Ruiz', ?, ?)", [('M1', 'IS', '5'), ('M2', 'IF', '2')])
+        conn.executemany("INSERT INTO tutoria (estudiante_id, nombre, apellido_p, apellido_m, motivo, fecha) "
+                         "VALUES (?, 'Ana', 'López', 'Ruiz', 'Inasistencias', ?)",
+                         [(1, '2025-03-01'), (1, '2025-05-01'), (2, '2025-04-01')])
+        conn.commit()
+
+        estudiante, tutorias = leer_estudiante(conn, 1)
+        assert [t['fecha'] for t in tutorias] == ['2025-05-01', '2025-03-01'], "Fallo: tutorías de homónimos mezcladas"
+        datos = datos_estudiante(estudiante, 'Tutor')
+        assert datos['carrera'] == 'IS' and datos['cuatrimestre'] == '5', "Fallo: carrera o cuatrimestre del estudiante"
+        conn.execute("INSERT INTO estudiantes (matricula, nombre, apellido_p) VALUES ('M3', 'Sin', 'Tutorías')")
+        assert leer_estudiante(conn, 3)[1] == [] and leer_estudiante(conn, 99) is None, "Fallo: estudiante sin tutorías o inexistente"
+
+        # Cambiar la carrera del estudiante invalida su reporte en la caché
+        parametros = {'estudiante_id': 1, 'tutor': 'Tutor'}
+        clave, _ = clave_trabajo(conn, 'estudiante', parametros)
+        conn.execute("UPDATE estudiantes SET carrera = 'ISC' WHERE id = 1")
+        assert clave_trabajo(conn, 'estudiante', parametros)[0] != clave, "Fallo: la huella no incluye al estudiante"
+        conn.commit()
+
+        cola = ReportJobQueue(ruta_db, os.path.join(directorio, 'reportes'), trabajadores=1)
+        trabajo_id = cola.encolar(conn, 'estudiante', parametros, 'tutor@x')
+        cola.esperar()
+        trabajo = cola.obtener(conn, trabajo_id)
+        assert trabajo['estado'] == TERMINADO and trabajo['nombre_descarga'] == 'Reporte_Tutorias_Ana_López.pdf', "Fallo: trabajo del reporte"
+        conn.close()
+    print("✅ Verificación de Reporte de Estudiante por Id exitosa.")
+
+def test_importacion_estudiantes():
+    """Verifica la importación por lotes de listas CSV y Excel: altas, cambios, simulación y filas inválidas."""
+    print("\n--- Verificando Importación de Estudiantes ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        conn = sqlite3.connect(os.path.join(directorio, 'importacion.db'))
+        conn.row_factory = sqlite3.Row
+        crear_esquema(conn)
+        crear_tabla_actividad(conn)
+
+        ruta_csv = os.path.join(directorio, 'lista.csv')
+        with open(ruta_csv, 'w', newline='', encoding='utf-8') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(COLUMNAS_CSV)
+            escritor.writerows([f"E{i}", 'López', '', f"20250{i:03d}", '1725 IS'] for i in range(25))
+            escritor.writerow(['', '', '', '', ''])                       # vacía: se ignora
+            escritor.writerow(['Sin', '', '', '999', '1725IS'])           # sin apellido
+            escritor.writerow(['Mal', 'Grupo', '', '998', 'X'])           # grupo inválido
+
+        simulado = importar_archivo(conn, ruta_csv, dry_run=True, tamano_lote=10)
+        assert (simulado.leidas, simulado.insertadas, simulado.invalidas) == (27, 25, 2), f"Fallo: simulación {simulado}"
+        assert conn.execute("SELECT COUNT(*) FROM estudiantes").fetchone()[0] == 0, "Fallo: la simulación guardó cambios"
+
+        resumen = importar_archivo(conn, ruta_csv, tamano_lote=10)
+        assert resumen.insertadas == 25 and [u for u, _ in resumen.errores] == ['línea 28', 'línea 29'], f"Fallo: importación {resumen}"
+        fila = conn.execute("SELECT carrera, cuatrimestre_actual, grupo, programa_educativo FROM estudiantes WHERE matricula = '20250000'").fetchone()
+        assert tuple(fila) == ('Ingeniería en Software', '7', '1725IS', 1), f"Fallo: datos del grupo {tuple(fila)}"
+        assert importar_archivo(conn, ruta_csv).sin_cambios == 25, "Fallo: reimportar sin cambios"
+
+        # Excel (modo read_only): matrícula numérica y cambio de grupo de un estudiante existente
+        ruta_excel = os.path.join(directorio, 'lista.xlsx')
+        libro = openpyxl.Workbook()
+        hoja = libro.active
+        hoja.title = '1425 ITII'
+        hoja.append(['Nombre', 'Apellido P', 'Apellido M', 'Matrícula'])
+        hoja.append(['E0', 'López', None, 20250000.0])
+        hoja.append(['Nueva', 'Ruiz', 'Paz', 20259999])
+        libro.save(ruta_excel)
+        resumen = importar_archivo(conn, ruta_excel)
+        assert (resumen.insertadas, resumen.actualizadas) == (1, 1), f"Fallo: importación de Excel {resumen}"
+        assert conn.execute("SELECT grupo FROM estudiantes WHERE matricula = '20250000'").fetchone()[0] == '1425ITII', "Fallo: actualización del grupo"
+        assert importar_archivo(conn, ruta_excel, solo_nuevos=True).sin_cambios == 2, "Fallo: solo nuevos"
+        conn.close()
+    print("✅ Verificación de Importación de Estudiantes exitosa.")
+
+def test_datos_sinteticos():
+    """Verifica que el generador de datos sintéticos sea determinista y respete los tamaños y códigos de grupo."""
+    print("\n--- Verificando Generador de Datos Sintéticos ---")
+    tamanos = {'estudiantes': 300, 'tutorias': 3000, 'asesorias': 600, 'grupales': 150}
+
+    def contenido(ruta):
+        conn = sqlite3.connect(ruta)
+        filas = {tabla: conn.execute(f"SELECT * FROM {tabla} ORDER BY id").fetchall()
+                 for tabla in ('estudiantes', 'tutoria', 'asesoria', 'tutoria_grupal')}
+        conn.close()
+        return filas
+
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = [os.path.join(directorio, f"sintetica_{i}.db") for i in range(3)]
+        resumen = crear_base_sintetica(rutas[0], semilla=7, hasta=date(2025, 11, 28), busqueda=True, **tamanos)
+        crear_base_sintetica(rutas[1], semilla=7, hasta=date(2025, 11, 28), **tamanos)
+        crear_base_sintetica(rutas[2], semilla=8, hasta=date(2025, 11, 28), **tamanos)
+        assert resumen.filas == {'estudiantes': 300, 'tutoria': 3000, 'asesoria': 600, 'tutoria_grupal': 150}, f"Fallo: filas {resumen.filas}"
+        primera = contenido(rutas[0])
+        assert primera == contenido(rutas[1]), "Fallo: la misma semilla generó datos distintos"
+        assert primera != contenido(rutas[2]), "Fallo: otra semilla generó los mismos datos"
+        try:
+            crear_base_sintetica(rutas[0], **tamanos)
+            assert False, "Fallo: se sobrescribió una base existente"
+        except FileExistsError:
+            pass
+
+        conn = sqlite3.connect(rutas[0])
+        for cuatrimestre, carrera, grupo, programa in conn.execute(
+                "SELECT cuatrimestre_actual, carrera, grupo, programa_educativo FROM estudiantes"):
+            sigla = grupo[1 + len(cuatrimestre) + 2:]
+            assert grupo[1:1 + len(cuatrimestre)] == cuatrimestre and obtener_carreras_por_programa(programa)[sigla] == carrera, \
+                f"Fallo: grupo {grupo} de {carrera}"
+        # Tablas derivadas construidas como en esquema.preparar_esquema
+        assert conn.execute("SELECT sum(cantidad) FROM actividad_mensual WHERE tipo = 'tutoria'").fetchone()[0] == 3000, "Fallo: actividad_mensual"
+        assert conn.execute("SELECT COUNT(*) FROM busqueda_tutoria").fetchone()[0] == 3000, "Fallo: índice de búsqueda"
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal', "Fallo: la base no quedó en WAL"
+        assert version_esquema(conn) == VERSION_ESQUEMA, "Fallo: versión de la base con búsqueda"
+        conn.close()
+
+        # Por defecto se omite la búsqueda: la base queda en la versión 0 y la app la completa al abrirla
+        conn = sqlite3.connect(rutas[1])
+        assert version_esquema(conn) == 0, "Fallo: la base sin búsqueda quedó marcada como al día"
+        assert preparar_esquema(conn), "Fallo: la base sin búsqueda no se migró"
+        assert conn.execute("SELECT COUNT(*) FROM busqueda_tutoria").fetchone()[0] == 3000, "Fallo: búsqueda construida al abrir"
+        conn.close()
+    print("✅ Verificación de Generador de Datos Sintéticos exitosa.")
+
+def test_instrumentacion_sql():
+    """Verifica el registro por petición de sentencias, filas leídas y consultas lentas."""
+    print("\n--- Verificando Instrumentación SQL ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        gestor = ConnectionManager(os.path.join(directorio, 'instrumentacion.db'))
+        db = gestor.obtener()
+        db.execute("CREATE TABLE t (x INTEGER)")
+        db.execute("CREATE TABLE bitacora (x INTEGER)")
+        db.execute("CREATE TRIGGER t_ai AFTER INSERT ON t BEGIN INSERT INTO bitacora VALUES (new.x); END")
+        db.commit()
+
+        registro = RegistroPeticion('GET', '/prueba', 'prueba')
+        db.instrumentar(registro)
+        db.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(30)])
+        db.commit()
+        assert len(db.execute("SELECT x FROM t WHERE x < ?", (10,)).fetchall()) == 10
+        assert sum(1 for _ in db.execute("SELECT x FROM t")) == 30
+        assert len(list(recorrer_en_lotes(db.execute("SELECT x FROM t"), tamano=7))) == 30
+        db.instrumentar(None)
+        db.execute("SELECT COUNT(*) FROM t").fetchone()
+
+        insercion, commit, filtrada, recorrida, por_lotes = registro.consultas
+        assert (insercion.filas, insercion.expandida) == (30, "INSERT INTO t VALUES (0)"), f"Fallo: escritura {insercion.filas}"
+        assert commit.sql == 'COMMIT', "Fallo: commit no registrado"
+        assert filtrada.expandida == "SELECT x FROM t WHERE x < 10", f"Fallo: texto expandido {filtrada.expandida}"
+        assert (filtrada.filas, recorrida.filas, por_lotes.filas) == (10, 30, 30), "Fallo: filas leídas"
+
+        monitor = MonitorPeticiones(umbral_ms=0, capacidad=2)
+        for ruta in ('/a', '/b', '/c'):
+            monitor.terminar(RegistroPeticion('GET', ruta), 200)
+        monitor.terminar(registro, 200)
+        assert 'desc="5 consultas", total;dur=' in encabezado_server_timing(registro), "Fallo: encabezado Server-Timing"
+        assert [p.ruta for p in monitor.peticiones()] == ['/prueba', '/c'], "Fallo: capacidad del historial"
+        assert monitor.lentas()[0] == (registro, por_lotes), "Fallo: consultas lentas"
+        gestor.cerrar_todas()
+    print("✅ Verificación de Instrumentación SQL exitosa.")
+
+def test_metricas():
+    """Verifica los contadores, histogramas y la exposición en formato Prometheus."""
+    print("\n--- Verificando Métricas ---")
+    registro = RegistroMetricas('prueba')
+    peticiones = registro.contador('peticiones_total', 'Peticiones', ('ruta',))
+    duracion = registro.histograma('duracion_segundos', 'Duración', ('ruta',), limites=(0.1, 1))
+    peticiones.incrementar('/a')
+    peticiones.incrementar('/a', cantidad=2)
+    for valor in (0.05, 0.1, 0.5, 3):
+        duracion.observar(valor, '/a "b"')
+    registro.caches.acierto('reportes')
+    registro.caches.fallo('reportes')
+    registro.caches.registrar('lru', lambda: (3, 1))
+    registro.caches.registrar('rota', lambda: 1 / 0)
+
+    texto = registro.exponer()
+    assert texto.endswith('\n') and '# TYPE prueba_duracion_segundos histogram' in texto, "Fallo: encabezados"
+    assert 'prueba_peticiones_total{ruta="/a"} 3' in texto, "Fallo: contador"
+    # Las cubetas son acumuladas y el límite es inclusivo
+    assert 'prueba_duracion_segundos_bucket{ruta="/a \\"b\\"",le="0.1"} 2' in texto, "Fallo: cubeta 0.1 o escape"
+    assert 'prueba_duracion_segundos_bucket{ruta="/a \\"b\\"",le="+Inf"} 4' in texto, "Fallo: cubeta +Inf"
+    assert 'prueba_duracion_segundos_count{ruta="/a \\"b\\""} 4' in texto, "Fallo: cuenta"
+    assert 'prueba_cache_proporcion_aciertos{cache="reportes"} 0.5' in texto, "Fallo: proporción de caché propia"
+    assert 'prueba_cache_proporcion_aciertos{cache="lru"} 0.75' in texto, "Fallo: proporción de caché externa"
+    assert 'cache="rota"' not in texto, "Fallo: caché que no se puede leer"
+
+    # Sentencias contadas por la conexión
+    with tempfile.TemporaryDirectory() as directorio:
+        gestor = ConnectionManager(os.path.join(directorio, 'metricas.db'))
+        db = gestor.obtener()
+        inicio = db.sentencias
+        db.execute("CREATE TABLE t (x INTEGER)")
+        db.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+        db.execute("SELECT * FROM t").fetchall()
+        assert db.sentencias - inicio == 3, f"Fallo: sentencias contadas {db.sentencias - inicio}"
+        gestor.cerrar_todas()
+    print("✅ Verificación de Métricas exitosa.")
+
+# Presupuesto del arranque en frío (importar app con la base al día), en segundos
+PRESUPUESTO_ARRANQUE_S = float(os.environ.get('TUTORIAS_PRESUPUESTO_ARRANQUE_S', 2.0))
+
+CODIGO_IMPORTAR_SIN_HILOS = """
+import threading
+import app
+assert not [h.name for h in threading.enumerate() if h.name.startswith('reportes')], "hilos de reportes al importar"
+"""
+
+CODIGO_MAIN_REANUDA = """
+import app
+app.app.run = lambda **opciones: None
+app.main()
+app.cola_reportes.esperar()
+"""
+
+def test_arranque_versionado():
+    """Verifica que el arranque con el esquema al día solo lee user_version, no carga los módulos pesados y cabe en el presupuesto."""
+    print("\n--- Verificando Arranque con Esquema Versionado ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'arranque.db')
+        conn = sqlite3.connect(ruta)
+        conn.row_factory = sqlite3.Row
+        assert preparar_esquema(conn), "Fallo: la base nueva no se preparó"
+        assert version_esquema(conn) == VERSION_ESQUEMA, "Fallo: versión no guardada"
+        sentencias = []
+        conn.set_trace_callback(sentencias.append)
+        assert not preparar_esquema(conn), "Fallo: se repitió la preparación con la base al día"
+        assert sentencias == ["PRAGMA user_version"], f"Fallo: sentencias al iniciar {sentencias}"
+        conn.set_trace_callback(None)
+        conn.close()
+
+        # Cada arranque es un proceso nuevo, como el ejecutable; se toma el más rápido
+        entorno = dict(os.environ, TUTORIAS_DB=ruta, TUTORIAS_REPORTES_DIR=os.path.join(directorio, 'reportes'),
+                       PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+        tiempos = []
+        for _ in range(3):
+            inicio = time.perf_counter()
+            # ReportLab y pandas se cargan en el primer uso (carga_diferida.py), no al iniciar
+            subprocess.run([sys.executable, '-c', 'import app, carga_diferida; assert not carga_diferida.modulos_cargados()'],
+                           env=entorno, cwd=directorio, check=True, stdout=subprocess.DEVNULL)
+            tiempos.append(time.perf_counter() - inicio)
+        conn = sqlite3.connect(ruta)
+        assert conn.execute("SELECT COUNT(*) FROM usuarios").fetchone()[0] == 0, "Fallo: el arranque cargó datos de prueba"
+        conn.close()
+        assert min(tiempos) <= PRESUPUESTO_ARRANQUE_S, \
+            f"Fallo: arranque en {min(tiempos):.2f} s (presupuesto {PRESUPUESTO_ARRANQUE_S} s)"
+
+        # Importar la app no arranca los hilos de la cola ni reanuda reportes; main() sí
+        conn = sqlite3.connect(ruta)
+        conn.execute("INSERT INTO trabajos_reporte (id, tipo, parametros, estado, creado) "
+                     "VALUES ('p1', 'grupo', '{\"group_id\": 99}', 'pendiente', '2025-01-01')")
+        conn.commit()
+        subprocess.run([sys.executable, '-c', CODIGO_IMPORTAR_SIN_HILOS], env=entorno, cwd=directorio, check=True)
+        assert conn.execute("SELECT estado FROM trabajos_reporte WHERE id = 'p1'").fetchone()[0] == 'pendiente', \
+            "Fallo: importar la app reanudó los reportes"
+        # Proceso del servidor (el que el recargador de debug marca con WERKZEUG_RUN_MAIN)
+        subprocess.run([sys.executable, '-c', CODIGO_MAIN_REANUDA], env=dict(entorno, WERKZEUG_RUN_MAIN='true'),
+                       cwd=directorio, check=True)
+        assert conn.execute("SELECT estado FROM trabajos_reporte WHERE id = 'p1'").fetchone()[0] == 'error', \
+            "Fallo: main() no reanudó los reportes pendientes"
+        conn.close()
+    print(f"✅ Verificación de Arranque exitosa ({min(tiempos):.2f} s).")
+
+# Peticiones a la app en un proceso nuevo (DATABASE se lee al importar app): cada ruta debe responder 200
+CODIGO_RUTAS = """
+import sys
+import app
+app.app.config['TESTING'] = True
+cliente = app.app.test_client()
+with cliente.session_transaction() as sesion:
+    sesion['usuario'], sesion['nombre'] = 'tutor@x', 'Tutor'
+for ruta in sys.argv[1:]:
+    respuesta = cliente.get(ruta)
+    assert respuesta.status_code == 200, f"{ruta}: {respuesta.status_code}"
+"""
+
+# Dos solicitudes del mismo reporte llevan a la misma URL de la caché, que revalida con If-None-Match
+CODIGO_DESCARGA_CACHE = """
+import time
+import app
+app.app.config['TESTING'] = True
+cliente = app.app.test_client()
+with cliente.session_transaction() as sesion:
+    sesion['usuario'], sesion['nombre'] = 'tutor@x', 'Tutor'
+respuesta = cliente.get('/report/group/1')
+trabajo_id = respuesta.headers['Location'].rsplit('/', 1)[1]
+while (estado := cliente.get(f'/api/reportes/{trabajo_id}').get_json())['estado'] != 'terminado':
+    assert estado['estado'] != 'error', estado
+    time.sleep(0.05)
+url = estado['descarga']
+assert url.startswith('/reportes/cache/'), url
+assert cliente.get(f'/reportes/{trabajo_id}/descargar').headers['Location'].endswith(url), "descarga del trabajo"
+assert cliente.get('/report/group/1').headers['Location'].endswith(url), "el acierto no usa la URL estable"
+respuesta = cliente.get(url)
+assert respuesta.status_code == 200 and respuesta.data.startswith(b'%PDF-'), respuesta.status_code
+assert respuesta.headers['ETag'] == '"' + url.rsplit('/', 1)[1] + '"', respuesta.headers['ETag']
+revalidada = cliente.get(url, headers={'If-None-Match': respuesta.headers['ETag']})
+assert revalidada.status_code == 304 and not revalidada.data, revalidada.status_code
+"""
+
+def test_descarga_cache_estable():
+    """Verifica que los reportes de la caché se descargan de /reportes/cache/<clave> y responden 304 a If-None-Match."""
+    print("\n--- Verificando Descarga Estable de la Caché ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'descarga.db')
+        conn = sqlite3.connect(ruta)
+        conn.row_factory = sqlite3.Row
+        migrar(conn)
+        conn.execute("INSERT INTO tutoria_grupal (grupo_nombre, carrera, cuatrimestre, motivo, fecha, descripcion, asistentes) "
+                     "VALUES ('IS-701', 'ISC', '7', 'Integración', '2025-03-01', 'Dinámica de grupo', '25')")
+        conn.commit()
+        conn.close()
+        entorno = dict(os.environ, TUTORIAS_DB=ruta, TUTORIAS_REPORTES_DIR=os.path.join(directorio, 'reportes'),
+                       PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+        proceso = subprocess.run([sys.executable, '-c', CODIGO_DESCARGA_CACHE],
+                                 env=entorno, cwd=directorio, capture_output=True, text=True)
+        assert proceso.returncode == 0, f"Fallo: descarga de la caché\n{proceso.stderr[-2000:]}"
+    print("✅ Verificación de Descarga Estable de la Caché exitosa.")
+
+def test_rutas_base_vacia():
+    """Verifica que una instalación nueva (base migrada sin registros) muestra los paneles sin errores."""
+    print("\n--- Verificando Rutas con Base Vacía ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'vacia.db')
+        conn = sqlite3.connect(ruta)
+        conn.row_factory = sqlite3.Row
+        migrar(conn)
+        conn.close()
+        entorno = dict(os.environ, TUTORIAS_DB=ruta, TUTORIAS_REPORTES_DIR=os.path.join(directorio, 'reportes'),
+                       PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+        proceso = subprocess.run([sys.executable, '-c', CODIGO_RUTAS, '/', '/dashboard/risk', '/dashboard/risk?time_filter=semana',
+                                  '/consultas', '/estudiantes'],
+                                 env=entorno, cwd=directorio, capture_output=True, text=True)
+        assert proceso.returncode == 0, f"Fallo: ruta con base vacía\n{proceso.stderr[-2000:]}"
+    print("✅ Verificación de Rutas con Base Vacía exitosa.")
+
+def test_migraciones():
+    """Verifica el motor de migraciones sobre una base antigua, por lotes y con dos procesos a la vez."""
+    print("\n--- Verificando Migraciones ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        # Base como la creaba el init_db original: sin matricula en asesoria, sin estudiante_id
+        # ni created_at en tutoria y sin grupo/programa_educativo en estudiantes
+        ruta = os.path.join(directorio, 'antigua.db')
+        conn = sqlite3.connect(ruta)
+        conn.row_factory = sqlite3.Row
+        conn.executescript('''
+            CREATE TABLE asesoria (id INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT, apellido_p TEXT, apellido_m TEXT,
+                                   unidad TEXT, parcial TEXT, periodo TEXT, tema TEXT, fecha TEXT, created_at TEXT);
+            CREATE TABLE tutoria (id INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT, apellido_p TEXT, apellido_m TEXT,
+                                  matricula TEXT, cuatrimestre TEXT, motivo TEXT, fecha TEXT, descripcion TEXT,
+                                  observaciones TEXT, seguimiento TEXT);
+            CREATE TABLE estudiantes (id INTEGER PRIMARY KEY AUTOINCREMENT, matricula TEXT UNIQUE NOT NULL,
+                                      nombre TEXT NOT NULL, apellido_p TEXT NOT NULL, apellido_m TEXT,
+                                      cuatrimestre_actual TEXT, carrera TEXT, created_at TEXT, updated_at TEXT);
+        ''')
+        conn.executemany("INSERT INTO tutoria (nombre, apellido_p, motivo, fecha) VALUES (?, 'Pérez', ?, ?)",
+                         [(f"Alumno{i}", f"Motivo {i}", f"2025-0{i % 9 + 1}-10") for i in range(11)])
+        conn.commit()
+
+        assert migrar(conn, hasta=3, tamano_lote=4) == [1, 2, 3], "Fallo: migración parcial"
+        assert version_esquema(conn) == 3, "Fallo: versión tras la migración parcial"
+        assert 'estudiante_id' in columnas_tabla(conn, 'tutoria') and 'matricula' in columnas_tabla(conn, 'asesoria'), \
+            "Fallo: columnas faltantes"
+        assert 'programa_educativo' in columnas_tabla(conn, 'estudiantes'), "Fallo: programa_educativo"
+        assert conn.execute("SELECT COUNT(*) FROM tutoria WHERE created_at IS NULL").fetchone()[0] == 0, \
+            "Fallo: created_at sin rellenar"
+
+        # FTS por lotes: las filas existentes y las que llegan por trigger quedan indexadas una vez
+        assert migrar(conn, tamano_lote=4) == list(range(4, VERSION_ESQUEMA + 1)), "Fallo: migraciones restantes"
+        conn.execute("INSERT INTO tutoria (nombre, apellido_p, motivo, fecha) VALUES ('Nuevo', 'López', 'x', '2025-01-01')")
+        conn.commit()
+        assert conn.execute("SELECT COUNT(*) FROM busqueda_tutoria").fetchone()[0] == 12, "Fallo: índice de búsqueda"
+        assert migrar(conn) == [], "Fallo: se repitió la migración"
+        assert migrar(conn, forzar=True, tamano_lote=5) == list(range(1, VERSION_ESQUEMA + 1)), "Fallo: migración forzada"
+        assert conn.execute("SELECT COUNT(*) FROM busqueda_tutoria").fetchone()[0] == 12, "Fallo: filas repetidas en FTS"
+        conn.close()
+
+        # Dos procesos con la misma base nueva: el candado de archivo deja migrar a uno solo
+        ruta = os.path.join(directorio, 'nueva.db')
+        aplicadas = []
+        def migrar_en_hilo():
+            c = sqlite3.connect(ruta, timeout=10)
+            c.row_factory = sqlite3.Row
+            aplicadas.extend(migrar(c))
+            c.close()
+        hilos = [threading.Thread(target=migrar_en_hilo) for _ in range(2)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        assert sorted(aplicadas) == list(range(1, VERSION_ESQUEMA + 1)), f"Fallo: migraciones concurrentes {aplicadas}"
+
+    # tablas.sql describe las mismas tablas que database.TABLAS
+    referencia, esquema = sqlite3.connect(':memory:'), sqlite3.connect(':memory:')
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablas.sql'), encoding='utf-8') as archivo:
+        referencia.executescript(archivo.read())
+    crear_esquema(esquema)
+    consulta = "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name != 'sqlite_sequence' ORDER BY name"
+    normalizar = lambda filas: [(nombre, ' '.join(sql.split())) for nombre, sql in filas]
+    assert normalizar(referencia.execute(consulta)) == normalizar(esquema.execute(consulta)), "Fallo: tablas.sql desactualizado"
+    print("✅ Verificación de Migraciones exitosa.")
+
+def test_calendario_academico():
+    """Verifica los períodos del calendario académico, su caché por día y el mapeo por lotes."""
+    print("\n--- Verificando Calendario Académico ---")
+    ahora = [datetime(2025, 12, 31, 23, 59).timestamp()]
+    calendario = AcademicCalendar(lambda: ahora[0])
+
+    assert calendario.nombre_periodo() == "Septiembre - Diciembre", "Fallo: período de diciembre"
+    assert calendario.cuatrimestres_disponibles() == ('1', '4', '7', '10'), "Fallo: cuatrimestres de diciembre"
+    assert calendario.fecha_inicio_filtro('semana') == '2025-12-24', "Fallo: inicio del filtro semanal"
+    assert calendario.fecha_inicio_filtro('cuatrimestre') == '2025-09-02', "Fallo: inicio del filtro cuatrimestral"
+    assert calendario.fecha_inicio_filtro('todo') < '2000-01-01', "Fallo: el historial completo tiene límite"
+    contexto = calendario.contexto_plantillas()
+    assert calendario.contexto_plantillas() is contexto, "Fallo: el contexto se recalcula el mismo día"
+
+    # Cambio de día y de año: se recalcula una vez y el período lleva el año nuevo
+    ahora[0] = datetime(2026, 1, 1, 0, 1).timestamp()
+    periodo = calendario.periodo_actual()
+    assert (periodo.año, periodo.numero, periodo.cuatrimestres) == (2026, 1, ('2', '5', '8')), "Fallo: cambio de año"
+    assert calendario.contexto_plantillas() is not contexto, "Fallo: el contexto no cambió de día"
+    assert calendario.fecha_inicio_filtro('semana') == '2025-12-25', "Fallo: filtro tras el cambio de día"
+
+    # Límites de cada período, incluido febrero de un año bisiesto
+    assert [(p.inicio.isoformat(), p.fin.isoformat()) for p in calendario.periodos_del_año(2028)] == [
+        ('2028-01-01', '2028-04-30'), ('2028-05-01', '2028-08-31'), ('2028-09-01', '2028-12-31')], "Fallo: límites"
+    assert calendario.periodos_del_año(2028) is calendario.periodos_del_año(2028), "Fallo: el año se recalcula"
+
+    # Por lotes: textos ISO, fechas y vacíos, igual que una a una
+    fechas = ['2025-04-30', '2025-05-01', date(2024, 9, 1), datetime(2026, 8, 31, 23, 59), None, '2025-04-01']
+    assert calendario.periodos(fechas) == [calendario.periodo(f) for f in fechas], "Fallo: mapeo por lotes"
+    assert [p and p.etiqueta for p in calendario.periodos(fechas)] == [
+        'Enero - Abril 2025', 'Mayo - Agosto 2025', 'Septiembre - Diciembre 2024', 'Mayo - Agosto 2026', None,
+        'Enero - Abril 2025'], "Fallo: etiquetas de los períodos"
+    assert [p.etiqueta for p in calendario.periodos_entre('2025-12-15', '2026-05-02')] == [
+        'Septiembre - Diciembre 2025', 'Enero - Abril 2026', 'Mayo - Agosto 2026'], "Fallo: períodos de un rango"
+    print("✅ Verificación de Calendario Académico exitosa.")
+
+def test_normalizacion_estudiantes():
+    """Verifica la migración a estudiante_id: enlace, copias vaciadas, vistas, búsqueda y actividad."""
+    print("\n--- Verificando Normalización de Estudiantes ---")
+    with tempfile.TemporaryDirectory() as directorio:
+        conn = sqlite3.connect(os.path.join(directorio, 'registros.db'))
+        conn.row_factory = sqlite3.Row
+        migrar(conn, hasta=6)
+        conn.executemany("INSERT INTO estudiantes (id, matricula, nombre, apellido_p, apellido_m, carrera) VALUES (?, ?, ?, ?, ?, ?)",
+                         [(1, 'A1', 'Ana', 'Ruiz', 'Paz', 'ISC'), (2, 'B2', 'Carla', 'Díaz', None, 'IGE'),
+                          (3, 'C3', 'Luis', 'Mora', None, 'ISC'), (4, 'D4', 'Luis', 'Mora', None, 'IGE')])
+        # Registros como los guardaban las versiones anteriores, con la copia de la identidad
+        conn.executemany("INSERT INTO asesoria (nombre, apellido_p, apellido_m, matricula, tema, fecha) VALUES (?, ?, ?, ?, 'Álgebra', ?)",
+                         [('Anita', 'Ruiz', 'Paz', 'A1', '2025-01-10'), ('Carla', 'Díaz', None, None, '2025-02-10'),
+                          ('Luis', 'Mora', None, None, '2025-03-10'), ('Zoe', 'Vega', None, 'Z9', '2025-03-11')])
+        conn.executemany("INSERT INTO tutoria (estudiante_id, nombre, apellido_p, apellido_m, matricula, cuatrimestre, motivo, fecha) "
+                         "VALUES (?, ?, ?, ?, ?, '3', 'Inasistencias', '2025-01-15')",
+                         [(1, 'Anita', 'Ruiz', 'Paz', 'A1'), (None, 'Carla', 'Díaz', None, 'B2')])
+        # El índice de búsqueda de esas versiones tenía el nombre de la copia
+        conn.execute("UPDATE busqueda_tutoria SET nombre = 'anita ruiz paz' WHERE rowid = 1")
+        conn.commit()
+        actividad = conn.execute("SELECT tipo, sum(cantidad) FROM actividad_mensual GROUP BY tipo").fetchall()
+
+        assert migrar(conn, tamano_lote=2) == list(range(7, VERSION_ESQUEMA + 1)), "Fallo: migración de normalización"
+        # Enlace por matrícula o por nombre único; el nombre repetido y la matrícula desconocida quedan sin estudiante
+        assert [tuple(f) for f in conn.execute("SELECT estudiante_id, nombre, matricula FROM asesoria ORDER BY id")] == [
+            (1, None, None), (2, None, None), (None, 'Luis', None), (None, 'Zoe', 'Z9')], "Fallo: enlace de asesorías"
+        assert [tuple(f) for f in conn.execute("SELECT estudiante_id, nombre, cuatrimestre FROM tutoria ORDER BY id")] == [
+            (1, None, '3'), (2, None, '3')], "Fallo: enlace de tutorías"
+        assert [f['nombre'] for f in conn.execute("SELECT nombre FROM vista_asesoria ORDER BY id")] == ['Ana', 'Carla', 'Luis', 'Zoe'], \
+            "Fallo: vista de asesorías"
+        assert conn.execute("SELECT tipo, sum(cantidad) FROM actividad_mensual GROUP BY tipo").fetchall() == actividad, \
+            "Fallo: totales de actividad"
+        assert conn.execute("SELECT cantidad FROM actividad_mensual WHERE tipo = 'asesoria' AND carrera = 'IGE'").fetchone()[0] == 1, \
+            "Fallo: carrera de la asesoría enlazada por nombre"
+        assert not buscar_tutorias(conn, 'Anita') and [t['id'] for t in buscar_tutorias(conn, 'Ruiz')] == [1], \
+            "Fallo: reindexación de la búsqueda"
+
+        # Renombrar al estudiante cambia sus registros sin tocarlos
+        conn.execute("UPDATE estudiantes SET apellido_p = 'Ríos' WHERE id = 1")
+        conn.commit()
+        assert conn.execute("SELECT apellido_p FROM vista_tutoria WHERE id = 1").fetchone()[0] == 'Ríos', "Fallo: vista tras renombrar"
+        assert [t['apellido_p'] for t in buscar_tutorias(conn, 'Ríos')] == ['Ríos'] and not buscar_tutorias(conn, 'Ruiz'), \
+            "Fallo: búsqueda tras renombrar"
+        assert [a['id'] for a in buscar_asesorias(conn, 'Rios')] == [1], "Fallo: búsqueda de asesorías tras renombrar"
+
+        # Repetir la migración no cambia nada
+        migrar(conn, forzar=True)
+        assert conn.execute("SELECT COUNT(*) FROM busqueda_asesoria").fetchone()[0] == 4, "Fallo: filas repetidas en FTS"
+        assert [f['nombre'] for f in conn.execute("SELECT nombre FROM vista_asesoria ORDER BY id")] == ['Ana', 'Carla', 'Luis', 'Zoe'], \
+            "Fallo: migración repetida"
+        conn.close()
+    print("✅ Verificación de Normalización de Estudiantes exitosa.")
+
 if __name__ == '__main__':
     juan_id = setup_test_data()
     test_risk_assessment(juan_id)
     test_academic_history(juan_id)
     test_pdf_generation()
+    test_carga_masiva_riesgo()
+    test_riesgo_materializado()
+    test_reconstruccion_riesgo_concurrente()
+    test_renovacion_ventanas_riesgo()
+    test_evaluacion_por_lotes()
+    test_clasificador_motivos()
+    test_gestor_conexiones()
+    test_conexiones_servidor_hilos()
+    test_busqueda_texto_completo()
+    test_paginacion_keyset()
+    test_actividad_mensual()
+    test_reporte_periodo_por_lotes()
+    test_memoria_reporte_periodo()
+    test_cola_reportes()
+    test_estilos_compartidos()
+    test_cache_reportes()
+    test_descarga_cache_estable()
+    test_exportacion_masiva()
+    test_reporte_estudiante_por_id()
+    test_importacion_estudiantes()
+    test_datos_sinteticos()
+    test_instrumentacion_sql()
+    test_metricas()
+    test_arranque_versionado()
+    test_rutas_base_vacia()
+    test_migraciones()
+    test_calendario_academico()
+    test_normalizacion_estudiantes()
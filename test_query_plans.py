@@ -0,0 +1,262 @@
+"""
+Verificación de planes de consulta
+Extrae todas las sentencias SQL de los módulos de la aplicación, ejecuta EXPLAIN QUERY PLAN
+sobre el esquema real (database.crear_esquema) y falla si alguna recorre una tabla completa
+sin índice y no está en la lista de excepciones justificadas.
+
+Uso: python test_query_plans.py   (o pytest test_query_plans.py)
+"""
+
+import ast
+import os
+import re
+import sqlite3
+
+from actividad import crear_tabla_actividad, obtener_resumen_actividad
+from busqueda import fts_disponible, crear_indices_busqueda, buscar_asesorias, buscar_tutorias, buscar_tutorias_grupales, buscar_estudiantes
+from database import VISTA_DE, crear_esquema
+from paginacion import paginar, ORDEN_RECIENTES, ORDEN_APELLIDOS
+from report_export import leer_cohorte, leer_estudiante
+from report_jobs import crear_tabla_trabajos
+from risk_data import crear_tabla_riesgo
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos cuyas consultas se revisan
+MODULOS = ('app.py', 'risk_data.py', 'report_jobs.py', 'report_cache.py', 'report_export.py', 'roster_import.py')
+
+PALABRAS_SQL = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'WITH')
+PATRON_SQL = re.compile(rf"^(?:{'|'.join(PALABRAS_SQL)})\b", re.IGNORECASE)
+
+# Recorridos completos aceptados: (fragmento de la consulta normalizada, motivo).
+# Cada excepción debe seguir cubriendo al menos un recorrido real.
+EXCEPCIONES = (
+    ("FROM estudiantes WHERE 1=1", "Listado sin filtros o con búsqueda por subcadena (LIKE '%texto%'); los filtros por carrera y cuatrimestre sí usan índice"),
+    ("cuatrimestre_actual FROM estudiantes", "Información de todos los estudiantes para la reconstrucción en bloque del riesgo"),
+    ("riesgo_ventana SET firma", "Invalidación de las ventanas de riesgo: una fila por ventana (cuatro)"),
+    ("firma FROM riesgo_ventana", "Estado de todas las ventanas de riesgo: una fila por ventana (cuatro)"),
+    ("LEFT JOIN tutoria t ON t.estudiante_id = e.id", "Columnas base de los reportes individuales (report_export): siempre se ejecutan con filtro por id, grupo o carrera; ver test_reportes_estudiante_usan_indices"),
+)
+
+PATRON_RECORRIDO = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+
+def normalizar(sql):
+    return ' '.join(sql.split())
+
+
+def _es_sql(texto):
+    # Palabra completa: 'insertadas' o 'updates' no son consultas
+    return PATRON_SQL.match(normalizar(texto)) is not None
+
+
+def extraer_consultas(ruta):
+    """
+    Devuelve [(línea, sql)] con cada sentencia SQL literal del módulo. Las consultas
+    que se arman con `consulta += "..."` dentro de una función se reportan también
+    con todos sus fragmentos concatenados.
+    """
+    with open(ruta, encoding='utf-8') as archivo:
+        arbol = ast.parse(archivo.read())
+
+    consultas = []
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Constant) and isinstance(nodo.value, str) and _es_sql(nodo.value):
+            consultas.append((nodo.lineno, normalizar(nodo.value)))
+
+    for funcion in ast.walk(arbol):
+        if not isinstance(funcion, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        variables = {}
+        nodos = sorted((n for n in ast.walk(funcion) if isinstance(n, (ast.Assign, ast.AugAssign))),
+                       key=lambda n: (n.lineno, n.col_offset))
+        for nodo in nodos:
+            if (isinstance(nodo, ast.Assign) and len(nodo.targets) == 1 and isinstance(nodo.targets[0], ast.Name)
+                    and isinstance(nodo.value, ast.Constant) and isinstance(nodo.value.value, str)
+                    and _es_sql(nodo.value.value)):
+                variables[nodo.targets[0].id] = nodo.value.value
+            elif (isinstance(nodo, ast.AugAssign) and isinstance(nodo.op, ast.Add)
+                    and isinstance(nodo.target, ast.Name) and nodo.target.id in variables
+                    and isinstance(nodo.value, ast.Constant) and isinstance(nodo.value.value, str)):
+                variables[nodo.target.id] += ' ' + nodo.value.value
+                consultas.append((nodo.lineno, normalizar(variables[nodo.target.id])))
+
+    return sorted(set(consultas))
+
+
+def crear_db_esquema():
+    """Base en memoria con el mismo esquema e índices que la aplicación"""
+    conn = sqlite3.connect(':memory:')
+    crear_esquema(conn)
+    crear_tabla_riesgo(conn)
+    crear_indices_busqueda(conn)
+    crear_tabla_actividad(conn)
+    crear_tabla_trabajos(conn)
+    return conn
+
+
+def plan_consulta(conn, sql):
+    """Detalles de EXPLAIN QUERY PLAN (los parámetros se enlazan como NULL)"""
+    return [fila[3] for fila in conn.execute(f"EXPLAIN QUERY PLAN {sql}", [None] * sql.count('?'))]
+
+
+def excepcion_para(sql):
+    for fragmento, motivo in EXCEPCIONES:
+        if fragmento in sql:
+            return motivo
+    return None
+
+
+def revisar_planes():
+    """
+    Returns:
+        tuple: (revisadas, recorridos_no_permitidos [(modulo, línea, sql, plan)],
+                excepciones que ya no cubren ningún recorrido)
+    """
+    conn = crear_db_esquema()
+    revisadas = 0
+    fallas = []
+    usadas = set()
+    for modulo in MODULOS:
+        for linea, sql in extraer_consultas(os.path.join(DIRECTORIO, modulo)):
+            plan = plan_consulta(conn, sql)
+            revisadas += 1
+            if any(PATRON_RECORRIDO.match(detalle) for detalle in plan):
+                motivo = excepcion_para(sql)
+                if motivo:
+                    usadas.add(motivo)
+                else:
+                    fallas.append((modulo, linea, sql, plan))
+    conn.close()
+    sin_uso = [fragmento for fragmento, motivo in EXCEPCIONES if motivo not in usadas]
+    return revisadas, fallas, sin_uso
+
+
+def test_planes_sin_recorridos_completos():
+    print("\n--- Verificando planes de consulta ---")
+    revisadas, fallas, sin_uso = revisar_planes()
+    assert revisadas > 0, "Fallo: no se encontraron consultas"
+    for modulo, linea, sql, plan in fallas:
+        print(f"  ❌ {modulo}:{linea}: {sql}\n     plan: {plan}")
+    assert not fallas, f"Fallo: {len(fallas)} consultas recorren una tabla completa sin índice"
+    assert not sin_uso, f"Fallo: excepciones obsoletas en EXCEPCIONES: {sin_uso}"
+    print(f"✅ {revisadas} consultas revisadas sin recorridos completos inesperados.")
+
+
+def test_indices_usados():
+    """Las consultas que motivaron cada índice deben usarlo"""
+    print("\n--- Verificando uso de índices ---")
+    conn = crear_db_esquema()
+    esperados = {
+        "SELECT * FROM tutoria WHERE fecha >= ? AND fecha <= ? AND cuatrimestre = ? ORDER BY fecha DESC": 'idx_tutoria_fecha_cuatrimestre',
+        "SELECT * FROM tutoria_grupal WHERE grupo_nombre = ? ORDER BY fecha DESC": 'idx_tutoria_grupal_grupo_fecha',
+        "SELECT * FROM tutoria WHERE nombre = ? AND apellido_p = ? AND apellido_m = ? ORDER BY fecha DESC": 'idx_tutoria_nombre_fecha',
+        "SELECT * FROM tutoria WHERE estudiante_id = ? ORDER BY fecha DESC": 'idx_tutoria_estudiante_fecha',
+        "SELECT * FROM asesoria ORDER BY created_at DESC": 'idx_asesoria_created_at',
+        "SELECT * FROM tutoria ORDER BY created_at DESC": 'idx_tutoria_created_at',
+        "SELECT * FROM tutoria_grupal ORDER BY created_at DESC": 'idx_tutoria_grupal_created_at',
+    }
+    for sql, indice in esperados.items():
+        plan = ' | '.join(plan_consulta(conn, sql))
+        assert indice in plan, f"Fallo: '{sql}' no usa {indice} ({plan})"
+        assert 'TEMP B-TREE' not in plan, f"Fallo: '{sql}' ordena en un árbol temporal ({plan})"
+    conn.close()
+    print("✅ Verificación de uso de índices exitosa.")
+
+
+def test_busquedas_usan_fts():
+    """Las consultas que arma busqueda.py (f-strings) se capturan al ejecutarse y se revisan"""
+    print("\n--- Verificando planes de búsqueda ---")
+    if not fts_disponible():
+        print("  (SQLite sin FTS5: la búsqueda usa LIKE; se omite)")
+        return
+    conn = crear_db_esquema()
+    ejecutadas = []
+    conn.set_trace_callback(ejecutadas.append)
+    for texto in ('perez', 'pe', 'garcía matemáticas'):
+        buscar_asesorias(conn, texto)
+        buscar_tutorias(conn, texto)
+        buscar_tutorias_grupales(conn, texto)
+        buscar_estudiantes(conn, texto, '3')
+    conn.set_trace_callback(None)
+
+    consultas = [normalizar(sql) for sql in ejecutadas if _es_sql(sql)]
+    assert consultas, "Fallo: no se capturaron consultas de búsqueda"
+    for sql in consultas:
+        # El rastreo ya trae los parámetros expandidos
+        plan = [fila[3] for fila in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        assert not any(PATRON_RECORRIDO.match(d) for d in plan), f"Fallo: la búsqueda recorre una tabla ({sql}: {plan})"
+        assert any('VIRTUAL TABLE' in d for d in plan), f"Fallo: la búsqueda no usa el índice FTS5 ({plan})"
+    conn.close()
+    print(f"✅ {len(consultas)} consultas de búsqueda usan el índice de texto completo.")
+
+
+def test_paginacion_usa_indices():
+    """Cada página keyset debe ser un recorrido de índice sin ordenamiento temporal"""
+    print("\n--- Verificando planes de paginación ---")
+    conn = crear_db_esquema()
+    conn.row_factory = sqlite3.Row
+    conn.execute("INSERT INTO estudiantes (matricula, nombre, apellido_p) VALUES ('1', 'A', 'B'), ('2', 'C', 'D')")
+    conn.execute("INSERT INTO tutoria (estudiante_id, created_at) VALUES (1, '2025-01-01'), (2, '2025-01-02')")
+    ejecutadas = []
+    conn.set_trace_callback(ejecutadas.append)
+    # Asesorías y tutorías se paginan sobre su vista, como en /consultas
+    for tabla, orden, descendente in ((VISTA_DE['asesoria'], ORDEN_RECIENTES, True), (VISTA_DE['tutoria'], ORDEN_RECIENTES, True),
+                                      ('tutoria_grupal', ORDEN_RECIENTES, True), ('estudiantes', ORDEN_APELLIDOS, False)):
+        primera = paginar(conn, tabla, orden, descendente, tamano=1)
+        if primera.siguiente:
+            segunda = paginar(conn, tabla, orden, descendente, primera.siguiente, tamano=1)
+            paginar(conn, tabla, orden, descendente, segunda.anterior, tamano=1)
+    conn.set_trace_callback(None)
+
+    for sql in ejecutadas:
+        plan = ' | '.join(fila[3] for fila in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+        assert 'USING INDEX' in plan and 'TEMP B-TREE' not in plan, f"Fallo: página sin índice ({sql}: {plan})"
+    conn.close()
+    print(f"✅ {len(ejecutadas)} consultas de paginación usan índice.")
+
+
+def test_dashboard_una_consulta():
+    """El dashboard lee el resumen con una sola consulta, sin tocar las tablas de registros"""
+    print("\n--- Verificando consulta del dashboard ---")
+    conn = crear_db_esquema()
+    ejecutadas = []
+    conn.set_trace_callback(ejecutadas.append)
+    obtener_resumen_actividad(conn, carrera='ISC', cuatrimestre='3')
+    conn.set_trace_callback(None)
+
+    assert len(ejecutadas) == 1, f"Fallo: el dashboard ejecuta {len(ejecutadas)} consultas"
+    plan = plan_consulta(conn, ejecutadas[0])
+    tablas = {m.group(1) for m in (re.match(r'^(?:SCAN|SEARCH) (\w+)', d) for d in plan) if m}
+    assert tablas == {'actividad_mensual'}, f"Fallo: el dashboard no lee solo actividad_mensual ({plan})"
+    conn.close()
+    print("✅ El dashboard lee actividad_mensual con una sola consulta.")
+
+
+def test_reportes_estudiante_usan_indices():
+    """El reporte individual y la exportación masiva leen estudiantes y tutorías por índice"""
+    print("\n--- Verificando planes de reportes de estudiantes ---")
+    conn = crear_db_esquema()
+    conn.row_factory = sqlite3.Row
+    ejecutadas = []
+    conn.set_trace_callback(ejecutadas.append)
+    leer_estudiante(conn, 1)
+    list(leer_cohorte(conn, grupo='1725IS'))
+    list(leer_cohorte(conn, carrera='IS'))
+    conn.set_trace_callback(None)
+
+    for sql in ejecutadas:
+        plan = plan_consulta(conn, sql)
+        assert not any(PATRON_RECORRIDO.match(d) for d in plan), f"Fallo: recorrido completo ({sql}: {plan})"
+        assert any('idx_tutoria_estudiante_fecha' in d for d in plan), f"Fallo: tutorías sin índice ({plan})"
+    conn.close()
+    print(f"✅ {len(ejecutadas)} consultas de reportes de estudiantes usan índice.")
+
+
+if __name__ == '__main__':
+    test_planes_sin_recorridos_completos()
+    test_indices_usados()
+    test_busquedas_usan_fts()
+    test_paginacion_usa_indices()
+    test_dashboard_una_consulta()
+    test_reportes_estudiante_usan_indices()
@@ -0,0 +1,77 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Compilación ligera: pyinstaller tutorias_ligero.spec
+#
+# Frente a tutorias.spec:
+#  - No incluye pandas ni numpy (más de la mitad del paquete). La evaluación de riesgo por
+#    lotes usa su versión sin pandas (RiskAssessmentEngine._evaluar_lote_sin_pandas), unas
+#    1.3 veces más lenta con 1 millón de tutorías.
+#  - Genera una carpeta (onedir) en lugar de un solo .exe: al abrirlo no se descomprime el
+#    paquete completo en una carpeta temporal, que es lo que más tarda en iniciar.
+#  - ReportLab se importa al generar el primer PDF (carga_diferida.py), no al iniciar.
+#
+# Medición: python benchmarks/bench_importacion.py
+
+block_cipher = None
+
+a = Analysis(
+    ['app.py'],
+    pathex=[],
+    binaries=[],
+    datas=[
+        ('templates', 'templates'),
+        ('static', 'static'),
+        ('asesorias.db', '.'),
+    ],
+    hiddenimports=[
+        'flask',
+        'sqlite3',
+        # Se importan con carga_diferida (el análisis estático no los ve)
+        'pdf_generator',
+        'reportlab.pdfbase',
+        'reportlab.pdfbase.ttfonts',
+        'reportlab.lib.colors',
+        'reportlab.lib.pagesizes',
+        'reportlab.platypus',
+        'openpyxl',
+    ],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=['pandas', 'numpy', 'tkinter', 'unittest', 'pydoc_data'],
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    noarchive=False,
+)
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='TUTORIAS',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='TUTORIAS_ligero',
+)
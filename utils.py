@@ -2,28 +2,156 @@
 Módulo de utilidades para el sistema de tutorías
 """
 
-from datetime import datetime, timedelta
+import calendar
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+# ---------------------------
+# Calendario académico
+# ---------------------------
+# Períodos del año: (mes inicial, mes final, nombre, cuatrimestres que se cursan)
+PERIODOS_ACADEMICOS = (
+    (1, 4, "Enero - Abril", ('2', '5', '8')),
+    (5, 8, "Mayo - Agosto", ('3', '6', '9')),
+    (9, 12, "Septiembre - Diciembre", ('1', '4', '7', '10')),
+)
+
+# Posición en PERIODOS_ACADEMICOS del período de cada mes
+_PERIODO_DEL_MES = {mes: indice for indice, (inicio, fin, _, _) in enumerate(PERIODOS_ACADEMICOS)
+                    for mes in range(inicio, fin + 1)}
+
+# Días hacia atrás de cada filtro de tiempo; cualquier otro valor es todo el historial
+DIAS_FILTRO_TIEMPO = {'semana': 7, 'mes': 30, 'cuatrimestre': 120}
+FECHA_SIN_FILTRO = date.min.isoformat()
+
+
+class Periodo(namedtuple('Periodo', ['año', 'numero', 'nombre', 'inicio', 'fin', 'cuatrimestres'])):
+    """Período académico: número (1 a 3) dentro del año, fechas límite y cuatrimestres que se cursan"""
+
+    __slots__ = ()
+
+    @property
+    def etiqueta(self):
+        return f"{self.nombre} {self.año}"
+
+
+class AcademicCalendar:
+    """
+    Calendario académico con caché. Los límites de los períodos se calculan una vez por año
+    y lo que depende del día (período actual, cuatrimestres disponibles, inicio de cada filtro
+    de tiempo y el contexto de las plantillas) una vez por día; las llamadas siguientes solo
+    comparan la hora con los límites del día.
+
+    Args:
+        reloj: Función que devuelve la hora actual en segundos (time.time; en las pruebas, fija)
+    """
+
+    def __init__(self, reloj=time.time):
+        self._reloj = reloj
+        self._años = {}
+        # (inicio del día, siguiente medianoche, valores del día); se reemplaza completo al cambiar de día
+        self._dia = (0.0, 0.0, None)
+
+    def hoy(self):
+        return self._del_dia()['hoy']
+
+    def periodos_del_año(self, año):
+        """Los tres períodos de un año, en orden"""
+        periodos = self._años.get(año)
+        if periodos is None:
+            periodos = self._años[año] = tuple(
+                Periodo(año, numero, nombre, date(año, mes_inicio, 1),
+                        date(año, mes_fin, calendar.monthrange(año, mes_fin)[1]), cuatrimestres)
+                for numero, (mes_inicio, mes_fin, nombre, cuatrimestres) in enumerate(PERIODOS_ACADEMICOS, 1)
+            )
+        return periodos
+
+    def periodo(self, fecha):
+        """Período de una fecha (date, datetime o texto ISO 'YYYY-MM-DD'); None si no hay fecha"""
+        if not fecha:
+            return None
+        if isinstance(fecha, str):
+            año, mes = int(fecha[:4]), int(fecha[5:7])
+        else:
+            año, mes = fecha.year, fecha.month
+        return self.periodos_del_año(año)[_PERIODO_DEL_MES[mes]]
+
+    def periodos(self, fechas):
+        """Período de cada fecha de una secuencia; cada mes distinto se resuelve una sola vez"""
+        por_mes = {}
+        resultado = []
+        for fecha in fechas:
+            clave = fecha[:7] if isinstance(fecha, str) else fecha and (fecha.year, fecha.month)
+            periodo = por_mes.get(clave)
+            if periodo is None:
+                periodo = por_mes[clave] = self.periodo(fecha)
+            resultado.append(periodo)
+        return resultado
+
+    def periodos_entre(self, desde, hasta):
+        """Períodos que se traslapan con el rango de fechas [desde, hasta]"""
+        primero, ultimo = self.periodo(desde), self.periodo(hasta)
+        return [periodo for año in range(primero.año, ultimo.año + 1) for periodo in self.periodos_del_año(año)
+                if primero.inicio <= periodo.inicio <= ultimo.inicio]
+
+    def _del_dia(self):
+        ahora = self._reloj()
+        inicio, fin, valores = self._dia
+        if not inicio <= ahora < fin:
+            hoy = date.fromtimestamp(ahora)
+            periodo = self.periodo(hoy)
+            valores = {
+                'hoy': hoy,
+                'periodo': periodo,
+                'filtros': {filtro: (hoy - timedelta(days=dias)).isoformat()
+                            for filtro, dias in DIAS_FILTRO_TIEMPO.items()},
+                'contexto': {'cuatrimestres_disponibles': periodo.cuatrimestres, 'periodo_actual': periodo.nombre},
+            }
+            medianoche = datetime.combine(hoy, datetime.min.time())
+            self._dia = (medianoche.timestamp(), (medianoche + timedelta(days=1)).timestamp(), valores)
+        return valores
+
+    def periodo_actual(self):
+        return self._del_dia()['periodo']
+
+    def cuatrimestres_disponibles(self):
+        """
+        Cuatrimestres que se cursan en el período actual:
+        - Septiembre - Diciembre: 1°, 4°, 7° y 10°
+        - Enero - Abril: 2°, 5° y 8°
+        - Mayo - Agosto: 3°, 6° y 9°
+        """
+        return self._del_dia()['periodo'].cuatrimestres
+
+    def nombre_periodo(self):
+        """Nombre del período actual (ej. "Septiembre - Diciembre")"""
+        return self._del_dia()['periodo'].nombre
+
+    def fecha_inicio_filtro(self, filtro_tiempo):
+        """
+        Fecha de inicio (YYYY-MM-DD) de un filtro de tiempo: 'semana' (7 días), 'mes' (30),
+        'cuatrimestre' (120) o cualquier otro valor para todo el historial
+        """
+        return self._del_dia()['filtros'].get(filtro_tiempo, FECHA_SIN_FILTRO)
+
+    def contexto_plantillas(self):
+        """Variables del período actual para las plantillas (el mismo dict durante todo el día)"""
+        return self._del_dia()['contexto']
+
+
+# Calendario de la aplicación (fecha del sistema)
+calendario = AcademicCalendar()
+
 
 def obtener_cuatrimestres_disponibles():
     """
     Obtiene los cuatrimestres disponibles según la época del año actual.
     
-    Lógica:
-    - Septiembre - Diciembre: 1°, 4°, 7° y 10°
-    - Enero - Abril: 2°, 5° y 8°
-    - Mayo - Agosto: 3°, 6° y 9°
-    
     Returns:
         list: Lista de cuatrimestres disponibles como strings
     """
-    mes_actual = datetime.now().month
-    
-    if mes_actual in [9, 10, 11, 12]:  # Septiembre - Diciembre
-        return ['1', '4', '7', '10']
-    elif mes_actual in [1, 2, 3, 4]:  # Enero - Abril
-        return ['2', '5', '8']
-    else:  # Mayo - Agosto (5, 6, 7, 8)
-        return ['3', '6', '9']
+    return list(calendario.cuatrimestres_disponibles())
 
 def obtener_nombre_periodo():
     """
@@ -32,14 +160,7 @@ def obtener_nombre_periodo():
     Returns:
         str: Nombre del período (ej. "Septiembre - Diciembre")
     """
-    mes_actual = datetime.now().month
-    
-    if mes_actual in [9, 10, 11, 12]:
-        return "Septiembre - Diciembre"
-    elif mes_actual in [1, 2, 3, 4]:
-        return "Enero - Abril"
-    else:
-        return "Mayo - Agosto"
+    return calendario.nombre_periodo()
 
 def validar_cuatrimestre(cuatrimestre):
     """
@@ -51,8 +172,7 @@ def validar_cuatrimestre(cuatrimestre):
     Returns:
         bool: True si es válido, False si no
     """
-    cuatrimestres_disponibles = obtener_cuatrimestres_disponibles()
-    return str(cuatrimestre) in cuatrimestres_disponibles
+    return str(cuatrimestre) in calendario.cuatrimestres_disponibles()
 
 def obtener_fecha_inicio_filtro(filtro_tiempo):
     """
@@ -62,22 +182,9 @@ def obtener_fecha_inicio_filtro(filtro_tiempo):
         filtro_tiempo (str): 'semana', 'mes', 'cuatrimestre'
         
     Returns:
-        datetime: Fecha de inicio del período de filtro.
+        datetime: Inicio (a medianoche) del período de filtro; datetime.min sin filtro.
     """
-    hoy = datetime.now()
-    
-    if filtro_tiempo == 'semana':
-        # Últimos 7 días
-        return hoy - timedelta(days=7)
-    elif filtro_tiempo == 'mes':
-        # Últimos 30 días
-        return hoy - timedelta(days=30)
-    elif filtro_tiempo == 'cuatrimestre':
-        # Últimos 4 meses (aprox. 120 días)
-        return hoy - timedelta(days=120)
-    else:
-        # Sin filtro de tiempo (todos los datos)
-        return datetime.min # Usar una fecha muy antigua
+    return datetime.fromisoformat(calendario.fecha_inicio_filtro(filtro_tiempo))
 
 
 
@@ -117,7 +224,7 @@ def obtener_grupos_disponibles(cuatrimestre, programa_id):
     if not cuatrimestre or not programa_id:
         return []
     
-    año_actual = str(datetime.now().year)[-2:]  # Últimos 2 dígitos del año
+    año_actual = str(calendario.hoy().year)[-2:]  # Últimos 2 dígitos del año
     carreras = obtener_carreras_por_programa(programa_id)
     grupos_disponibles = []
     